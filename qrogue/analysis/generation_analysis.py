@@ -69,6 +69,34 @@ def test_layout():
         map_gen.generate(seed, debug=True)
 
 
+def layout_regression(start_seed: int = 50000, end_seed: int = 55000, legacy: Optional[bool] = None):
+    """
+    Generates the layouts of all seeds in [start_seed, end_seed[ and reports the mean and 99th percentile of the
+    generation times as well as the number of failing seeds.
+
+    :param legacy: whether the layouts should be created like in older versions, see RandomLayoutGenerator
+    """
+    durations: List[float] = []
+    failing_seeds: List[int] = []
+    map_gen = RandomLayoutGenerator(DungeonGenerator.WIDTH, DungeonGenerator.HEIGHT, legacy)
+    for seed in range(start_seed, end_seed):
+        start_time = time.perf_counter()
+        if not map_gen.generate(seed, validate=True):
+            failing_seeds.append(seed)
+        durations.append(time.perf_counter() - start_time)
+
+    durations.sort()
+    p99 = durations[min(int(len(durations) * 0.99), len(durations) - 1)]
+    __print(f"Layouts for seeds {start_seed} to {end_seed} (legacy = {legacy}):")
+    __print(f"Mean: {1000 * sum(durations) / len(durations):.3f}ms")
+    __print(f"P99:  {1000 * p99:.3f}ms")
+    __print(f"Max:  {1000 * durations[-1]:.3f}ms")
+    __print(f"Failures: {len(failing_seeds)}")
+    if len(failing_seeds) > 0:
+        __print(", ".join([str(seed) for seed in failing_seeds]))
+    __print()
+
+
 def test_dungeon():
     min_duration = (1, -1)
     duration_sum = 0
@@ -123,6 +151,9 @@ if __name__ == '__main__':
     if test_util.init_singletons(include_config=True):
         test_layout()
         print()
+        layout_regression(legacy=True)
+        layout_regression(legacy=False)
+        print()
         print("#####################################################################################################")
         print()
         test_dungeon()
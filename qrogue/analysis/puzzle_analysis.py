@@ -1,8 +1,11 @@
-from typing import List, Tuple, Dict
+import time
+from typing import List, Tuple, Dict, Optional
+
+import numpy as np
 
 import qrogue.game.logic.collectibles.instruction as gates
 from qrogue.game.logic import PuzzleGenerator
-from qrogue.game.logic.base import QuantumCircuit, StateVector
+from qrogue.game.logic.base import QuantumCircuit, StateVector, UnitaryCache
 from qrogue.game.logic.collectibles import Score
 from qrogue.test import test_util
 from qrogue.util import RandomManager, StvDifficulty, DifficultyType
@@ -37,6 +40,7 @@ def analyze_puzzle_gen_speed(num_of_seeds: int = 100):
     diff_level = StvDifficulty.max_difficulty_level()
     difficulty = StvDifficulty.from_difficulty_level(diff_level)
 
+    UnitaryCache.instance().reset_stats()
     times = [produce_puzzle(seed, num_of_qubits, circuit_space, difficulty, gate_list) for seed in range(num_of_seeds)]
 
     times.sort()
@@ -47,6 +51,34 @@ def analyze_puzzle_gen_speed(num_of_seeds: int = 100):
     print(f"Q3:     {int(times[int(len(times) * 0.75)] / 1000)}ms")
     print(f"Max:     {int(times[-1] / 1000)}ms")
 
+    cache = UnitaryCache.instance()
+    print(f"Unitary cache: {cache.hits} hits, {cache.misses} misses, {cache.size}/{cache.max_size} entries")
+
+
+def analyze_batch_puzzle_gen_speed(num_of_seeds: int = 1000, num_of_workers: Optional[int] = None):
+    """
+    Compares generating puzzles sequentially with PuzzleGenerator.generate_puzzles() distributed over multiple
+    processes and checks that both produce the same puzzles.
+    """
+    num_of_qubits = 3
+    circuit_space = 5
+    gate_list = [gates.HGate(), gates.XGate(), gates.SGate(), gates.XGate(), gates.HGate()]
+    difficulty = StvDifficulty.from_difficulty_level(StvDifficulty.max_difficulty_level())
+    seeds = list(range(num_of_seeds))
+
+    results = []
+    for workers in [1, num_of_workers]:
+        start_time = time.time()
+        results.append(PuzzleGenerator.generate_puzzles(seeds, num_of_qubits, circuit_space, difficulty, gate_list,
+                                                        [gates.CXGate()], [Score()], workers))
+        duration = time.time() - start_time
+        print(f"{'sequential' if workers == 1 else 'batch':<10}: {duration:.2f}s total, "
+              f"{int(1000 * duration / num_of_seeds)}ms per puzzle")
+
+    identical = all(np.array_equal(seq[0].amplitudes, par[0].amplitudes) and
+                    np.array_equal(seq[1].amplitudes, par[1].amplitudes) for seq, par in zip(*results))
+    print(f"Identical results: {identical}")
+
 
 def analyze_puzzle_gen_success(num_of_seeds: int = 100, print_fails: bool = False, print_stats: bool = True):
     """
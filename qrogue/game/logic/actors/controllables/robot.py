@@ -5,6 +5,8 @@ Author: Artner Michael
 from abc import ABC
 from typing import Tuple, List, Callable, Optional, Iterator, Union
 
+import numpy as np
+
 from qrogue.game.logic.actors.controllables import Controllable
 from qrogue.game.logic.actors.controllables.qubit import QubitSet, DummyQubitSet
 from qrogue.game.logic.base import StateVector, CircuitMatrix, QuantumSimulator, QuantumCircuit, UnitarySimulator
@@ -317,6 +319,106 @@ class _Backpack:
         return iter(self.__storage)
 
 
+class _CircuitProducts:
+    """
+    Keeps the unitary of every column of a Robot's circuit as well as prefix and suffix products of them. Changing a
+    single column therefore only needs the column's own unitary and two matrix multiplications with the cached products
+    instead of simulating the whole circuit again. Only used with the native backend.
+    """
+
+    def __init__(self, num_of_qubits: int, circuit_space: int):
+        """
+        :param num_of_qubits: how many qubits the circuit has
+        :param circuit_space: how many columns the circuit has
+        """
+        self.__num_of_qubits = num_of_qubits
+        self.__identity = np.eye(2 ** num_of_qubits, dtype=np.complex128)
+        self.__identity.flags.writeable = False
+        self.__columns: List[Optional[np.ndarray]] = [None] * circuit_space  # None for empty columns
+        # prefixes[i] is the unitary of columns 0..i-1, suffixes[i] the unitary of columns i..circuit_space-1
+        self.__prefixes: List[np.ndarray] = [self.__identity] * (circuit_space + 1)
+        self.__suffixes: List[np.ndarray] = [self.__identity] * (circuit_space + 1)
+        self.__valid_prefixes = circuit_space  # prefixes[0..__valid_prefixes] are up-to-date
+        self.__valid_suffixes = 0  # suffixes[__valid_suffixes..circuit_space] are up-to-date
+        self.__dirty: List[int] = []  # columns whose unitary has to be recomputed
+
+    @property
+    def num_of_qubits(self) -> int:
+        return self.__num_of_qubits
+
+    @property
+    def circuit_space(self) -> int:
+        return len(self.__columns)
+
+    def __column_unitary(self, instruction: Optional[Instruction]) -> Optional[np.ndarray]:
+        if instruction is None: return None
+        # the single gate unitaries are shared with (and cached by) the global UnitaryCache
+        unitary, _ = Instruction.compute_unitary([instruction], self.__num_of_qubits)
+        return unitary
+
+    @staticmethod
+    def __multiply(left: Optional[np.ndarray], right: np.ndarray) -> np.ndarray:
+        if left is None: return right
+        return left @ right
+
+    def __update_prefixes(self, until: int):
+        for i in range(self.__valid_prefixes, until):
+            self.__prefixes[i + 1] = self.__multiply(self.__columns[i], self.__prefixes[i])
+        self.__valid_prefixes = max(self.__valid_prefixes, until)
+
+    def __update_suffixes(self, until: int):
+        for i in range(self.__valid_suffixes - 1, until - 1, -1):
+            suffix = self.__suffixes[i + 1]
+            self.__suffixes[i] = suffix if self.__columns[i] is None else suffix @ self.__columns[i]
+        self.__valid_suffixes = min(self.__valid_suffixes, until)
+
+    def invalidate(self, position: int):
+        """
+        Marks the column at position as changed, e.g., because an Instruction was placed or removed.
+        """
+        if position not in self.__dirty:
+            self.__dirty.append(position)
+        self.__valid_prefixes = min(self.__valid_prefixes, position)
+        self.__valid_suffixes = max(self.__valid_suffixes, position + 1)
+
+    def compute(self, instructions: List[Optional[Instruction]]) -> np.ndarray:
+        """
+        :param instructions: the Instruction (or None) of every column, must have length circuit_space
+        :return: the (unrounded) unitary of the whole circuit
+        """
+        if len(self.__dirty) <= 0:
+            self.__update_prefixes(self.circuit_space)
+            return self.__prefixes[-1]
+
+        for position in self.__dirty:
+            self.__columns[position] = self.__column_unitary(instructions[position])
+        lo, hi = min(self.__dirty), max(self.__dirty)
+        self.__dirty.clear()
+
+        # only the changed range lo..hi has to be multiplied, everything around it is taken from the cached products
+        self.__update_prefixes(lo)
+        self.__update_suffixes(hi + 1)
+        unitary = self.__prefixes[lo]
+        for i in range(lo, hi + 1):
+            unitary = self.__multiply(self.__columns[i], unitary)
+        return self.__suffixes[hi + 1] @ unitary
+
+    def preview(self, instruction: Instruction, position: int) -> np.ndarray:
+        """
+        Computes the unitary the circuit would have if instruction was placed at position (replacing the Instruction
+        currently placed there) without changing the cached products.
+
+        :param instruction: the Instruction to preview, its qargs need to be set
+        :param position: the column to place instruction at
+        :return: the (unrounded) unitary of the previewed circuit
+        """
+        assert len(self.__dirty) <= 0, "compute() needs to be called before previewing"
+        self.__update_prefixes(position)
+        self.__update_suffixes(position + 1)
+        return self.__suffixes[position + 1] @ self.__multiply(self.__column_unitary(instruction),
+                                                                 self.__prefixes[position])
+
+
 class Robot(Controllable, ABC):
     @staticmethod
     def __counts_to_bit_list(counts):  # todo can be deleted I think
@@ -359,6 +461,7 @@ class Robot(Controllable, ABC):
         self.__instruction_count: int = 0  # how many instructions are currently placed on the circuit
         # initialize based on empty circuit
         self.__instructions: List[Optional[Instruction]] = [None] * attributes.circuit_space
+        self.__products: Optional[_CircuitProducts] = None  # created on demand since num_of_qubits can change
         # initially there is no static gate (i.e., a gate that cannot be moved and was added by a puzzle)
 
         if False:
@@ -464,6 +567,7 @@ class Robot(Controllable, ABC):
         for i, inst in enumerate(old_instructions):
             if inst is not None and i < len(self.__instructions):
                 self.__instructions[i] = inst
+        self.__products = None
 
     def update_statevector(self, input_stv: StateVector, use_energy: bool = True, check_for_game_over: bool = True):
         """
@@ -478,18 +582,24 @@ class Robot(Controllable, ABC):
         if check_for_game_over and self.game_over_check():
             return
 
-        num_of_used_gates: int = 0  # cannot use len(instructions) since this contains None values
-        circuit = QuantumCircuit.from_bit_num(self.num_of_qubits, self.num_of_qubits)
-        for inst in self.__instructions:
-            if inst is not None:
-                num_of_used_gates += 1
-                inst.append_to(circuit)
+        if QuantumSimulationConfig.use_native_backend():
+            unitary = self.__get_products().compute(self.__instructions)
+            amplitudes = unitary[:, 0]  # the output for |0...0>
+            self.__circuit_matrix = CircuitMatrix(np.round(unitary, QuantumSimulationConfig.DECIMALS),
+                                                  self.__instruction_count)
+        else:
+            num_of_used_gates: int = 0  # cannot use len(instructions) since this contains None values
+            circuit = QuantumCircuit.from_bit_num(self.num_of_qubits, self.num_of_qubits)
+            for inst in self.__instructions:
+                if inst is not None:
+                    num_of_used_gates += 1
+                    inst.append_to(circuit)
 
-        amplitudes = self.__unitary_simulator.execute(circuit, decimals=QuantumSimulationConfig.DECIMALS)
-        self.__circuit_matrix = CircuitMatrix(amplitudes, num_of_used_gates)
+            unitary = self.__unitary_simulator.execute(circuit, decimals=QuantumSimulationConfig.DECIMALS)
+            self.__circuit_matrix = CircuitMatrix(unitary, num_of_used_gates)
+            amplitudes = None if input_stv is not None else self.__simulator.run(circuit, do_transpile=True)
 
         if input_stv is None:  # todo: input_stv might only be None if the circuit is empty (reset or initialized)
-            amplitudes = self.__simulator.run(circuit, do_transpile=True)
             self.__stv = StateVector(amplitudes, num_of_used_gates=self.__instruction_count)
         else:
             self.__stv = self.__circuit_matrix.multiply(input_stv)
@@ -499,6 +609,47 @@ class Robot(Controllable, ABC):
         if use_energy and GameplayConfig.get_option_value(Options.energy_mode):
             self.decrease_energy(amount=1)
 
+    def __get_products(self) -> _CircuitProducts:
+        if self.__products is None or self.__products.num_of_qubits != self.num_of_qubits or \
+                self.__products.circuit_space != len(self.__instructions):
+            self.__products = _CircuitProducts(self.num_of_qubits, len(self.__instructions))
+            for position, inst in enumerate(self.__instructions):
+                if inst is not None:
+                    self.__products.invalidate(position)
+        return self.__products
+
+    def __invalidate_column(self, position: int):
+        if self.__products is not None:
+            self.__products.invalidate(position)
+
+    def preview_circuit_matrix(self, instruction: Instruction, position: int) -> CircuitMatrix:
+        """
+        Computes the CircuitMatrix the circuit would have if instruction was placed at position (replacing the
+        Instruction currently placed there) without actually placing it, e.g., to show the resulting output while
+        choosing where to place instruction.
+
+        :param instruction: the Instruction to preview, its qubits need to be specified
+        :param position: the position in the circuit where instruction would be placed
+        :return: the resulting CircuitMatrix
+        """
+        num_of_used_gates = self.__instruction_count
+        if self.__instructions[position] is None:
+            num_of_used_gates += 1
+
+        if QuantumSimulationConfig.use_native_backend():
+            products = self.__get_products()
+            products.compute(self.__instructions)  # make sure there are no pending changes
+            unitary = products.preview(instruction, position)
+        else:
+            circuit = QuantumCircuit.from_bit_num(self.num_of_qubits, self.num_of_qubits)
+            for i, inst in enumerate(self.__instructions):
+                if i == position:
+                    inst = instruction
+                if inst is not None:
+                    inst.append_to(circuit)
+            unitary = self.__unitary_simulator.execute(circuit, decimals=None)
+        return CircuitMatrix(np.round(unitary, QuantumSimulationConfig.DECIMALS), num_of_used_gates)
+
     def __remove_instruction(self, instruction: Optional[Instruction], skip_qargs: bool = False) -> bool:
         """
         Tries to remove the given instruction from the circuit. Fails if the Instruction is not used in the circuit.
@@ -511,6 +662,7 @@ class Robot(Controllable, ABC):
         if instruction and instruction.is_used():
             self.__instructions[instruction.position] = None
             self.__instruction_count -= 1
+            self.__invalidate_column(instruction.position)
             instruction.reset(skip_qargs=skip_qargs)
             return True
         return False
@@ -545,6 +697,7 @@ class Robot(Controllable, ABC):
                 self.__remove_instruction(self.__instructions[position])
             self.__instruction_count += 1
             self.__instructions[position] = instruction
+            self.__invalidate_column(position)
             return instruction.use(position)
         else:
             # illegal position removes the instruction from the circuit if possible
@@ -1,8 +1,11 @@
 # exporting
 import itertools
-from typing import Tuple, Optional, List
+import time
+from typing import Tuple, Optional, List, Dict, Hashable
 
-from qrogue.game.logic.base import CircuitMatrix, StateVector, QuantumCircuit, UnitarySimulator
+import numpy as np
+
+from qrogue.game.logic.base import StateVector, QuantumCircuit
 from qrogue.game.logic.collectibles import Instruction
 from qrogue.util import QuantumSimulationConfig
 from .boss import Boss
@@ -13,51 +16,96 @@ from .riddle import Riddle
 from .target import Target
 
 
-def is_puzzle_solvable(input_stv: StateVector, target_stv: StateVector, gate_list: List[Instruction]) \
-        -> Tuple[bool, Optional[QuantumCircuit]]:
-    # todo: sometimes the order of the gates matters and claims that a solvable puzzle is not solvable
-    #  Example:
-    #  input_stv = StateVector([0, 0, 0, 0, complex(0, -1), 0, 0, 0])
-    #  target_stv = Instruction.compute_stv([gates.HGate().setup([1])], 3)
-    #  gate_list = [gates.XGate(), gates.CXGate(), gates.HGate(), gates.SGate()]     # this order returns True
-    #  gate_list_ = [gates.HGate(), gates.SGate(), gates.XGate(), gates.CXGate()]      # but this order returns False
+def is_puzzle_solvable(input_stv: StateVector, target_stv: StateVector, gate_list: List[Instruction],
+                       max_depth: Optional[int] = None, time_limit: Optional[float] = None) \
+        -> Tuple[Optional[bool], Optional[QuantumCircuit]]:
+    """
+    Searches breadth-first over the StateVectors reachable from input_stv by placing gates of gate_list (each at most
+    once, on any qubits). gate_list is treated as multiset, so its order doesn't matter. StateVectors are deduplicated
+    based on their amplitudes rounded to QuantumSimulationConfig.DECIMALS, hence every reachable state is only expanded
+    once per remaining multiset of gates. Since the search is breadth-first, the returned circuit uses as few gates as
+    possible.
 
+    :param input_stv: the StateVector the circuit is applied to
+    :param target_stv: the StateVector we want to reach
+    :param gate_list: the gates that can be used, their qubits don't need to be specified
+    :param max_depth: how many gates can be placed at most, defaults to len(gate_list)
+    :param time_limit: after how many seconds the search is aborted, None for no limit
+    :return: whether target_stv is reachable and if so, a circuit reaching it. Whether it is reachable is None if the
+        search was aborted because of time_limit, i.e., the puzzle might still be solvable.
+    """
     assert input_stv.num_of_qubits == target_stv.num_of_qubits, "Different number of qubits!"
 
-    simulator = UnitarySimulator()
-    circuit = QuantumCircuit.from_bit_num(input_stv.num_of_qubits, input_stv.num_of_qubits)
-    return __is_reachable_rec(simulator, circuit, input_stv, target_stv, gate_list)
-
+    num_of_qubits = input_stv.num_of_qubits
+    circuit = QuantumCircuit.from_bit_num(num_of_qubits, num_of_qubits)
+    if input_stv.is_equal_to(target_stv, ignore_god_mode=True):
+        return True, circuit
+    if max_depth is None:
+        max_depth = len(gate_list)
+    deadline = None if time_limit is None else time.time() + time_limit
 
-def __is_reachable_rec(simulator: UnitarySimulator, circuit: QuantumCircuit, input_stv: StateVector,
-                       target_stv: StateVector, gate_list: List[Instruction]) \
-        -> Tuple[bool, Optional[QuantumCircuit]]:
-    cur_gate = gate_list.pop()
-    qubits = list(itertools.permutations(range(input_stv.num_of_qubits), cur_gate.num_of_qubits))
+    # group equal gates so we can describe the available gates by how many of every kind are left
+    kinds: List[Instruction] = []
+    kind_indices: Dict[Hashable, int] = {}
+    counts: List[int] = []
+    for gate in gate_list:
+        signature = gate.copy().signature()
+        if signature not in kind_indices:
+            kind_indices[signature] = len(kinds)
+            kinds.append(gate)
+            counts.append(0)
+        counts[kind_indices[signature]] += 1
 
-    while len(qubits) > 0:
-        cur_circuit = circuit.copy()
-        qargs = qubits.pop()
-        gate = cur_gate.copy().setup(qargs)
-        gate.append_to(cur_circuit)
+    # every kind of gate on every possible qubit combination (the matrices are cached so they are only computed once)
+    moves: List[Tuple[int, Instruction, np.ndarray]] = []
+    for index, kind in enumerate(kinds):
+        for qargs in itertools.permutations(range(num_of_qubits), kind.num_of_qubits):
+            gate = kind.copy().setup(list(qargs))
+            unitary, _ = Instruction.compute_unitary([gate], num_of_qubits)
+            moves.append((index, gate, unitary))
 
-        amplitudes = simulator.execute(cur_circuit, decimals=QuantumSimulationConfig.DECIMALS)
-        circuit_matrix = CircuitMatrix(amplitudes, 0)  # num of used gates doesn't matter when checking reachability
-        cur_stv = circuit_matrix.multiply(input_stv)
-        diff = cur_stv.get_diff(target_stv)
+    def state_key(amplitudes: np.ndarray, remaining: Tuple[int, ...]) -> Tuple[bytes, Tuple[int, ...]]:
+        # "+ 0" gets rid of -0.0 which would otherwise result in different bytes
+        return (np.round(amplitudes, QuantumSimulationConfig.DECIMALS) + 0).tobytes(), remaining
 
-        if diff.is_zero:
-            return True, cur_circuit
+    # a node consists of amplitudes, remaining gate counts, the index of its parent and the gate leading to it
+    nodes: List[Tuple[np.ndarray, Tuple[int, ...], int, Optional[Instruction]]] = \
+        [(input_stv.amplitudes, tuple(counts), -1, None)]
+    visited = {state_key(input_stv.amplitudes, tuple(counts))}
+    layer = [0]
+    for _ in range(max_depth):
+        next_layer = []
+        for node_index in layer:
+            amplitudes, remaining, _, _ = nodes[node_index]
+            for kind_index, gate, unitary in moves:
+                if remaining[kind_index] <= 0: continue
+                if deadline is not None and time.time() >= deadline:
+                    return None, None
 
-        # go one recursion step deeper and try the next gate
-        if len(gate_list) > 0:
-            ret, winning_circuit = __is_reachable_rec(simulator, cur_circuit, input_stv, target_stv,
-                                                      gate_list.copy())
-            if ret: return True, winning_circuit
-        # else we try to place cur_gate on different qubits and continue
+                new_amplitudes = unitary @ amplitudes
+                new_remaining = remaining[:kind_index] + (remaining[kind_index] - 1,) + remaining[kind_index + 1:]
+                key = state_key(new_amplitudes, new_remaining)
+                if key in visited: continue
+                visited.add(key)
 
+                nodes.append((new_amplitudes, new_remaining, node_index, gate))
+                if StateVector(new_amplitudes).is_equal_to(target_stv, ignore_god_mode=True):
+                    # walk back to the input to collect the gates in the order they need to be applied
+                    solution = []
+                    cur_index = len(nodes) - 1
+                    while cur_index > 0:
+                        _, _, cur_index, cur_gate = nodes[cur_index]
+                        solution.append(cur_gate)
+                    for cur_gate in reversed(solution):
+                        cur_gate.copy().setup(list(cur_gate.qargs_iter())).append_to(circuit)
+                    return True, circuit
+                next_layer.append(len(nodes) - 1)
+        if len(next_layer) <= 0:
+            break
+        layer = next_layer
     return False, None
 
+
 # importing
 # +util
 # +collectibles
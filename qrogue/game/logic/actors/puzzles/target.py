@@ -88,6 +88,14 @@ class Target(ABC):
         """
         return self.__checks
 
+    @property
+    def reward(self) -> Optional[Collectible]:
+        """
+
+        :return: the Collectible provided when this Target is reached or None if it was already provided
+        """
+        return self.__reward
+
     def is_reached(self, state_vector: StateVector, circ_matrix: CircuitMatrix) -> Tuple[bool, Optional[Collectible]]:
         """
         Checks if the given StateVector is equal to the Target's StateVector. If so, this Target is set inactive and
@@ -1,7 +1,9 @@
 # exporting
 from .circuit_matrix import CircuitMatrix
+from .gate_matrices import GateMatrices
 from .simulator import QuantumCircuit, QuantumSimulator, UnitarySimulator
 from .state_vector import StateVector
+from .unitary_cache import UnitaryCache
 
 # importing
 # +util
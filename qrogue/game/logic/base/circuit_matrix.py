@@ -11,28 +11,11 @@ from .state_vector import StateVector
 class CircuitMatrix:
     @staticmethod
     def create_identity(num_of_qubits: int) -> "CircuitMatrix":
-        matrix = []
-        for i in range(2 ** num_of_qubits):
-            row = [0] * 2 ** num_of_qubits
-            row[i] = 1
-            matrix.append(row)
-        return CircuitMatrix(matrix, num_of_used_gates=0)
+        return CircuitMatrix(np.eye(2 ** num_of_qubits, dtype=np.complex128), num_of_used_gates=0)
 
     @staticmethod
-    def check_validity(matrix: List[List[complex]]) -> bool:
-        col_sum: List[float] = [0] * len(matrix)
-        for row in matrix:
-            row_sum = 0
-            for i, val in enumerate(row):
-                res_val = abs(val) ** 2
-                row_sum += res_val
-                col_sum[i] += res_val
-            if row_sum < 1 - QuantumSimulationConfig.TOLERANCE or 1 + QuantumSimulationConfig.TOLERANCE < row_sum:
-                return False
-        for val in col_sum:
-            if val < 1 - QuantumSimulationConfig.TOLERANCE or 1 + QuantumSimulationConfig.TOLERANCE < val:
-                return False
-        return True
+    def check_validity(matrix: Union[List[List[complex]], np.ndarray]) -> bool:
+        return verify_circuit_matrix(matrix, QuantumSimulationConfig.TOLERANCE)
 
     @staticmethod
     def matrix_to_string(matrix: Union[List[List[complex]], np.ndarray], num_of_qubits: int,
@@ -67,13 +50,36 @@ class CircuitMatrix:
             text += "\n"
         return text
 
-    def __init__(self, matrix: List[List[complex]], num_of_used_gates: int):
+    def __init__(self, matrix: Union[List[List[complex]], np.ndarray], num_of_used_gates: int):
+        """
+        :param matrix: the unitary of the circuit, complex128 arrays (e.g., a simulator's output) are used without
+            copying
+        :param num_of_used_gates: how many gates the circuit consists of
+        """
+        matrix = np.asarray(matrix, dtype=np.complex128)
+        if matrix.flags.writeable:
+            # use a read-only view so neither we nor the creator of the array can accidentally alter the other's data
+            matrix = matrix.view()
+            matrix.flags.writeable = False
         self.__matrix = matrix
         self.__num_of_used_gates = num_of_used_gates
 
-        if not verify_circuit_matrix(matrix, QuantumSimulationConfig.TOLERANCE):
+        # derived values are only computed on first access since the matrix never changes
+        self.__is_classical: Optional[bool] = None
+        self.__is_real: Optional[bool] = None
+        self.__is_imag: Optional[bool] = None
+
+        # validation is only needed to find bugs, so we skip it in release builds
+        if Config.debugging() and not verify_circuit_matrix(matrix, QuantumSimulationConfig.TOLERANCE):
             Config.check_reachability("CircuitMatrix.verfiy_circuit_matrix()")
 
+    @property
+    def matrix(self) -> np.ndarray:
+        """
+        :return: read-only 2D array of the matrix's entries
+        """
+        return self.__matrix
+
     @property
     def size(self) -> int:
         return len(self.__matrix)
@@ -88,50 +94,63 @@ class CircuitMatrix:
 
     @property
     def is_classical(self) -> bool:
-        mat_sum = 0
-        for row in self.__matrix:
-            for val in row:
-                if val != 0 and val != 1:
-                    return False
-                mat_sum += val
-        return mat_sum == self.size  # there needs to be one 1 per row
+        if self.__is_classical is None:
+            if self.is_real:
+                real = self.__matrix.real
+                # there needs to be one 1 per row and everything else has to be 0
+                self.__is_classical = bool(np.all((real == 0) | (real == 1)) and real.sum() == self.size)
+            else:
+                self.__is_classical = False
+        return self.__is_classical
 
     @property
     def is_real(self) -> bool:
-        for row in self.__matrix:
-            for val in row:
-                if val.imag != 0:
-                    return False
-        return True
+        if self.__is_real is None:
+            self.__is_real = not np.any(self.__matrix.imag)
+        return self.__is_real
 
     @property
     def is_imag(self) -> bool:
-        for row in self.__matrix:
-            for val in row:
-                if val.real != 0:
-                    return False
-        return True
+        if self.__is_imag is None:
+            self.__is_imag = not np.any(self.__matrix.real)
+        return self.__is_imag
 
     @property
     def is_complex(self) -> bool:
         # if it's neither pure real nor pure imaginary it has to be mixed and therefore complex
         return not self.is_real and not self.is_imag
 
-    def multiply(self, stv: StateVector) -> Optional[StateVector]:  # todo improve performance?
+    def multiply(self, stv: StateVector) -> Optional[StateVector]:
         if self.num_of_qubits == stv.num_of_qubits:
-            values = []
-            for row in self.__matrix:
-                val = 0
-                for i, entry in enumerate(row):
-                    val += entry * stv.at(i)
-                values.append(val)
-            return StateVector(values, self.num_of_used_gates +
+            return StateVector(self.__matrix @ stv.amplitudes, self.num_of_used_gates +
                                (0 if stv.num_of_used_gates is None else stv.num_of_used_gates))
         else:
             Logger.instance().error(f"@multiply: CircuitMatrix (={self.num_of_qubits}) and Stv (={stv.num_of_qubits}) "
                                     f"don't have the same number of qubits!", show=Config.debugging(), from_pycui=False)
             return None
 
+    def multiply_all(self, stvs: List[StateVector]) -> Optional[List[StateVector]]:
+        """
+        Multiplies all given StateVectors at once (i.e., with a single matrix multiplication) with this CircuitMatrix.
+
+        :param stvs: the StateVectors to multiply, all of them need to have the same number of qubits as this matrix
+        :return: the resulting StateVectors in the same order as stvs or None if the number of qubits doesn't match
+        """
+        if len(stvs) <= 0:
+            return []
+        for stv in stvs:
+            if stv.num_of_qubits != self.num_of_qubits:
+                Logger.instance().error(f"@multiply_all: CircuitMatrix (={self.num_of_qubits}) and Stv "
+                                        f"(={stv.num_of_qubits}) don't have the same number of qubits!",
+                                        show=Config.debugging(), from_pycui=False)
+                return None
+
+        # every column of the result is one output StateVector
+        results = self.__matrix @ np.stack([stv.amplitudes for stv in stvs], axis=1)
+        return [StateVector(results[:, i], self.num_of_used_gates +
+                            (0 if stv.num_of_used_gates is None else stv.num_of_used_gates))
+                for i, stv in enumerate(stvs)]
+
     def to_string(self, space_per_value: Optional[int] = None) -> str:
         if space_per_value is None:
             if self.is_complex:
@@ -145,19 +164,13 @@ class CircuitMatrix:
 
     def __eq__(self, other):
         if not isinstance(other, CircuitMatrix): return False
-        if other.size != self.size: return False
-
-        for y in range(self.size):
-            for x in range(self.size):
-                if other.__matrix[y][x] != self.__matrix[y][x]:
-                    return False
-        return True
+        return np.array_equal(self.__matrix, other.__matrix)
 
     def __str__(self) -> str:
         text = "CircuitMatrix("
-        for row in self.__matrix:
+        for row in np.round(self.__matrix, QuantumSimulationConfig.DECIMALS):
             for val in row:
-                text += f"{np.round(val, QuantumSimulationConfig.DECIMALS)}, "
+                text += f"{val}, "
             text += "\n"
         text = text[:-2] + ")"
         return text
@@ -0,0 +1,156 @@
+import itertools
+import math
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from qrogue.util import GateType, QuantumSimulationConfig
+from qrogue.util.quantum_functions import apply_gate_matrix
+
+
+def _read_only(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.ascontiguousarray(matrix, dtype=np.complex128)
+    matrix.flags.writeable = False
+    return matrix
+
+
+def _controlled(matrix: np.ndarray) -> np.ndarray:
+    # the control is qargs[0], i.e., the least significant bit of the matrix's index
+    controlled = np.eye(4, dtype=np.complex128)
+    controlled[np.ix_([1, 3], [1, 3])] = matrix
+    return controlled
+
+
+class GateMatrices:
+    """
+    Registry of the unitaries of all gate types (except GateType.Combined) as read-only complex128 arrays in Qiskit's
+    qubit order, so circuits can be simulated without building Qiskit gates. Besides a gate's matrix and its inverse it
+    also provides the operator of a gate embedded into a circuit of a certain size.
+
+    The matrices of gates without parameters are built at import time. Matrices of rotation gates depend on their angle
+    and, like all embeddings, are computed on first use and memoized afterwards.
+    """
+    __SQRT_HALF = 1 / math.sqrt(2)
+    __ROTATION_GATES = {GateType.RYGate, GateType.RZGate}
+
+    __X = np.array([[0, 1], [1, 0]], dtype=np.complex128)
+    __Y = np.array([[0, -1j], [1j, 0]], dtype=np.complex128)
+    __Z = np.array([[1, 0], [0, -1]], dtype=np.complex128)
+    __H = np.array([[__SQRT_HALF, __SQRT_HALF], [__SQRT_HALF, -__SQRT_HALF]], dtype=np.complex128)
+    __FIXED: Dict[GateType, np.ndarray] = {
+        GateType.IGate: _read_only(np.eye(2)),
+        GateType.XGate: _read_only(__X),
+        GateType.SXGate: _read_only(np.array([[0.5 + 0.5j, 0.5 - 0.5j], [0.5 - 0.5j, 0.5 + 0.5j]])),
+        GateType.YGate: _read_only(__Y),
+        GateType.ZGate: _read_only(__Z),
+        GateType.HGate: _read_only(__H),
+        GateType.SGate: _read_only(np.array([[1, 0], [0, 1j]])),
+        GateType.SwapGate: _read_only(np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])),
+        GateType.CXGate: _read_only(_controlled(__X)),
+        GateType.CYGate: _read_only(_controlled(__Y)),
+        GateType.CZGate: _read_only(_controlled(__Z)),
+        GateType.CHGate: _read_only(_controlled(__H)),
+    }
+    __INVERSES: Dict[GateType, np.ndarray] = {gate_type: _read_only(matrix.conj().T)
+                                              for gate_type, matrix in __FIXED.items()}
+
+    # (gate type, angle, inverse) -> matrix, only for rotation gates
+    __rotations: Dict[Tuple[GateType, float, bool], np.ndarray] = {}
+    # (gate type, angle, qargs, number of qubits, inverse) -> operator of the whole circuit
+    __embeddings: Dict[Tuple[GateType, Optional[float], Tuple[int, ...], int, bool], np.ndarray] = {}
+
+    @staticmethod
+    def is_supported(gate_type: GateType) -> bool:
+        return gate_type in GateMatrices.__FIXED or gate_type in GateMatrices.__ROTATION_GATES
+
+    @staticmethod
+    def num_of_qubits(gate_type: GateType) -> int:
+        """
+        :return: how many qubits gates of the given type act on
+        """
+        if gate_type in GateMatrices.__ROTATION_GATES:
+            return 1
+        return int(math.log2(len(GateMatrices.get(gate_type))))
+
+    @staticmethod
+    def __rotation(gate_type: GateType, angle: float) -> np.ndarray:
+        half_angle = angle / 2
+        if gate_type is GateType.RYGate:
+            cos, sin = math.cos(half_angle), math.sin(half_angle)
+            return np.array([[cos, -sin], [sin, cos]], dtype=np.complex128)
+        else:   # GateType.RZGate
+            return np.array([[np.exp(-1j * half_angle), 0], [0, np.exp(1j * half_angle)]], dtype=np.complex128)
+
+    @staticmethod
+    def get(gate_type: GateType, angle: Optional[float] = None, inverse: bool = False) -> np.ndarray:
+        """
+        :param gate_type: type of the gate
+        :param angle: the angle of rotation gates, ignored for other gates
+        :param inverse: whether to return the matrix of the gate's inverse
+        :return: the read-only unitary of the gate
+        :raises ValueError: if the gate type is not supported (see is_supported()) or a rotation gate misses its angle
+        """
+        if gate_type in GateMatrices.__FIXED:
+            return GateMatrices.__INVERSES[gate_type] if inverse else GateMatrices.__FIXED[gate_type]
+
+        if gate_type not in GateMatrices.__ROTATION_GATES:
+            raise ValueError(f"There is no predefined matrix for {gate_type}!")
+        if angle is None:
+            raise ValueError(f"{gate_type} needs an angle!")
+        key = (gate_type, float(angle), inverse)
+        if key not in GateMatrices.__rotations:
+            matrix = GateMatrices.__rotation(gate_type, float(angle))
+            GateMatrices.__rotations[key] = _read_only(matrix.conj().T if inverse else matrix)
+        return GateMatrices.__rotations[key]
+
+    @staticmethod
+    def embed(gate_type: GateType, qargs: Sequence[int], num_of_qubits: int, angle: Optional[float] = None,
+              inverse: bool = False) -> np.ndarray:
+        """
+        :param gate_type: type of the gate
+        :param qargs: the qubits the gate is applied to
+        :param num_of_qubits: how many qubits the circuit has
+        :param angle: the angle of rotation gates, ignored for other gates
+        :param inverse: whether to embed the gate's inverse
+        :return: the read-only (2**num_of_qubits x 2**num_of_qubits) operator of applying the gate to qargs
+        :raises ValueError: if the gate type is not supported or qargs don't fit to the gate or circuit
+        """
+        qargs = tuple(qargs)
+        if gate_type not in GateMatrices.__ROTATION_GATES:
+            angle = None    # other gates have no parameter, so it must not be part of the key
+        key = (gate_type, None if angle is None else float(angle), qargs, num_of_qubits, inverse)
+        if key not in GateMatrices.__embeddings:
+            matrix = GateMatrices.get(gate_type, angle, inverse)
+            if len(matrix) != 2 ** len(qargs) or len(set(qargs)) != len(qargs) or \
+                    any(qubit < 0 or qubit >= num_of_qubits for qubit in qargs):
+                raise ValueError(f"Invalid qargs {qargs} for {gate_type} in a circuit with {num_of_qubits} qubits!")
+            dim = 2 ** num_of_qubits
+            tensor = np.eye(dim, dtype=np.complex128).reshape((2,) * num_of_qubits + (dim,))
+            tensor = apply_gate_matrix(tensor, matrix, qargs, num_of_qubits)
+            GateMatrices.__embeddings[key] = _read_only(tensor.reshape(dim, dim))
+        return GateMatrices.__embeddings[key]
+
+    @staticmethod
+    def precompute(max_num_of_qubits: int = QuantumSimulationConfig.MAX_NUM_OF_QUBITS):
+        """
+        Computes the embeddings of all gates without parameters (and their inverses) for all qargs in circuits of up to
+        max_num_of_qubits qubits, so later calls of embed() only need to look them up.
+        """
+        for gate_type in GateMatrices.__FIXED:
+            gate_qubits = GateMatrices.num_of_qubits(gate_type)
+            for num_of_qubits in range(gate_qubits, max_num_of_qubits + 1):
+                for qargs in itertools.permutations(range(num_of_qubits), gate_qubits):
+                    for inverse in [False, True]:
+                        GateMatrices.embed(gate_type, qargs, num_of_qubits, inverse=inverse)
+
+    @staticmethod
+    def num_of_embeddings() -> int:
+        return len(GateMatrices.__embeddings)
+
+    @staticmethod
+    def clear():
+        """
+        Forgets all memoized rotation matrices and embeddings.
+        """
+        GateMatrices.__rotations.clear()
+        GateMatrices.__embeddings.clear()
@@ -1,53 +1,122 @@
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple, Iterator, TYPE_CHECKING
 
-from qiskit import Aer, execute, transpile, QuantumRegister, QuantumCircuit as QiskitCircuit
-from qiskit.circuit import Gate
+import numpy as np
 
-from qrogue.util import Config
+from qrogue.util import Config, QuantumSimulationConfig
+from qrogue.util.quantum_functions import simulate_statevector, simulate_unitary
 
-if Config.using_new_qiskit():
-    from qiskit.providers.basicaer import StatevectorSimulatorPy as StatevectorSimulator
-else:
-    from qiskit.providers.aer import StatevectorSimulator
+if TYPE_CHECKING:
+    from qiskit import QuantumCircuit as QiskitCircuit
+    from qiskit.circuit import Gate
+
+
+def _statevector_simulator():
+    if Config.using_new_qiskit():
+        from qiskit.providers.basicaer import StatevectorSimulatorPy as StatevectorSimulator
+    else:
+        from qiskit.providers.aer import StatevectorSimulator
+    return StatevectorSimulator()
 
 
 class QuantumCircuit:
+    """
+    Stores the gates appended to a circuit. The underlying Qiskit circuit is only built if it is actually needed (e.g.,
+    for Qiskit's backends or for printing), so the native backend can skip Qiskit's circuit machinery entirely. This
+    also holds for Qiskit itself: it is only imported once a Qiskit circuit or backend is needed because importing it
+    takes a noticeable amount of time.
+    """
+
     @staticmethod
     def from_register(num_qubits: int) -> "QuantumCircuit":
-        return QuantumCircuit(QiskitCircuit(QuantumRegister(num_qubits)))
+        return QuantumCircuit(num_qubits, num_cbits=None)
 
     @staticmethod
     def from_bit_num(num_qubits: int, num_cbits: int = 0) -> "QuantumCircuit":
-        return QuantumCircuit(QiskitCircuit(num_qubits, num_cbits))
+        return QuantumCircuit(num_qubits, num_cbits)
+
+    def __init__(self, num_qubits: int, num_cbits: Optional[int],
+                 operations: Optional[List[Tuple[Callable[[], "Gate"], List[int], List[int],
+                                                 Optional[np.ndarray]]]] = None,
+                 name: Optional[str] = None):
+        """
+        :param num_qubits: how many qubits the circuit has
+        :param num_cbits: how many classical bits the circuit has, None if the qubits should be stored in a register
+        :param operations: functions creating the gates (with their qargs, cargs and optionally matrix) that are
+            already part of the circuit
+        :param name: optional name of the circuit
+        """
+        self.__num_qubits = num_qubits
+        self.__num_cbits = num_cbits
+        self.__operations = [] if operations is None else operations
+        self.__name = name
+        self.__circuit: Optional["QiskitCircuit"] = None
 
-    def __init__(self, circuit: QiskitCircuit):
-        self.__circuit = circuit
+    @property
+    def num_qubits(self) -> int:
+        return self.__num_qubits
 
     @property
-    def circuit(self) -> QiskitCircuit:
-        return self.__circuit
+    def size(self) -> int:
+        return len(self.__operations)
 
-    def append(self, gate: Gate, qargs: List[int], cargs: List[int]):
-        self.__circuit.append(gate, qargs, cargs)
+    @property
+    def circuit(self) -> "QiskitCircuit":
+        if self.__circuit is None:
+            from qiskit import QuantumRegister, QuantumCircuit as QiskitCircuit
+            if self.__num_cbits is None:
+                circuit = QiskitCircuit(QuantumRegister(self.__num_qubits), name=self.__name)
+            else:
+                circuit = QiskitCircuit(self.__num_qubits, self.__num_cbits, name=self.__name)
+            for gate, qargs, cargs, _ in self.__operations:
+                circuit.append(gate(), qargs, cargs)
+            self.__circuit = circuit
+        return self.__circuit
 
-    def to_gate(self, label: Optional[str] = None) -> Gate:
-        return self.__circuit.to_gate(label=label)
+    def append(self, gate: Callable[[], "Gate"], qargs: List[int], cargs: List[int],
+               matrix: Optional[np.ndarray] = None):
+        """
+        :param gate: function returning the gate to append, only called if the Qiskit gate is actually needed
+        :param qargs: the qubits to apply gate to
+        :param cargs: the classical bits used by gate
+        :param matrix: optional unitary of gate, retrieved from gate itself if needed but not provided
+        """
+        self.__operations.append((gate, list(qargs), list(cargs), matrix))
+        if self.__circuit is not None:
+            self.__circuit.append(gate(), qargs, cargs)
+
+    def operations(self) -> Iterator[Tuple[np.ndarray, List[int]]]:
+        """
+        :return: an Iterator over (matrix, qargs) of every appended gate in order
+        """
+        for gate, qargs, _, matrix in self.__operations:
+            if matrix is None:
+                matrix = np.asarray(gate().to_matrix(), dtype=np.complex128)
+            yield matrix, qargs
+
+    def to_gate(self, label: Optional[str] = None) -> "Gate":
+        return self.circuit.to_gate(label=label)
 
     def copy(self, name: Optional[str] = None) -> "QuantumCircuit":
-        return QuantumCircuit(self.__circuit.copy(name))
+        return QuantumCircuit(self.__num_qubits, self.__num_cbits, self.__operations.copy(), name)
 
     def __str__(self) -> str:
-        return str(self.__circuit)
+        return str(self.circuit)
 
 
 class QuantumSimulator:
     def __init__(self):
-        self.__simulator = StatevectorSimulator()
+        self.__simulator = None  # only created if the Qiskit backend is used
 
-    def run(self, circuit: QuantumCircuit, do_transpile: bool = False) -> List[complex]:
-        circuit: QiskitCircuit = circuit.circuit  # unwrap circuit
+    def run(self, circuit: QuantumCircuit, do_transpile: bool = False) -> np.ndarray:
+        if QuantumSimulationConfig.use_native_backend():
+            return simulate_statevector(circuit.operations(), circuit.num_qubits)
+
+        if self.__simulator is None:
+            self.__simulator = _statevector_simulator()
+        circuit: "QiskitCircuit" = circuit.circuit  # unwrap circuit
 
         if do_transpile:
+            from qiskit import transpile
             circuit = transpile(circuit, self.__simulator)
 
         # optionally use:   ddsim.JKQProvider().get_backend('statevector_simulator')?
@@ -63,10 +132,24 @@ class QuantumSimulator:
 
 class UnitarySimulator:
     def __init__(self):
-        self.__backend = Aer.get_backend('unitary_simulator')
-
-    def execute(self, circuit: QuantumCircuit, decimals: int) -> List[List[complex]]:
-        circuit: QiskitCircuit = circuit.circuit  # unwrap circuit
+        self.__backend = None  # only retrieved if the Qiskit backend is used
+
+    def execute(self, circuit: QuantumCircuit, decimals: Optional[int]) -> np.ndarray:
+        """
+        :param circuit: the circuit to compute the unitary of
+        :param decimals: to how many decimals the entries should be rounded, None for no rounding
+        :return: the unitary as 2D array
+        """
+        if QuantumSimulationConfig.use_native_backend():
+            unitary = simulate_unitary(circuit.operations(), circuit.num_qubits)
+            if decimals is not None:
+                unitary = np.round(unitary, decimals)
+            return unitary
+
+        from qiskit import Aer, execute
+        if self.__backend is None:
+            self.__backend = Aer.get_backend('unitary_simulator')
+        circuit: "QiskitCircuit" = circuit.circuit  # unwrap circuit
 
         job = execute(circuit, self.__backend)
         result = job.result()
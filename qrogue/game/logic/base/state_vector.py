@@ -1,4 +1,4 @@
-from typing import Iterator, List, Optional
+from typing import Iterator, List, Optional, Union, Iterable
 
 import numpy as np
 
@@ -79,59 +79,77 @@ class StateVector:
 
     @staticmethod
     def create_zero_state_vector(num_of_qubits: int) -> "StateVector":
-        amplitudes = [1] + [0] * (2 ** num_of_qubits - 1)
+        amplitudes = np.zeros(2 ** num_of_qubits, dtype=np.complex128)
+        amplitudes[0] = 1
         return StateVector(amplitudes, num_of_used_gates=0)
 
     @staticmethod
     def create_basis_states(num_of_qubits: int) -> List["StateVector"]:
-        states = []
-        for i in range(2 ** num_of_qubits):
-            amplitudes = [0] * 2 ** num_of_qubits
-            amplitudes[i] = 1
-            states.append(StateVector(amplitudes, num_of_used_gates=0))
-        return states
-
-    def __init__(self, amplitudes: List[complex], num_of_used_gates: Optional[int] = None):
+        # every row of the identity is one basis state
+        return [StateVector(row, num_of_used_gates=0)
+                for row in np.eye(2 ** num_of_qubits, dtype=np.complex128)]
+
+    def __init__(self, amplitudes: Union[List[complex], np.ndarray], num_of_used_gates: Optional[int] = None):
+        """
+        :param amplitudes: the amplitudes of the StateVector, complex128 arrays (e.g., a simulator's output) are used
+            without copying
+        :param num_of_used_gates: how many gates were used to create this StateVector
+        """
+        amplitudes = np.asarray(amplitudes, dtype=np.complex128)
+        if amplitudes.flags.writeable:
+            # use a read-only view so neither we nor the creator of the array can accidentally alter the other's data
+            amplitudes = amplitudes.view()
+            amplitudes.flags.writeable = False
         self.__amplitudes = amplitudes
         self.__num_of_used_gates = num_of_used_gates
 
+        # derived values are only computed on first access since the amplitudes never change
+        self.__num_of_qubits: Optional[int] = None
+        self.__is_real: Optional[bool] = None
+        self.__is_imag: Optional[bool] = None
+        self.__hash: Optional[int] = None
+
+    @property
+    def amplitudes(self) -> np.ndarray:
+        """
+        :return: read-only array of the amplitudes
+        """
+        return self.__amplitudes
+
     @property
     def size(self) -> int:
         return len(self.__amplitudes)
 
     @property
     def num_of_qubits(self) -> int:
-        return int(np.log2(self.size))
+        if self.__num_of_qubits is None:
+            self.__num_of_qubits = int(np.log2(self.size))
+        return self.__num_of_qubits
 
     @property
     def is_zero(self) -> bool:
-        for val in self.__amplitudes:
-            if abs(val) > QuantumSimulationConfig.TOLERANCE:
-                return False
-        return True
+        return bool(np.all(np.abs(self.__amplitudes) <= QuantumSimulationConfig.TOLERANCE))
 
     @property
     def is_classical(self) -> bool:
-        for val in self.__amplitudes:
-            # if there is an imaginary part or the real part is anything except 0 or 1, the StateVector is not classical
-            if val.imag != 0 or val.real not in [0, 1]:
-                return False
+        # if there is an imaginary part or the real part is anything except 0 or 1, the StateVector is not classical
+        if not self.is_real: return False
+        real = self.__amplitudes.real
+        if not np.all((real == 0) | (real == 1)): return False
         # if the sum is 1, we have exactly one 1 and everything else is 0 -> we have a classical state
-        return sum(self.__amplitudes) == 1
+        return bool(real.sum() == 1)
 
     @property
     def is_real(self) -> bool:
-        for val in self.__amplitudes:
-            if val.imag != 0:
-                return False
-        return True
+        if self.__is_real is None:
+            self.__is_real = not np.any(self.__amplitudes.imag)
+        return self.__is_real
 
     @property
     def is_imag(self) -> bool:
-        for val in self.__amplitudes:
-            if val.real != 0:
-                return False
-        return True
+        if self.__is_imag is None:
+            self.__is_imag = not np.any(self.__amplitudes.real)
+        return self.__is_imag
 
     @property
     def is_complex(self) -> bool:
@@ -152,8 +170,8 @@ class StateVector:
 
         :return: List of amplitudes
         """
-        return [np.round(val.real ** 2 + val.imag ** 2, decimals=QuantumSimulationConfig.DECIMALS)
-                for val in self.__amplitudes]
+        values = self.__amplitudes.real ** 2 + self.__amplitudes.imag ** 2
+        return np.round(values, decimals=QuantumSimulationConfig.DECIMALS).tolist()
 
     def is_equal_to(self, other: "StateVector", tolerance: float = QuantumSimulationConfig.TOLERANCE,
                     ignore_god_mode: bool = False) -> bool:
@@ -171,21 +189,28 @@ class StateVector:
         #  (so the robot can have more qubits than the enemy)
         if self.size > other.size:
             return False
+        diff = self.__amplitudes - other.__amplitudes[:self.size]
+        return bool(np.all(np.abs(diff) <= tolerance))
+
+    def is_equal_to_any(self, others: Iterable["StateVector"], tolerance: float = QuantumSimulationConfig.TOLERANCE,
+                        ignore_god_mode: bool = False) -> bool:
         """
-        self_value = self.__amplitudes  #self.to_value()
-        other_value = other.__amplitudes    #other.to_value()
-        for i in range(len(self_value)):
-            p_min = self_value[i] - tolerance/2         # todo maybe tolerance doesn't work for imaginary numbers?
-            p = other_value[i]
-            p_max = self_value[i] + tolerance/2
-            if not (p_min <= p <= p_max):
-                return False
+        Checks whether is_equal_to() is True for at least one of the given StateVectors, but compares all of them at
+        once.
+
+        :param others: the StateVectors to compare with
+        :param tolerance: how much an amplitude is allowed to differ
+        :param ignore_god_mode: whether we also want to check for equality when in god mode
+        :return: True if at least one of others is equal to this StateVector, False otherwise
         """
-        diff = [self.__amplitudes[i] - other.__amplitudes[i] for i in range(self.size)]
-        for val in diff:
-            if abs(val) > tolerance:
-                return False
-        return True
+        if not ignore_god_mode and CheatConfig.in_god_mode():
+            return True
+
+        candidates = [other.__amplitudes[:self.size] for other in others if self.size <= other.size]
+        if len(candidates) <= 0:
+            return False
+        diff = np.abs(np.stack(candidates) - self.__amplitudes)
+        return bool(np.any(np.all(diff <= tolerance, axis=1)))
 
     def get_diff(self, other: "StateVector") -> "StateVector":
         """
@@ -205,19 +230,18 @@ class StateVector:
                                     show_popup=True)
 
         if self.size == other.size:
-            diff = [self.__amplitudes[i] - other.__amplitudes[i] for i in range(self.size)]
-            return StateVector(diff)
+            return StateVector(self.__amplitudes - other.__amplitudes)
 
         elif self.size < other.size:
             Logger.instance().info("Requested difference between StateVectors of different sizes! "
                                    f"self = {self}, other = {other}; padding self with the needed number of 0s",
                                    from_pycui=False)
-            diff: List[complex] = [0] * other.size
-            for i in range(self.size):
-                diff[i] = self.__amplitudes[i] - other.__amplitudes[i]
+            # like in is_equal_to() only the first entries are subtracted, the remaining ones stay 0
+            diff = np.zeros(other.size, dtype=np.complex128)
+            diff[:self.size] = self.__amplitudes - other.__amplitudes[:self.size]
             return StateVector(diff)
 
-        return StateVector([-1] * other.size)
+        return StateVector(np.full(other.size, -1, dtype=np.complex128))
 
     def wrap_in_qubit_conf(self, index: int, space_per_value: Optional[int] = None, coloring: bool = False,
                            correct_amplitude: bool = False, show_percentage: bool = False, skip_ket: bool = False) \
@@ -244,18 +268,14 @@ class StateVector:
         return text
 
     def __hash__(self):
-        mult = 11
-        hash_sum = 0
-        for amplitude in self.__amplitudes:
-            hash_sum += hash(amplitude.imag) * mult
-            mult = mult * 2 + 1
-            hash_sum += hash(amplitude.real) * mult
-            mult = mult * 2 + 1
-        return hash_sum
+        if self.__hash is None:
+            # adding 0 turns -0.0 into 0.0, so StateVectors that are equal (see __eq__) also have the same bytes
+            self.__hash = hash((self.__amplitudes + 0).tobytes())
+        return self.__hash
 
     def __eq__(self, other) -> bool:
         if type(other) is type(self):
-            return self.__amplitudes == other.__amplitudes
+            return np.array_equal(self.__amplitudes, other.__amplitudes)
         elif isinstance(other, list):
             if len(other) <= 0 or len(other) >= len(self.__amplitudes):
                 return False
@@ -272,11 +292,8 @@ class StateVector:
         return False
 
     def __str__(self) -> str:
-        text = "StateVector("
-        for val in self.__amplitudes:
-            text += f"{np.round(val, QuantumSimulationConfig.DECIMALS)}, "
-        text = text[:-2] + ")"
-        return text
+        values = np.round(self.__amplitudes, QuantumSimulationConfig.DECIMALS)
+        return f"StateVector({', '.join([str(val) for val in values])})"
 
     def __iter__(self) -> Iterator:
         return iter(self.__amplitudes)
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from typing import Optional, Tuple, Sequence, Hashable, Callable, List
+
+import numpy as np
+
+from qrogue.util import QuantumSimulationConfig
+from qrogue.util.quantum_functions import apply_gate_matrix
+
+
+class UnitaryCache:
+    """
+    LRU cache that maps a sequence of gates (described by hashable gate keys) to the unitary of the resulting circuit and
+    the StateVector it produces from the zero state. If a sequence is not cached, the longest cached prefix is reused
+    and only the remaining gates are applied. Every computed prefix is cached as well, so appending a gate to a
+    previously seen sequence only costs a single gate application.
+    """
+    __instance: Optional["UnitaryCache"] = None
+
+    @staticmethod
+    def instance() -> "UnitaryCache":
+        if UnitaryCache.__instance is None:
+            UnitaryCache.__instance = UnitaryCache(QuantumSimulationConfig.UNITARY_CACHE_SIZE)
+        return UnitaryCache.__instance
+
+    def __init__(self, max_size: int):
+        """
+        :param max_size: how many unitaries can be cached at most, 0 disables caching
+        """
+        self.__max_size = max_size
+        self.__entries: "OrderedDict[Tuple[Hashable, ...], np.ndarray]" = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def max_size(self) -> int:
+        return self.__max_size
+
+    @property
+    def size(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def hits(self) -> int:
+        """
+        :return: how often the whole requested sequence was already cached
+        """
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """
+        :return: how often at least one gate of the requested sequence had to be applied
+        """
+        return self.__misses
+
+    def resize(self, max_size: int):
+        self.__max_size = max_size
+        while len(self.__entries) > max(max_size, 0):
+            self.__entries.popitem(last=False)
+
+    def clear(self):
+        self.__entries.clear()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.__hits = 0
+        self.__misses = 0
+
+    def __store(self, key: Tuple[Hashable, ...], unitary: np.ndarray):
+        if self.__max_size <= 0: return
+        self.__entries[key] = unitary
+        if len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)  # remove the least recently used entry
+
+    def __lookup(self, key: Tuple[Hashable, ...]) -> Optional[np.ndarray]:
+        unitary = self.__entries.get(key)
+        if unitary is not None:
+            self.__entries.move_to_end(key)
+        return unitary
+
+    def compute(self, num_of_qubits: int, gate_keys: Sequence[Hashable],
+                get_operation: Callable[[int], Tuple[np.ndarray, List[int]]], inverse: bool = False) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param num_of_qubits: how many qubits the circuit has
+        :param gate_keys: a canonical key per gate (e.g., gate type, qargs and angle) in the order they are applied
+        :param get_operation: returns the matrix and qargs of the gate at the given index, only called for gates that
+            are not covered by a cached prefix
+        :param inverse: whether get_operation returns the inverse gates, needed to distinguish them in the cache
+        :return: the (read-only) unitary of the circuit and the amplitudes it produces from the zero state
+        """
+        dim = 2 ** num_of_qubits
+        if len(gate_keys) <= 0:
+            unitary = np.eye(dim, dtype=np.complex128)
+            unitary.flags.writeable = False
+            return unitary, unitary[:, 0]
+
+        base_key = (num_of_qubits, inverse)
+        length = len(gate_keys)
+        unitary = None
+        while length > 0:
+            unitary = self.__lookup(base_key + tuple(gate_keys[:length]))
+            if unitary is not None: break
+            length -= 1
+
+        if length == len(gate_keys) and unitary is not None:
+            self.__hits += 1
+        else:
+            self.__misses += 1
+            if unitary is None:
+                tensor = np.eye(dim, dtype=np.complex128)
+            else:
+                tensor = unitary
+            # the rows of the unitary are transformed by each gate while the columns act as batch dimension
+            tensor = tensor.reshape((2,) * num_of_qubits + (dim,))
+            for i in range(length, len(gate_keys)):
+                matrix, qargs = get_operation(i)
+                tensor = apply_gate_matrix(tensor, matrix, qargs, num_of_qubits)
+                unitary = tensor.reshape(dim, dim)
+                unitary.flags.writeable = False
+                self.__store(base_key + tuple(gate_keys[:i + 1]), unitary)
+        # the first column is the result of applying the circuit to |0...0>
+        return unitary, unitary[:, 0]
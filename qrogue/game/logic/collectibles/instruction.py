@@ -1,17 +1,37 @@
+import functools
 import math
 from abc import ABC, abstractmethod
-from typing import Iterator, Optional, Dict, List, Callable, Tuple, Any
+from typing import Iterator, Optional, Dict, List, Callable, Tuple, Any, Hashable, TYPE_CHECKING
 
-import qiskit.circuit.library.standard_gates as gates
-from qiskit.circuit import Gate as QiskitGate
+import numpy as np
 
-from qrogue.game.logic.base import StateVector, CircuitMatrix, QuantumSimulator, QuantumCircuit, UnitarySimulator
+from qrogue.game.logic.base import StateVector, CircuitMatrix, QuantumSimulator, QuantumCircuit, UnitarySimulator, \
+    UnitaryCache, GateMatrices
 from qrogue.game.logic.collectibles import Collectible, CollectibleType
 from qrogue.util import Logger, GateType, QuantumSimulationConfig, InstructionConfig, ColorConfig, ColorCode, \
     SaveGrammarConfig
 from qrogue.util.achievements import Unlocks
 from qrogue.util.util_functions import rad2deg, center_string, to_binary_string, num_to_letter
 
+if TYPE_CHECKING:
+    from qiskit.circuit import Gate as QiskitGate
+
+
+def _create_gate(name: str, **params) -> "QiskitGate":
+    # Qiskit's gates are only needed for Qiskit's backends and for printing circuits, so we import them on demand
+    # instead of slowing down the start of the game
+    import qiskit.circuit.library.standard_gates as gates
+    return getattr(gates, name)(**params)
+
+
+def _qiskit_gate(name: str, **params) -> Callable[[], "QiskitGate"]:
+    """
+    :param name: class name of the gate in qiskit.circuit.library.standard_gates
+    :param params: parameters of the gate
+    :return: a picklable function creating the gate
+    """
+    return functools.partial(_create_gate, name, **params)
+
 
 class Instruction(Collectible, ABC):
     """
@@ -21,12 +41,42 @@ class Instruction(Collectible, ABC):
 
     @staticmethod
     def compute_stv(instructions: List["Instruction"], num_of_qubits: int, inverse: bool = False) -> StateVector:
+        if QuantumSimulationConfig.use_native_backend():
+            _, amplitudes = Instruction.compute_unitary(instructions, num_of_qubits, inverse)
+        else:
+            circuit = QuantumCircuit.from_bit_num(num_of_qubits, num_of_qubits)
+            for instruction in instructions:
+                instruction.append_to(circuit, inverse)
+            simulator = QuantumSimulator()
+            amplitudes = simulator.run(circuit, do_transpile=True)
+        return StateVector(amplitudes, num_of_used_gates=len(instructions))
+
+    @staticmethod
+    def compute_unitary(instructions: List["Instruction"], num_of_qubits: int, inverse: bool = False) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the unitary of the circuit built from instructions (in the given order) and the amplitudes it
+        produces from the zero state. With the native backend the results are cached based on the instructions'
+        signatures, so sequences sharing a prefix with a previously computed one only need to apply the new gates.
+
+        :param instructions: the set up Instructions forming the circuit
+        :param num_of_qubits: how many qubits the circuit has
+        :param inverse: whether to use the inverse of every Instruction
+        :return: the circuit's unitary (unrounded) and its output for |0...0>
+        """
+        if QuantumSimulationConfig.use_native_backend():
+            def get_operation(index: int) -> Tuple[np.ndarray, List[int]]:
+                return instructions[index].get_matrix(inverse), instructions[index]._qargs
+
+            return UnitaryCache.instance().compute(num_of_qubits, [inst.signature() for inst in instructions],
+                                                   get_operation, inverse)
+
         circuit = QuantumCircuit.from_bit_num(num_of_qubits, num_of_qubits)
         for instruction in instructions:
             instruction.append_to(circuit, inverse)
-        simulator = QuantumSimulator()
-        amplitudes = simulator.run(circuit, do_transpile=True)
-        return StateVector(amplitudes, num_of_used_gates=len(instructions))
+        unitary = UnitarySimulator().execute(circuit, decimals=None)
+        amplitudes = QuantumSimulator().run(circuit, do_transpile=True)
+        return unitary, amplitudes
 
     @staticmethod
     def __circuit_input_value(qubit: int, state_vectors: Optional[Tuple[StateVector, StateVector, StateVector]]):
@@ -99,14 +149,22 @@ class Instruction(Collectible, ABC):
         line_width = len(lines[0])
         return "\n".join([center_string(line, line_width, uneven_left=False) for line in lines])
 
-    def __init__(self, gate_type: GateType, instruction: QiskitGate, needed_qubits: int):
+    def __init__(self, gate_type: GateType, instruction: Callable[[], "QiskitGate"], needed_qubits: int):
+        """
+        :param gate_type: type of the gate
+        :param instruction: function creating the underlying Qiskit gate, only called if the Qiskit gate is needed
+        :param needed_qubits: how many qubits the gate acts on
+        """
         super().__init__(CollectibleType.Gate)
         self.__type = gate_type
-        self.__instruction = instruction
+        self.__create_instruction = instruction
+        self.__instruction: Optional["QiskitGate"] = None  # created on first use
         self.__needed_qubits = needed_qubits
         self._qargs = []
         self._cargs = []
         self.__position: Optional[int] = None
+        self.__matrix: Optional[np.ndarray] = None  # computed on first use
+        self.__inverse_matrix: Optional[np.ndarray] = None  # computed on first use
 
     @property
     def gate_type(self) -> GateType:
@@ -193,9 +251,43 @@ class Instruction(Collectible, ABC):
         if not skip_position:
             self.__position = None
 
+    def get_qiskit_gate(self, inverse: bool = False) -> "QiskitGate":
+        """
+        :param inverse: whether to return the inverse of the underlying Qiskit gate
+        :return: the underlying Qiskit gate, which is created (and hence Qiskit imported) on the first call
+        """
+        if self.__instruction is None:
+            self.__instruction = self.__create_instruction()
+        return self.__instruction.inverse() if inverse else self.__instruction
+
     def append_to(self, circuit: QuantumCircuit, inverse: bool = False):
-        instruction = self.__instruction.inverse() if inverse else self.__instruction
-        circuit.append(instruction, self._qargs, self._cargs)
+        circuit.append(functools.partial(self.get_qiskit_gate, inverse), self._qargs, self._cargs,
+                       self.get_matrix(inverse))
+
+    def get_matrix(self, inverse: bool = False) -> np.ndarray:
+        """
+        :param inverse: whether to return the matrix of the inverse of this Instruction
+        :return: the unitary matrix of this Instruction (in Qiskit's qubit order) as complex128 array
+        """
+        if inverse:
+            if self.__inverse_matrix is None:
+                self.__inverse_matrix = self._compute_inverse_matrix()
+            return self.__inverse_matrix
+        if self.__matrix is None:
+            self.__matrix = self._compute_matrix()
+        return self.__matrix
+
+    def _compute_matrix(self) -> np.ndarray:
+        return GateMatrices.get(self.gate_type)
+
+    def _compute_inverse_matrix(self) -> np.ndarray:
+        return GateMatrices.get(self.gate_type, inverse=True)
+
+    def signature(self) -> Tuple[Hashable, ...]:
+        """
+        :return: a canonical key that is equal for all Instructions resulting in the same operation
+        """
+        return self.__type, tuple(self._qargs)
 
     def qargs_iter(self) -> Iterator[int]:
         return iter(self._qargs)
@@ -222,7 +314,7 @@ class Instruction(Collectible, ABC):
 
     def _matrix_string(self) -> str:
         # use the real underlying matrix because some Instructions might have parameters
-        return CircuitMatrix.matrix_to_string(self.__instruction.to_matrix(), self.num_of_qubits)
+        return CircuitMatrix.matrix_to_string(self.get_matrix(), self.num_of_qubits)
 
     @abstractmethod
     def copy(self) -> "Instruction":
@@ -272,13 +364,13 @@ class Instruction(Collectible, ABC):
 
 
 class SingleQubitGate(Instruction, ABC):
-    def __init__(self, gate_type: GateType, instruction: QiskitGate):
+    def __init__(self, gate_type: GateType, instruction: Callable[[], "QiskitGate"]):
         super().__init__(gate_type, instruction, needed_qubits=1)
 
 
 class IGate(SingleQubitGate):
     def __init__(self):
-        super().__init__(GateType.IGate, gates.IGate())
+        super().__init__(GateType.IGate, _qiskit_gate("IGate"))
 
     def abbreviation(self, qubit: Optional[int] = None):
         return "I"
@@ -289,7 +381,7 @@ class IGate(SingleQubitGate):
 
 class XGate(SingleQubitGate):
     def __init__(self):
-        super(XGate, self).__init__(GateType.XGate, gates.XGate())
+        super(XGate, self).__init__(GateType.XGate, _qiskit_gate("XGate"))
 
     def abbreviation(self, qubit: Optional[int] = None):
         return " X "
@@ -300,7 +392,7 @@ class XGate(SingleQubitGate):
 
 class SXGate(SingleQubitGate):
     def __init__(self):
-        super(SXGate, self).__init__(GateType.SXGate, gates.SXGate())
+        super(SXGate, self).__init__(GateType.SXGate, _qiskit_gate("SXGate"))
 
     def abbreviation(self, qubit: Optional[int] = None):
         return "SX "
@@ -311,7 +403,7 @@ class SXGate(SingleQubitGate):
 
 class YGate(SingleQubitGate):
     def __init__(self):
-        super(YGate, self).__init__(GateType.YGate, gates.YGate())
+        super(YGate, self).__init__(GateType.YGate, _qiskit_gate("YGate"))
 
     def abbreviation(self, qubit: Optional[int] = None):
         return " Y "
@@ -322,7 +414,7 @@ class YGate(SingleQubitGate):
 
 class ZGate(SingleQubitGate):
     def __init__(self):
-        super(ZGate, self).__init__(GateType.ZGate, gates.ZGate())
+        super(ZGate, self).__init__(GateType.ZGate, _qiskit_gate("ZGate"))
 
     def abbreviation(self, qubit: Optional[int] = None):
         return " Z "
@@ -333,7 +425,7 @@ class ZGate(SingleQubitGate):
 
 class HGate(SingleQubitGate):
     def __init__(self):
-        super().__init__(GateType.HGate, gates.HGate())
+        super().__init__(GateType.HGate, _qiskit_gate("HGate"))
 
     def abbreviation(self, qubit: Optional[int] = None):
         return " H "
@@ -344,7 +436,7 @@ class HGate(SingleQubitGate):
 
 class SGate(SingleQubitGate):
     def __init__(self):
-        super().__init__(GateType.SGate, gates.SGate())
+        super().__init__(GateType.SGate, _qiskit_gate("SGate"))
 
     def abbreviation(self, qubit: Optional[int] = None):
         return " S "
@@ -356,7 +448,7 @@ class SGate(SingleQubitGate):
 class RotationGate(SingleQubitGate, ABC):
     _DEFAULT_ANGLE = math.pi / 2
 
-    def __init__(self, gate_type: GateType, instruction: QiskitGate, angle: float):
+    def __init__(self, gate_type: GateType, instruction: Callable[[], "QiskitGate"], angle: float):
         """
         :param angle: value between 0 and PI (other values possible, but they correspond to an angle in said range)
         """
@@ -367,6 +459,15 @@ class RotationGate(SingleQubitGate, ABC):
     def angle(self) -> float:
         return self.__angle
 
+    def signature(self) -> Tuple[Hashable, ...]:
+        return super().signature() + (self.__angle,)
+
+    def _compute_matrix(self) -> np.ndarray:
+        return GateMatrices.get(self.gate_type, self.__angle)
+
+    def _compute_inverse_matrix(self) -> np.ndarray:
+        return GateMatrices.get(self.gate_type, self.__angle, inverse=True)
+
     def description(self, check_unlocks: Optional[Callable[[str], bool]] = None) -> str:
         desc = super().description(check_unlocks)  # remove the stated default angle at the end
         # find indices of "°" and the whitespace before that, so we can replace the angle value.
@@ -385,7 +486,7 @@ class RotationGate(SingleQubitGate, ABC):
 
 class RYGate(RotationGate):
     def __init__(self, angle: float = RotationGate._DEFAULT_ANGLE):
-        super().__init__(GateType.RYGate, gates.RYGate(theta=angle), angle)
+        super().__init__(GateType.RYGate, _qiskit_gate("RYGate", theta=angle), angle)
 
     def abbreviation(self, qubit: Optional[int] = None):
         return " RY"
@@ -396,7 +497,7 @@ class RYGate(RotationGate):
 
 class RZGate(RotationGate):
     def __init__(self, angle: float = RotationGate._DEFAULT_ANGLE):
-        super().__init__(GateType.RZGate, gates.RZGate(phi=angle), angle)
+        super().__init__(GateType.RZGate, _qiskit_gate("RZGate", phi=angle), angle)
 
     def abbreviation(self, qubit: Optional[int] = None):
         return " RZ"
@@ -428,13 +529,13 @@ class MultiQubitGate(Instruction, ABC):
 
 
 class DoubleQubitGate(MultiQubitGate, ABC):
-    def __init__(self, gate_type: GateType, instruction: QiskitGate):
+    def __init__(self, gate_type: GateType, instruction: Callable[[], "QiskitGate"]):
         super(DoubleQubitGate, self).__init__(gate_type, instruction, needed_qubits=2)
 
 
 class SwapGate(DoubleQubitGate):
     def __init__(self):
-        super().__init__(GateType.SwapGate, gates.SwapGate())
+        super().__init__(GateType.SwapGate, _qiskit_gate("SwapGate"))
 
     def _internal_abbreviation(self, index: Optional[int]) -> str:
         if index is None:
@@ -448,7 +549,7 @@ class SwapGate(DoubleQubitGate):
 
 class CXGate(DoubleQubitGate):
     def __init__(self):
-        super().__init__(GateType.CXGate, gates.CXGate())
+        super().__init__(GateType.CXGate, _qiskit_gate("CXGate"))
 
     def _internal_abbreviation(self, index: Optional[int]) -> str:
         if index is None:
@@ -464,7 +565,7 @@ class CXGate(DoubleQubitGate):
 
 class CYGate(DoubleQubitGate):
     def __init__(self):
-        super().__init__(GateType.CYGate, gates.CYGate())
+        super().__init__(GateType.CYGate, _qiskit_gate("CYGate"))
 
     def _internal_abbreviation(self, index: Optional[int]) -> str:
         if index is None:
@@ -480,7 +581,7 @@ class CYGate(DoubleQubitGate):
 
 class CZGate(DoubleQubitGate):
     def __init__(self):
-        super().__init__(GateType.CZGate, gates.CZGate())
+        super().__init__(GateType.CZGate, _qiskit_gate("CZGate"))
 
     def _internal_abbreviation(self, index: Optional[int]) -> str:
         if index is None:
@@ -496,7 +597,7 @@ class CZGate(DoubleQubitGate):
 
 class CHGate(DoubleQubitGate):
     def __init__(self):
-        super().__init__(GateType.CHGate, gates.CHGate())
+        super().__init__(GateType.CHGate, _qiskit_gate("CHGate"))
 
     def _internal_abbreviation(self, index: Optional[int]) -> str:
         if index is None:
@@ -579,6 +680,17 @@ class CombinedGate(MultiQubitGate):
         CombinedGate.__NEXT_ID += 1
         return next_id
 
+    @staticmethod
+    def _set_next_id(next_id: int) -> int:
+        """
+        Needed during testing, so the ids of CombinedGates don't depend on the gates other tests created.
+
+        :return: the previous next id
+        """
+        previous_id = CombinedGate.__NEXT_ID
+        CombinedGate.__NEXT_ID = next_id
+        return previous_id
+
     def __init__(self, instructions: List[Instruction], needed_qubits: int, name: Optional[str] = None,
                  _id: Optional[int] = None):
         inst_validation = CombinedGate.validate_instructions(instructions)
@@ -618,18 +730,17 @@ class CombinedGate(MultiQubitGate):
 
         circuit = QuantumCircuit.from_register(needed_qubits)
         for inst in instructions: inst.append_to(circuit)
-        gate = circuit.to_gate(label=name)
 
-        super().__init__(GateType.Combined, gate, needed_qubits)
-        self.__gate = gate
+        super().__init__(GateType.Combined, functools.partial(circuit.to_gate, label=name), needed_qubits)
+        self.__label = name
         self.__instructions = instructions
 
         inst_dict: Dict[int, Instruction] = {}
         for i, inst in enumerate(instructions): inst_dict[i] = inst
         self.__circ_repr = Instruction.circuit_to_string(needed_qubits, len(instructions), inst_dict)
 
-        amplitudes = UnitarySimulator().execute(circuit, decimals=QuantumSimulationConfig.DECIMALS)
-        self.__matrix = CircuitMatrix(amplitudes, len(instructions))
+        self.__unitary = UnitarySimulator().execute(circuit, decimals=None)
+        self.__matrix = CircuitMatrix(np.round(self.__unitary, QuantumSimulationConfig.DECIMALS), len(instructions))
 
     @property
     def difficulty(self) -> int:
@@ -637,13 +748,23 @@ class CombinedGate(MultiQubitGate):
 
     def name(self, include_suffix: Optional[bool] = None) -> str:
         if include_suffix is None: include_suffix = True
-        return f"{self.__gate.label}{' Gate' if include_suffix else ''}"
+        return f"{self.__label}{' Gate' if include_suffix else ''}"
 
     def _internal_abbreviation(self, index: Optional[int] = None):
         index = "" if index is None else str(index)
         id_str = str(self.__id) if self.__id < 10 else num_to_letter(self.__id - 10, start_uppercase=True)
         return f"{GateType.Combined.short_name[0]}{id_str}{index}"
 
+    def _compute_matrix(self) -> np.ndarray:
+        return self.__unitary
+
+    def _compute_inverse_matrix(self) -> np.ndarray:
+        return self.__unitary.conj().T  # the inverse of a unitary is its conjugate transpose
+
+    def signature(self) -> Tuple[Hashable, ...]:
+        # the underlying instructions (including parameters like angles) describe the resulting unitary
+        return super().signature() + (self.num_of_qubits, tuple([inst.signature() for inst in self.__instructions]))
+
     def _matrix_string(self) -> str:
         return self.__matrix.to_string()
 
@@ -659,20 +780,29 @@ class CombinedGate(MultiQubitGate):
         # e.g.: combined{"Bell" 2: H(0),CX(0,1)}
         text = [f"{inst.to_save_string()}({','.join([str(q) for q in inst.qargs_iter()])})"
                 for inst in self.__instructions]
-        return f"{SaveGrammarConfig.combined_prefix()}{{\"{self.__gate.label}\" {self.num_of_qubits}: " \
+        return f"{SaveGrammarConfig.combined_prefix()}{{\"{self.__label}\" {self.num_of_qubits}: " \
                f"{','.join(text)}}}"
 
     def copy(self) -> "Instruction":
         # copy the instructions to not accidentally alter the positioning of the underlying Instructions
         instructions = [inst._deep_copy() for inst in self.__instructions]
-        return CombinedGate(instructions, self.__gate.num_qubits, self.__gate.label, self.__id)
+        return CombinedGate(instructions, self.num_of_qubits, self.__label, self.__id)
 
 
 ####### Gates for internal use only #######
 
 class DebugGate(SingleQubitGate):
+    __ANGLE = 2.5
+
     def __init__(self):
-        super().__init__(GateType.Debug, gates.RZGate(phi=2.5))
+        super().__init__(GateType.Debug, _qiskit_gate("RZGate", phi=DebugGate.__ANGLE))
+
+    def _compute_matrix(self) -> np.ndarray:
+        # there is no matrix for GateType.Debug since it behaves like an RZGate
+        return GateMatrices.get(GateType.RZGate, DebugGate.__ANGLE)
+
+    def _compute_inverse_matrix(self) -> np.ndarray:
+        return GateMatrices.get(GateType.RZGate, DebugGate.__ANGLE, inverse=True)
 
     def abbreviation(self, qubit: Optional[int] = None):
         return "deb"
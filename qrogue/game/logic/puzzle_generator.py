@@ -1,10 +1,31 @@
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Optional, Tuple, Dict, Set
 
 from qrogue.game.logic.base import StateVector
 from qrogue.game.logic.collectibles import Collectible, Instruction
 from qrogue.game.logic.collectibles.instruction import RZGate, RYGate
-from qrogue.util import MyRandom, RandomManager, DifficultyType, StvDifficulty, Config, Logger
+from qrogue.util import MyRandom, RandomManager, DifficultyType, StvDifficulty, Config, Logger, \
+    QuantumSimulationConfig
+
+# arguments of generate_puzzle() (except the MyRandom) shared by all puzzles of a worker process' batch
+_worker_args: Optional[Tuple[int, int, StvDifficulty, List[Instruction], Optional[List[Instruction]],
+                             List[Collectible]]] = None
+
+
+def _init_puzzle_worker(args: Tuple[int, int, StvDifficulty, List[Instruction], Optional[List[Instruction]],
+                                    List[Collectible]], native_backend: bool):
+    global _worker_args
+    _worker_args = args
+    # the results have to be computed the same way as in the parent process to be identical
+    QuantumSimulationConfig.set_native_backend(native_backend)
+    Logger.init_for_worker()
+
+
+def _generate_puzzle_chunk(seeds: List[int]) -> List[Tuple[StateVector, StateVector, Optional[Collectible]]]:
+    # a worker processes a whole chunk of seeds, so its UnitaryCache is reused between the puzzles of the chunk
+    return [PuzzleGenerator.generate_puzzle(RandomManager.create_new(seed), *_worker_args) for seed in seeds]
 
 
 class PuzzleGenerator:
@@ -225,13 +246,7 @@ class PuzzleGenerator:
 
                 # check whether new_stv is indeed new or a repeat of a previous one (meaning the gate undid an
                 # operation)
-                is_repeated = False
-                for prev_stv in prev_stvs:
-                    if prev_stv.is_equal_to(new_stv, ignore_god_mode=True):
-                        is_repeated = True  # we found a duplicate
-                        break
-
-                if not is_repeated:
+                if not new_stv.is_equal_to_any(prev_stvs, ignore_god_mode=True):
                     # gates_for_target and cur_gate result in a new stv -> save cur_gate to gates_for_target
                     # gates_for_target.append(cur_gate)
                     # prev_stvs.append(new_stv)  # also store the resulting stv for comparison with new ones
@@ -386,3 +401,37 @@ class PuzzleGenerator:
         reward = rrm.get_element(reward_pool, msg="generate_puzzle()-reward")
 
         return input_stv, target_stv, reward
+
+    @staticmethod
+    def generate_puzzles(seeds: List[int], num_of_qubits: int, circuit_space: int, difficulty: StvDifficulty,
+                         available_gates: List[Instruction], include_gates: Optional[List[Instruction]],
+                         reward_pool: List[Collectible], num_of_workers: Optional[int] = None,
+                         chunk_size: Optional[int] = None) \
+            -> List[Tuple[StateVector, StateVector, Optional[Collectible]]]:
+        """
+        Generates one puzzle per seed via generate_puzzle(), optionally distributed over multiple processes. Since every
+        puzzle only depends on its seed and the shared arguments, the result is identical to calling generate_puzzle()
+        with RandomManager.create_new(seed) for every seed in order, regardless of the number of workers.
+
+        :param seeds: one seed per puzzle to generate
+        :param num_of_workers: how many processes to use, 1 generates all puzzles in this process, None uses one process
+            per CPU
+        :param chunk_size: how many seeds are sent to a worker at once, None splits seeds evenly into a few chunks per
+            worker
+        :return: input StateVector, target StateVector and reward of every puzzle in the order of seeds
+        """
+        args = num_of_qubits, circuit_space, difficulty, available_gates, include_gates, reward_pool
+        if num_of_workers == 1 or len(seeds) <= 1:
+            return [PuzzleGenerator.generate_puzzle(RandomManager.create_new(seed), *args) for seed in seeds]
+
+        if num_of_workers is None:
+            num_of_workers = os.cpu_count() or 1
+        if chunk_size is None:
+            # a few chunks per worker balance the load without losing the benefit of each worker's cache
+            chunk_size = max(1, math.ceil(len(seeds) / (4 * num_of_workers)))
+        chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+
+        with ProcessPoolExecutor(num_of_workers, initializer=_init_puzzle_worker,
+                                 initargs=(args, QuantumSimulationConfig.use_native_backend())) as executor:
+            # map() returns the results in the order of chunks
+            return [puzzle for chunk in executor.map(_generate_puzzle_chunk, chunks) for puzzle in chunk]
@@ -0,0 +1,232 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from qrogue.game.logic.base import StateVector
+from qrogue.util import Config, Logger, PuzzleConfig
+
+
+class PuzzleBank:
+    """
+    Persistent store of generated enemy puzzles backed by an SQLite database. Puzzles are grouped by a key made of the
+    StvDifficulty code, the number of qubits and the multiset of available gates (see key()). Every key has a fixed
+    number of slots and the puzzle of a slot is generated from a seed derived from key and slot (see slot_seed()).
+    Hence, a stored puzzle is exactly the puzzle live generation would produce and drawing a slot with the game's
+    MyRandom selects puzzles deterministically, regardless of which puzzles the bank already contains. The number of
+    slots should be large enough to not noticeably reduce the variety of puzzles.
+
+    Records only consist of numbers and raw amplitudes. Once the bank holds max_size puzzles, newly generated puzzles
+    are no longer stored.
+
+    SQLite connections must not be used across fork(), so the active instance is only available in the process that
+    opened it. Worker processes can open their own connection to the same database with init_for_worker().
+    """
+    __instance: Optional["PuzzleBank"] = None
+    # instances inherited by forked processes, they are kept but never used or closed since they belong to the parent
+    __inherited: List["PuzzleBank"] = []
+
+    @staticmethod
+    def instance() -> Optional["PuzzleBank"]:
+        """
+        :return: the opened PuzzleBank or None if puzzles should always be generated live
+        """
+        if PuzzleBank.__instance is not None and PuzzleBank.__instance.__pid != os.getpid():
+            return None
+        return PuzzleBank.__instance
+
+    @staticmethod
+    def open(path: str, max_size: int = PuzzleConfig.BANK_MAX_SIZE,
+             slots_per_key: int = PuzzleConfig.BANK_SLOTS_PER_KEY,
+             commit_interval: int = PuzzleConfig.BANK_COMMIT_INTERVAL) -> bool:
+        """
+        Opens the PuzzleBank stored at path (created if it doesn't exist yet) and makes it the active instance.
+
+        :return: whether the bank could be opened
+        """
+        PuzzleBank.close()
+        try:
+            PuzzleBank.__instance = PuzzleBank(path, commit_interval, max_size, slots_per_key)
+            return True
+        except sqlite3.Error as ex:
+            Logger.instance().error(f"Failed to open puzzle bank at \"{path}\": {ex}", show=False, from_pycui=False)
+            return False
+
+    @staticmethod
+    def close():
+        """
+        Writes pending puzzles of the active instance to disk and deactivates it.
+        """
+        if PuzzleBank.__instance is not None:
+            if PuzzleBank.__instance.__pid == os.getpid():
+                PuzzleBank.__instance.__close()
+            else:
+                PuzzleBank.__inherited.append(PuzzleBank.__instance)
+            PuzzleBank.__instance = None
+
+    @staticmethod
+    def worker_settings() -> Optional[Tuple[str, int, int]]:
+        """
+        :return: what worker processes need to open the active instance themselves (see init_for_worker()) or None if
+            there is no active instance
+        """
+        bank = PuzzleBank.instance()
+        if bank is None:
+            return None
+        return bank.__path, bank.__max_size, bank.__slots_per_key
+
+    @staticmethod
+    def init_for_worker(settings: Optional[Tuple[str, int, int]]):
+        """
+        Replaces a PuzzleBank inherited from the parent process with an own connection to the same database, so workers
+        draw the same puzzles as the parent.
+
+        :param settings: the parent's worker_settings()
+        """
+        PuzzleBank.close()
+        if settings is not None:
+            path, max_size, slots_per_key = settings
+            # worker processes may end without closing the bank, so every stored puzzle is committed right away
+            PuzzleBank.open(path, max_size, slots_per_key, commit_interval=1)
+
+    @staticmethod
+    def key(difficulty_code: str, num_of_qubits: int, gates: List[str], circuit_space: int, rotate_input: bool) \
+            -> str:
+        """
+        :param difficulty_code: code of the puzzle's StvDifficulty
+        :param num_of_qubits: number of qubits of the puzzle
+        :param gates: descriptions of the available gates including their parameters, their order doesn't matter
+        :param circuit_space: how many gates fit into the circuit
+        :param rotate_input: whether the input is a random rotation instead of the zero state
+        :return: the key of the slots of puzzles with the given parameters
+        """
+        return f"{difficulty_code}|{num_of_qubits}|{','.join(sorted(gates))}|{circuit_space}|{int(rotate_input)}"
+
+    @staticmethod
+    def slot_seed(key: str, slot: int) -> int:
+        """
+        :return: the seed the puzzle in the given slot is generated with
+        """
+        digest = hashlib.sha1(f"{key}#{slot}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % Config.MAX_SEED
+
+    @staticmethod
+    def __encode_stv(stv: StateVector) -> bytes:
+        return stv.amplitudes.astype(np.complex128).tobytes()
+
+    @staticmethod
+    def __decode_stv(data: bytes, num_of_used_gates: int) -> StateVector:
+        # frombuffer() returns a read-only array that StateVector can use without copying
+        return StateVector(np.frombuffer(data, dtype=np.complex128), num_of_used_gates)
+
+    def __init__(self, path: str, commit_interval: int = PuzzleConfig.BANK_COMMIT_INTERVAL,
+                 max_size: int = PuzzleConfig.BANK_MAX_SIZE, slots_per_key: int = PuzzleConfig.BANK_SLOTS_PER_KEY):
+        """
+        :param path: path of the database file
+        :param commit_interval: after how many stored puzzles they are committed to disk
+        :param max_size: how many puzzles can be stored at most
+        :param slots_per_key: how many different puzzles are provided for the same key
+        """
+        self.__path = path
+        self.__pid = os.getpid()
+        # the connection is shared by the threads of this process
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS puzzle_slots ("
+                                  "key TEXT NOT NULL, slot INTEGER NOT NULL, seed INTEGER NOT NULL, "
+                                  "input_stv BLOB NOT NULL, input_gates INTEGER NOT NULL, "
+                                  "target_stv BLOB NOT NULL, target_gates INTEGER NOT NULL, "
+                                  "PRIMARY KEY (key, slot)) WITHOUT ROWID")
+        self.__connection.commit()
+        self.__commit_interval = commit_interval
+        self.__max_size = max_size
+        self.__slots_per_key = slots_per_key
+        self.__size = self.__connection.execute("SELECT COUNT(*) FROM puzzle_slots").fetchone()[0]
+        self.__num_of_pending = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    @property
+    def max_size(self) -> int:
+        return self.__max_size
+
+    @property
+    def slots_per_key(self) -> int:
+        return self.__slots_per_key
+
+    def lookup(self, key: str, slot: int, num_of_qubits: int) -> Optional[Tuple[StateVector, StateVector]]:
+        """
+        :param key: describes the puzzle's parameters, see key()
+        :param slot: which of the puzzles with the given key to look up
+        :param num_of_qubits: number of qubits of the puzzle
+        :return: input StateVector and target StateVector or None if the slot is empty (or its record is invalid or
+            cannot be read)
+        """
+        try:
+            with self.__lock:
+                row = self.__connection.execute("SELECT seed, input_stv, input_gates, target_stv, target_gates "
+                                                "FROM puzzle_slots WHERE key = ? AND slot = ?", (key, slot)).fetchone()
+        except sqlite3.Error:
+            row = None   # e.g., another process locks the database for too long
+        stv_size = 2 ** num_of_qubits * np.dtype(np.complex128).itemsize
+        if row is None or row[0] != PuzzleBank.slot_seed(key, slot) or len(row[1]) != stv_size or \
+                len(row[3]) != stv_size:
+            self.__misses += 1
+            return None
+        self.__hits += 1
+        _, input_stv, input_gates, target_stv, target_gates = row
+        return self.__decode_stv(input_stv, input_gates), self.__decode_stv(target_stv, target_gates)
+
+    def store(self, key: str, slot: int, input_stv: StateVector, target_stv: StateVector):
+        """
+        Stores a live generated puzzle unless the bank is full, see lookup() for the meaning of the arguments. Failing
+        to store a puzzle is not an error since it can always be generated again.
+        """
+        try:
+            with self.__lock:
+                exists = self.__connection.execute("SELECT 1 FROM puzzle_slots WHERE key = ? AND slot = ?",
+                                                   (key, slot)).fetchone() is not None
+                if not exists and self.__size >= self.__max_size:
+                    return
+                # an existing record of the slot is invalid, otherwise lookup() would have returned it
+                self.__connection.execute("INSERT OR REPLACE INTO puzzle_slots VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                          (key, slot, PuzzleBank.slot_seed(key, slot),
+                                           self.__encode_stv(input_stv), input_stv.num_of_used_gates,
+                                           self.__encode_stv(target_stv), target_stv.num_of_used_gates))
+                if not exists:
+                    self.__size += 1
+                self.__num_of_pending += 1
+                if self.__num_of_pending >= self.__commit_interval:
+                    self.__commit()
+        except sqlite3.Error as ex:
+            Logger.instance().warn(f"Failed to store puzzle in puzzle bank: {ex}", from_pycui=False)
+
+    def __commit(self):
+        self.__connection.commit()
+        self.__num_of_pending = 0
+
+    def commit(self):
+        with self.__lock:
+            self.__commit()
+
+    def __close(self):
+        with self.__lock:
+            self.__commit()
+            self.__connection.close()
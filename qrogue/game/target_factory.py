@@ -8,8 +8,9 @@ from qrogue.game.logic.actors.controllables import Robot
 from qrogue.game.logic.actors.puzzles import Enemy, Target, Boss
 from qrogue.game.logic.base import StateVector
 from qrogue.game.logic.collectibles import Collectible, CollectibleFactory, Instruction, QuantumFuser
+from qrogue.game.puzzle_bank import PuzzleBank
 from qrogue.game.target_difficulty import ExplicitTargetDifficulty
-from qrogue.util import Logger, MyRandom, Config, StvDifficulty, DifficultyType
+from qrogue.util import Logger, MyRandom, Config, StvDifficulty, DifficultyType, PuzzleConfig, RandomManager
 
 
 class EnemyFactory(ABC):
@@ -195,12 +196,21 @@ class NewEnemyFactory(PuzzleFactory, EnemyFactory):
         robot: Robot = data
         return EnemyFactory._fallback_enemy(None, eid, robot.num_of_qubits, None)
 
-    def produce(self, rm: MyRandom, include_gates: Optional[List[Instruction]],
-                input_gates: Optional[List[Instruction]] = None, eid: Optional[int] = None) -> Enemy:
-        eid = 0 if eid is None else eid
-
-        # Note (0.1.09.24): include_gates and input_gates seem to be None for all calls
-
+    def __bank_key(self) -> str:
+        """
+        :return: the key of the PuzzleBank's slots for puzzles produced by this factory
+        """
+        # the qubits of the available gates don't matter since they are reset during preparation
+        gates = [repr(gate.copy().signature()) for gate in self._get_available_gates()]
+        return PuzzleBank.key(self._difficulty.to_code(), self._num_of_qubits, gates, self._circuit_space,
+                              self.__rotate_input)
+
+    def __generate(self, rm: MyRandom, include_gates: Optional[List[Instruction]],
+                   input_gates: Optional[List[Instruction]], available_gates: List[Instruction]) \
+            -> Tuple[StateVector, StateVector]:
+        """
+        :return: input StateVector and target StateVector of a newly generated puzzle
+        """
         # prepare gates for stv computation
         if input_gates is not None or self.__input_gates is not None:
             # just use the provided gates
@@ -214,15 +224,50 @@ class NewEnemyFactory(PuzzleFactory, EnemyFactory):
         else:
             # use no create a 0-state stv
             gates_for_input = []
-        gates_for_target = self._prepare_from_gates(rm, include_gates, force_num_of_gates=False)
+        gates_for_target = PuzzleGenerator.prepare_from_gates(rm, self._num_of_qubits, self._circuit_space,
+                                                              self._difficulty, available_gates, include_gates,
+                                                              force_num_of_gates=False)
 
         target_stv = Instruction.compute_stv(gates_for_input + gates_for_target, self._num_of_qubits)
         # don't reverse this StV because the used gates are used as-is in target_stv and don't have to be "countered"
         #  (i.e., reversed by the player)
         input_stv = Instruction.compute_stv(gates_for_input, self._num_of_qubits, inverse=False)
+        return input_stv, target_stv
+
+    def __draw_from_bank(self, rm: MyRandom, bank: PuzzleBank) -> Tuple[StateVector, StateVector]:
+        """
+        Draws one of the PuzzleBank's slots for this factory's parameters with rm. The slot's puzzle only depends on the
+        slot, so the result is the same whether the bank already contains the puzzle or not.
+
+        :return: input StateVector and target StateVector of the drawn puzzle
+        """
+        key = self.__bank_key()
+        slot = rm.get_int(0, bank.slots_per_key, msg="NewEnemyFactory.produce()@slot")
+        record = bank.lookup(key, slot, self._num_of_qubits)
+        if record is not None:
+            return record
+
+        # sort the gates, so the puzzle only depends on their multiset and not on their order
+        available_gates = sorted(self._get_available_gates(), key=lambda gate: repr(gate.copy().signature()))
+        input_stv, target_stv = self.__generate(RandomManager.create_new(PuzzleBank.slot_seed(key, slot)), None, None,
+                                                available_gates)
+        bank.store(key, slot, input_stv, target_stv)
+        return input_stv, target_stv
+
+    def produce(self, rm: MyRandom, include_gates: Optional[List[Instruction]],
+                input_gates: Optional[List[Instruction]] = None, eid: Optional[int] = None) -> Enemy:
+        eid = 0 if eid is None else eid
+
+        # Note (0.1.09.24): include_gates and input_gates seem to be None for all calls
+        # puzzles based on input gates are not drawn from the PuzzleBank since preparing them alters the (shared) gates,
+        #  so the produced puzzle doesn't only depend on the slot
+        bank = PuzzleBank.instance()
+        if bank is not None and include_gates is None and input_gates is None and self.__input_gates is None:
+            input_stv, target_stv = self.__draw_from_bank(rm, bank)
+        else:
+            input_stv, target_stv = self.__generate(rm, include_gates, input_gates, self._get_available_gates())
         reward = None if self.__reward_pool is None \
             else rm.get_element(self.__reward_pool, msg="EnemyFactory.produce()@reward")
-
         return Enemy(self._next_id(), eid, target_stv, reward, input_stv)
 
 
@@ -1,7 +1,8 @@
-from typing import Callable, List, Tuple, Dict, Optional, Set
+from __future__ import annotations  # the generated parser is only imported for type checking
 
-from antlr4 import InputStream, CommonTokenStream
-from antlr4.tree.Tree import TerminalNodeImpl
+from typing import Callable, List, Tuple, Dict, Optional, Set, TYPE_CHECKING
+
+from antlr4.tree.Tree import ParseTreeVisitor, TerminalNodeImpl
 
 from qrogue.game.logic import Message
 from qrogue.game.logic import actors
@@ -15,17 +16,26 @@ from qrogue.game.target_difficulty import ExplicitTargetDifficulty
 from qrogue.game.target_factory import EnemyFactory, EnemyTargetFactory, BossFactory
 from qrogue.game.world import tiles
 from qrogue.game.world.dungeon_generator import parser_util
-from qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonLexer import QrogueDungeonLexer
-from qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonParser import QrogueDungeonParser
-from qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonVisitor import QrogueDungeonVisitor
 from qrogue.game.world.dungeon_generator.generator import DungeonGenerator
+from qrogue.game.world.dungeon_generator.level_parse_cache import LevelParseCache
 from qrogue.game.world.map import CallbackPack, MapMetaData, LessonMap, rooms
 from qrogue.game.world.navigation import Coordinate, Direction
 from qrogue.util import Config, MapConfig, PathConfig, Logger, CommonQuestions, RandomManager, MyRandom, \
-    load_help_text, ParserErrorListener, PuzzleGrammarConfig
+    load_help_text, PuzzleGrammarConfig
+
+if TYPE_CHECKING:
+    from qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonParser import QrogueDungeonParser
+
 
+def _dungeon_parser():
+    # The generated parser is slow to import, so it is only imported once the first level is loaded (see
+    # LevelParseCache). We also don't extend the generated QrogueDungeonVisitor since it imports the parser, but its
+    # generic base class instead. The generated visitor doesn't add any behaviour to it anyway.
+    from qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonParser import QrogueDungeonParser
+    return QrogueDungeonParser
 
-class QrogueLevelGenerator(DungeonGenerator, QrogueDungeonVisitor):
+
+class QrogueLevelGenerator(DungeonGenerator, ParseTreeVisitor):
     __DEFAULT_NUM_OF_RIDDLE_ATTEMPTS = 7
     __ROBOT_NO_GATES = "none"
     __SPAWN_ROOM_ID = "SR"
@@ -203,14 +213,8 @@ class QrogueLevelGenerator(DungeonGenerator, QrogueDungeonVisitor):
         self.__rm = RandomManager.create_new(seed)
         map_data = PathConfig.read_level(file_path, in_dungeon_folder)
 
-        input_stream = InputStream(map_data)
-        lexer = QrogueDungeonLexer(input_stream)
-        token_stream = CommonTokenStream(lexer)
-        parser = QrogueDungeonParser(token_stream)
-        parser.addErrorListener(ParserErrorListener())
-
         try:
-            meta_data, room_matrix = self.visit(parser.start())
+            meta_data, room_matrix = self.visit(LevelParseCache.parse(map_data, MapConfig.use_level_parse_cache()))
         except SyntaxError as se:
             Logger.instance().error(str(se), show=False, from_pycui=False)
             return None, False
@@ -1128,20 +1132,21 @@ class QrogueLevelGenerator(DungeonGenerator, QrogueDungeonVisitor):
         return room_matrix
 
     def __hallway_handling(self, ctx_children: List[TerminalNodeImpl], y: int, direction: Direction):
+        parser = _dungeon_parser()
         x = 0
         for child in ctx_children:
             if parser_util.check_for_overspecified_columns(x, child.symbol.type,
-                                                           QrogueDungeonParser.VERTICAL_SEPARATOR):
+                                                           parser.VERTICAL_SEPARATOR):
                 self._warning(
                     f"Too much room columns specified. Only maps of size ({MapConfig.map_width()}, "
                     f"{MapConfig.map_height()}) supported. Ignoring over-specified columns.")
                 break
-            if child.symbol.type == QrogueDungeonParser.HALLWAY_ID:
+            if child.symbol.type == parser.HALLWAY_ID:
                 hw_id = child.symbol.text
                 origin = Coordinate(x, y)
                 self._add_hallway(origin, origin + direction, self.__load_hallway(hw_id))
                 x += 1
-            elif child.symbol.type == QrogueDungeonParser.EMPTY_HALLWAY:
+            elif child.symbol.type == parser.EMPTY_HALLWAY:
                 x += 1
 
     def __visitL_hallway_row(self, ctx: QrogueDungeonParser.L_hallway_rowContext, y: int) -> None:
@@ -1149,21 +1154,22 @@ class QrogueLevelGenerator(DungeonGenerator, QrogueDungeonVisitor):
 
     def __visitL_room_row(self, ctx: QrogueDungeonParser.L_room_rowContext, y: int) -> List[Optional[rooms.Room]]:
         self.__hallway_handling(ctx.children, y, Direction.East)  # connect to the right to the next room
+        parser = _dungeon_parser()
 
         row: List[Optional[rooms.Room]] = []
         x = 0
         for child in ctx.children:
             if parser_util.check_for_overspecified_columns(x, child.symbol.type,
-                                                           QrogueDungeonParser.VERTICAL_SEPARATOR):
+                                                           parser.VERTICAL_SEPARATOR):
                 self._warning(f"Too much room columns specified. Only maps of size ({MapConfig.map_width()}, "
                               f"{MapConfig.map_height()}) supported. Ignoring over-specified columns.")
                 break
 
-            if child.symbol.type == QrogueDungeonParser.ROOM_ID:
+            if child.symbol.type == parser.ROOM_ID:
                 room_id = child.symbol.text  # todo make it illegal to have the same room_id twice?
                 row.append(self.__load_room(room_id, x, y))
                 x += 1
-            elif child.symbol.type == QrogueDungeonParser.EMPTY_ROOM:
+            elif child.symbol.type == parser.EMPTY_ROOM:
                 row.append(None)
                 x += 1
         return row
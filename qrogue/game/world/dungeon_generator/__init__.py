@@ -1,6 +1,8 @@
 # exporting
 from .QrogueLevelGenerator import QrogueLevelGenerator
+from .expedition_recipe import ExpeditionRecipe
 from .generator import DungeonGenerator
+from .level_parse_cache import LevelParseCache
 from .random_generator import ExpeditionGenerator
 
 # not exported:
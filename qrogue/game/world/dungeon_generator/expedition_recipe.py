@@ -0,0 +1,156 @@
+import pickle
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from qrogue.game.logic.actors.controllables.robot import RoboProperties
+from qrogue.game.logic.collectibles import Collectible, Instruction
+from qrogue.game.world import tiles
+from qrogue.game.world.navigation import Coordinate, Direction
+from qrogue.util import StvDifficulty
+
+# (code, data) of a tile in a wild room, data is (enemy id, enemy seed) for Enemies and the Collectible for Collectibles
+TileRecord = Tuple[tiles.TileCode, Any]
+# (neighboring room, direction of the door, open state of the door) of a room's hallway
+HallwayRecord = Tuple[Coordinate, Direction, tiles.DoorOpenState]
+
+
+class ExpeditionRecipe:
+    """
+    Compact description of a generated ExpeditionMap. It stores the outcome of every random decision (layout, tiles of
+    wild rooms, puzzles) but no callbacks, so it can be pickled to send it to another process or to store it on disk.
+    Building an ExpeditionMap from a recipe neither runs the layout generation and WFC nor generates puzzles again.
+    """
+    # increase whenever the stored data changes, so recipes of older versions are discarded instead of misinterpreted
+    __VERSION = 1
+    # plain prefix of the pickled recipe, so the version can be checked before unpickling data of a different version
+    __HEADER = f"QrogueRecipe{__VERSION}\n".encode("ascii")
+
+    @staticmethod
+    def from_bytes(data: bytes) -> Optional["ExpeditionRecipe"]:
+        """
+        :param data: bytes created by to_bytes()
+        :return: the stored recipe or None if data was created by a different version or is corrupted, i.e., the recipe
+            has to be built again
+        """
+        if not data.startswith(ExpeditionRecipe.__HEADER):
+            return None
+        try:
+            recipe = pickle.loads(data[len(ExpeditionRecipe.__HEADER):])
+        except Exception:
+            # unpickling can raise nearly any exception for invalid data
+            return None
+        if not isinstance(recipe, ExpeditionRecipe):
+            return None
+        return recipe
+
+    @staticmethod
+    def load(path: str) -> Optional["ExpeditionRecipe"]:
+        with open(path, "rb") as file:
+            return ExpeditionRecipe.from_bytes(file.read())
+
+    def __init__(self, map_seed: int, puzzle_seed: int, difficulty: StvDifficulty, robo_props: RoboProperties,
+                 added_gates: List[Instruction], main_gate: Instruction):
+        """
+        :param map_seed: the seed used for the layout, rooms and boss puzzle
+        :param puzzle_seed: the seed used for all other puzzles
+        :param difficulty: the difficulty of the generated puzzles
+        :param robo_props: describes the robot of the expedition
+        :param added_gates: randomly picked gates given to the robot in addition to the ones of robo_props
+        :param main_gate: the gate that can be collected and is needed for the boss and challenge
+        """
+        self.__map_seed = map_seed
+        self.__puzzle_seed = puzzle_seed
+        self.__difficulty = difficulty
+        self.__robo_props = robo_props
+        self.__added_gates = added_gates
+        self.__main_gate = main_gate
+        self.__boss: Optional[Tuple[int, np.ndarray, np.ndarray, Collectible, int]] = None
+        self.__challenge: Optional[Tuple[int, np.ndarray, np.ndarray, int, int]] = None
+        self.__room_codes: Dict[Coordinate, int] = {}
+        self.__hallways: Dict[Coordinate, List[HallwayRecord]] = {}
+        self.__wild_rooms: Dict[Coordinate, Tuple[int, List[TileRecord]]] = {}
+
+    @property
+    def map_seed(self) -> int:
+        return self.__map_seed
+
+    @property
+    def puzzle_seed(self) -> int:
+        return self.__puzzle_seed
+
+    @property
+    def difficulty(self) -> StvDifficulty:
+        return self.__difficulty
+
+    @property
+    def robo_props(self) -> RoboProperties:
+        return self.__robo_props
+
+    @property
+    def added_gates(self) -> List[Instruction]:
+        return [gate.copy() for gate in self.__added_gates]
+
+    @property
+    def main_gate(self) -> Instruction:
+        return self.__main_gate.copy()
+
+    @property
+    def boss(self) -> Tuple[int, np.ndarray, np.ndarray, Collectible, int]:
+        """
+        :return: id, target amplitudes, input amplitudes, reward and edits of the boss
+        """
+        return self.__boss
+
+    @property
+    def challenge(self) -> Tuple[int, np.ndarray, np.ndarray, int, int]:
+        """
+        :return: id, target amplitudes, input amplitudes, minimum and maximum number of gates of the challenge
+        """
+        return self.__challenge
+
+    @property
+    def room_positions(self) -> List[Coordinate]:
+        """
+        :return: positions of all rooms in the order they were generated
+        """
+        return list(self.__room_codes.keys())
+
+    def set_boss(self, id_: int, target: np.ndarray, input_: np.ndarray, reward: Collectible, edits: int):
+        self.__boss = id_, np.asarray(target), np.asarray(input_), reward, edits
+
+    def set_challenge(self, id_: int, target: np.ndarray, input_: np.ndarray, min_gates: int, max_gates: int):
+        self.__challenge = id_, np.asarray(target), np.asarray(input_), min_gates, max_gates
+
+    def add_room(self, pos: Coordinate, code: int, hallways: List[HallwayRecord]):
+        """
+        :param pos: where the room is placed
+        :param code: the layout code of the room
+        :param hallways: the room's hallways in the order they are connected
+        """
+        self.__room_codes[pos] = code
+        self.__hallways[pos] = hallways
+
+    def set_wild_room(self, pos: Coordinate, enemy_factory_index: int, tile_records: List[TileRecord]):
+        """
+        :param pos: where the previously added wild room is placed
+        :param enemy_factory_index: index of the enemy factory used for the room's enemies
+        :param tile_records: the room's tiles as concatenation of its rows
+        """
+        self.__wild_rooms[pos] = enemy_factory_index, tile_records
+
+    def get_room_code(self, pos: Coordinate) -> int:
+        return self.__room_codes[pos]
+
+    def get_hallways(self, pos: Coordinate) -> List[HallwayRecord]:
+        return self.__hallways[pos]
+
+    def get_wild_room(self, pos: Coordinate) -> Tuple[int, List[TileRecord]]:
+        return self.__wild_rooms[pos]
+
+    def to_bytes(self) -> bytes:
+        return ExpeditionRecipe.__HEADER + pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def save(self, path: str):
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
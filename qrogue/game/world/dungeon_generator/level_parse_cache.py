@@ -0,0 +1,167 @@
+from __future__ import annotations  # the generated parser is only imported for type checking
+
+import hashlib
+import os
+import pickle
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+from antlr4 import InputStream, CommonTokenStream, ParserRuleContext
+from antlr4.Token import CommonToken
+from antlr4.tree.Tree import TerminalNode
+
+from qrogue.util import FileTypes, Logger, PathConfig, ParserErrorListener
+
+if TYPE_CHECKING:
+    from qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonParser import QrogueDungeonParser
+
+
+class LevelParseCache:
+    """
+    Stores the parse trees of level files, so loading a level again neither has to run ANTLR's lexer nor its parser.
+    A tree is stored in a compact form (nested tuples of context names and tokens) in a file named after the hash of the
+    level's content, hence, changing a level automatically leads to parsing it again. The file also stores the version
+    of the format and a fingerprint of the grammar to detect outdated files.
+
+    The generated lexer and parser are slow to import, so they are only imported once the first level is loaded.
+
+    Only parse trees are cached and not the levels built from them because building a level depends on its seed and
+    creates callbacks.
+    """
+    # increase whenever the stored data changes, so files of older versions are parsed again instead of misinterpreted
+    __VERSION = 1
+    __grammar_fingerprint: Optional[str] = None
+    __trees: Dict[str, QrogueDungeonParser.StartContext] = {}   # content hash -> parse tree, for repeated loads
+
+    @staticmethod
+    def __get_grammar_fingerprint() -> str:
+        if LevelParseCache.__grammar_fingerprint is None:
+            from qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonParser import serializedATN
+            LevelParseCache.__grammar_fingerprint = hashlib.sha1(str(serializedATN()).encode("utf-8")).hexdigest()
+        return LevelParseCache.__grammar_fingerprint
+
+    @staticmethod
+    def __encode(node) -> tuple:
+        """
+        :return: (token type, text, line, column) for terminal nodes and (context class name, encoded children) for
+            rule nodes
+        """
+        if isinstance(node, TerminalNode):
+            token = node.symbol
+            return token.type, token.text, token.line, token.column
+        children = [] if node.children is None else node.children
+        return type(node).__name__, [LevelParseCache.__encode(child) for child in children]
+
+    @staticmethod
+    def __decode(data: tuple, parser: type, parent: Optional[ParserRuleContext] = None) -> ParserRuleContext:
+        ctx = getattr(parser, data[0])(None, parent)
+        for child in data[1]:
+            if isinstance(child[0], str):
+                ctx.addChild(LevelParseCache.__decode(child, parser, ctx))
+            else:
+                token_type, text, line, column = child
+                token = CommonToken(type=token_type)
+                token.text = text
+                token.line = line
+                token.column = column
+                ctx.addTokenNode(token)
+        return ctx
+
+    @staticmethod
+    def __parse(level_data: str) -> QrogueDungeonParser.StartContext:
+        from qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonLexer import QrogueDungeonLexer
+        from qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonParser import QrogueDungeonParser
+        input_stream = InputStream(level_data)
+        lexer = QrogueDungeonLexer(input_stream)
+        token_stream = CommonTokenStream(lexer)
+        parser = QrogueDungeonParser(token_stream)
+        parser.addErrorListener(ParserErrorListener())
+        return parser.start()
+
+    @staticmethod
+    def __cache_file(content_hash: str) -> str:
+        return PathConfig.level_cache_path(f"{content_hash}{FileTypes.ParseCache.value}")
+
+    @staticmethod
+    def __load(content_hash: str) -> Optional[QrogueDungeonParser.StartContext]:
+        path = LevelParseCache.__cache_file(content_hash)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as file:
+                version, grammar_fingerprint, data = pickle.load(file)
+            if version != LevelParseCache.__VERSION or \
+                    grammar_fingerprint != LevelParseCache.__get_grammar_fingerprint():
+                return None
+            from qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonParser import QrogueDungeonParser
+            return LevelParseCache.__decode(data, QrogueDungeonParser)
+        except (OSError, pickle.UnpicklingError, ValueError, TypeError, AttributeError, EOFError) as ex:
+            Logger.instance().warn(f"Failed to load cached parse tree \"{path}\": {ex}", from_pycui=False)
+            return None
+
+    @staticmethod
+    def __store(content_hash: str, tree: QrogueDungeonParser.StartContext):
+        path = LevelParseCache.__cache_file(content_hash)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write to a temporary file first, so other processes never load a partially written file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                pickle.dump((LevelParseCache.__VERSION, LevelParseCache.__get_grammar_fingerprint(),
+                             LevelParseCache.__encode(tree)), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as ex:
+            Logger.instance().warn(f"Failed to cache parse tree at \"{path}\": {ex}", from_pycui=False)
+
+    @staticmethod
+    def parse(level_data: str, use_cache: bool = True) -> QrogueDungeonParser.StartContext:
+        """
+        :param level_data: content of a level file
+        :param use_cache: whether cached parse trees can be used and newly parsed trees should be cached
+        :return: the parse tree of level_data, either loaded from the cache or freshly parsed
+        :raises SyntaxError: if level_data cannot be parsed
+        """
+        if not use_cache:
+            return LevelParseCache.__parse(level_data)
+
+        content_hash = hashlib.sha1(level_data.encode("utf-8")).hexdigest()
+        if content_hash in LevelParseCache.__trees:
+            return LevelParseCache.__trees[content_hash]
+
+        tree = LevelParseCache.__load(content_hash)
+        if tree is None:
+            tree = LevelParseCache.__parse(level_data)
+            LevelParseCache.__store(content_hash, tree)
+        LevelParseCache.__trees[content_hash] = tree
+        return tree
+
+    @staticmethod
+    def clear_memory():
+        """
+        Forgets the parse trees kept in memory, so the next parse() has to load them from disk again.
+        """
+        LevelParseCache.__trees.clear()
+
+    @staticmethod
+    def prebuild(folder: Optional[str] = None) -> Tuple[int, int]:
+        """
+        Parses and caches all level files in the given folder and its sub folders.
+
+        :param folder: defaults to the dungeon folder of the game data
+        :return: number of cached levels and number of levels that could not be parsed
+        """
+        if folder is None:
+            folder = PathConfig.base_path(PathConfig.dungeon_folder())
+
+        num_of_cached, num_of_failed = 0, 0
+        for dir_path, _, file_names in os.walk(folder):
+            for file_name in sorted(file_names):
+                if not file_name.endswith(FileTypes.Dungeon.value):
+                    continue
+                path = os.path.join(dir_path, file_name)
+                try:
+                    LevelParseCache.parse(PathConfig.read(path, in_user_path=False))
+                    num_of_cached += 1
+                except SyntaxError as se:
+                    Logger.instance().error(f"Failed to parse \"{path}\": {se}", show=False, from_pycui=False)
+                    num_of_failed += 1
+        return num_of_cached, num_of_failed
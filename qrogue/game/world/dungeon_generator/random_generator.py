@@ -1,11 +1,16 @@
+import heapq
+from collections import deque
 from enum import IntEnum
 from typing import Callable, Dict, Optional, Tuple, List, Any, Set
 
+from qrogue.game.logic.actors import Boss, Challenge
 from qrogue.game.logic.actors.controllables.robot import RoboProperties, BaseBot
+from qrogue.game.logic.base import StateVector
 from qrogue.game.logic.collectibles import GateFactory, Key, instruction, Score, CollectibleType, \
     CollectibleFactory, Instruction
 from qrogue.game.target_factory import BossFactory, NewEnemyFactory, ChallengeFactory
 from qrogue.game.world import tiles
+from qrogue.game.world.dungeon_generator.expedition_recipe import ExpeditionRecipe, TileRecord
 from qrogue.game.world.dungeon_generator.generator import DungeonGenerator
 from qrogue.game.world.dungeon_generator.wave_function_collapse import WFCManager, LearnableRoom
 from qrogue.game.world.map import CallbackPack, Hallway, Room, ExpeditionMap
@@ -13,7 +18,8 @@ from qrogue.game.world.map.rooms import AreaType, DefinedWildRoom, EmptyRoom, Sp
     ChallengeRoom
 from qrogue.game.world.navigation import Coordinate, Direction
 from qrogue.graphics.popups import Popup
-from qrogue.util import Logger, RandomManager, MyRandom, StvDifficulty, GateType, DifficultyType, ExpeditionConfig
+from qrogue.util import Logger, RandomManager, MyRandom, StvDifficulty, GateType, DifficultyType, ExpeditionConfig, \
+    MapConfig
 
 
 class _Code(IntEnum):
@@ -105,16 +111,28 @@ class RandomLayoutGenerator:
     class _RLGException(Exception):
         pass
 
-    def __init__(self, width: int, height: int):
+    # costs of a step of the path connecting a SpecialRoom with the SpawnRoom, all are at least 1 so the manhattan
+    # distance never overestimates the remaining cost
+    __PATH_HALLWAY_COST = 1     # walking through an existing hallway
+    __PATH_CONNECT_COST = 2     # adding a hallway to an existing room
+    __PATH_ROOM_COST = 3        # placing a new WildRoom
+
+    def __init__(self, width: int, height: int, legacy: Optional[bool] = None):
+        """
+        :param legacy: whether SpecialRooms are connected by the original randomized depth-first search, which creates
+            the same layouts as older versions for a given seed. Defaults to MapConfig.use_legacy_layout().
+        """
         if width * height < RandomLayoutGenerator.__MIN_AREA:
             Popup.error(f"width={width}, height={height} create a too small grid (minimal grid area = "
                         f"{RandomLayoutGenerator.__MIN_AREA}). Please use larger values!")
+        if legacy is None: legacy = MapConfig.use_legacy_layout()
         self.__width = width
         self.__height = height
+        self.__legacy = legacy
         self.__rama: Optional[MyRandom] = None
 
-        # generate empty map
-        self.__map: List[List[_Code]] = []
+        # generate empty map, stored row by row
+        self.__map: List[_Code] = []
         self.__spawn_pos: Optional[Coordinate] = None
         self.__normal_rooms: Set[Coordinate] = set()
         self.__hallways: Dict[Coordinate, Dict[Coordinate, tiles.Door]] = {}
@@ -126,7 +144,7 @@ class RandomLayoutGenerator:
 
     def __init_empty_map(self):
         # generate empty map
-        self.__map = [[_Code.Free] * self.__width for _ in range(self.__height)]
+        self.__map = [_Code.Free] * (self.__width * self.__height)
         self.__spawn_pos = None
 
         self.__normal_rooms.clear()
@@ -142,12 +160,12 @@ class RandomLayoutGenerator:
         return self.__rama
 
     def __get(self, pos: Coordinate) -> _Code:
-        return self.__map[pos.y][pos.x]
+        return self.__map[pos.y * self.__width + pos.x]
 
     def __set(self, pos: Coordinate, code: _Code):
         if code in [_Code.Spawn, _Code.Wild]:
             self.__normal_rooms.add(pos)
-        self.__map[pos.y][pos.x] = code
+        self.__map[pos.y * self.__width + pos.x] = code
 
     def __new_prio(self):
         prio_sum = 0
@@ -413,6 +431,89 @@ class RandomLayoutGenerator:
                         return True
         return False
 
+    def __find_path(self, start_pos: Coordinate, target_pos: Coordinate) -> Optional[List[Coordinate]]:
+        """
+        A* search over the grid for the cheapest path between two rooms that only passes normal rooms and free cells.
+        Walking through existing hallways is cheaper than adding new hallways, which is cheaper than placing new rooms.
+        Ties are broken randomly, so equally good paths are picked evenly.
+
+        :return: the cells of the path including start_pos and target_pos or None if there is no such path
+        """
+        width = self.__width
+        start = start_pos.y * width + start_pos.x
+        target = target_pos.y * width + target_pos.x
+        tie_breakers = [self.__rm.get(msg="RandomGen_pathTieBreaker") for _ in range(len(self.__map))]
+
+        costs: Dict[int, int] = {start: 0}
+        predecessors: Dict[int, int] = {}
+        closed: Set[int] = set()
+        heap = [(Coordinate.distance(start_pos, target_pos), tie_breakers[start], start)]
+        while len(heap) > 0:
+            _, _, cell = heapq.heappop(heap)
+            if cell == target:
+                path = [cell]
+                while cell in predecessors:
+                    cell = predecessors[cell]
+                    path.append(cell)
+                return [Coordinate(cell % width, cell // width) for cell in reversed(path)]
+            if cell in closed:
+                continue    # outdated entry
+            closed.add(cell)
+
+            pos = Coordinate(cell % width, cell // width)
+            hallways = self.__hallways.get(pos, {})
+            for direction in Direction.values():
+                neighbor_pos = pos + direction
+                if not self.__is_valid_pos(neighbor_pos):
+                    continue
+                code = self.__get(neighbor_pos)
+                if code in _Code.special_rooms():
+                    continue    # SpecialRooms have exactly one hallway, so a path can never pass them
+                if neighbor_pos in hallways:
+                    step_cost = RandomLayoutGenerator.__PATH_HALLWAY_COST
+                elif code in _Code.normal_rooms():
+                    step_cost = RandomLayoutGenerator.__PATH_CONNECT_COST
+                elif code < _Code.Blocked:
+                    step_cost = RandomLayoutGenerator.__PATH_ROOM_COST
+                else:
+                    continue    # blocked cells cannot be passed
+
+                neighbor = neighbor_pos.y * width + neighbor_pos.x
+                cost = costs[cell] + step_cost
+                if neighbor not in closed and (neighbor not in costs or cost < costs[neighbor]):
+                    costs[neighbor] = cost
+                    predecessors[neighbor] = cell
+                    heapq.heappush(heap, (cost + Coordinate.distance(neighbor_pos, target_pos),
+                                          tie_breakers[neighbor], neighbor))
+        return None
+
+    def __build_path(self, path: List[Coordinate]):
+        """
+        Adds the missing hallways and WildRooms along the given path.
+        """
+        for pos, next_pos in zip(path, path[1:]):
+            direction = Direction.from_coordinates(pos, next_pos)
+            if self.__get(next_pos) < _Code.Blocked:
+                self.__place_wild(pos, tiles.Door(direction))
+            elif next_pos not in self.__hallways.get(pos, {}):
+                self.__add_hallway(pos, next_pos, tiles.Door(direction))
+
+    def __is_reachable(self, start_pos: Coordinate, target_pos: Coordinate) -> bool:
+        """
+        :return: whether target_pos can be reached from start_pos by only walking through hallways
+        """
+        visited = {start_pos}
+        stack = [start_pos]
+        while len(stack) > 0:
+            pos = stack.pop()
+            if pos == target_pos:
+                return True
+            for neighbor in self.__hallways.get(pos, {}):
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+        return False
+
     def get_hallway(self, pos: Coordinate) -> Optional[Dict[Coordinate, tiles.Door]]:
         if pos in self.__hallways:
             return self.__hallways[pos]
@@ -482,6 +583,21 @@ class RandomLayoutGenerator:
                     direction, _, new_pos = self.__rm.get_element(neighbors, msg="RandomGen_neighbor")
                     self.__add_hallway(self.__spawn_pos, new_pos, tiles.Door(direction))
 
+            if not self.__legacy:
+                # as last step, add missing Hallways and WildRooms along the cheapest path from every SpecialRoom to
+                # the SpawnRoom
+                for room in special_rooms:
+                    start_pos = list(self.__hallways[room].keys())[0]
+                    path = self.__find_path(start_pos, self.__spawn_pos)
+                    if path is None:
+                        return False
+                    self.__build_path(path)
+
+                if validate:
+                    return self.__validate()
+                else:
+                    return True
+
             success = True
             # as last step, add missing Hallways and WildRooms to connect every SpecialRoom with the SpawnRoom
             rooms = list(special_rooms)
@@ -533,17 +649,15 @@ class RandomLayoutGenerator:
 
         # third check if we can reach the spawn room from every room with a hallway
         for pos in self.__hallways:
-            visited = set()
-            if not self.__call_astar(visited, start_pos=pos, target_pos=self.__spawn_pos, connect=False):
+            if not self.__is_reachable(pos, self.__spawn_pos):
                 # now we either found a faulty connection or some "phantom rooms" which are only connected to themselves
-                self.__map[pos.y][pos.x] = _Code.Phantom
-                new_visited = set()
+                self.__map[pos.y * self.__width + pos.x] = _Code.Phantom
                 # we only have to check immediate neighbors since the neighbors are also checked in the outer loop,
                 # therefore, also their neighbors and ultimately any of these "phantom rooms" are checked
                 for neigh in self.__hallways[pos]:
                     # see if a neighbor can reach spawn_pos (= neighbor is not a "phantom room" and hence the connection
                     # is faulty)
-                    if self.__call_astar(new_visited, start_pos=neigh, target_pos=self.__spawn_pos, connect=False):
+                    if self.__is_reachable(neigh, self.__spawn_pos):
                         print(self)
                         return False
         return True
@@ -593,8 +707,7 @@ class RandomLayoutGenerator:
 
 class ExpeditionGenerator(DungeonGenerator):
     __MAX_ROOM_GEN_TRIES = 10
-    __BLOCKING_WEIGHT = 2
-    __INVALID_WEIGHT = 1_000_000
+    __INNER_NEIGHBORS: Optional[List[List[int]]] = None   # see __inner_neighbors()
 
     @staticmethod
     def get_random_gates(available_gates: List[Instruction], difficulty: StvDifficulty, seed: int) \
@@ -707,6 +820,49 @@ class ExpeditionGenerator(DungeonGenerator):
         self.__next_tile_id += 1
         return val
 
+    def __create_enemy_factories(self, difficulty: StvDifficulty, robot: BaseBot) \
+            -> Tuple[List[NewEnemyFactory], List[float]]:
+        """
+        :return: a variety of enemy factories for normal puzzle generation and their priorities
+        """
+        enemy_factories = [
+            # plain and simple: one level less CircuitExuberance, 0-state inputs
+            NewEnemyFactory(difficulty.create_relative({
+                DifficultyType.CircuitExuberance: -1,
+            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions, False),
+            # less CircuitExuberance and QubitExuberance, but rotated inputs
+            NewEnemyFactory(difficulty.create_relative({
+                DifficultyType.CircuitExuberance: -1, DifficultyType.QubitExuberance: -1
+            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions, True),
+            # use XGate on inputs - based on QubitExuberance, it should be possible to apply XGate to every qubit
+            NewEnemyFactory(difficulty.create_relative({
+                DifficultyType.CircuitExuberance: -1,
+            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions,
+                [instruction.XGate()] * robot.num_of_qubits),
+            # use HGate on inputs
+            NewEnemyFactory(difficulty.create_relative({
+                DifficultyType.CircuitExuberance: -1, DifficultyType.QubitExuberance: -1
+            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions,
+                [instruction.HGate()] * robot.num_of_qubits),
+        ]
+        enemy_factory_priorities = [0.25, 0.1, 0.35, 0.3]
+        # add more factories (varying in input stvs) for higher difficulties
+        if difficulty.level > 2:
+            # use SGate on inputs
+            enemy_factories.append(NewEnemyFactory(difficulty.create_relative({
+                DifficultyType.CircuitExuberance: -1, DifficultyType.QubitExuberance: -1
+            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions,
+                [instruction.SGate()] * robot.num_of_qubits))
+            enemy_factory_priorities.append(0.2)
+        if difficulty.level > 3:
+            # use SGate on inputs
+            enemy_factories.append(NewEnemyFactory(difficulty.create_relative({
+                DifficultyType.CircuitExuberance: -1, DifficultyType.QubitExuberance: -1
+            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions,
+                [instruction.YGate()] * robot.num_of_qubits))
+            enemy_factory_priorities.append(0.3)
+        return enemy_factories, enemy_factory_priorities
+
     def generate(self, map_seed: int, data: Tuple[RoboProperties, StvDifficulty, int]) \
             -> Tuple[Optional[ExpeditionMap], bool]:
         """
@@ -719,12 +875,30 @@ class ExpeditionGenerator(DungeonGenerator):
         :param data: a tuple describing puzzle generation
         :returns: the generated ExpeditionMap and True if generation was successful, None and False otherwise
         """
+        recipe = self.create_recipe(map_seed, data)
+        if recipe is None:
+            return None, False
+        return self.build(recipe)
+
+    def create_recipe(self, map_seed: int, data: Tuple[RoboProperties, StvDifficulty, int]) \
+            -> Optional[ExpeditionRecipe]:
+        """
+        Makes all random decisions of generate() without creating the ExpeditionMap itself. The returned recipe is
+        picklable, so it can be created in a different process or loaded from disk and built later via build().
+
+        :param map_seed: the seed used to create the layout of the ExpeditionMap and boss puzzle
+        :param data: a tuple describing puzzle generation, see generate()
+        :returns: the recipe of the ExpeditionMap or None if generation failed
+        """
         robo_props, difficulty, puzzle_seed = data
         robot = BaseBot.from_properties(robo_props, self.__cbp.game_over)
+        added_gates: List[Instruction] = []
         if robot.used_capacity <= 0:
             # choose a random subset of globally available gates based on difficulty
             for gate in self.get_random_gates(self.__get_available_gates(), difficulty, puzzle_seed):
-                robot.give_collectible(gate)
+                # the recipe needs its own copy since the robot may alter the given gate
+                if robot.give_collectible(gate):
+                    added_gates.append(gate.copy())
         else:
             # check validity of gates available to the robot
             val_code, val_data = ExpeditionMap.validate_gates_for_difficulty(difficulty,
@@ -732,7 +906,7 @@ class ExpeditionGenerator(DungeonGenerator):
             if val_code != 0:
                 Logger.instance().error("Failed to generate ExpeditionMap based on the given RoboProperties and "
                                         f"StvDifficulty: code={val_code}, data={val_data}", False, from_pycui=False)
-                return None, False
+                return None
 
         map_rm = RandomManager.create_new(map_seed)         # used for layout, rooms (tile placement), collectibles
         puzzle_rm = RandomManager.create_new(puzzle_seed)   # used for all puzzles
@@ -755,206 +929,229 @@ class ExpeditionGenerator(DungeonGenerator):
         main_gate: Instruction = gate_factory.produce(map_rm)
         assert main_gate is not None and isinstance(main_gate, Instruction), f"Invalid product of GateFactory: " \
                                                                              f"\"{main_gate}\"!"
+        recipe = ExpeditionRecipe(map_seed, puzzle_seed, difficulty, robo_props, added_gates, main_gate.copy())
         dungeon_boss = boss_factory.produce(map_rm, include_gates=[main_gate])
+        recipe.set_boss(dungeon_boss.id, dungeon_boss.state_vector.amplitudes, dungeon_boss.input_stv.amplitudes,
+                        dungeon_boss.reward, dungeon_boss.edits)
         dungeon_challenge = challenge_factory.produce(puzzle_rm, include_gates=[main_gate])
+        recipe.set_challenge(dungeon_challenge.id, dungeon_challenge.state_vector.amplitudes,
+                             dungeon_challenge.input_stv.amplitudes, dungeon_challenge.min_gates,
+                             dungeon_challenge.max_gates)
 
-        #####################################################################################################
-        # create a variety of enemy factories for normal puzzle generation
-        # factories are picked room-wise
-        enemy_factories = [
-            # plain and simple: one level less CircuitExuberance, 0-state inputs
-            NewEnemyFactory(difficulty.create_relative({
-                DifficultyType.CircuitExuberance: -1,
-            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions, False),
-            # less CircuitExuberance and QubitExuberance, but rotated inputs
-            NewEnemyFactory(difficulty.create_relative({
-                DifficultyType.CircuitExuberance: -1, DifficultyType.QubitExuberance: -1
-            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions, True),
-            # use XGate on inputs - based on QubitExuberance, it should be possible to apply XGate to every qubit
-            NewEnemyFactory(difficulty.create_relative({
-                DifficultyType.CircuitExuberance: -1,
-            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions,
-                [instruction.XGate()] * robot.num_of_qubits),
-            # use HGate on inputs
-            NewEnemyFactory(difficulty.create_relative({
-                DifficultyType.CircuitExuberance: -1, DifficultyType.QubitExuberance: -1
-            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions,
-                [instruction.HGate()] * robot.num_of_qubits),
-        ]
-        enemy_factory_priorities = [0.25, 0.1, 0.35, 0.3]
-        # add more factories (varying in input stvs) for higher difficulties
-        if difficulty.level > 2:
-            # use SGate on inputs
-            enemy_factories.append(NewEnemyFactory(difficulty.create_relative({
-                DifficultyType.CircuitExuberance: -1, DifficultyType.QubitExuberance: -1
-            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions,
-                [instruction.SGate()] * robot.num_of_qubits))
-            enemy_factory_priorities.append(0.2)
-        if difficulty.level > 3:
-            # use SGate on inputs
-            enemy_factories.append(NewEnemyFactory(difficulty.create_relative({
-                DifficultyType.CircuitExuberance: -1, DifficultyType.QubitExuberance: -1
-            }), robot.num_of_qubits, robot.circuit_space, robot.get_available_instructions,
-                [instruction.YGate()] * robot.num_of_qubits))
-            enemy_factory_priorities.append(0.3)
+        # factories are picked room-wise, but only their index is stored in the recipe
+        _, enemy_factory_priorities = self.__create_enemy_factories(difficulty, robot)
+        enemy_factory_indices = list(range(len(enemy_factory_priorities)))
+
+        layout = RandomLayoutGenerator(self.width, self.height)
+        if not layout.generate(map_seed, validate=True):
+            return None
+
+        # extract all wild rooms, so we can choose where to place the key
+        wild_room_coordinates: List[Coordinate] = []
+        for y in range(self.height):
+            for x in range(self.width):
+                pos = Coordinate(x, y)
+                code = layout.get_room(pos)
+                if code is _Code.Wild:
+                    wild_room_coordinates.append(pos)
+        # choose a random wild room to place the key in
+        key_room_pos = map_rm.get_element(wild_room_coordinates)
+
+        wild_room_generator = self.__wfc_manager.get_generator(AreaType.WildRoom, map_rm)
+        has_spawn = False
+        for y in range(self.height):
+            for x in range(self.width):
+                pos = Coordinate(x, y)
+                code = layout.get_room(pos)
+                if code is None or code <= _Code.Blocked:
+                    continue
+
+                hallways = layout.get_hallway(pos)
+                if hallways is None:
+                    if code == _Code.Wild:
+                        # it is completely fine if it happens that an isolated WildRoom was generated
+                        continue
+                    else:
+                        Popup.error(f"Found a SpecialRoom ({code}) without connecting Hallways for seed = "
+                                    f"{map_seed}.", add_report_note=True)
+                recipe.add_room(pos, int(code), [(neighbor, door.direction, door.data[0])
+                                                 for neighbor, door in hallways.items()])
+                if code == _Code.Spawn:
+                    has_spawn = True
+                elif code == _Code.Wild:
+                    enemy_factory_index = puzzle_rm.get_element_prioritized(enemy_factory_indices,
+                                                                            enemy_factory_priorities,
+                                                                            msg="RandomDG_elemPrioritized")
+
+                    def record_from_tile_data(tile_code: tiles.TileCode, tile_data: Any) -> TileRecord:
+                        if tile_code == tiles.TileCode.Enemy:
+                            enemy_seed = puzzle_rm.get_seed("Create enemy for expedition")
+                            return tiles.TileCode.Enemy, (tile_data, enemy_seed)
+                        elif tile_code == tiles.TileCode.CollectibleScore:
+                            return tiles.TileCode.Collectible, Score(tile_data)
+                        elif tile_code == tiles.TileCode.Collectible:
+                            return tiles.TileCode.Collectible, get_collectible_factory(tile_data).produce(map_rm)
+                        elif tile_code in [tiles.TileCode.Wall, tiles.TileCode.Obstacle]:
+                            return tile_code, None
+                        else:
+                            return tiles.TileCode.Floor, None
+
+                    def placeholder_tile(record: TileRecord) -> tiles.Tile:
+                        # correct_tile_list() only cares about whether a tile is blocking or not
+                        if record[0] == tiles.TileCode.Wall:
+                            return tiles.Wall()
+                        elif record[0] == tiles.TileCode.Obstacle:
+                            return tiles.Obstacle()
+                        return tiles.Floor()
+
+                    # only the keys matter for correct_tile_list()
+                    room_hallways = {direction: None for direction in [Direction.North, Direction.East,
+                                                                       Direction.South, Direction.West]}
+
+                    # todo: should this be optional based on difficulty/progress (#tunneling)?
+                    # fourth check if we can reach every door from every door of this room (= doors are
+                    # reachable for player, implies that the previous layout reachability-check still holds)
+
+                    static_entries = {Room.mid(): tiles.Collectible(Key())} if pos == key_room_pos else None
+                    gen_tries = 0
+                    while gen_tries < ExpeditionGenerator.__MAX_ROOM_GEN_TRIES:
+                        tile_matrix: List[List[LearnableRoom.TileData]] = wild_room_generator.generate(
+                            seed=map_rm.get_seed("generating a room in ExpeditionGenerator"),
+                            static_entries=static_entries
+                        )
+                        tile_records = [record_from_tile_data(entry.code, entry.data)
+                                        for row in tile_matrix for entry in row]
+                        # place the Key again because static_entries can only set a universal Pickup and not
+                        #  directly a Key (since we don't want to place Keys at random positions, WFC actually
+                        #  does not learn to place Keys, hence, static_entries can only use Pickups to collapse
+                        #  the wave functions correctly)
+                        if pos == key_room_pos:
+                            tile_records[Room.coordinate_to_index(Room.mid(), in_room=True)] = \
+                                tiles.TileCode.Collectible, Key()
+
+                        tile_list = [placeholder_tile(record) for record in tile_records]
+                        if self.correct_tile_list(tile_list, room_hallways) >= 0:
+                            break
+                        Logger.instance().warn(f"Failed to generate a room: try #{gen_tries}, seed={map_seed}")
+                        gen_tries += 1
+                    if gen_tries >= ExpeditionGenerator.__MAX_ROOM_GEN_TRIES:
+                        # todo don't care about potentially impossible Expedition?
+                        Logger.instance().error("Failed to validate generated room! Expedition might be "
+                                                "impossible to clear.", from_pycui=False)
+
+                    # blocking tiles removed by correct_tile_list() were replaced by Floor
+                    tile_records = [(tiles.TileCode.Floor, None) if tile.code != record[0] else record
+                                    for record, tile in zip(tile_records, tile_list)]
+                    recipe.set_wild_room(pos, enemy_factory_index, tile_records)
+
+        if not has_spawn:
+            return None
+        return recipe
+
+    def build(self, recipe: ExpeditionRecipe) -> Tuple[Optional[ExpeditionMap], bool]:
+        """
+        Creates the ExpeditionMap described by a recipe and attaches this generator's callbacks to it. Since all random
+        decisions are already part of the recipe, neither the layout nor puzzles are generated again.
+
+        :param recipe: a recipe created by create_recipe(), potentially by a different process
+        :returns: the built ExpeditionMap and True if building was successful, None and False otherwise
+        """
+        robot = BaseBot.from_properties(recipe.robo_props, self.__cbp.game_over)
+        for gate in recipe.added_gates:
+            robot.give_collectible(gate)
+        main_gate = recipe.main_gate
+
+        boss_id, boss_target, boss_input, boss_reward, boss_edits = recipe.boss
+        dungeon_boss = Boss(boss_id, StateVector(boss_target), StateVector(boss_input), boss_reward, boss_edits)
+        challenge_id, challenge_target, challenge_input, min_gates, max_gates = recipe.challenge
+        dungeon_challenge = Challenge(challenge_id, StateVector(challenge_target), min_gates, max_gates,
+                                      input_=StateVector(challenge_input))
+
+        enemy_factories, _ = self.__create_enemy_factories(recipe.difficulty, robot)
         enemy_groups_by_room = {}
-        #####################################################################################################
 
         rooms: List[List[Optional[Room]]] = [[None for _ in range(self.width)] for _ in range(self.height)]
         spawn_room = None
         created_hallways = {}
-        layout = RandomLayoutGenerator(self.width, self.height)
-        if layout.generate(map_seed, validate=True):
-            # extract all wild rooms, so we can choose where to place the key
-            wild_room_coordinates: List[Coordinate] = []
-            for y in range(self.height):
-                for x in range(self.width):
-                    pos = Coordinate(x, y)
-                    code = layout.get_room(pos)
-                    if code is _Code.Wild:
-                        wild_room_coordinates.append(pos)
-            # choose a random wild room to place the key in
-            key_room_pos = map_rm.get_element(wild_room_coordinates)
-
-            wild_room_generator = self.__wfc_manager.get_generator(AreaType.WildRoom, map_rm)
-            for y in range(self.height):
-                for x in range(self.width):
-                    pos = Coordinate(x, y)
-                    code = layout.get_room(pos)
-                    if code is not None and code > _Code.Blocked:
-                        room_hallways = {
-                            Direction.North: None, Direction.East: None, Direction.South: None, Direction.West: None,
-                        }
-                        hallways = layout.get_hallway(pos)
-                        if hallways is None:
-                            if code == _Code.Wild:
-                                # it is completely fine if it happens that an isolated WildRoom was generated
-                                continue
-                            else:
-                                Popup.error(f"Found a SpecialRoom ({code}) without connecting Hallways for seed = "
-                                            f"{map_seed}.", add_report_note=True)
-
-                        direction: Optional[Direction] = None
-                        for neighbor in hallways:
-                            direction = Direction.from_coordinates(pos, neighbor)
-                            opposite = direction.opposite()
-                            # get hallway from neighbor if it exists, otherwise create it
-                            if neighbor in created_hallways and opposite in created_hallways[neighbor]:
-                                hallway = created_hallways[neighbor][opposite]
-                            else:
-                                hallway = Hallway(hallways[neighbor])  # todo create door here and only check if it should be locked or not?
-                                if neighbor in created_hallways:
-                                    created_hallways[neighbor][opposite] = hallway
-                                else:
-                                    created_hallways[neighbor] = {opposite: hallway}
-
-                            # store the hallway so the neighbors can find it if necessary
-                            if pos not in created_hallways:
-                                created_hallways[pos] = {}
-                            created_hallways[pos][direction] = hallway
-                            room_hallways[direction] = hallway
-
-                        room = None
-                        if code == _Code.Spawn:
-                            spawn_room = pos
-                            room = SpawnRoom(self.__leave_map,
-                                             north_hallway=room_hallways[Direction.North],
-                                             east_hallway=room_hallways[Direction.East],
-                                             south_hallway=room_hallways[Direction.South],
-                                             west_hallway=room_hallways[Direction.West],
-                                             place_teleporter=False)
-                        elif code == _Code.Wild:
-                            enemy_factory = puzzle_rm.get_element_prioritized(enemy_factories, enemy_factory_priorities,
-                                                                              msg="RandomDG_elemPrioritized")
-
-                            def tile_from_tile_data(tile_code: tiles.TileCode, tile_data: Any) -> tiles.Tile:
-                                if tile_code == tiles.TileCode.Enemy:
-                                    enemy_seed = puzzle_rm.get_seed("Create enemy for expedition")
-                                    return self.__create_enemy(enemy_seed, tile_data, pos, enemy_factory,
-                                                               enemy_groups_by_room)
-                                elif tile_code == tiles.TileCode.CollectibleScore:
-                                    return tiles.Collectible(Score(tile_data))
-                                elif tile_code == tiles.TileCode.Collectible:
-                                    return tiles.Collectible(get_collectible_factory(tile_data).produce(map_rm))
-                                elif tile_code == tiles.TileCode.Wall:
-                                    return tiles.Wall()
-                                elif tile_code == tiles.TileCode.Obstacle:
-                                    return tiles.Obstacle()
-                                else:
-                                    return tiles.Floor()
-
-                            # todo: should this be optional based on difficulty/progress (#tunneling)?
-                            # fourth check if we can reach every door from every door of this room (= doors are
-                            # reachable for player, implies that the previous layout reachability-check still holds)
-
-                            static_entries = {Room.mid(): tiles.Collectible(Key())} if pos == key_room_pos \
-                                else None
-                            gen_tries = 0
-                            while gen_tries < ExpeditionGenerator.__MAX_ROOM_GEN_TRIES:
-                                tile_matrix: List[List[LearnableRoom.TileData]] = wild_room_generator.generate(
-                                    seed=map_rm.get_seed("generating a room in ExpeditionGenerator"),
-                                    static_entries=static_entries
-                                )
-                                tile_list = [tile_from_tile_data(entry.code, entry.data)
-                                             for row in tile_matrix for entry in row]
-                                # place the Key again because static_entries can only set a universal Pickup and not
-                                #  directly a Key (since we don't want to place Keys at random positions, WFC actually
-                                #  does not learn to place Keys, hence, static_entries can only use Pickups to collapse
-                                #  the wave functions correctly)
-                                if pos == key_room_pos:
-                                    tile_list[Room.coordinate_to_index(Room.mid(), in_room=True)] = \
-                                        tiles.Collectible(Key())
-
-                                if self.correct_tile_list(tile_list, room_hallways) >= 0:
-                                    break
-                                Logger.instance().warn(f"Failed to generate a room: try #{gen_tries}, seed={map_seed}")
-                                gen_tries += 1
-                            if gen_tries >= ExpeditionGenerator.__MAX_ROOM_GEN_TRIES:
-                                # todo don't care about potentially impossible Expedition?
-                                Logger.instance().error("Failed to validate generated room! Expedition might be "
-                                                        "impossible to clear.", from_pycui=False)
-
-                            room = DefinedWildRoom(
-                                tile_list,
-                                north_hallway=room_hallways[Direction.North],
-                                east_hallway=room_hallways[Direction.East],
-                                south_hallway=room_hallways[Direction.South],
-                                west_hallway=room_hallways[Direction.West]
-                            )
-                            """
-                            room = WildRoom(
-                                enemy_factory,
-                                chance=map_rm.get(ExpeditionGenerator.__MIN_ENEMY_FACTORY_CHANCE,
-                                              ExpeditionGenerator.__MAX_ENEMY_FACTORY_CHANCE,
-                                              msg="RandomDG_WRPuzzleDistribution"),
-                                north_hallway=room_hallways[Direction.North],
-                                east_hallway=room_hallways[Direction.East],
-                                south_hallway=room_hallways[Direction.South],
-                                west_hallway=room_hallways[Direction.West],
-                            )"""
-                        elif code == _Code.Phantom:
-                            room = EmptyRoom(room_hallways)
-                        elif direction is not None:
-                            # special rooms have exactly 1 neighbor which is already stored in direction
-                            hw = room_hallways[direction]
-                            if code == _Code.Gate:
-                                room = TreasureRoom(tiles.Collectible(main_gate, force_add=True), hw, direction)
-                            elif code == _Code.Challenge:
-                                room = ChallengeRoom(hw, direction, tiles.Challenger(dungeon_challenge, main_gate,
-                                                                                     self.__cbp.open_challenge,
-                                                                                     Popup.generic_info))
-                            elif code == _Code.Boss:
-                                room = BossRoom(hw, direction, tiles.Boss(dungeon_boss, self.__cbp.start_boss_fight))
-                        if room:
-                            rooms[y][x] = room
-            if spawn_room:
-                my_map = ExpeditionMap(map_seed, difficulty, main_gate.gate_type, rooms, robot, spawn_room,
-                                       self.__check_achievement, self.__trigger_event)
-                return my_map, True
-            else:
-                return None, False
-        else:
-            return None, False
+        for pos in recipe.room_positions:
+            code = _Code(recipe.get_room_code(pos))
+            room_hallways = {
+                Direction.North: None, Direction.East: None, Direction.South: None, Direction.West: None,
+            }
+            direction: Optional[Direction] = None
+            for neighbor, door_direction, open_state in recipe.get_hallways(pos):
+                direction = Direction.from_coordinates(pos, neighbor)
+                opposite = direction.opposite()
+                # get hallway from neighbor if it exists, otherwise create it
+                if neighbor in created_hallways and opposite in created_hallways[neighbor]:
+                    hallway = created_hallways[neighbor][opposite]
+                else:
+                    hallway = Hallway(tiles.Door(door_direction, open_state))
+                    if neighbor in created_hallways:
+                        created_hallways[neighbor][opposite] = hallway
+                    else:
+                        created_hallways[neighbor] = {opposite: hallway}
+
+                # store the hallway so the neighbors can find it if necessary
+                if pos not in created_hallways:
+                    created_hallways[pos] = {}
+                created_hallways[pos][direction] = hallway
+                room_hallways[direction] = hallway
+
+            room = None
+            if code == _Code.Spawn:
+                spawn_room = pos
+                room = SpawnRoom(self.__leave_map,
+                                 north_hallway=room_hallways[Direction.North],
+                                 east_hallway=room_hallways[Direction.East],
+                                 south_hallway=room_hallways[Direction.South],
+                                 west_hallway=room_hallways[Direction.West],
+                                 place_teleporter=False)
+            elif code == _Code.Wild:
+                enemy_factory_index, tile_records = recipe.get_wild_room(pos)
+                enemy_factory = enemy_factories[enemy_factory_index]
+
+                def tile_from_record(tile_code: tiles.TileCode, tile_data: Any) -> tiles.Tile:
+                    if tile_code == tiles.TileCode.Enemy:
+                        enemy_id, enemy_seed = tile_data
+                        return self.__create_enemy(enemy_seed, enemy_id, pos, enemy_factory, enemy_groups_by_room)
+                    elif tile_code == tiles.TileCode.Collectible:
+                        return tiles.Collectible(tile_data)
+                    elif tile_code == tiles.TileCode.Wall:
+                        return tiles.Wall()
+                    elif tile_code == tiles.TileCode.Obstacle:
+                        return tiles.Obstacle()
+                    else:
+                        return tiles.Floor()
+
+                room = DefinedWildRoom(
+                    [tile_from_record(tile_code, tile_data) for tile_code, tile_data in tile_records],
+                    north_hallway=room_hallways[Direction.North],
+                    east_hallway=room_hallways[Direction.East],
+                    south_hallway=room_hallways[Direction.South],
+                    west_hallway=room_hallways[Direction.West]
+                )
+            elif code == _Code.Phantom:
+                room = EmptyRoom(room_hallways)
+            elif direction is not None:
+                # special rooms have exactly 1 neighbor which is already stored in direction
+                hw = room_hallways[direction]
+                if code == _Code.Gate:
+                    room = TreasureRoom(tiles.Collectible(main_gate, force_add=True), hw, direction)
+                elif code == _Code.Challenge:
+                    room = ChallengeRoom(hw, direction, tiles.Challenger(dungeon_challenge, main_gate,
+                                                                         self.__cbp.open_challenge,
+                                                                         Popup.generic_info))
+                elif code == _Code.Boss:
+                    room = BossRoom(hw, direction, tiles.Boss(dungeon_boss, self.__cbp.start_boss_fight))
+            if room:
+                rooms[pos.y][pos.x] = room
+
+        if spawn_room:
+            my_map = ExpeditionMap(recipe.map_seed, recipe.difficulty, main_gate.gate_type, rooms, robot, spawn_room,
+                                   self.__check_achievement, self.__trigger_event)
+            return my_map, True
+        return None, False
 
     @staticmethod
     def correct_tile_list(tile_list: List[tiles.Tile], hallways: Dict[Direction, Optional[Hallway]]) \
@@ -962,7 +1159,8 @@ class ExpeditionGenerator(DungeonGenerator):
         """
         Corrects a given list of tiles (interpreted as Room.INNER_WIDTH * Room.INNER_HEIGHT tile matrix) such that
         robot is able to reach every Hallway from every other Hallway. This way it is guaranteed that a Room with the
-        given tile_list and hallways does not block off access to one of its neighboring Rooms.
+        given tile_list and hallways does not block off access to one of its neighboring Rooms. Between two Hallways
+        only the fewest blocking tiles necessary are removed (see path_search()).
         Potentially modifies tile_list by removing Obstacles!
 
         :param tile_list: a Room's tile matrix in list form (interpreted as concatenation of its rows)
@@ -975,31 +1173,7 @@ class ExpeditionGenerator(DungeonGenerator):
         def is_blocking(t: tiles.Tile) -> bool:
             return t.code in [tiles.TileCode.Obstacle, tiles.TileCode.Wall]
 
-        # gather positions of all possibly blocking tiles
-        blocking_tiles: Dict[Coordinate, tiles.Tile] = {}
-        for i, tile in enumerate(tile_list):
-            if is_blocking(tile):
-                blocking_tiles[Room.index_to_coordinate(i)] = tile
-
         num_of_changes = 0
-        # calculate weights for every position
-        weight_matrix: Dict[Coordinate, int] = {}
-        for x in range(Room.INNER_WIDTH):
-            for y in range(Room.INNER_HEIGHT):
-                coor = Coordinate(x, y)
-                # initialize weight with the minimum distance to one of the hallway entrances
-                weight = min([Coordinate.distance(coor, Room.direction_to_hallway_entrance_pos(direction))
-                              for direction in hallways.keys()])
-                if weight > 0 and is_blocking(tile_list[Room.coordinate_to_index(coor)]):
-                    # if weight is 0 (i.e. coor is an entrance) it should stay 0 because it will be a search target
-                    weight += ExpeditionGenerator.__BLOCKING_WEIGHT  # increase weight if something is blocking
-                weight_matrix[coor] = weight
-
-        def get_weight(position: Coordinate) -> int:
-            if position in weight_matrix:
-                return weight_matrix[position]
-            return ExpeditionGenerator.__INVALID_WEIGHT
-
         direction: Optional[Direction] = None
         for other_dir in hallways.keys():
             if direction is None:
@@ -1008,24 +1182,10 @@ class ExpeditionGenerator(DungeonGenerator):
                 start_pos = Room.direction_to_hallway_entrance_pos(direction)
                 target_pos = Room.direction_to_hallway_entrance_pos(other_dir)
 
-                # which positions need to be cleared to reach exit from key
-                forth = ExpeditionGenerator.path_search(tile_list, is_blocking, get_weight, set(), target_pos,
-                                                        start_pos)
-                # check the result from searching the other way around
-                back = ExpeditionGenerator.path_search(tile_list, is_blocking, get_weight, set(), start_pos,
-                                                       target_pos)
-                if forth[0] and back[0]:
-                    # if both succeeded we use the one that removes less (resulting in a less empty room)
-                    if len(forth[1]) < len(back[1]):
-                        tiles_to_remove = forth[1]
-                    else:
-                        tiles_to_remove = back[1]
-                elif forth[0]:
-                    tiles_to_remove = forth[1]
-                elif back[0]:
-                    tiles_to_remove = back[1]
-                else:
-                    # return error code if both directions failed to find a path
+                # which positions need to be cleared to reach one entrance from the other
+                success, tiles_to_remove = ExpeditionGenerator.path_search(tile_list, is_blocking, start_pos,
+                                                                           target_pos)
+                if not success:
                     return -1
 
                 for pos in tiles_to_remove:
@@ -1034,38 +1194,68 @@ class ExpeditionGenerator(DungeonGenerator):
         return num_of_changes
 
     @staticmethod
-    def path_search(tile_list: List[tiles.Tile], is_blocking: Callable[[tiles.Tile], bool],
-                    get_weight: Callable[[Coordinate], int], visited: Set[Coordinate],
-                    target_pos: Coordinate, cur_pos: Coordinate) -> Tuple[bool, List[Coordinate]]:
+    def __inner_neighbors() -> List[List[int]]:
+        """
+        :return: the indices of the neighbors of every index of a Room's tile list
         """
-        Searches for a path in tile_list (interpreted as Room.INNER_WIDTH * Room.INNER_HEIGHT tile matrix) from cur_pos
-        to target_pos based on positional weights.
+        if ExpeditionGenerator.__INNER_NEIGHBORS is None:
+            ExpeditionGenerator.__INNER_NEIGHBORS = [
+                [Room.coordinate_to_index(pos) for pos in Room.index_to_coordinate(index).get_neighbors(
+                    Coordinate(0, 0), Coordinate(Room.INNER_WIDTH - 1, Room.INNER_HEIGHT - 1))]
+                for index in range(Room.INNER_WIDTH * Room.INNER_HEIGHT)
+            ]
+        return ExpeditionGenerator.__INNER_NEIGHBORS
+
+    @staticmethod
+    def path_search(tile_list: List[tiles.Tile], is_blocking: Callable[[tiles.Tile], bool], start_pos: Coordinate,
+                    target_pos: Coordinate) -> Tuple[bool, List[Coordinate]]:
+        """
+        Searches for the path in tile_list (interpreted as Room.INNER_WIDTH * Room.INNER_HEIGHT tile matrix) from
+        start_pos to target_pos that passes the fewest blocking tiles. Moving onto a blocking tile costs 1 and onto any
+        other tile 0, so a 0-1 breadth-first search (Dijkstra with a deque) finds it in linear time.
 
         :param tile_list: a Room's tile matrix in list form (interpreted as concatenation of its rows)
         :param is_blocking: tells us whether a given tile is blocking or free to move
-        :param get_weight: provides a weight for every room position with lower values being more favourable to move to
-        :param visited: set of already visited positions so we don't double check
+        :param start_pos: start of the path we search
         :param target_pos: end of the path we search
-        :param cur_pos: current position in the path we search
-        :return: True and a list of Coordinates of the Obstacles we have to remove to get a valid path, False and a
-                 meaningless list if no such path exists (e.g. target is blocked by walls)
+        :return: True and a list of Coordinates of the fewest blocking tiles we have to remove to get a valid path
+                 (including start_pos and target_pos if they are blocking), False and an empty list if start_pos or
+                 target_pos is not inside the room
         """
-        if cur_pos == target_pos:
-            return True, []
-
-        # max_ is inclusive
-        neighbors = cur_pos.get_neighbors(Coordinate(0, 0), Coordinate(Room.INNER_WIDTH - 1, Room.INNER_HEIGHT - 1))
-        neighbors.sort(key=lambda val: get_weight(val))  # continue with the better neighbors first
-        for pos in neighbors:
-            if pos in visited:
-                continue
-            visited.add(pos)
-            success, tiles_to_remove = ExpeditionGenerator.path_search(tile_list, is_blocking, get_weight,
-                                                                       visited, target_pos, pos)
-            if success:
-                tile = tile_list[pos.x + pos.y * Room.INNER_WIDTH]
-                if is_blocking(tile):  # todo theoretically expandable to also take the direction as parameter
-                    tiles_to_remove = [pos] + tiles_to_remove
-                return True, tiles_to_remove
-
-        return False, []
+        num_of_cells = Room.INNER_WIDTH * Room.INNER_HEIGHT
+        if len(tile_list) != num_of_cells or \
+                not (0 <= start_pos.x < Room.INNER_WIDTH and 0 <= start_pos.y < Room.INNER_HEIGHT) or \
+                not (0 <= target_pos.x < Room.INNER_WIDTH and 0 <= target_pos.y < Room.INNER_HEIGHT):
+            return False, []
+
+        neighbors = ExpeditionGenerator.__inner_neighbors()
+        costs = [1 if is_blocking(tile) else 0 for tile in tile_list]
+        start = Room.coordinate_to_index(start_pos)
+        target = Room.coordinate_to_index(target_pos)
+
+        distances = [num_of_cells + 1] * num_of_cells    # larger than any possible distance
+        predecessors = [-1] * num_of_cells
+        distances[start] = costs[start]
+        queue = deque([start])
+        while len(queue) > 0:
+            cell = queue.popleft()
+            if cell == target:
+                break
+            for neighbor in neighbors[cell]:
+                distance = distances[cell] + costs[neighbor]
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    predecessors[neighbor] = cell
+                    if costs[neighbor] == 0:
+                        queue.appendleft(neighbor)
+                    else:
+                        queue.append(neighbor)
+
+        tiles_to_remove = []
+        cell = target
+        while cell >= 0:
+            if costs[cell] > 0:
+                tiles_to_remove.append(Room.index_to_coordinate(cell))
+            cell = predecessors[cell]
+        tiles_to_remove.reverse()
+        return True, tiles_to_remove
@@ -1,6 +1,8 @@
 # exporting
 from .learnables import WFCLearnMatrix, LearnableMap, LearnableRoom
 from .wave_function import WaveFunction
+from .wfc_engine import WFCArrayEngine
+from .wfc_knowledge import WFCKnowledge
 from .wfc_generator import WFCGenerator, WFCLayoutGenerator, WFCRoomGenerator, WFCEmptyRoomGenerator
 from .wfc_learner import WFCLearner
 from .wfc_manager import WFCManager
@@ -0,0 +1,158 @@
+import heapq
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from qrogue.game.world.navigation import Coordinate, Direction
+from qrogue.util import RandomManager, MyRandom, Logger
+from .wfc_knowledge import WFCKnowledge
+
+
+class WFCArrayEngine:
+    """
+    Array based alternative to the WaveFunction objects used by WFCGenerator. The weights of all cells are stored in one
+    matrix indexed by (cell, tile id) and the learned neighbor weights are converted into a (tile id, tile id) matrix of
+    factors once per WFCKnowledge. The cell to collapse next is the one with minimal entropy, which is looked up in a heap
+    that gets a new entry whenever propagation changes the weights of a cell. Outdated entries are skipped lazily.
+    """
+
+    @staticmethod
+    def __entropy(weights: np.ndarray) -> float:
+        weights = weights[weights > 0].astype(np.float64)
+        if len(weights) <= 0:
+            return 0
+        # shannon_entropy_for_square = log(sum(weight)) - (sum(weight * log(weight)) / sum(weight))
+        weight_sum = weights.sum()
+        return math.log(weight_sum) - float(np.dot(weights, np.log(weights))) / weight_sum
+
+    @staticmethod
+    def __entropies(weights: np.ndarray) -> np.ndarray:
+        """
+        Vectorized version of __entropy() for all rows of weights at once.
+        """
+        weights = weights.astype(np.float64)
+        weight_sums = weights.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_sums = np.where(weights > 0, weights * np.log(weights), 0).sum(axis=1)
+            entropies = np.log(weight_sums) - log_sums / weight_sums
+        return np.where(weight_sums > 0, entropies, 0)
+
+    def __init__(self, knowledge: WFCKnowledge):
+        """
+        :param knowledge: the learned weights, its arrays are used without copying them
+        """
+        self.__knowledge = knowledge
+        self.__width = knowledge.width
+        self.__height = knowledge.height
+        self.__tiles = knowledge.tiles
+        self.__pos_weights = knowledge.pos_weights
+        self.__factors = knowledge.factors()
+
+    @property
+    def width(self) -> int:
+        return self.__width
+
+    @property
+    def height(self) -> int:
+        return self.__height
+
+    @property
+    def num_of_tiles(self) -> int:
+        return len(self.__tiles)
+
+    def generate(self, seed: int, width: Optional[int] = None, height: Optional[int] = None,
+                 static_entries: Optional[Dict[Coordinate, Any]] = None,
+                 is_assignable: Optional[Callable[[Any, Any], bool]] = None) -> List[List[Any]]:
+        """
+        Same as WFCGenerator.generate().
+        """
+        assert self.__width > 0 and self.__height > 0, "Cannot generate without learning from data before!"
+
+        rand: MyRandom = RandomManager.create_new(seed)
+
+        # if no dimensions are given we take the learned one
+        if width is None: width = self.__width
+        if height is None: height = self.__height
+        if is_assignable is None:
+            def is_assignable(key_, value_) -> bool:
+                return key_ == value_
+
+        # cells are ordered column by column so ties in entropy are broken like in WFCGenerator
+        def to_cell(x_: int, y_: int) -> int:
+            return x_ * height + y_
+
+        initial_weights = np.zeros((width, height, len(self.__tiles)), dtype=np.int64)
+        learned_width, learned_height = min(width, self.__width), min(height, self.__height)
+        initial_weights[:learned_width, :learned_height] = self.__pos_weights[:learned_width, :learned_height]
+        initial_weights = initial_weights.reshape(width * height, len(self.__tiles))
+        weights = initial_weights.copy()
+        states: List[Optional[int]] = [None] * (width * height)
+        is_collapsed = [False] * (width * height)
+        versions = [0] * (width * height)
+        heap = []
+
+        def propagate_collapse(x_: int, y_: int, state_: Optional[int]):
+            if state_ is None:
+                factors = np.zeros(len(self.__tiles), dtype=np.float64)   # like collapsing to an unknown type
+            else:
+                factors = self.__factors[state_]
+            for direction in Direction.values():
+                nx, ny = x_ + direction.x, y_ + direction.y
+                if 0 <= nx < width and 0 <= ny < height:
+                    neighbor = to_cell(nx, ny)
+                    if is_collapsed[neighbor]: continue
+                    # truncating towards 0 like WaveFunction.adapt_weights()
+                    weights[neighbor] = (weights[neighbor] * factors).astype(np.int64)
+                    versions[neighbor] += 1
+                    heapq.heappush(heap, (self.__entropy(weights[neighbor]), neighbor, versions[neighbor]))
+
+        def collapse(cell_: int) -> Optional[int]:
+            cell_weights = weights[cell_]
+            weight_sum = int(cell_weights.sum())
+            if weight_sum <= 0:
+                # the neighbors excluded every learned tile, so we ignore them instead of collapsing to nothing
+                cell_weights = initial_weights[cell_]
+                weight_sum = int(cell_weights.sum())
+                if weight_sum <= 0:
+                    return None
+            rand_val = rand.get_int(0, weight_sum, "WFCArrayEngine.collapse()")
+            return int(np.searchsorted(np.cumsum(cell_weights), rand_val, side="right"))
+
+        if static_entries is not None:
+            for pos in static_entries:
+                value = static_entries[pos]
+                forced = False
+                if 0 <= pos.x < width and 0 <= pos.y < height:
+                    for tile_id in self.__knowledge.pos_tiles(pos):
+                        if is_assignable(self.__tiles[tile_id], value):
+                            cell = to_cell(pos.x, pos.y)
+                            states[cell] = tile_id
+                            is_collapsed[cell] = True
+                            propagate_collapse(pos.x, pos.y, tile_id)
+                            forced = True
+                            break
+                if not forced:
+                    Logger.instance().error(f"Failed to force value={value} for static entry at {pos}", show=False,
+                                            from_pycui=False)
+
+        for cell, entropy in enumerate(self.__entropies(weights).tolist()):
+            if not is_collapsed[cell]:
+                heap.append((entropy, cell, versions[cell]))
+        heapq.heapify(heap)
+
+        while len(heap) > 0:
+            _, cell, version = heapq.heappop(heap)
+            if is_collapsed[cell] or version != versions[cell]:
+                continue    # outdated entry
+            states[cell] = collapse(cell)
+            is_collapsed[cell] = True
+            propagate_collapse(cell // height, cell % height, states[cell])
+
+        matrix = [[None] * width for _ in range(height)]
+        for x in range(width):
+            for y in range(height):
+                state = states[to_cell(x, y)]
+                if state is not None:
+                    matrix[y][x] = self.__tiles[state]
+        return matrix
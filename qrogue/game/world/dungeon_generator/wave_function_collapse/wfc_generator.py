@@ -11,6 +11,8 @@ from qrogue.util import RandomManager, MapConfig, MyRandom, Logger
 from qrogue.util.util_functions import my_str
 from .learnables import LearnableMap, LearnableRoom
 from .wave_function import WaveFunction
+from .wfc_engine import WFCArrayEngine
+from .wfc_knowledge import WFCKnowledge
 from .wfc_learner import WFCLearner, WFCLearnMatrix
 
 
@@ -50,23 +52,43 @@ class WFCGenerator:
 
     def __init__(self, pos_weights: Optional[Dict[Coordinate, Dict[Any, int]]] = None,
                  type_weights: Optional[Dict[Optional[Any], Dict[Any, int]]] = None,
-                 data: Optional[List[WFCLearnMatrix]] = None):
+                 data: Optional[List[WFCLearnMatrix]] = None, knowledge: Optional[WFCKnowledge] = None):
         """
         Learns a wave function from the given data.
+
+        :param knowledge: previously learned weights, used instead of pos_weights and type_weights if given
         """
         if pos_weights is None: pos_weights = {}
         if type_weights is None: type_weights = {}
-        self.__learner = WFCLearner(pos_weights, type_weights)
+        self.__knowledge = knowledge
+        # the learner's dictionaries are only restored from knowledge if they are actually needed
+        self.__lazy_learner = WFCLearner(pos_weights, type_weights) if knowledge is None else None
+        self.__array_engine: Optional[WFCArrayEngine] = None  # created on first use
 
         if data is not None:
             self.add_knowledge(data)
 
+    @property
+    def __learner(self) -> WFCLearner:
+        if self.__lazy_learner is None:
+            self.__lazy_learner = WFCLearner(*self.__knowledge.to_dicts())
+        return self.__lazy_learner
+
+    @property
+    def knowledge(self) -> WFCKnowledge:
+        if self.__knowledge is None:
+            self.__knowledge = WFCKnowledge.from_learner(self.__learner)
+        return self.__knowledge
+
     def add_knowledge(self, data: List[WFCLearnMatrix]):
         assert len(data) > 0, "Cannot learn from empty list!"
 
         for matrix in data:
             self.__learner.learn(matrix)    # this updates pos_weights and type_weights
         self.__learner.remove_unwanted_values()
+        # have to be recreated with the new knowledge
+        self.__knowledge = None
+        self.__array_engine = None
 
     def __weight(self, main: Any, neighbor: Any) -> float:
         """
@@ -104,6 +126,11 @@ class WFCGenerator:
     def generate(self, seed: int, width: Optional[int] = None, height: Optional[int] = None,
                  static_entries: Optional[Dict[Coordinate, Any]] = None,
                  is_assignable: Optional[Callable[[Any, Any], bool]] = None) -> List[List[Any]]:
+        if MapConfig.use_array_wfc():
+            if self.__array_engine is None:
+                self.__array_engine = WFCArrayEngine(self.knowledge)
+            return self.__array_engine.generate(seed, width, height, static_entries, is_assignable)
+
         assert self.__learner.width > 0 and self.__learner.height > 0, \
             "Cannot generate without learning from data before!"
 
@@ -262,9 +289,9 @@ class WFCRoomGenerator(WFCGenerator):
 
     def __init__(self, room_type: AreaType, pos_weights: Optional[Dict[Coordinate, Dict[Any, int]]] = None,
                  type_weights: Optional[Dict[Optional[Any], Dict[Any, int]]] = None,
-                 data: Optional[List[WFCLearnMatrix]] = None):
+                 data: Optional[List[WFCLearnMatrix]] = None, knowledge: Optional[WFCKnowledge] = None):
         self.__room_type = room_type
-        super(WFCRoomGenerator, self).__init__(pos_weights, type_weights, data)
+        super(WFCRoomGenerator, self).__init__(pos_weights, type_weights, data, knowledge)
 
     @property
     def room_type(self) -> AreaType:
@@ -0,0 +1,177 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from qrogue.game.logic.collectibles import CollectibleType
+from qrogue.game.world import tiles
+from qrogue.game.world.navigation import Coordinate
+from .learnables import LearnableRoom
+from .wfc_learner import WFCLearner
+
+
+class WFCKnowledge:
+    """
+    The weights of a WFCLearner stored as arrays over a vocabulary of tiles, i.e., every learned tile is identified by
+    its index in the vocabulary. Besides the weights the arrays also store in which order the tiles were learned, so
+    the dictionaries of the WFCLearner can be restored exactly.
+    """
+    # kinds of data a LearnableRoom.TileData can have, used to store it as integers
+    __DATA_NONE = 0
+    __DATA_INT = 1
+    __DATA_COLLECTIBLE = 2
+
+    @staticmethod
+    def encode_tiles(tiles_: List[LearnableRoom.TileData]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: names of the tiles' TileCodes and (kind, value) of their data
+        """
+        codes = np.array([tile.code.name for tile in tiles_])
+        data = np.zeros((len(tiles_), 2), dtype=np.int64)
+        for i, tile in enumerate(tiles_):
+            if isinstance(tile.data, CollectibleType):
+                data[i] = WFCKnowledge.__DATA_COLLECTIBLE, tile.data.value
+            elif tile.data is not None:
+                data[i] = WFCKnowledge.__DATA_INT, tile.data
+        return codes, data
+
+    @staticmethod
+    def decode_tiles(codes: np.ndarray, data: np.ndarray) -> List[LearnableRoom.TileData]:
+        tiles_ = []
+        for code, (kind, value) in zip(codes.tolist(), data.tolist()):
+            if kind == WFCKnowledge.__DATA_COLLECTIBLE:
+                tile_data = CollectibleType(value)
+            elif kind == WFCKnowledge.__DATA_INT:
+                tile_data = value
+            else:
+                tile_data = None
+            tiles_.append(LearnableRoom.TileData(tiles.TileCode[code], tile_data))
+        return tiles_
+
+    @staticmethod
+    def from_learner(learner: WFCLearner) -> "WFCKnowledge":
+        tile_ids: Dict[Optional[Any], int] = {}
+
+        def get_tile_id(tile: Optional[Any]) -> int:
+            if tile not in tile_ids:
+                tile_ids[tile] = len(tile_ids)
+            return tile_ids[tile]
+
+        pos_weights = {pos: learner.pos_weights(pos) for pos in learner.positions}
+        type_weights = {type_: learner.type_weights(type_) for type_ in learner.types}
+        for weights in pos_weights.values():
+            for tile in weights:
+                get_tile_id(tile)
+        for type_, weights in type_weights.items():
+            get_tile_id(type_)
+            for tile in weights:
+                get_tile_id(tile)
+        num_of_tiles = len(tile_ids)
+
+        pos_weight_array = np.zeros((learner.width, learner.height, num_of_tiles), dtype=np.int64)
+        pos_order = np.full((learner.width, learner.height, num_of_tiles), -1, dtype=np.int16)
+        for pos, weights in pos_weights.items():
+            for rank, (tile, weight) in enumerate(weights.items()):
+                pos_weight_array[pos.x, pos.y, tile_ids[tile]] = weight
+                pos_order[pos.x, pos.y, tile_ids[tile]] = rank
+
+        type_weight_array = np.zeros((num_of_tiles, num_of_tiles), dtype=np.int64)
+        type_order = np.full((num_of_tiles, num_of_tiles), -1, dtype=np.int16)
+        type_ranks = np.full(num_of_tiles, -1, dtype=np.int16)
+        for type_rank, (type_, weights) in enumerate(type_weights.items()):
+            main = tile_ids[type_]
+            type_ranks[main] = type_rank
+            for rank, (tile, weight) in enumerate(weights.items()):
+                type_weight_array[main, tile_ids[tile]] = weight
+                type_order[main, tile_ids[tile]] = rank
+
+        return WFCKnowledge(list(tile_ids.keys()), pos_weight_array, pos_order, type_weight_array, type_order,
+                            type_ranks)
+
+    def __init__(self, tiles_: List[Optional[Any]], pos_weights: np.ndarray, pos_order: np.ndarray,
+                 type_weights: np.ndarray, type_order: np.ndarray, type_ranks: np.ndarray):
+        """
+        :param tiles_: vocabulary of learned tiles
+        :param pos_weights: weight of every tile at every position, indexed by (x, y, tile index)
+        :param pos_order: rank of every tile in the learned order of a position or -1 if it was never learned there
+        :param type_weights: weight of every tile next to every tile, indexed by (main tile index, neighbor tile index)
+        :param type_order: rank of every neighbor in the learned order of its main tile or -1 if it was never learned
+        :param type_ranks: rank of every tile in the learned order of main tiles or -1 if it was never a main tile
+        """
+        self.__tiles = tiles_
+        self.__pos_weights = pos_weights
+        self.__pos_order = pos_order
+        self.__type_weights = type_weights
+        self.__type_order = type_order
+        self.__type_ranks = type_ranks
+
+    @property
+    def width(self) -> int:
+        return self.__pos_weights.shape[0]
+
+    @property
+    def height(self) -> int:
+        return self.__pos_weights.shape[1]
+
+    @property
+    def tiles(self) -> List[Optional[Any]]:
+        return self.__tiles
+
+    @property
+    def pos_weights(self) -> np.ndarray:
+        return self.__pos_weights
+
+    @property
+    def type_weights(self) -> np.ndarray:
+        return self.__type_weights
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """
+        :return: all arrays except the vocabulary by name
+        """
+        return {
+            "pos_weights": self.__pos_weights,
+            "pos_order": self.__pos_order,
+            "type_weights": self.__type_weights,
+            "type_order": self.__type_order,
+            "type_ranks": self.__type_ranks,
+        }
+
+    def pos_tiles(self, pos: Coordinate) -> List[int]:
+        """
+        :return: indices of the tiles learned at pos in the order they were learned
+        """
+        if not (0 <= pos.x < self.width and 0 <= pos.y < self.height):
+            return []
+        order = self.__pos_order[pos.x, pos.y]
+        return [index for index in np.argsort(order, kind="stable").tolist() if order[index] >= 0]
+
+    def factors(self) -> np.ndarray:
+        """
+        :return: matrix of the factors a neighbor's weight is multiplied with if the main cell collapsed to a certain
+            tile, indexed by (main tile index, neighbor tile index) like the type weights. Tiles that were never seen
+            next to the main tile get a factor of 0.
+        """
+        weight_sums = self.__type_weights.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factors = 1 + self.__type_weights / weight_sums
+        return np.where((self.__type_order >= 0) & (weight_sums > 0), factors, 0)
+
+    def to_dicts(self) -> Tuple[Dict[Coordinate, Dict[Any, int]], Dict[Optional[Any], Dict[Any, int]]]:
+        """
+        :return: pos_weights and type_weights in the form used by WFCLearner
+        """
+        pos_weights: Dict[Coordinate, Dict[Any, int]] = {}
+        for x in range(self.width):
+            for y in range(self.height):
+                pos = Coordinate(x, y)
+                indices = self.pos_tiles(pos)
+                if len(indices) > 0:
+                    pos_weights[pos] = {self.__tiles[i]: int(self.__pos_weights[x, y, i]) for i in indices}
+
+        type_weights: Dict[Optional[Any], Dict[Any, int]] = {}
+        for main in np.argsort(self.__type_ranks, kind="stable").tolist():
+            if self.__type_ranks[main] < 0: continue
+            order = self.__type_order[main]
+            indices = [i for i in np.argsort(order, kind="stable").tolist() if order[i] >= 0]
+            type_weights[self.__tiles[main]] = {self.__tiles[i]: int(self.__type_weights[main, i]) for i in indices}
+        return pos_weights, type_weights
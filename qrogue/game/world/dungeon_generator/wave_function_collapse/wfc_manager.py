@@ -1,19 +1,45 @@
+import hashlib
 import json
+import os
 from typing import List, Dict, Union, Tuple, Optional
 
+import numpy as np
+
 from qrogue.game.world.map.rooms import AreaType
 from qrogue.util import PathConfig, MyRandom, Logger
 from qrogue.util.util_functions import enum_from_string
 from .wfc_generator import WFCGenerator, WFCRoomGenerator
+from .wfc_knowledge import WFCKnowledge
 
 
 class WFCManager:
     __DEFAULT_FILE = "wfc.txt"
+    __DEFAULT_BINARY_FILE = "wfc.npz"
+    # increase whenever the binary format changes, so older files are learned again instead of misinterpreted
+    __BINARY_VERSION = 1
+    __LEVELS_START = "levels = "
     __AREA_TYPE_START = "_start"
     __AREA_TYPE_END = "_end"
     __POS_WEIGHTS_START = "pos_weights ="
     __TYPE_WEIGHTS_START = "type_weights = "
 
+    @staticmethod
+    def levels_hash(templates: Optional[List[Tuple[str, bool]]] = None) -> str:
+        """
+        :param templates: the levels WFC learns from, defaults to WFCRoomGenerator.get_level_list()
+        :return: a hash of the names and content of the given levels, used to detect outdated binary files
+        """
+        if templates is None:
+            templates = WFCRoomGenerator.get_level_list()
+        sha = hashlib.sha1()
+        for filename, in_dungeon_folder in templates:
+            sha.update(f"{filename}:{in_dungeon_folder}\n".encode("utf-8"))
+            try:
+                sha.update(PathConfig.read_level(filename, in_dungeon_folder).encode("utf-8"))
+            except FileNotFoundError:
+                pass    # a missing level simply leads to a different hash
+        return sha.hexdigest()
+
     def __init__(self):
         self.__area_data: Dict[AreaType, List[WFCRoomGenerator]] = {}
 
@@ -26,9 +52,30 @@ class WFCManager:
         else:
             self.__area_data[AreaType.WildRoom] = [wr_gen]
 
-    def store(self, file_name: Optional[str] = None):
+    @staticmethod
+    def stored_levels_hash(file_name: Optional[str] = None) -> Optional[str]:
+        """
+        :param file_name: text file in the user data folder
+        :return: the levels_hash() of the levels the weights in the text file were learned from, None if the file
+            doesn't exist or was stored without the hash
+        """
         if file_name is None: file_name = WFCManager.__DEFAULT_FILE
-        data = ""
+        path = PathConfig.user_data_path(file_name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as file:
+            first_line = file.readline().rstrip("\n")
+        if first_line.startswith(WFCManager.__LEVELS_START):
+            return first_line[len(WFCManager.__LEVELS_START):]
+        return None
+
+    def store(self, file_name: Optional[str] = None, templates: Optional[List[Tuple[str, bool]]] = None):
+        """
+        :param file_name: file in the user data folder
+        :param templates: the levels the weights were learned from, defaults to WFCRoomGenerator.get_level_list()
+        """
+        if file_name is None: file_name = WFCManager.__DEFAULT_FILE
+        data = f"{WFCManager.__LEVELS_START}{WFCManager.levels_hash(templates)}\n"
         for area_type in self.__area_data:
             data += f"{area_type.name}{WFCManager.__AREA_TYPE_START}\n"
             data += f"{len(self.__area_data[area_type])}\n"
@@ -43,12 +90,118 @@ class WFCManager:
 
         PathConfig.write(file_name, data)
 
+    def store_binary(self, file_name: Optional[str] = None, templates: Optional[List[Tuple[str, bool]]] = None):
+        """
+        Stores the learned weights as arrays in an uncompressed .npz file (see WFCKnowledge), so loading only has to
+        read the raw array data. The file is written to a temporary file first and then moved, so processes loading at
+        the same time never see a partial file.
+
+        :param file_name: file in the user data folder
+        :param templates: the levels the weights were learned from, defaults to WFCRoomGenerator.get_level_list()
+        """
+        if file_name is None: file_name = WFCManager.__DEFAULT_BINARY_FILE
+        arrays = {
+            "version": np.array(WFCManager.__BINARY_VERSION),
+            "levels": np.array(WFCManager.levels_hash(templates)),
+            "area_types": np.array([area_type.name for area_type in self.__area_data
+                                    for _ in self.__area_data[area_type]]),
+        }
+        index = 0
+        for area_type in self.__area_data:
+            for wfc_gen in self.__area_data[area_type]:
+                knowledge = wfc_gen.knowledge
+                arrays[f"{index}_tile_codes"], arrays[f"{index}_tile_data"] = \
+                    WFCKnowledge.encode_tiles(knowledge.tiles)
+                for name, array in knowledge.arrays().items():
+                    arrays[f"{index}_{name}"] = array
+                index += 1
+
+        path = PathConfig.user_data_path(file_name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(tmp_path, path)
+
+    def load_binary(self, file_name: Optional[str] = None, templates: Optional[List[Tuple[str, bool]]] = None) \
+            -> bool:
+        """
+        Loads weights stored by store_binary(). The loaded arrays are directly used by the generators, so neither the
+        weight dictionaries nor the level files have to be parsed.
+
+        :param file_name: file in the user data folder
+        :param templates: the levels the weights should have been learned from, defaults to
+            WFCRoomGenerator.get_level_list()
+        :return: False if the file doesn't exist, was stored by a different version or is outdated because the levels
+            changed, True if it was loaded successfully
+        """
+        if file_name is None: file_name = WFCManager.__DEFAULT_BINARY_FILE
+        path = PathConfig.user_data_path(file_name)
+        if not os.path.exists(path):
+            return False
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != WFCManager.__BINARY_VERSION or \
+                        str(data["levels"]) != WFCManager.levels_hash(templates):
+                    return False
+
+                area_data: Dict[AreaType, List[WFCRoomGenerator]] = {}
+                for index, area_type in enumerate(data["area_types"].tolist()):
+                    area_type = AreaType[area_type]
+                    tiles = WFCKnowledge.decode_tiles(data[f"{index}_tile_codes"], data[f"{index}_tile_data"])
+                    knowledge = WFCKnowledge(tiles, data[f"{index}_pos_weights"], data[f"{index}_pos_order"],
+                                             data[f"{index}_type_weights"], data[f"{index}_type_order"],
+                                             data[f"{index}_type_ranks"])
+                    wfc_gen = WFCRoomGenerator(area_type, knowledge=knowledge)
+                    if area_type in area_data:
+                        area_data[area_type].append(wfc_gen)
+                    else:
+                        area_data[area_type] = [wfc_gen]
+        except (OSError, ValueError, KeyError) as ex:
+            Logger.instance().warn(f"Failed to load WFC file \"{file_name}\": {ex}", from_pycui=False)
+            return False
+
+        for area_type, wfc_gens in area_data.items():
+            if area_type in self.__area_data:
+                self.__area_data[area_type] += wfc_gens
+            else:
+                self.__area_data[area_type] = wfc_gens
+        return True
+
     def load(self, file_name: Optional[str] = None, learn_if_non_existent: Optional[bool] = None):
-        if file_name is None: file_name = WFCManager.__DEFAULT_FILE
+        """
+        Loads the weights for the WFC generators. Without a specific file_name the binary file is used if it is up to
+        date. Otherwise, the text file is used if it was learned from the current levels, and if it wasn't either, the
+        weights are learned again. In both cases the binary file is stored for the next time.
+
+        :param file_name: text file in the user data folder to load
+        :param learn_if_non_existent: whether the weights should be learned if the text file doesn't exist
+        """
+        if file_name is None:
+            if self.load_binary():
+                return
+            if WFCManager.stored_levels_hash() == WFCManager.levels_hash():
+                self.__load_text(WFCManager.__DEFAULT_FILE, learn_if_non_existent)
+            else:
+                # the binary file as well as the text file are missing or outdated
+                Logger.instance().info(f"WFC file \"{WFCManager.__DEFAULT_BINARY_FILE}\" is outdated or missing. "
+                                       f"Learning and storing fresh WFC values...", from_pycui=False)
+                self.learn()
+                self.store()
+            try:
+                self.store_binary()
+            except OSError as ex:
+                Logger.instance().warn(f"Failed to store WFC file \"{WFCManager.__DEFAULT_BINARY_FILE}\": {ex}",
+                                       from_pycui=False)
+        else:
+            self.__load_text(file_name, learn_if_non_existent)
+
+    def __load_text(self, file_name: str, learn_if_non_existent: Optional[bool] = None):
         if learn_if_non_existent is None: learn_if_non_existent = True
         try:
             data = PathConfig.read(file_name, in_user_path=True)
             line_start = 0
+            if data.startswith(WFCManager.__LEVELS_START):
+                line_start = data.index("\n") + 1  # skip the hash of the levels
             while line_start < len(data):
                 # read area type
                 line_end = data.index("\n", line_start)
@@ -1,6 +1,6 @@
 import enum
 from abc import ABC, abstractmethod
-from typing import List, Callable, Optional, Tuple, Any
+from typing import List, Callable, Optional, Tuple, Any, Set
 
 import qrogue.game.world.tiles as tiles
 from qrogue.game.logic import Message
@@ -74,6 +74,12 @@ class BaseMap(ABC):
         self.__rooms = rooms
         self.__dimensions = Coordinate(len(rooms[0]), len(rooms))
 
+        # the rendered rows are composed of the rows of all Areas and only updated where an Area changed
+        self.__layout: Optional[List[Tuple[Area, int, int, int]]] = None  # Area, first row, number of rows, part
+        self.__area_versions: List[int] = []
+        self.__row_parts: List[List[str]] = []
+        self.__rows: List[str] = []
+
     @property
     def _meta_data(self) -> MapMetaData:
         return self.__meta_data
@@ -186,14 +192,21 @@ class BaseMap(ABC):
             return self.__rooms[y][x]
         return None
 
-    def row_strings(self) -> List[str]:
-        rows: List[str] = []
-        offset = 0
+    def __build_layout(self):
+        """
+        Determines which part of which rows every Area (including Hallways and Placeholders) is rendered to. The order
+        is the same as the Areas were rendered in before, so Tiles with side effects on rendering (e.g., Enemies
+        triggering their events after being defeated) are still checked in the same order.
+        """
+        self.__layout = []
+        self.__row_parts = []
+        separator = Area.void().get_img()
         # iterate through every row of Rooms
         for y in range(self.height):
             last_row = y == self.height - 1  # there are no more Hallways after the last row of Rooms
+            offset = len(self.__row_parts)
             areas: List[Area] = []
-            south_hallways: List[str] = []
+            south_hallways: List[Area] = []
 
             for x in range(self.width):
                 last_col = x == self.width - 1  # there are no more Hallways after the last Room in a row
@@ -203,7 +216,7 @@ class BaseMap(ABC):
                     if not last_col:
                         areas.append(Placeholder.vertical())
                     if not last_row:
-                        south_hallways.append(Placeholder.horizontal().get_row_str(0))
+                        south_hallways.append(Placeholder.horizontal())
 
                 else:
                     areas.append(room)
@@ -216,17 +229,51 @@ class BaseMap(ABC):
                     if not last_row:
                         hallway = room.get_hallway(Direction.South, throw_error=False)
                         if hallway is None:
-                            south_hallways.append(Placeholder.horizontal().get_row_str(0))
+                            south_hallways.append(Placeholder.horizontal())
                         else:
-                            south_hallways.append(hallway.get_row_str(0))
+                            south_hallways.append(hallway)
+
+            south_offset = offset + Area.UNIT_HEIGHT
+            for i, hallway in enumerate(south_hallways):
+                self.__layout.append((hallway, south_offset, 1, 2 * i))  # every second part is a separator
+            for i, area in enumerate(areas):
+                self.__layout.append((area, offset, Area.UNIT_HEIGHT, i))
+
+            self.__row_parts += [[""] * len(areas) for _ in range(Area.UNIT_HEIGHT)]
+            # the Hallways below are separated by a void Tile, after the last row of Rooms this row is empty
+            self.__row_parts.append([separator] * max(2 * len(south_hallways) - 1, 0))
+        self.__area_versions = [-1] * len(self.__layout)
+        self.__rows = [""] * len(self.__row_parts)
+
+    def _update_rows(self) -> Set[int]:
+        """
+        Updates the rendered rows of all Areas that changed since the last update.
+
+        :return: indices of the rows that changed
+        """
+        if self.__layout is None:
+            self.__build_layout()
+        changed_rows: Set[int] = set()
+        for i, (area, first_row, num_of_rows, part) in enumerate(self.__layout):
+            if area.update_render() != self.__area_versions[i]:
+                for row in range(num_of_rows):
+                    self.__row_parts[first_row + row][part] = area.get_row_str(row)
+                    changed_rows.add(first_row + row)
+                self.__area_versions[i] = area.render_version
+        for row in changed_rows:
+            self.__rows[row] = "".join(self.__row_parts[row])
+        return changed_rows
 
-            rows += ([""] * Area.UNIT_HEIGHT)  # initialize the new "block" of rows with empty strings
-            for area in areas:
-                for ry in range(Area.UNIT_HEIGHT):
-                    rows[offset + ry] += area.get_row_str(ry)
-            rows.append(Area.void().get_img().join(south_hallways))
-            offset += Area.UNIT_HEIGHT + 1
-        return rows
+    @property
+    def _rendered_rows(self) -> List[str]:
+        """
+        :return: the rows as of the last call of _update_rows(), must not be modified
+        """
+        return self.__rows
+
+    def row_strings(self) -> List[str]:
+        self._update_rows()
+        return list(self.__rows)
 
     def __str__(self):
         return "\n".join(self.row_strings())
@@ -243,6 +290,8 @@ class Map(BaseMap, ABC):
         self.__controllable_tile = tiles.ControllableTile(controllable)
         self.__controllable_pos = BaseMap._calculate_pos(spawn_room, Coordinate(Area.MID_X, Area.MID_Y))
         self.__move_direction = Direction.Center  # initially we didn't move in any direction
+        self.__render_rows: Optional[List[str]] = None  # the rendered rows including the robot
+        self.__robot_render_row: Optional[int] = None  # the row we last rendered the robot in
 
         self.__cur_area = self.room_at(spawn_room.x, spawn_room.y)
         if self.__cur_area is None:
@@ -279,6 +328,29 @@ class Map(BaseMap, ABC):
     def _is_done(self) -> bool:
         return self.__check_achievement(MapConfig.done_event_id())
 
+    def render_string(self) -> str:
+        """
+        Only the rows of Areas that changed since the last call and the rows of the robot's old and new position are
+        updated.
+
+        :return: the Map as it is shown to the player, i.e., including the robot
+        """
+        changed_rows = self._update_rows()
+        rows = self._rendered_rows
+        if self.__render_rows is None:
+            self.__render_rows = list(rows)
+        else:
+            if self.__robot_render_row is not None:
+                changed_rows.add(self.__robot_render_row)
+            for row in changed_rows:
+                self.__render_rows[row] = rows[row]
+
+        # add robot
+        x, y = self.__controllable_pos.x, self.__controllable_pos.y
+        self.__render_rows[y] = rows[y][0:x] + self.robot_img + rows[y][x + 1:]
+        self.__robot_render_row = y
+        return "\n".join(self.__render_rows)
+
     def start(self):
         self._meta_data.show_description()
 
@@ -52,6 +52,9 @@ class Area(ABC):
     __ID = 1
     __FOG = FogOfWar()
     __VOID = Void()
+    __RENDER_VISIBLE = 0
+    __RENDER_FOG = 1
+    __RENDER_VOID = 2
     UNIT_WIDTH = MapConfig.room_width()
     UNIT_HEIGHT = MapConfig.room_height()
     MID_X = MapConfig.room_mid_x()
@@ -74,6 +77,14 @@ class Area(ABC):
         self.__is_visible = False
         self.__was_visited = False
 
+        # rendering is cached per row, only the images of Tiles that can change are checked again
+        self.__render_mode: Optional[int] = None
+        self.__render_version = 0  # increases whenever the rendered rows change
+        self.__row_imgs: List[Optional[List[str]]] = [None] * self.__height
+        self.__row_strs: List[Optional[str]] = [None] * self.__height
+        self.__dynamic_columns: List[List[int]] = [self.__find_dynamic_columns(y) for y in range(self.__height)]
+        self.__dynamic_rows = [y for y in range(self.__height) if len(self.__dynamic_columns[y]) > 0]
+
     @property
     def id(self) -> int:
         return self.__id
@@ -94,6 +105,24 @@ class Area(ABC):
     def type(self) -> AreaType:
         return self.__type
 
+    @property
+    def render_version(self) -> int:
+        """
+        :return: a number that changes whenever get_row_str() returns something different for at least one row
+        """
+        return self.__render_version
+
+    def __find_dynamic_columns(self, y: int) -> List[int]:
+        return [x for x, tile in enumerate(self.__tiles[y]) if not tile.has_static_img]
+
+    def __get_render_mode(self) -> int:
+        if self.is_visible:
+            return Area.__RENDER_VISIBLE
+        elif self.is_in_sight:
+            return Area.__RENDER_FOG
+        else:
+            return Area.__RENDER_VOID
+
     def _set_tile(self, tile: Tile, x: int, y: int) -> bool:
         """
 
@@ -104,9 +133,18 @@ class Area(ABC):
         """
         if 0 <= x < Area.UNIT_WIDTH and 0 <= y < Area.UNIT_HEIGHT:
             self.__tiles[y][x] = tile
+            self.__invalidate_row(y)
             return True
         return False
 
+    def __invalidate_row(self, y: int):
+        if y < self.__height:
+            self.__row_imgs[y] = None
+            self.__row_strs[y] = None
+            self.__dynamic_columns[y] = self.__find_dynamic_columns(y)
+            self.__dynamic_rows = [row for row in range(self.__height) if len(self.__dynamic_columns[row]) > 0]
+            self.__render_version += 1
+
     def at(self, x: int, y: int, force: bool = False) -> Tile:
         """
 
@@ -131,8 +169,23 @@ class Area(ABC):
             return "".join([Invalid().get_img()] * Area.UNIT_WIDTH)
 
         if self.is_visible:
-            tiles = [t.get_img() for t in self.__tiles[row]]
-            return "".join(tiles)
+            imgs = self.__row_imgs[row]
+            if imgs is None:
+                imgs = [t.get_img() for t in self.__tiles[row]]
+                self.__row_imgs[row] = imgs
+                changed = True
+            else:
+                # only Tiles without a static image can look differently than the last time
+                changed = False
+                for x in self.__dynamic_columns[row]:
+                    img = self.__tiles[row][x].get_img()
+                    if img != imgs[x]:
+                        imgs[x] = img
+                        changed = True
+            if changed or self.__row_strs[row] is None:
+                self.__row_strs[row] = "".join(imgs)
+                self.__render_version += 1
+            return self.__row_strs[row]
         elif self.is_in_sight:
             fog_str = Area.__FOG.get_img()
             return fog_str * self.__width
@@ -140,14 +193,37 @@ class Area(ABC):
             void_str = Area.__VOID.get_img()
             return void_str * self.__width
 
+    def update_render(self) -> int:
+        """
+        Checks whether the rows returned by get_row_str() changed, e.g., because the Area became visible or one of its
+        Tiles (like an Enemy) looks differently now. Only the Tiles without a static image are checked again, and only if
+        the Area is visible.
+
+        :return: the current render_version
+        """
+        mode = self.__get_render_mode()
+        if mode != self.__render_mode:
+            self.__render_mode = mode
+            self.__render_version += 1
+        elif mode == Area.__RENDER_VISIBLE:
+            for row in self.__dynamic_rows:
+                self.get_row_str(row)
+        return self.__render_version
+
     def make_visible(self):
+        if not self.__is_visible or not self.__is_in_sight:
+            self.__render_version += 1
         self.__is_in_sight = True
         self.__is_visible = True
 
     def in_sight(self):
+        if not self.__is_in_sight:
+            self.__render_version += 1
         self.__is_in_sight = True
 
     def enter(self, direction: Direction):
+        if not self.__is_visible:
+            self.__render_version += 1
         self.__is_visible = True
         self.__was_visited = True
 
@@ -231,7 +307,7 @@ class Hallway(Area):
         elif r2id is None:
             Logger.instance().debug(f"#hw{self.id}: room1=#r{r1id} but room2 is None!", from_pycui=False)
 
-    def get_row_str(self, row: int) -> str:
+    def __check_hide(self):
         if self.__hide:
             if self.__door.check_event():
                 if self.__room1.is_visible or self.__room2.is_visible:
@@ -239,8 +315,15 @@ class Hallway(Area):
                 # elif self.__room1.in_sight or self.__room2.in_sight:
                 #    self.in_sight()
                 self.__hide = False
+
+    def get_row_str(self, row: int) -> str:
+        self.__check_hide()
         return super(Hallway, self).get_row_str(row)
 
+    def update_render(self) -> int:
+        self.__check_hide()
+        return super(Hallway, self).update_render()
+
     def in_sight(self):
         if not self.__hide:
             self.make_visible()
@@ -106,6 +106,13 @@ class Tile(ABC):
     def _invisible(self):
         return Tile._invisible_tile()
 
+    @property
+    def has_static_img(self) -> bool:
+        """
+        :return: whether get_img() always returns the same image, so renderers don't have to check it again
+        """
+        return False
+
     @abstractmethod
     def get_img(self):
         pass
@@ -130,6 +137,10 @@ class Invalid(Tile):
     def data(self) -> None:
         return None
 
+    @property
+    def has_static_img(self) -> bool:
+        return True
+
     def get_img(self):
         return TileCode.Invalid.representation
 
@@ -149,6 +160,10 @@ class Debug(Tile):
     def data(self) -> int:
         return int(self.__num)
 
+    @property
+    def has_static_img(self) -> bool:
+        return True
+
     def get_img(self) -> str:
         return self.__num
 
@@ -167,6 +182,10 @@ class Void(Tile):
     def data(self) -> None:
         return None
 
+    @property
+    def has_static_img(self) -> bool:
+        return True
+
     def get_img(self):
         return self._invisible
 
@@ -189,6 +208,10 @@ class Floor(Tile):
     def data(self) -> None:
         return None
 
+    @property
+    def has_static_img(self) -> bool:
+        return True
+
     def get_img(self):
         return Floor.img()
 
@@ -211,6 +234,10 @@ class Wall(Tile):
     def data(self) -> None:
         return None
 
+    @property
+    def has_static_img(self) -> bool:
+        return True
+
     def get_img(self):
         return Wall.img()
 
@@ -229,6 +256,10 @@ class Obstacle(Tile):
     def data(self) -> None:
         return None
 
+    @property
+    def has_static_img(self) -> bool:
+        return True
+
     def get_img(self):
         return TileCode.Obstacle.representation
 
@@ -247,6 +278,10 @@ class FogOfWar(Tile):
     def data(self) -> None:
         return None
 
+    @property
+    def has_static_img(self) -> bool:
+        return True
+
     def get_img(self):
         return TileCode.FogOfWar.representation
 
@@ -267,6 +302,10 @@ class Decoration(Tile):
     def data(self) -> bool:
         return self.__blocking
 
+    @property
+    def has_static_img(self) -> bool:
+        return True
+
     def get_img(self):
         return self.__decoration
 
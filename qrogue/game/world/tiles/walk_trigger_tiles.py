@@ -101,6 +101,10 @@ class Trigger(WalkTriggerTile):
         self.__callback(direction, controllable)
         return True
 
+    @property
+    def has_static_img(self) -> bool:
+        return True
+
     def get_img(self):
         return self._invisible
 
@@ -131,6 +135,10 @@ class Teleport(WalkTriggerTile):
             CommonQuestions.UseTeleporter.ask(callback)
         return True
 
+    @property
+    def has_static_img(self) -> bool:
+        return True
+
     def get_img(self):
         return Teleport.Img()
 
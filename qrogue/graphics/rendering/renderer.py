@@ -1,8 +1,20 @@
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from py_cui.colors import ColorRule
 from py_cui.renderer import Renderer
 
 from qrogue.util import ColorConfig, Logger
 
 
+def _rule_signature(rule: ColorRule) -> Tuple:
+    # rules are compared by value since widgets and popups recreate equal rules, e.g., after resetting them
+    region = None if rule._region is None else tuple(rule._region)
+    return rule._regex, rule._color, rule._selected_color, rule._rule_type, rule._match_type, region, \
+        rule._include_whitespace
+
+
 class Fragment:
     def __init__(self, start: int, text: str, color: int):
         self.__start = start
@@ -89,9 +101,75 @@ class FragmentStorage:
         return iter(self.__fragments)
 
 
+class _RuleSet:
+    """
+    Color rules that were set for drawing a ui element, identified by a version that is equal for equal rules.
+    """
+    def __init__(self, version: int, color_rules: List[ColorRule]):
+        self.__version = version
+        # "region" rules modify their region while drawing, so the result of a line might change for the same rules
+        self.__is_cacheable = all(rule._match_type != 'region' for rule in color_rules)
+        self.__combined_regex: Optional[Pattern] = None
+        if len(color_rules) > 0 and all(rule._rule_type == 'contains' for rule in color_rules):
+            try:
+                self.__combined_regex = re.compile("|".join([f"(?:{rule._regex})" for rule in color_rules]))
+            except re.error:
+                self.__combined_regex = None
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    @property
+    def is_cacheable(self) -> bool:
+        return self.__is_cacheable
+
+    def can_match(self, line: str) -> bool:
+        """
+        :return: False if none of the rules matches the given line, True if at least one might match
+        """
+        if self.__combined_regex is None:
+            return True
+        return self.__combined_regex.search(line) is not None
+
+
 class MultiColorRenderer(Renderer):
-    def __init__(self, root, stdscr, logger: Logger):
+    __CACHE_SIZE = 4096  # how many drawn lines are cached at most
+
+    def __init__(self, root, stdscr, logger: Logger, cache_size: int = __CACHE_SIZE):
         super().__init__(root, stdscr, logger)
+        self.__cache_size = cache_size
+        # caches the fragments of drawn lines since most of them don't change between frames
+        self.__fragment_cache: "OrderedDict[Tuple, List[List]]" = OrderedDict()
+        self.__rule_sets: Dict[Tuple, _RuleSet] = {}
+        self.__rule_set = self.__get_rule_set(self._color_rules)
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def cache_hits(self) -> int:
+        return self.__hits
+
+    @property
+    def cache_misses(self) -> int:
+        return self.__misses
+
+    @property
+    def cache_size(self) -> int:
+        return len(self.__fragment_cache)
+
+    def __get_rule_set(self, color_rules: List[ColorRule]) -> _RuleSet:
+        signature = tuple([_rule_signature(rule) for rule in color_rules])
+        if signature not in self.__rule_sets:
+            self.__rule_sets[signature] = _RuleSet(len(self.__rule_sets), color_rules)
+        return self.__rule_sets[signature]
+
+    def set_color_rules(self, color_rules) -> None:
+        super().set_color_rules(color_rules)
+        self.__rule_set = self.__get_rule_set(color_rules)
+
+    def clear_cache(self):
+        self.__fragment_cache.clear()
 
     def _get_render_text(self, ui_element, line, centered, bordered, selected, start_pos):
         """Internal function that computes the scope of the text that should be drawn
@@ -119,6 +197,29 @@ class MultiColorRenderer(Renderer):
         _, width = ui_element.get_absolute_dimensions()
 
         render_text_length = width - (2 * padx)
+        if not self.__rule_set.is_cacheable or self.__cache_size <= 0:
+            return self.__compute_render_text(ui_element, line, centered, bordered, selected, start_pos,
+                                              render_text_length)
+
+        # the fragments only depend on the rules, the line, how it fits into the ui element and its color
+        color = ui_element.get_selected_color() if selected else ui_element.get_color()
+        key = self.__rule_set.version, line, render_text_length, centered, bordered, selected, start_pos, color
+        fragments = self.__fragment_cache.get(key, None)
+        if fragments is None:
+            self.__misses += 1
+            fragments = self.__compute_render_text(ui_element, line, centered, bordered, selected, start_pos,
+                                                   render_text_length)
+            self.__fragment_cache[key] = fragments
+            if len(self.__fragment_cache) > self.__cache_size:
+                self.__fragment_cache.popitem(last=False)
+        else:
+            self.__hits += 1
+            self.__fragment_cache.move_to_end(key)
+        # the caller modifies the fragments while drawing them
+        return [list(fragment) for fragment in fragments]
+
+    def __compute_render_text(self, ui_element, line, centered, bordered, selected, start_pos,
+                              render_text_length: int):
         # this line is the only difference to the original (super) function
         render_text_length += ColorConfig.count_meta_characters(
             line, render_text_length, lambda err: self._logger.error(err, show=False, from_pycui=False))
@@ -155,10 +256,13 @@ class MultiColorRenderer(Renderer):
             list of text - color code combinations to write
         """
         if selected:
-            meta_fragments = FragmentStorage(render_text, ui_element.get_selected_color())
+            color = ui_element.get_selected_color()
         else:
-            meta_fragments = FragmentStorage(render_text, ui_element.get_color())
+            color = ui_element.get_color()
+        if not self.__rule_set.can_match(line):
+            return [[render_text, color]]  # same result as if no rule matched
 
+        meta_fragments = FragmentStorage(render_text, color)
         for color_rule in self._color_rules:
             fragments, match = color_rule.generate_fragments(ui_element, line, render_text, selected)
             if match:
@@ -170,9 +274,4 @@ class MultiColorRenderer(Renderer):
                     cur_pos += len(text)
                     meta_fragments.append(Fragment(start, text, color))
         meta_fragments.sort()
-        full = meta_fragments.fill_blanks()
-        text = ""
-        for frag in full:
-            text += str(frag)
-        text += "\n"
-        return full
+        return meta_fragments.fill_blanks()
@@ -606,13 +606,7 @@ class MapWidget(Widget):
 
     def render(self) -> None:
         if self.__map is not None:
-            rows = self.__map.row_strings()
-            # add robot
-            x = self.__map.robot_pos.x
-            y = self.__map.robot_pos.y
-            rows[y] = rows[y][0:x] + self.__map.robot_img + rows[y][x + 1:]
-
-            self.widget.set_title("\n".join(rows))
+            self.widget.set_title(self.__map.render_string())
 
     def render_reset(self) -> None:
         self.__backup = self.widget.get_title().title()
@@ -1312,6 +1312,15 @@ class TransitionWidgetSet(MyWidgetSet):
             self._unlock(self.__timer_lock)
             self.__update_screen(next_char)
 
+    def fast_forward(self):
+        """
+        Immediately shows all text up to the next point that waits for confirmation (or the end of the transition),
+        i.e., the state the player sees after waiting long enough. Used by simulations that cannot wait for the timers.
+        """
+        self._stop_timer()
+        while not self.__wait_for_confirmation and not self.at_transition_end:
+            self.__next_text()
+
     def set_data(self, text_scrolls: List[TextScroll], continue_callback: Callable[[], None],
                  auto_scroll: bool = False):
         assert len(text_scrolls) > 0, "Empty list of texts provided!"
@@ -1,6 +1,8 @@
 # exporting
+from .expedition_pool import ExpeditionPool, ExpeditionWorkItem
 from .map_management import MapManager
 from .qrogue_pycui import QrogueCUI
+from .replay_runner import ReplayResult, ReplayRunner
 from .save_data import NewSaveData
 
 # importing
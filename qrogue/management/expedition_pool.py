@@ -0,0 +1,227 @@
+import multiprocessing
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from threading import Lock
+from typing import Callable, List, Optional, Tuple
+
+from qrogue.game.logic.actors.controllables.robot import RoboProperties
+from qrogue.game.logic.collectibles import Instruction
+from qrogue.game.puzzle_bank import PuzzleBank
+from qrogue.game.world.dungeon_generator import ExpeditionGenerator, ExpeditionRecipe
+from qrogue.game.world.dungeon_generator.wave_function_collapse import WFCManager
+from qrogue.game.world.map import CallbackPack
+from qrogue.util import Config, ExpeditionConfig, Logger, PathConfig, StvDifficulty
+
+
+class ExpeditionWorkItem:
+    """
+    Describes everything needed to deterministically generate an expedition. Only consists of picklable data, so it can
+    be sent to worker processes.
+    """
+
+    def __init__(self, map_seed: int, puzzle_seed: int, robo_props: RoboProperties, difficulty: StvDifficulty,
+                 available_gates: List[Instruction]):
+        """
+        :param map_seed: the seed used for the layout, rooms and boss puzzle
+        :param puzzle_seed: the seed used for all other puzzles
+        :param robo_props: describes the robot of the expedition
+        :param difficulty: the difficulty of the generated puzzles
+        :param available_gates: gates to choose from if robo_props doesn't specify any
+        """
+        self.__map_seed = map_seed
+        self.__puzzle_seed = puzzle_seed
+        self.__robo_props = robo_props
+        self.__difficulty = difficulty
+        self.__available_gates = available_gates
+
+    @property
+    def map_seed(self) -> int:
+        return self.__map_seed
+
+    @property
+    def puzzle_seed(self) -> int:
+        return self.__puzzle_seed
+
+    @property
+    def robo_props(self) -> RoboProperties:
+        return self.__robo_props
+
+    @property
+    def difficulty(self) -> StvDifficulty:
+        return self.__difficulty
+
+    def get_available_gates(self) -> List[Instruction]:
+        return [gate.copy() for gate in self.__available_gates]
+
+    def create_recipe(self, generator: ExpeditionGenerator) -> Optional[ExpeditionRecipe]:
+        return generator.create_recipe(self.__map_seed, (self.__robo_props, self.__difficulty, self.__puzzle_seed))
+
+
+# state of a worker process, set up once by _init_worker()
+_worker_item: Optional[ExpeditionWorkItem] = None
+_worker_generator: Optional[ExpeditionGenerator] = None
+
+
+def _init_worker(base_path: str, user_data_path: str, puzzle_bank: Optional[Tuple[str, int, int]]):
+    global _worker_generator
+    if multiprocessing.get_start_method() != "fork":
+        # a freshly started process doesn't share the parent's configuration
+        PathConfig.load_paths(base_path, user_data_path)
+        Config.load()
+    Logger.init_for_worker()
+    PuzzleBank.init_for_worker(puzzle_bank)
+
+    wfc_manager = WFCManager()
+    wfc_manager.load()
+
+    def get_available_gates() -> List[Instruction]:
+        return _worker_item.get_available_gates()
+
+    _worker_generator = ExpeditionGenerator(wfc_manager, lambda achievement: False, lambda event: None,
+                                            lambda: None, get_available_gates, CallbackPack.dummy())
+
+
+def _generate(item: ExpeditionWorkItem) -> Tuple[ExpeditionWorkItem, Optional[ExpeditionRecipe], float]:
+    """
+    :return: the given item, the recipe of its expedition (None if generation failed) and how long it took in seconds
+    """
+    global _worker_item
+    _worker_item = item
+    start_time = time.time()
+    recipe = item.create_recipe(_worker_generator)
+    return item, recipe, time.time() - start_time
+
+
+class ExpeditionPool:
+    """
+    Generates expeditions in a pool of worker processes, so generation neither competes with the UI thread for the GIL
+    nor blocks it. Workers return ExpeditionRecipes, so the interactive process only has to build the ExpeditionMaps.
+    At most queue_size expeditions are generated ahead of time. Results are returned in the order their work items were
+    submitted, so the sequence of expeditions only depends on the submitted seeds and not on the number of workers or
+    their timing.
+    """
+
+    def __init__(self, queue_size: int, num_of_workers: int = ExpeditionConfig.NUM_OF_WORKERS):
+        """
+        :param queue_size: how many expeditions can be generated or waiting to be used at once
+        :param num_of_workers: how many worker processes are used for generation
+        """
+        self.__queue_size = queue_size
+        self.__num_of_workers = num_of_workers
+        self.__executor: Optional[ProcessPoolExecutor] = None   # created on first submit
+        self.__queue: List[Tuple[Future, float]] = []   # futures in submission order together with their submit time
+        self.__lock = Lock()
+        self.__num_of_results = 0
+        self.__latency_sum = 0.0
+        self.__generation_sum = 0.0
+
+    @property
+    def queue_size(self) -> int:
+        return self.__queue_size
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        :return: how many expeditions are currently generated or waiting to be used
+        """
+        return len(self.__queue)
+
+    @property
+    def num_of_finished(self) -> int:
+        """
+        :return: how many expeditions are ready to be used without waiting
+        """
+        return len([future for future, _ in self.__queue if future.done()])
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.__queue) >= self.__queue_size
+
+    @property
+    def average_latency(self) -> float:
+        """
+        :return: average time in seconds between submitting a work item and its expedition being used
+        """
+        if self.__num_of_results <= 0: return 0.0
+        return self.__latency_sum / self.__num_of_results
+
+    @property
+    def average_generation_time(self) -> float:
+        """
+        :return: average time in seconds a worker needed to generate an expedition
+        """
+        if self.__num_of_results <= 0: return 0.0
+        return self.__generation_sum / self.__num_of_results
+
+    def __get_executor(self) -> ProcessPoolExecutor:
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(self.__num_of_workers, initializer=_init_worker,
+                                                  initargs=(PathConfig.base_path(), PathConfig.user_data_path(),
+                                                            PuzzleBank.worker_settings()))
+        return self.__executor
+
+    def submit(self, item: ExpeditionWorkItem, callback: Optional[Callable[[], None]] = None) -> bool:
+        """
+        :param item: describes the expedition to generate
+        :param callback: optionally called (from a background thread) as soon as generation is finished
+        :return: True if item was submitted, False if the queue is already full
+        """
+        with self.__lock:
+            if self.is_full:
+                return False
+            future = self.__get_executor().submit(_generate, item)
+            self.__queue.append((future, time.time()))
+        if callback is not None:
+            future.add_done_callback(lambda _: callback())
+        return True
+
+    def pop(self) -> Optional[Tuple[ExpeditionWorkItem, Optional[ExpeditionRecipe]]]:
+        """
+        Waits for the oldest submitted work item to be generated and removes it from the queue.
+
+        :return: the oldest work item and the recipe of its expedition (None if its generation failed), None if the
+            queue is empty or generation was cancelled
+        """
+        with self.__lock:
+            if len(self.__queue) <= 0:
+                return None
+            future, submit_time = self.__queue.pop(0)
+        if future.cancelled():
+            return None
+        try:
+            item, recipe, duration = future.result()
+        except Exception as ex:
+            Logger.instance().error(f"Failed to generate an expedition in a worker process: {ex}", show=False,
+                                    from_pycui=False)
+            return None
+
+        self.__num_of_results += 1
+        self.__latency_sum += time.time() - submit_time
+        self.__generation_sum += duration
+        return item, recipe
+
+    def wait(self):
+        """
+        Blocks until all submitted work items are generated.
+        """
+        with self.__lock:
+            futures = [future for future, _ in self.__queue]
+        wait(futures)
+
+    def cancel(self):
+        """
+        Cancels the generation of all submitted but not yet started work items and discards all queued results.
+        """
+        with self.__lock:
+            for future, _ in self.__queue:
+                future.cancel()
+            self.__queue.clear()
+
+    def shutdown(self):
+        """
+        Cancels all queued work and stops the worker processes without waiting for running generations.
+        """
+        self.cancel()
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
@@ -1,5 +1,3 @@
-import time
-from threading import Thread
 from typing import Callable, Optional, Dict, List, Tuple, Union
 
 from qrogue.game.logic import Message
@@ -10,6 +8,7 @@ from qrogue.game.world.dungeon_generator.wave_function_collapse import WFCManage
 from qrogue.game.world.map import Map, MapType, ExpeditionMap, CallbackPack
 from qrogue.game.world.navigation import Coordinate
 from qrogue.graphics.popups import Popup
+from qrogue.management.expedition_pool import ExpeditionPool, ExpeditionWorkItem
 from qrogue.management.save_data import NewSaveData
 from qrogue.util import CommonQuestions, RandomManager, LevelInfo, Config, MapConfig, ErrorConfig, \
     ExpeditionConfig, StvDifficulty
@@ -66,7 +65,8 @@ class MapManager:
     def __init__(self, wfc_manager: WFCManager, save_data: NewSaveData, seed: int, start_level: Callable[[Map], None],
                  start_level_transition_callback: Callable[[str, str, Callable[[], None]], None],
                  exit_map_callback: Callable[[], None], callback_pack: CallbackPack,
-                 queue_size: int = ExpeditionConfig.DEFAULT_QUEUE_SIZE):
+                 queue_size: int = ExpeditionConfig.DEFAULT_QUEUE_SIZE,
+                 num_of_workers: int = ExpeditionConfig.NUM_OF_WORKERS):
         self.__save_data = save_data
         # no longer used code!
         self.__exit_map = exit_map_callback
@@ -79,12 +79,24 @@ class MapManager:
         self.__expedition_generator = ExpeditionGenerator(wfc_manager, self.__save_data.check_achievement,
                                                           self.trigger_event, self.__load_back,
                                                           save_data.get_gates, callback_pack)
-        self.__expedition_queue: List[ExpeditionMap] = []
+        self.__expedition_pool = ExpeditionPool(queue_size, num_of_workers)
         self.__cur_map: Optional[Map] = None
+        self.__persist_progress = True  # whether completing a map triggers an auto save
 
         self.__level_timer = cur_datetime()
         self.__temp_level_event_storage: Dict[str, Tuple[int, int]] = {}  # event name -> score, done_score
 
+    @property
+    def cur_map(self) -> Optional[Map]:
+        return self.__cur_map
+
+    @property
+    def persist_progress(self) -> bool:
+        return self.__persist_progress
+
+    def set_persist_progress(self, persist: bool):
+        self.__persist_progress = persist
+
     @property
     def is_in_level(self) -> bool:
         return self.__cur_map is not None and self.__cur_map.get_type() is MapType.Level
@@ -97,29 +109,47 @@ class MapManager:
     def show_individual_qubits(self) -> bool:
         return self.__cur_map.show_individual_qubits
 
+    @property
+    def expedition_pool(self) -> ExpeditionPool:
+        return self.__expedition_pool
+
     def fill_expedition_queue(self, callback: Optional[Callable[[], None]] = None, no_thread: bool = False):
-        if len(self.__expedition_queue) >= self.__queue_size:
-            return
-
-        def fill():
-            # todo: how to handle difficulty?
-            difficulty = StvDifficulty.from_difficulty_code("1")
-            robo_props = RoboProperties.from_difficulty_level(difficulty.level)
-            while len(self.__expedition_queue) < self.__queue_size:
-                map_seed = self.__rm.get_seed("MapManager.fill()@map_seed")
-                puzzle_seed = self.__rm.get_seed("MapManager.fill()@puzzle_seed")
-                expedition, success = self.__expedition_generator.generate(map_seed,
-                                                                           (robo_props, difficulty, puzzle_seed))
-                if success:
-                    self.__expedition_queue.append(expedition)
-
-            if callback is not None:
-                callback()
+        """
+        Submits work items to the expedition pool until its queue is full.
+
+        :param callback: called as soon as the last submitted expedition is generated
+        :param no_thread: whether to wait for the generation to finish before returning
+        """
+        # todo: how to handle difficulty?
+        difficulty = StvDifficulty.from_difficulty_code("1")
+        robo_props = RoboProperties.from_difficulty_level(difficulty.level)
+        num_of_missing = self.__expedition_pool.queue_size - self.__expedition_pool.queue_depth
+        for i in range(num_of_missing):
+            map_seed = self.__rm.get_seed("MapManager.fill()@map_seed")
+            puzzle_seed = self.__rm.get_seed("MapManager.fill()@puzzle_seed")
+            item = ExpeditionWorkItem(map_seed, puzzle_seed, robo_props, difficulty, self.__save_data.get_gates())
+            # only the last item needs the callback since the pool returns results in submission order
+            self.__expedition_pool.submit(item, callback if i == num_of_missing - 1 else None)
 
         if no_thread:
-            fill()
-        else:
-            Thread(target=fill, args=(), daemon=True).start()
+            self.__expedition_pool.wait()
+
+    def cancel_expedition_generation(self):
+        """
+        Stops the pre-generation of expeditions, e.g., because the game is closed.
+        """
+        self.__expedition_pool.shutdown()
+
+    def __pop_expedition(self) -> Tuple[Optional[ExpeditionMap], bool]:
+        # pop until we find an item that was generated successfully
+        while True:
+            result = self.__expedition_pool.pop()
+            if result is None:
+                return None, False
+            _, recipe = result
+            if recipe is not None:
+                # workers can't transfer callbacks, so the ExpeditionMap itself is built from the recipe in this process
+                return self.__expedition_generator.build(recipe)
 
     def __load_level(self, map_name: str, spawn_room: Optional[Coordinate] = None, seed: Optional[int] = None,
                      gate_list: Optional[List[Instruction]] = None):
@@ -158,14 +188,12 @@ class MapManager:
             difficulty = StvDifficulty.from_difficulty_code(difficulty)
         robo_props = RoboProperties.from_difficulty_level(difficulty.level, gate_list)
 
+        expedition, success = None, False
         if map_seed is None and self.__queue_size > 0:
-            while len(self.__expedition_queue) <= 0:
-                time.sleep(Config.loading_refresh_time())
-            success = True
-            expedition = self.__expedition_queue.pop(0)
+            expedition, success = self.__pop_expedition()
             self.fill_expedition_queue()  # todo: how to handle difficulty? dictionary?
             Config.check_reachability("post queue filling")
-        else:
+        if not success:  # either a specific map_seed was requested or there was no pre-generated expedition
             if map_seed is None: map_seed = rand_map_seed
             if puzzle_seed is None: puzzle_seed = rand_puzzle_seed
             expedition, success = self.__expedition_generator.generate(map_seed, (robo_props, difficulty,
@@ -265,7 +293,8 @@ class MapManager:
             else:   # currently only levels and expedition can trigger done-events
                 return
 
-            self.__save_data.save(is_auto_save=True)    # persist the progress
+            if self.__persist_progress:
+                self.__save_data.save(is_auto_save=True)    # persist the progress
 
             def show_end_message(end_message: Optional[Message]):
                 def _show_proceed_summary():
@@ -280,6 +309,9 @@ class MapManager:
 
         elif event_id.lower().startswith(MapConfig.unlock_prefix()):
             self.__save_data.unlock(event_id[len(MapConfig.unlock_prefix()):])
+            if self.__persist_progress:
+                # unlocks often directly follow the completion of a map, so both are merged into one auto save
+                self.__save_data.save(is_auto_save=True)
         else:
             if event_id in self.__temp_level_event_storage:  # todo: is score needed? a simple flag might be better
                 event_score, event_done_score = self.__temp_level_event_storage[event_id]
@@ -25,7 +25,7 @@ from qrogue.util import common_messages, CheatConfig, Config, GameplayConfig, UI
     Logger, PathConfig, Controls, Keys, RandomManager, PyCuiConfig, PopupConfig, PyCuiColors, Options, \
     CommonInfos, MapConfig, WordingConfig
 from qrogue.util.achievements import Achievement, Unlocks
-from qrogue.util.game_simulator import GameSimulator
+from qrogue.util.game_simulator import GameSimulator, SimulationReport
 from qrogue.util.key_logger import KeyLogger, OverWorldKeyLogger, DummyKeyLogger
 from .map_management import MapManager
 from .save_data import NewSaveData
@@ -193,7 +193,7 @@ class QrogueCUI(PyCUI):
     @staticmethod
     def start_simulation(simulation_path: str, in_keylog_folder: bool = True,
                          automation_step_time: Optional[int] = None, auto_scroll_transitions: bool = False,
-                         stop_when_finished: bool = False) -> Optional[NewSaveData]:
+                         stop_when_finished: bool = False, checkpoint: Optional[int] = None) -> Optional[NewSaveData]:
         """
 
         Args:
@@ -204,6 +204,8 @@ class QrogueCUI(PyCUI):
                 performing the next step
             auto_scroll_transitions: whether level transitions should also continue automatically or not
             stop_when_finished: whether we want to stop the CUI when the simulation is finished or not
+            checkpoint: index of the key log's checkpoint to simulate only the level it starts or None to simulate the
+                whole key log
 
         Returns:
             the save data of the simulation or None if the simulation path was invalid (e.g., non-existent or no .qrkl
@@ -212,7 +214,7 @@ class QrogueCUI(PyCUI):
         Logger.instance().assertion(automation_step_time is None or automation_step_time > 0,
                                     f"Invalid automation_step_time: {automation_step_time}!")
         try:
-            simulator = GameSimulator(simulation_path, in_keylog_folder)
+            simulator = GameSimulator(simulation_path, in_keylog_folder, checkpoint)
             qrogue_cui = QrogueCUI(simulator.seed, save_data=NewSaveData(simulator.save_state))
             qrogue_cui._set_simulator(simulator, auto_scroll_transitions, stop_when_finished)
 
@@ -232,11 +234,56 @@ class QrogueCUI(PyCUI):
             else:
                 Logger.instance().error(error_text, show=False, from_pycui=False)
             return None
+        except IndexError:
+            Logger.instance().error(f"Simulation file \"{simulation_path}\" has no checkpoint #{checkpoint}",
+                                    show=False, from_pycui=False)
+            return None
+
+    @staticmethod
+    def start_headless_simulation(simulation_path: str, in_keylog_folder: bool = True,
+                                  checkpoint: Optional[int] = None) -> Optional[SimulationReport]:
+        """
+        Simulates the given key log as fast as possible without curses, i.e., the keys are directly passed to the widget
+        sets without waiting or drawing anything. Transitions are fast-forwarded whenever a key is simulated.
+
+        Args:
+            simulation_path: path to the .qrkl file we want to simulate
+            in_keylog_folder: whether the given simulation path is inside the user data keylog folder or an absolute
+                path
+            checkpoint: index of the key log's checkpoint to simulate only the level it starts or None to simulate the
+                whole key log
+
+        Returns:
+            a report of the simulation's outcome and throughput or None if the simulation path was invalid (e.g.,
+            non-existent or no .qrkl file) or has no such checkpoint
+        """
+        try:
+            simulator = GameSimulator(simulation_path, in_keylog_folder, checkpoint)
+        except FileNotFoundError as fnf:
+            Logger.instance().error(f"Simulation file \"{simulation_path}\" not found: {fnf}", show=False,
+                                    from_pycui=False)
+            return None
+        except IndexError:
+            Logger.instance().error(f"Simulation file \"{simulation_path}\" has no checkpoint #{checkpoint}",
+                                    show=False, from_pycui=False)
+            return None
+
+        error_count = Logger.instance().error_count
+        qrogue_cui = QrogueCUI(simulator.seed, save_data=NewSaveData(simulator.save_state), headless=True)
+        qrogue_cui._set_simulator(simulator)
+        return qrogue_cui.start_headless(None if simulator.simulates_over_world else simulator.map_name, error_count)
 
     def __init__(self, seed: int, width: int = UIConfig.WINDOW_WIDTH, height: int = UIConfig.WINDOW_HEIGHT,
-                 save_data: Optional[NewSaveData] = None):
+                 save_data: Optional[NewSaveData] = None, headless: bool = False):
+        """
+        Args:
+            headless: whether the CUI is only used for simulations without curses, which also disables rendering
+        """
         self.__init_complete = False
-        super().__init__(width, height)
+        self.__headless = headless
+        # headless CUIs don't have a terminal, so we simulate the smallest one the game can be fully displayed in
+        simulated_terminal = list(PyCuiConfig.get_headless_terminal_dimensions()) if headless else None
+        super().__init__(width, height, simulated_terminal=simulated_terminal)
         PyCuiConfig.set_get_dimensions_callback(self._get_absolute_grid_dimensions)
         self.set_title(f"QRogue {Config.version()}")
         self.__controls = Controls(self._handle_key_presses)
@@ -445,7 +492,7 @@ class QrogueCUI(PyCUI):
             # since _draw is only called once, we have to set the timeout manually for the screen
             self._stdscr.timeout(self._refresh_timeout)
 
-    def start(self, level_name: Optional[str] = None) -> NewSaveData:
+    def __prepare_start(self):
         self.__ow_key_logger.reinit(self.__rm.seed, "meta", self.__save_data.to_keylog_string())
 
         if self.__save_data.is_fresh_save:
@@ -460,6 +507,9 @@ class QrogueCUI(PyCUI):
 
         self.__render([self.__cur_widget_set])
 
+    def start(self, level_name: Optional[str] = None) -> NewSaveData:
+        self.__prepare_start()
+
         # We don't want to handle accidental input on startup of the game (e.g., during play-testing this once closed
         # the introduction popup before it was even visible to the player) so we set our init_complete-flag to True
         # after a short delay. Needs to be in an extra thread so _handle_key_presses() can try to handle the accidental
@@ -476,8 +526,57 @@ class QrogueCUI(PyCUI):
         super(QrogueCUI, self).start()
         return self.__save_data
 
+    def start_headless(self, level_name: Optional[str] = None, error_count: int = 0) -> SimulationReport:
+        """
+        Headless counterpart of start() that runs the simulation set by _set_simulator() until it ends.
+
+        Args:
+            level_name: name of the level to start in or None to start in the menu
+            error_count: number of errors that were logged before the simulation
+
+        Returns:
+            the outcome of the simulation
+        """
+        assert self.__headless and self.__simulator is not None, "Headless starts are only allowed for simulations!"
+        simulator = self.__simulator
+        start_time = time.perf_counter()
+
+        self.__prepare_start()
+        self.__init_complete = True     # there is no accidental input we have to ignore
+        self.__map_manager.set_persist_progress(False)    # simulations must not overwrite the player's auto save
+        if level_name is not None:
+            self.__map_manager.load_map(level_name)
+
+        num_of_keys = 0
+        while self.__simulator is not None:
+            if self.__cur_widget_set is self.__transition:
+                # pretend we waited long enough for the text to be rendered completely
+                self.__transition.fast_forward()
+            key = self.__simulator.next()
+            if key is None:
+                self._end_simulation(can_stop=False)
+            else:
+                num_of_keys += 1
+                super(QrogueCUI, self)._handle_key_presses(key)
+        self.__transition.fast_forward()    # stops the transition's timer if a transition is running
+        duration = time.perf_counter() - start_time
+
+        cur_map = self.__map_manager.cur_map
+        if cur_map is None:
+            score, robot_state = None, None
+        else:
+            robot = cur_map.robot
+            score = robot.score
+            gates = ", ".join([str(gate) for gate in robot.instructions])
+            robot_state = f"{robot.name}: qubits={robot.num_of_qubits}, capacity={robot.capacity}, " \
+                          f"energy={robot.cur_energy}/{robot.max_energy}, keys={robot.key_count()}, gates=[{gates}]"
+        return SimulationReport(simulator.map_name, simulator.seed, num_of_keys, duration,
+                                Logger.instance().error_count - error_count, simulator.is_finished,
+                                self.__save_data.to_comparable_string(), score, robot_state)
+
     def stop(self) -> None:
         self.__ow_key_logger.flush_if_useful()
+        self.__map_manager.cancel_expedition_generation()
         super().stop()
 
     def _conditional_saving(self) -> Tuple[bool, CommonInfos]:
@@ -602,7 +701,8 @@ class QrogueCUI(PyCUI):
         super().apply_widget_set(new_widget_set)
         self.__cur_widget_set = new_widget_set
         self.move_focus(self.__cur_widget_set.get_main_widget(), auto_press_buttons=False)
-        self.__cur_widget_set.render()
+        if not self.__headless:
+            self.__cur_widget_set.render()
 
     def show_message_popup(self, title: str, text: str, color: int = PyCuiColors.WHITE_ON_BLACK) -> None:
         # todo: seems like setting the focused widgets here is no longer needed? but further testing required
@@ -721,7 +821,7 @@ class QrogueCUI(PyCUI):
         self.__map_manager.on_level_start()
         # store the level's seed and save state at the time of playing to the key logger
         self.__key_logger.reinit(level.seed, level.internal_name, self.__save_data.to_keylog_string())
-        self.__ow_key_logger.level_start(level.internal_name)
+        self.__ow_key_logger.level_start(level.internal_name, level.seed, self.__save_data.to_keylog_string())
 
         # reset the score at the start of each level
         level.robot.reset_score()   # needed because the player can restart levels to try again
@@ -826,6 +926,8 @@ class QrogueCUI(PyCUI):
         self.apply_widget_set(self.__transition)
 
     def __render(self, renderables: Optional[List[Renderable]]):
+        if self.__headless:
+            return
         if renderables is None:
             renderables = self.__cur_widget_set.get_widget_list()
         for r in renderables:
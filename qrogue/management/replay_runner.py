@@ -0,0 +1,189 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from qrogue.util import Config, FileTypes, Logger, PathConfig
+from qrogue.util.game_simulator import SimulationReport
+from .qrogue_pycui import QrogueCUI
+
+
+class ReplayResult:
+    """
+    Outcome of replaying a single key log in a worker process of ReplayRunner. Only consists of picklable data.
+    """
+
+    def __init__(self, name: str, wall_time: float, report: Optional[SimulationReport] = None,
+                 error: Optional[str] = None):
+        """
+        :param name: file name of the replayed key log
+        :param wall_time: seconds the worker needed for the whole replay including setting up the game
+        :param report: the report of the headless simulation or None if the replay failed
+        :param error: description of why the replay failed or None if it didn't
+        """
+        self.__name = name
+        self.__wall_time = wall_time
+        self.__report = report
+        self.__error = error
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def wall_time(self) -> float:
+        return self.__wall_time
+
+    @property
+    def report(self) -> Optional[SimulationReport]:
+        return self.__report
+
+    @property
+    def error(self) -> Optional[str]:
+        return self.__error
+
+    @property
+    def failed(self) -> bool:
+        return self.__report is None
+
+    def to_golden(self) -> Dict[str, object]:
+        """
+        :return: the parts of the outcome a later replay of the same key log has to reproduce
+        """
+        return {
+            "finished": self.__report.finished,
+            "error_count": self.__report.error_count,
+            "digest": self.__report.digest,
+            "save_state": self.__report.save_state,
+        }
+
+
+def _init_replay_worker(base_path: str, user_data_path: str):
+    if multiprocessing.get_start_method() != "fork":
+        # a freshly started process doesn't share the parent's configuration
+        PathConfig.load_paths(base_path, user_data_path)
+        Config.load()
+    # the console output of workers is dropped as well
+    sys.stdout = sys.stderr = open(os.devnull, "w")
+    Logger.init_for_worker()
+
+
+def _replay(path: str) -> ReplayResult:
+    start_time = time.time()
+    try:
+        report = QrogueCUI.start_headless_simulation(path, in_keylog_folder=False)
+        error = None if report is not None else "Key log not found"
+    except Exception as ex:
+        report, error = None, f"{type(ex).__name__}: {ex}"
+    return ReplayResult(os.path.basename(path), time.time() - start_time, report, error)
+
+
+class ReplayRunner:
+    """
+    Replays all key logs of a folder headlessly (see QrogueCUI.start_headless_simulation()) in a pool of worker
+    processes. Every key log is replayed in its own process because the game's configuration and Logger are singletons
+    that a replay must not share with other replays. The outcomes can be stored as golden results in the folder, so
+    later runs can report every key log whose outcome diverged.
+    """
+    GOLDEN_FILE = "golden_replays.json"
+
+    def __init__(self, folder: str, num_of_workers: Optional[int] = None):
+        """
+        :param folder: path of the folder containing the key logs
+        :param num_of_workers: how many worker processes are used, defaults to the number of CPUs
+        """
+        self.__folder = folder
+        self.__num_of_workers = os.cpu_count() if num_of_workers is None else num_of_workers
+
+    @property
+    def golden_path(self) -> str:
+        return os.path.join(self.__folder, ReplayRunner.GOLDEN_FILE)
+
+    def key_logs(self) -> List[str]:
+        """
+        :return: sorted paths of all key logs in the folder
+        """
+        return sorted([os.path.join(self.__folder, file) for file in os.listdir(self.__folder)
+                       if file.endswith(FileTypes.KeyLog.value)])
+
+    def run(self) -> List[ReplayResult]:
+        """
+        :return: the results of all key logs in the folder sorted by their name
+        """
+        paths = self.key_logs()
+        if len(paths) <= 0:
+            return []
+        num_of_workers = max(1, min(self.__num_of_workers, len(paths)))
+        with multiprocessing.Pool(num_of_workers, initializer=_init_replay_worker,
+                                  initargs=(PathConfig.base_path(), PathConfig.user_data_path()),
+                                  maxtasksperchild=1) as pool:
+            results = pool.map(_replay, paths, chunksize=1)
+        return sorted(results, key=lambda result: result.name)
+
+    def load_golden(self) -> Dict[str, Dict[str, object]]:
+        """
+        :return: the stored golden results by key log name or an empty dictionary if none were stored yet
+        """
+        if not os.path.exists(self.golden_path):
+            return {}
+        with open(self.golden_path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def store_golden(self, results: List[ReplayResult]):
+        """
+        Stores the outcomes of all successful replays as golden results. Failed replays keep their previous golden
+        result if they had one.
+        """
+        golden = self.load_golden()
+        for result in results:
+            if not result.failed:
+                golden[result.name] = result.to_golden()
+        with open(self.golden_path, "w", encoding="utf-8") as file:
+            json.dump(golden, file, indent=2, sort_keys=True)
+
+    @staticmethod
+    def find_divergences(results: List[ReplayResult], golden: Dict[str, Dict[str, object]]) \
+            -> List[Tuple[str, str]]:
+        """
+        :return: name and reason of every replay that failed or whose outcome differs from its golden result
+        """
+        divergences = []
+        for result in results:
+            if result.failed:
+                divergences.append((result.name, f"failed ({result.error})"))
+            elif result.name in golden:
+                expected = golden[result.name]
+                actual = result.to_golden()
+                differences = [key for key in sorted(expected) if key != "save_state" and expected[key] != actual[key]]
+                if len(differences) > 0:
+                    details = ", ".join([f"{key}: {expected[key]} -> {actual[key]}" for key in differences])
+                    divergences.append((result.name, f"diverged ({details})"))
+        return divergences
+
+    @staticmethod
+    def to_report(results: List[ReplayResult], golden: Dict[str, Dict[str, object]]) -> str:
+        """
+        :return: one line per replay with its timing, statistics and status followed by a summary line
+        """
+        divergences = dict(ReplayRunner.find_divergences(results, golden))
+        lines = []
+        for result in results:
+            if result.failed:
+                stats = "-"
+            else:
+                report = result.report
+                stats = f"{report.num_of_keys} keys, {report.keys_per_second:.0f} keys/s, " \
+                        f"{report.error_count} errors"
+            if result.name in divergences:
+                status = divergences[result.name]
+            elif result.name in golden:
+                status = "ok"
+            else:
+                status = "new"
+            lines.append(f"{result.name}: {result.wall_time:.2f}s, {stats} -> {status}")
+        total_time = sum([result.wall_time for result in results])
+        lines.append(f"Replayed {len(results)} key logs ({total_time:.2f}s in total): {len(divergences)} diverged or "
+                     f"failed")
+        return "\n".join(lines)
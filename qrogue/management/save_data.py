@@ -1,34 +1,50 @@
+from __future__ import annotations  # the generated parser is only imported for type checking
+
+import re
 from datetime import datetime
-from typing import Tuple, Optional, List, Union, Dict
+from typing import Tuple, Optional, List, Union, Dict, TYPE_CHECKING
 
 from antlr4 import InputStream, CommonTokenStream
+from antlr4.tree.Tree import ParseTreeVisitor
 
 from qrogue.game.logic.collectibles import InstructionManager, Instruction
 from qrogue.game.logic.collectibles.instruction import CombinedGate
 from qrogue.graphics.popups import Popup
-from qrogue.management.save_grammar.SaveDataLexer import SaveDataLexer
-from qrogue.management.save_grammar.SaveDataParser import SaveDataParser
-from qrogue.management.save_grammar.SaveDataVisitor import SaveDataVisitor
 from qrogue.util import Logger, CommonInfos, LevelInfo, LevelData, Config, PathConfig, FileTypes, ParserErrorListener, \
-    GateType, GameplayConfig
+    GateType, GameplayConfig, AutoSaver
 from qrogue.util.achievements import Achievement, Unlocks
-from qrogue.util.util_functions import cur_datetime, datetime2str, simple_decode, simple_encode
+from qrogue.util.util_functions import cur_datetime, datetime2str, simple_decode, simple_byte_decode, \
+    simple_byte_encode
+
+if TYPE_CHECKING:
+    from qrogue.management.save_grammar.SaveDataParser import SaveDataParser
 
 
 class NewSaveData:
     __instance = None
     __ENCODING_KEY = "6l5f5BqbldikHYpqE240"
+    # encoded saves start with the codec's prefix and version, e.g., "QRS2:", saves without it use the legacy encoding
+    __CODEC_PREFIX = "QRS"
+    __CODEC_VERSION = 2
+    __CODEC_SEPARATOR = ":"     # not part of the base64 alphabet, so the prefix cannot be confused with encoded data
 
     @staticmethod
     def _encode(data: str, force: bool = False) -> str:
         if not Config.debugging() or force:
-            data = simple_encode(NewSaveData.__ENCODING_KEY, data)
+            data = f"{NewSaveData.__CODEC_PREFIX}{NewSaveData.__CODEC_VERSION}{NewSaveData.__CODEC_SEPARATOR}" \
+                   f"{simple_byte_encode(NewSaveData.__ENCODING_KEY, data)}"
         return data
 
     @staticmethod
     def _decode(data: str) -> str:
         if data.startswith(_SaveDataGenerator.header()):
             return data
+        if data.startswith(NewSaveData.__CODEC_PREFIX):
+            version, separator, encoded = data[len(NewSaveData.__CODEC_PREFIX):] \
+                .partition(NewSaveData.__CODEC_SEPARATOR)
+            if separator and version == str(NewSaveData.__CODEC_VERSION):
+                return simple_byte_decode(NewSaveData.__ENCODING_KEY, encoded)
+        # saves written before the codec was versioned
         return simple_decode(NewSaveData.__ENCODING_KEY, data)
 
     @staticmethod
@@ -244,38 +260,61 @@ class NewSaveData:
     def to_keylog_string(self) -> str:
         return self.to_string()
 
+    def __gates_to_lines(self) -> List[str]:
+        if len(self.__gates) > 0:
+            return [_SaveDataGenerator.gate_separator().join([gate.to_save_string() for gate in self.__gates])]
+        return []
+
     def to_string(self) -> str:
-        text = f"{_SaveDataGenerator.header()}\n"
-        text += f"{datetime2str(self.__date_time)}\n"
+        lines = [_SaveDataGenerator.header(), datetime2str(self.__date_time),
+                 _SaveDataGenerator.inventory_header(), self.__inventory.to_string(),
+                 _SaveDataGenerator.gates_header()]
+        lines += self.__gates_to_lines()
 
-        text += f"{_SaveDataGenerator.inventory_header()}\n"
-        text += f"{self.__inventory.to_string()}\n"
+        lines.append(_SaveDataGenerator.levels_header())
+        lines += [f"{level.name} @ {datetime2str(level.date_time)} {level.duration} "
+                  f"{_SaveDataGenerator.duration_unit()} Score = {level.score}" for level in self.__levels.values()]
 
-        text += f"{_SaveDataGenerator.gates_header()}\n"
-        if len(self.__gates) > 0:
-            text += _SaveDataGenerator.gate_separator().join([gate.to_save_string() for gate in self.__gates])
-            text += "\n"
+        lines.append(_SaveDataGenerator.unlocks_header())
+        lines += [f"{unlock} @ {datetime2str(date_time)}" for unlock, date_time in self.__unlocks.items()]
 
-        text += f"{_SaveDataGenerator.levels_header()}\n"
-        for level in self.__levels.values():
-            text += f"{level.name} @ {datetime2str(level.date_time)} {level.duration} " \
-                    f"{_SaveDataGenerator.duration_unit()} Score = {level.score}\n"
+        lines.append(_SaveDataGenerator.achievements_header())
+        lines += [f"{ach.name} @ {datetime2str(ach.date_time)} Score = {ach.score} out of {ach.done_score}"
+                  for ach in self.__achievements.values()]
 
-        text += f"{_SaveDataGenerator.unlocks_header()}\n"
-        for unlock in self.__unlocks:
-            text += f"{unlock} @ {datetime2str(self.__unlocks[unlock])}\n"
+        lines.append(_SaveDataGenerator.ender())
+        return "\n".join(lines) + "\n"
 
-        text += f"{_SaveDataGenerator.achievements_header()}\n"
-        for ach in self.__achievements.values():
-            text += f"{ach.name} @ {datetime2str(ach.date_time)} Score = {ach.score} out of {ach.done_score}\n"
+    def to_comparable_string(self) -> str:
+        """
+        Returns:
+            the content of to_string() without any dates and durations, so runs with the same outcome (e.g., replays of
+            the same key log) lead to the same string
+        """
+        lines = [_SaveDataGenerator.header(), _SaveDataGenerator.inventory_header(), self.__inventory.to_string(),
+                 _SaveDataGenerator.gates_header()]
+        lines += self.__gates_to_lines()
+
+        lines.append(_SaveDataGenerator.levels_header())
+        lines += [f"{level.name} Score = {level.score}" for level in self.__levels.values()]
+
+        lines.append(_SaveDataGenerator.unlocks_header())
+        lines += [f"{unlock}" for unlock in self.__unlocks]
 
-        return text + f"{_SaveDataGenerator.ender()}\n"
+        lines.append(_SaveDataGenerator.achievements_header())
+        lines += [f"{ach.name} Score = {ach.score} out of {ach.done_score}" for ach in self.__achievements.values()]
+
+        lines.append(_SaveDataGenerator.ender())
+        return "\n".join(lines) + "\n"
 
     def save(self, is_auto_save: bool = False) -> Tuple[bool, CommonInfos]:
         """
+        Auto saves are only snapshotted here and then encoded and written in the background by the AutoSaver, which
+        also merges auto saves requested in quick succession. Manual saves are written before returning.
+
         Returns:
             False if an error occurred during saving, True if saving behaved as expected (i.e., latest save state is
-            persisted)
+            persisted or, for auto saves, scheduled to be persisted)
         """
         if Config.forbid_saving():
             return False, CommonInfos.NoSavingWithCheats
@@ -284,11 +323,13 @@ class NewSaveData:
 
         try:
             self.__date_time = cur_datetime()  # update datetime of the latest save (=now)
-            data = self._encode(self.to_string())
             if is_auto_save:
-                PathConfig.write_auto_save(data)
+                auto_saver = AutoSaver.instance()
+                for error in auto_saver.take_errors():  # failures of previous auto saves
+                    Logger.instance().error(f"Exception occurred during auto saving: {error}", False, False)
+                auto_saver.schedule(PathConfig.auto_save_path(), self.to_string, self._encode)
             else:
-                PathConfig.new_save_file(data)
+                PathConfig.new_save_file(self._encode(self.to_string()))
                 self.__has_unsaved_changes = False  # only change flag if it was a manual (i.e., no auto) save
             return True, CommonInfos.SavingSuccessful
 
@@ -342,7 +383,11 @@ class NewSaveData:
         self.__has_unsaved_changes = True
 
 
-class _SaveDataGenerator(SaveDataVisitor):
+class _SaveDataGenerator(ParseTreeVisitor):
+    """
+    Visits the parse tree of a save file. Instead of the generated SaveDataVisitor it extends the generic base class of
+    said visitor, so the slow to import generated parser is only imported once a save file is actually parsed.
+    """
     class Inventory:
         @staticmethod
         def default() -> "_SaveDataGenerator.Inventory":
@@ -359,6 +404,23 @@ class _SaveDataGenerator(SaveDataVisitor):
         def __str__(self):
             return f"Inventory({self.quantum_fuser})"
 
+    # patterns of the lines NewSaveData.to_string() writes, used to read saves without the generated parser
+    __DATE_TIME_PATTERN = r"(\d\d)d(\d\d)m(\d{4})y (\d\d):(\d\d):(\d\d)"
+    __DATE_TIME = re.compile(__DATE_TIME_PATTERN)
+    __INVENTORY = re.compile(r"QuantumFuser (\d+)")
+    __STD_GATE = re.compile(r"[A-Za-z]+")
+    __COMBINED_GATE = re.compile(r"combined\{\"([^\"]*)\" (\d+): (.+)}")
+    __BACKGROUND_GATES = re.compile(r"[A-Za-z]+\(\d+(?:,\d+)*\)(?:,[A-Za-z]+\(\d+(?:,\d+)*\))*")
+    __BACKGROUND_GATE = re.compile(r"([A-Za-z]+)\((\d+(?:,\d+)*)\)")
+    # level names need a digit, otherwise they are lexed as NAME_STD instead of NAME_SPECIAL
+    __LEVEL = re.compile(rf"([A-Za-z]+\d[A-Za-z\d]*) @ {__DATE_TIME_PATTERN} (\d+) seconds Score = (\d+)")
+    __UNLOCK = re.compile(rf"([A-Za-z]+) @ {__DATE_TIME_PATTERN}")
+    __ACHIEVEMENT = re.compile(rf"([A-Za-z]+) @ {__DATE_TIME_PATTERN} Score = (\d+) out of (\d+)")
+    # names the lexer would tokenize as keywords instead
+    __KEYWORDS = {"QuantumFuser", "seconds", "combined", "Score", "out", "of", "North", "East", "South", "West",
+                  "tutorial", "trigger"}
+    __SECTIONS = ["[INVENTORY]", "[GATES]", "[LEVELS]", "[UNLOCKS]", "[ACHIEVEMENTS]"]
+
     @staticmethod
     def header() -> str:
         return "Qrogue<"
@@ -405,6 +467,20 @@ class _SaveDataGenerator(SaveDataVisitor):
 
     def load(self, file_data: str) -> Tuple[datetime, Inventory, List[Instruction], List[LevelData],
              List[Tuple[str, datetime]], List[Achievement]]:
+        """
+        Reads saves in the layout of NewSaveData.to_string() in a single pass over their lines. Everything else the
+        grammar allows (e.g., other line breaks or comments) as well as invalid saves are parsed by ANTLR.
+        """
+        try:
+            data = _SaveDataGenerator.__read(file_data)
+        except ValueError:
+            return self.__load_with_parser(file_data)
+        return self.__build(*data)
+
+    def __load_with_parser(self, file_data: str) -> Tuple[datetime, Inventory, List[Instruction], List[LevelData],
+                                                         List[Tuple[str, datetime]], List[Achievement]]:
+        from qrogue.management.save_grammar.SaveDataLexer import SaveDataLexer
+        from qrogue.management.save_grammar.SaveDataParser import SaveDataParser
         input_stream = InputStream(file_data)
         lexer = SaveDataLexer(input_stream)
         token_stream = CommonTokenStream(lexer)
@@ -413,6 +489,171 @@ class _SaveDataGenerator(SaveDataVisitor):
 
         return self.visitStart(parser.start())
 
+    @staticmethod
+    def __read_date_time(match: re.Match, index: int) -> datetime:
+        day, month, year, hour, minute, second = [int(val) for val in match.group(*range(index, index + 6))]
+        return datetime(year, month, day, hour, minute, second)
+
+    @staticmethod
+    def __check_name(name: str) -> str:
+        if name in _SaveDataGenerator.__KEYWORDS:
+            raise ValueError(f"Keyword used as name: {name}")
+        return name
+
+    @staticmethod
+    def __read_gate(text: str) -> Tuple[str, Optional[Tuple[int, List[Tuple[str, List[int]]]]]]:
+        """
+        :return: the gate's name and for CombinedGates also their number of qubits and background gates (name, qargs)
+        """
+        if _SaveDataGenerator.__STD_GATE.fullmatch(text):
+            _SaveDataGenerator.__check_name(text)
+            return text, None
+        match = _SaveDataGenerator.__COMBINED_GATE.fullmatch(text)
+        if match is None or not _SaveDataGenerator.__BACKGROUND_GATES.fullmatch(match.group(3)):
+            raise ValueError(f"Invalid gate: {text}")
+        background_gates = [(_SaveDataGenerator.__check_name(name), [int(qubit) for qubit in qubits.split(",")])
+                            for name, qubits in _SaveDataGenerator.__BACKGROUND_GATE.findall(match.group(3))]
+        return match.group(1), (int(match.group(2)), background_gates)
+
+    @staticmethod
+    def __read(file_data: str) -> tuple:
+        """
+        Reads the values of a save without creating any objects yet, so failing halfway through has no side effects.
+
+        :raises ValueError: if file_data doesn't follow the layout of NewSaveData.to_string()
+        """
+        sections: Dict[str, List[str]] = {}
+        date_time, section, has_ended = None, None, False
+        for line in file_data.splitlines():
+            line = line.strip()
+            if len(line) <= 0:
+                continue
+            if has_ended:
+                raise ValueError(f"Unexpected line after the end of the save: {line}")
+            if date_time is None:
+                if section is None:
+                    if line != _SaveDataGenerator.header():
+                        raise ValueError(f"Expected header instead of: {line}")
+                    section = line
+                else:
+                    match = _SaveDataGenerator.__DATE_TIME.fullmatch(line)
+                    if match is None:
+                        raise ValueError(f"Invalid date: {line}")
+                    date_time = _SaveDataGenerator.__read_date_time(match, 1)
+            elif line in _SaveDataGenerator.__SECTIONS:
+                if line in sections or len(sections) > 0 and \
+                        _SaveDataGenerator.__SECTIONS.index(line) < _SaveDataGenerator.__SECTIONS.index(section):
+                    raise ValueError(f"Unexpected section: {line}")
+                section = line
+                sections[section] = []
+            elif line == _SaveDataGenerator.ender():
+                has_ended = True
+            elif section in sections:
+                sections[section].append(line)
+            else:
+                raise ValueError(f"Line outside of sections: {line}")
+        if not has_ended or any(header not in sections for header in _SaveDataGenerator.__SECTIONS[1:]):
+            raise ValueError("Save is incomplete")
+
+        quantum_fuser = None
+        if _SaveDataGenerator.inventory_header() in sections:
+            inventory = sections[_SaveDataGenerator.inventory_header()]
+            match = _SaveDataGenerator.__INVENTORY.fullmatch(inventory[0]) if len(inventory) == 1 else None
+            if match is None:
+                raise ValueError(f"Invalid inventory: {inventory}")
+            quantum_fuser = int(match.group(1))
+
+        gates = [_SaveDataGenerator.__read_gate(gate.strip())
+                 for line in sections[_SaveDataGenerator.gates_header()]
+                 for gate in line.split(_SaveDataGenerator.gate_separator()) if len(gate.strip()) > 0]
+
+        def read_lines(header: str, pattern: re.Pattern) -> List[re.Match]:
+            matches = [pattern.fullmatch(line) for line in sections[header]]
+            if None in matches:
+                raise ValueError(f"Invalid line in {header}")
+            for match in matches:
+                _SaveDataGenerator.__check_name(match.group(1))
+            return matches
+
+        levels = [(match.group(1), _SaveDataGenerator.__read_date_time(match, 2), int(match.group(8)),
+                   int(match.group(9)))
+                  for match in read_lines(_SaveDataGenerator.levels_header(), _SaveDataGenerator.__LEVEL)]
+        unlocks = [(match.group(1), _SaveDataGenerator.__read_date_time(match, 2))
+                   for match in read_lines(_SaveDataGenerator.unlocks_header(), _SaveDataGenerator.__UNLOCK)]
+        achievements = [(match.group(1), _SaveDataGenerator.__read_date_time(match, 2), int(match.group(8)),
+                         int(match.group(9)))
+                        for match in read_lines(_SaveDataGenerator.achievements_header(),
+                                                _SaveDataGenerator.__ACHIEVEMENT)]
+        return date_time, quantum_fuser, gates, levels, unlocks, achievements
+
+    def __build(self, date_time: datetime, quantum_fuser: Optional[int],
+                gates: List[Tuple[str, Optional[Tuple[int, List[Tuple[str, List[int]]]]]]],
+                levels: List[Tuple[str, datetime, int, int]], unlocks: List[Tuple[str, datetime]],
+                achievements: List[Tuple[str, datetime, int, int]]) \
+            -> Tuple[datetime, Inventory, List[Instruction], List[LevelData], List[Tuple[str, datetime]],
+                     List[Achievement]]:
+        if quantum_fuser is None:
+            inventory = _SaveDataGenerator.Inventory.default()
+        else:
+            inventory = _SaveDataGenerator.Inventory(quantum_fuser)
+
+        gate_list = []
+        for name, combined_data in gates:
+            if combined_data is None:
+                gate = InstructionManager.instruction_from_name(name)
+            else:
+                num_of_qubits, background_gates = combined_data
+                gate = self.__to_combined_gate(name, num_of_qubits, [self.__to_background_gate(bg_name, qubits)
+                                                                     for bg_name, qubits in background_gates])
+            if gate is not None:
+                gate_list.append(gate)
+
+        level_list = [self.__to_level(name, level_date_time, duration, score)
+                      for name, level_date_time, duration, score in levels]
+        achievement_list = [Achievement(name, score, done_score, ach_date_time)
+                            for name, ach_date_time, score, done_score in achievements]
+        self.__apply_knowledge_mode()
+        return date_time, inventory, gate_list, level_list, unlocks, achievement_list
+
+    def __to_background_gate(self, name: str, qubits: List[int]) -> Optional[Instruction]:
+        gate = InstructionManager.instruction_from_name(name)
+        if gate is None: return None
+
+        gate.setup(qubits)
+        return gate
+
+    def __to_combined_gate(self, name: str, num_of_qubits: int, gate_list: List[Optional[Instruction]]) \
+            -> Optional[Instruction]:
+        if None in gate_list:
+            Logger.instance().error(f"Failed to load a background gate of CombinedGate \"{name}\"")
+            return None
+        return CombinedGate(gate_list, num_of_qubits, name)
+
+    def __to_level(self, name: str, date_time: datetime, duration: int, score: int) -> LevelData:
+        level_data = LevelData(name, date_time, duration, score)
+
+        # find out which knowledge mode the highest level has
+        km, ln = level_data.knowledge_mode, level_data.level_num
+        if self.__knowledge_mode is None:
+            # initialize knowledge mode regardless (could still be null if level has no knowledge mode)
+            self.__knowledge_mode = km
+        elif km is not None and ln is not None:
+            # only set it if km and ln are not None (if km is None, we don't have any information anyways, and if ln is
+            #  None we cannot compare it to the highest level anyways)
+            if km != self.__knowledge_mode and ln is not None and ln > self.__highest_knowledge_level:
+                # set new value for knowledge mode if km differs and comes from a higher level
+                self.__knowledge_mode = km
+            # store new highest level regardless of whether knowledge mode changed (if it did, we already know that ln
+            #  is greater than the current highest level, else we stay in the same mode and also want to update highest
+            #  level)
+            self.__highest_knowledge_level = max(self.__highest_knowledge_level, ln)
+
+        return level_data
+
+    def __apply_knowledge_mode(self):
+        if not GameplayConfig.set_knowledge_mode(self.__knowledge_mode):
+            Logger.instance().warn(f"Failed to set knowledge mode to \"{self.__knowledge_mode}\"", from_pycui=False)
+
     #####################################
 
     def visitDate_time(self, ctx: SaveDataParser.Date_timeContext) -> datetime:
@@ -446,22 +687,14 @@ class _SaveDataGenerator(SaveDataVisitor):
     #####################################
 
     def visitBackground_gate(self, ctx: SaveDataParser.Background_gateContext) -> Optional[Instruction]:
-        gate = InstructionManager.instruction_from_name(ctx.NAME_STD().getText())
-        if gate is None: return None
-
-        qubits = [self.visitValue(val) for val in ctx.value()]
-        gate.setup(qubits)
-        return gate
+        return self.__to_background_gate(ctx.NAME_STD().getText(), [self.visitValue(val) for val in ctx.value()])
 
     def visitCombined_gate(self, ctx: SaveDataParser.Combined_gateContext) -> Optional[Instruction]:
         name = ctx.TEXT().getText()[1:-1]   # remove leading and trailing quotation mark
         num_of_qubits = self.visitValue(ctx.value())
 
         gate_list = [self.visitBackground_gate(bg_ctx) for bg_ctx in ctx.background_gate()]
-        if None in gate_list:
-            Logger.instance().error(f"Failed to load a background gate of CombinedGate \"{name}\"")
-            return None
-        return CombinedGate(gate_list, num_of_qubits, name)
+        return self.__to_combined_gate(name, num_of_qubits, gate_list)
 
     def visitGate(self, ctx: SaveDataParser.GateContext) -> Optional[Instruction]:
         if ctx.combined_gate() is None:
@@ -484,25 +717,7 @@ class _SaveDataGenerator(SaveDataVisitor):
         date_time = self.visitDate_time(ctx.date_time())
         duration = self.visitDuration(ctx.duration())
         score = self.visitScore(ctx.score())
-        level_data = LevelData(name, date_time, duration, score)
-
-        # find out which knowledge mode the highest level has
-        km, ln = level_data.knowledge_mode, level_data.level_num
-        if self.__knowledge_mode is None:
-            # initialize knowledge mode regardless (could still be null if level has no knowledge mode)
-            self.__knowledge_mode = km
-        elif km is not None and ln is not None:
-            # only set it if km and ln are not None (if km is None, we don't have any information anyways, and if ln is
-            #  None we cannot compare it to the highest level anyways)
-            if km != self.__knowledge_mode and ln is not None and ln > self.__highest_knowledge_level:
-                # set new value for knowledge mode if km differs and comes from a higher level
-                self.__knowledge_mode = km
-            # store new highest level regardless of whether knowledge mode changed (if it did, we already know that ln
-            #  is greater than the current highest level, else we stay in the same mode and also want to update highest
-            #  level)
-            self.__highest_knowledge_level = max(self.__highest_knowledge_level, ln)
-
-        return level_data
+        return self.__to_level(name, date_time, duration, score)
 
     def visitLevels(self, ctx: SaveDataParser.LevelsContext) -> List[LevelData]:
         return [self.visitLevel(level) for level in ctx.level()]
@@ -544,7 +759,5 @@ class _SaveDataGenerator(SaveDataVisitor):
         unlocks = self.visitUnlocks(ctx.unlocks())
         achievement_list = self.visitAchievements(ctx.achievements())
 
-        if not GameplayConfig.set_knowledge_mode(self.__knowledge_mode):
-            Logger.instance().warn(f"Failed to set knowledge mode to \"{self.__knowledge_mode}\"", from_pycui=False)
-
+        self.__apply_knowledge_mode()
         return date_time, inventory, gates, levels, unlocks, achievement_list
@@ -2,11 +2,12 @@ import random
 import sys
 from typing import Tuple, List, Optional
 
-from qrogue.game.world.dungeon_generator import QrogueLevelGenerator
+from qrogue.game.puzzle_bank import PuzzleBank
+from qrogue.game.world.dungeon_generator import QrogueLevelGenerator, LevelParseCache
 from qrogue.game.world.dungeon_generator.wave_function_collapse import WFCManager
 from qrogue.game.world.map import CallbackPack
-from qrogue.management import QrogueCUI
-from qrogue.util import Logger, Config, PyCuiConfig, PathConfig, GameplayConfig, Options
+from qrogue.management import QrogueCUI, ReplayRunner
+from qrogue.util import Logger, Config, PyCuiConfig, PathConfig, GameplayConfig, Options, PuzzleConfig, ImportProfiler
 
 
 def __init_singletons(seed: int):
@@ -37,9 +38,16 @@ def start_qrogue() -> int:
     __USER_DATA_PATH_ARGUMENT = ["--user-data", "-ud"]  # path argument
     # __CONTROLS_ARGUMENT = ["--controls", "-c"]          # int argument
     __SIMULATION_FILE_ARGUMENT = ["--simulation-path", "-sp"]  # path argument
+    __HEADLESS_ARGUMENT = ["--headless", "-hl"]  # only used together with __SIMULATION_FILE_ARGUMENT
+    __CHECKPOINT_ARGUMENT = ["--checkpoint", "-cp"]  # int argument, only used together with __SIMULATION_FILE_ARGUMENT
     __VALIDATE_MAP_ARGUMENT = ["--validate-map", "-vm"]  # path argument
     __PLAY_LEVEL_ARGUMENT = ["--play-level", "-pl"]  # str argument
     __UPDATE_WFC = ["--update-wfc", "-wfc"]
+    __PREBUILD_LEVEL_CACHE = ["--prebuild-level-cache", "-plc"]
+    __REPLAY_FOLDER_ARGUMENT = ["--replay-folder", "-rf"]  # path argument
+    __REPLAY_WORKERS_ARGUMENT = ["--replay-workers", "-rw"]  # int argument, only used with __REPLAY_FOLDER_ARGUMENT
+    __UPDATE_GOLDEN_ARGUMENT = ["--update-golden", "-ug"]  # only used together with __REPLAY_FOLDER_ARGUMENT
+    __PROFILE_STARTUP_ARGUMENT = ["--profile-startup", "-ps"]
 
     from_console, _ = __parse_argument(__CONSOLE_ARGUMENT)
     debugging, _ = __parse_argument(__DEBUG_ARGUMENT)
@@ -47,13 +55,26 @@ def start_qrogue() -> int:
     _, data_folder = __parse_argument(__GAME_DATA_PATH_ARGUMENT, has_value=True)
     _, user_data_folder = __parse_argument(__USER_DATA_PATH_ARGUMENT, has_value=True)
     has_simulation_path, simulation_path = __parse_argument(__SIMULATION_FILE_ARGUMENT, has_value=True)
+    headless, _ = __parse_argument(__HEADLESS_ARGUMENT)
+    _, checkpoint = __parse_argument(__CHECKPOINT_ARGUMENT, has_value=True)
     has_map_path, map_path = __parse_argument(__VALIDATE_MAP_ARGUMENT, has_value=True)
     _, seed = __parse_argument(__SEED_ARGUMENT, has_value=True)
     has_play_level, level2play = __parse_argument(__PLAY_LEVEL_ARGUMENT, has_value=True)
     has_update_wfc, _ = __parse_argument(__UPDATE_WFC)
-
-    if has_update_wfc:
+    has_prebuild_level_cache, _ = __parse_argument(__PREBUILD_LEVEL_CACHE)
+    has_replay_folder, replay_folder = __parse_argument(__REPLAY_FOLDER_ARGUMENT, has_value=True)
+    _, replay_workers = __parse_argument(__REPLAY_WORKERS_ARGUMENT, has_value=True)
+    update_golden, _ = __parse_argument(__UPDATE_GOLDEN_ARGUMENT)
+    has_profile_startup, _ = __parse_argument(__PROFILE_STARTUP_ARGUMENT)
+
+    if has_profile_startup:
+        return profile_startup()
+    elif has_update_wfc:
         update_wfc()
+    elif has_prebuild_level_cache:
+        return prebuild_level_cache(data_folder, user_data_folder)
+    elif has_replay_folder:
+        return replay_folder_of_key_logs(replay_folder, replay_workers, update_golden, data_folder, user_data_folder)
     elif has_map_path:
         if validate_map(map_path):
             return 0
@@ -61,7 +82,14 @@ def start_qrogue() -> int:
             return 1
     else:
         if has_simulation_path:
-            return simulate_game(simulation_path, from_console, debugging, data_folder, user_data_folder)
+            if checkpoint is not None:
+                try:
+                    checkpoint = int(checkpoint)
+                except ValueError:
+                    print(f"[Qrogue] Invalid checkpoint: {checkpoint}")
+                    return 1
+            return simulate_game(simulation_path, from_console, debugging, data_folder, user_data_folder, headless,
+                                 checkpoint)
         elif has_play_level:
             return play_level(level2play, debugging, data_folder, seed)
         else:
@@ -104,6 +132,7 @@ def start_game(from_console: bool = False, debugging: bool = False, test_level:
         print(f"[Qrogue] Starting game with seed = {seed}")
         try:
             __init_singletons(seed)
+            PuzzleBank.open(PathConfig.user_data_path(PuzzleConfig.BANK_FILE))
             save_data = QrogueCUI(seed).start()
         except PyCuiConfig.OutOfBoundsError:
             # print("[Qrogue] ERROR!")
@@ -120,6 +149,7 @@ def start_game(from_console: bool = False, debugging: bool = False, test_level:
                 print("[Qrogue] Successfully saved the game!")
             else:
                 Logger.instance().error(f"Failed to save the game: {message.text}", show=False, from_pycui=False)
+        PuzzleBank.close()
         Logger.instance().flush()
         print("[Qrogue] Successfully flushed all logs and shut down the game without any problems. See you next time!")
     else:
@@ -137,7 +167,7 @@ def start_game(from_console: bool = False, debugging: bool = False, test_level:
 
 
 def simulate_game(simulation_path: str, from_console: bool = False, debugging: bool = False, data_folder: str = None,
-                  user_data_folder: str = None) -> int:
+                  user_data_folder: str = None, headless: bool = False, checkpoint: Optional[int] = None) -> int:
     if PathConfig.load_paths(data_folder, user_data_folder):
         return_code = Config.load()  # NEEDS TO BE THE FIRST THING WE DO!
     else:
@@ -147,9 +177,20 @@ def simulate_game(simulation_path: str, from_console: bool = False, debugging: b
             Config.activate_debugging()
 
         print(f"[Qrogue] Simulating the game recorded at \"{simulation_path}\"")
+        if headless:
+            __init_singletons(seed=PathConfig.get_seed_from_key_log_file(simulation_path))
+            report = QrogueCUI.start_headless_simulation(simulation_path, checkpoint=checkpoint)
+            PuzzleBank.close()
+            Logger.instance().flush()
+            if report is None:
+                print("Simulation failed! Please read the logs to find the reason.")
+                return 1
+            print(f"[Qrogue] {report}")
+            return 0
+
         try:
             __init_singletons(seed=PathConfig.get_seed_from_key_log_file(simulation_path))
-            save_data = QrogueCUI.start_simulation(simulation_path)
+            save_data = QrogueCUI.start_simulation(simulation_path, checkpoint=checkpoint)
         except PyCuiConfig.OutOfBoundsError:
             # print("[Qrogue] ERROR!")
             # print("Your terminal window is too small. "
@@ -169,6 +210,7 @@ def simulate_game(simulation_path: str, from_console: bool = False, debugging: b
                 print("[Qrogue] Successfully saved the game!")
             else:
                 Logger.instance().error(f"Failed to save the game: {message.text}", show=False, from_pycui=False)
+        PuzzleBank.close()
         Logger.instance().flush()
         print("[Qrogue] Successfully flushed all logs and shut down the game without any problems. See you next time!")
     else:
@@ -249,6 +291,7 @@ def play_level(level_name: str, debugging: bool = False, data_folder: str = None
             sys.exit(1)
 
         # flush after the player stopped playing
+        PuzzleBank.close()
         Logger.instance().flush()
         print("[Qrogue] Successfully flushed all logs and shut down the game without any problems. See you next time!")
     else:
@@ -265,5 +308,64 @@ def update_wfc():
     wfc_manager = WFCManager()
     wfc_manager.learn()
     wfc_manager.store()
+    wfc_manager.store_binary()
     Logger.instance().info("WFC matrices updated successfully", from_pycui=False)
     Logger.instance().flush()
+
+
+def prebuild_level_cache(data_folder: str = None, user_data_folder: str = None) -> int:
+    if PathConfig.load_paths(data_folder, user_data_folder):
+        return_code = Config.load()
+    else:
+        return_code = 1
+    if return_code == 0:
+        Logger(print)
+        num_of_cached, num_of_failed = LevelParseCache.prebuild()
+        Logger.instance().info(f"Cached the parse trees of {num_of_cached} levels ({num_of_failed} failed)",
+                               from_pycui=False)
+        Logger.instance().flush()
+        if num_of_failed > 0:
+            return_code = 1
+    else:
+        print(f"[Qrogue] Error #{return_code}: failed to load the config")
+    return return_code
+
+
+def profile_startup() -> int:
+    print("[Qrogue] Measuring the imports needed to start the game...")
+    try:
+        records = ImportProfiler.measure()
+    except RuntimeError as ex:
+        print(f"[Qrogue] {ex}")
+        return 1
+    print(ImportProfiler.to_report(records))
+    return 0
+
+
+def replay_folder_of_key_logs(folder: str, num_of_workers: Optional[str] = None, update_golden: bool = False,
+                              data_folder: str = None, user_data_folder: str = None) -> int:
+    if PathConfig.load_paths(data_folder, user_data_folder):
+        return_code = Config.load()
+    else:
+        return_code = 1
+    if return_code == 0:
+        if num_of_workers is not None:
+            try:
+                num_of_workers = int(num_of_workers)
+            except ValueError:
+                print(f"[Qrogue] Invalid number of workers: {num_of_workers}")
+                return 1
+
+        print(f"[Qrogue] Replaying all key logs in \"{folder}\"")
+        runner = ReplayRunner(folder, num_of_workers)
+        golden = runner.load_golden()
+        results = runner.run()
+        print(ReplayRunner.to_report(results, golden))
+        if update_golden:
+            runner.store_golden(results)
+            print(f"[Qrogue] Stored golden results at \"{runner.golden_path}\"")
+        if len(ReplayRunner.find_divergences(results, golden)) > 0:
+            return_code = 1
+    else:
+        print(f"[Qrogue] Error #{return_code}: failed to load the config")
+    return return_code
@@ -1,19 +1,27 @@
 
+from .auto_saver_tests import AutoSaverTestCase
 from .config_tests import MyOptionsTest
 from .control_tests import ControlTests
 from .fusion_tests import FusionTestCase
 from .generation_tests import LayoutGenTestCase, LevelGenTestCase
-from .key_logger_tests import KeyLoggingTestCase
+from .import_tests import ImportProfilerTestCase
+from .key_logger_tests import KeyLoggingTestCase, KeyLogReaderTestCase
+from .logger_tests import AsyncFileWriterTestCase, LoggerTestCase
 from .popup_tests import MyPopupTests
 from .puzzle_generation_tests import ManuelPuzzleGenTestCase
 from .random_tests import MyRandomTests
-from .save_load_test import SaveDataOverhaulTests
+from .rendering_tests import MultiColorRendererTestCase
+from .save_load_test import SaveDataOverhaulTests, SaveEncodingTestCases, SaveParsingTestCase
+from .simulation_tests import HeadlessSimulationTestCase, ReplayRunnerTestCase
+from .simulator_tests import CircuitMatrixTestCase, GateMatrixTestCase, NativeBackendTestCase, RobotCircuitTestCase, \
+    UnitaryCacheTestCase
+from .statevector_tests import StateVectorTestCase
 from .test_util import *
 from .validation_tests import ValidationTests
 from .wfc_tests import WFCGeneratorTestCases, WaveFunctionTestCase
 
 # manuel tests:
-# - simulation_tests.py (needs to simulate a terminal)
+# - simulation_tests.py (needs to simulate a terminal, except for HeadlessSimulationTestCase and ReplayRunnerTestCase)
 # - transition_tests.py (needs to simulate a terminal)
-# - state_vector_tests.py
+# - statevector_tests.py (prints its results, except for StateVectorTestCase)
 # - selection_tests.py
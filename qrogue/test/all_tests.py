@@ -1,9 +1,11 @@
 import unittest
 
-from qrogue.test import SaveDataOverhaulTests
-from qrogue.test import MyOptionsTest, ControlTests, FusionTestCase, LayoutGenTestCase, LevelGenTestCase, \
-    MyPopupTests, ManuelPuzzleGenTestCase, MyRandomTests, ValidationTests, \
-    WFCGeneratorTestCases, WaveFunctionTestCase
+from qrogue.test import SaveDataOverhaulTests, SaveEncodingTestCases, SaveParsingTestCase
+from qrogue.test import MyOptionsTest, AsyncFileWriterTestCase, AutoSaverTestCase, CircuitMatrixTestCase, \
+    ControlTests, FusionTestCase, GateMatrixTestCase, HeadlessSimulationTestCase, ImportProfilerTestCase, \
+    KeyLogReaderTestCase, LayoutGenTestCase, LevelGenTestCase, LoggerTestCase, MyPopupTests, ManuelPuzzleGenTestCase, \
+    MultiColorRendererTestCase, MyRandomTests, NativeBackendTestCase, ReplayRunnerTestCase, ValidationTests, \
+    RobotCircuitTestCase, StateVectorTestCase, UnitaryCacheTestCase, WFCGeneratorTestCases, WaveFunctionTestCase
 # for some reason KeyLoggingTestCase cannot find test_data it's called from here
 # from qrogue.test import KeyLoggingTestCase
 
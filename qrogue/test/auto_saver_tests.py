@@ -0,0 +1,88 @@
+import os
+import tempfile
+import time
+import unittest
+
+from qrogue.util import AsyncFileWriter, AutoSaver, PathConfig
+
+
+class AutoSaverTestCase(unittest.TestCase):
+    @staticmethod
+    def read(path: str) -> str:
+        with open(path) as file:
+            return file.read()
+
+    @staticmethod
+    def wait_for(condition, timeout: float = 5.0):
+        end = time.perf_counter() + timeout
+        while not condition() and time.perf_counter() < end:
+            time.sleep(0.01)
+
+    def test_debounce(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "save.qrsave")
+            saver = AutoSaver(debounce=0.05, max_delay=5.0)
+            for i in range(10):
+                saver.schedule(path, lambda: f"state {i}", str.upper)
+            self.wait_for(lambda: saver.num_of_writes > 0)
+
+            # only the latest snapshot of the burst is written
+            self.assertEqual("STATE 9", self.read(path))
+            self.assertEqual((10, 1, 9), (saver.num_of_requests, saver.num_of_writes, saver.num_of_coalesced_requests))
+            self.assertEqual(0, saver.num_of_pending_saves)
+            self.assertEqual(["save.qrsave"], os.listdir(folder))   # no temporary file is left behind
+            self.assertGreaterEqual(saver.max_latency, 0.05)
+
+            # close() writes pending saves right away
+            saver.schedule(path, lambda: "final")
+            saver.close()
+            self.assertEqual("final", self.read(path))
+            self.assertRaises(AssertionError, saver.schedule, path, lambda: "closed")
+
+    def test_max_delay(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "save.qrsave")
+            saver = AutoSaver(debounce=0.2, max_delay=0.3)
+            # the requests come faster than the debounce time but still have to be written eventually
+            end = time.perf_counter() + 1.5
+            while time.perf_counter() < end and saver.num_of_writes <= 0:
+                saver.schedule(path, lambda: "burst")
+                time.sleep(0.02)
+            self.assertGreater(saver.num_of_writes, 0)
+            self.assertEqual("burst", self.read(path))
+            saver.close()
+
+    def test_failure(self):
+        def fail(text: str) -> str:
+            raise ValueError(text)
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "save.qrsave")
+            PathConfig.write_atomic(path, "previous", in_user_path=False)
+            saver = AutoSaver(debounce=10, max_delay=10)
+            saver.schedule(path, lambda: "broken", fail)
+            saver.schedule(os.path.join(folder, "other.qrsave"), lambda: "other")
+            self.assertEqual(2, saver.num_of_pending_saves)
+            saver.flush()
+
+            # the previous content survives a failed save and the error is only reported once
+            self.assertEqual("previous", self.read(path))
+            self.assertEqual("other", self.read(os.path.join(folder, "other.qrsave")))
+            self.assertEqual((1, 1), (saver.num_of_writes, saver.num_of_failures))
+            self.assertEqual(1, len(saver.take_errors()))
+            self.assertEqual([], saver.take_errors())
+            self.assertEqual({"save.qrsave", "other.qrsave"}, set(os.listdir(folder)))
+            saver.close()
+
+    def test_instance(self):
+        saver = AutoSaver.instance()
+        self.assertIs(saver, AutoSaver.instance())
+        self.assertIsNot(saver, AsyncFileWriter.instance())     # every subclass has its own shared instance
+        # a closed shared instance is replaced
+        saver.close()
+        self.assertIsNot(saver, AutoSaver.instance())
+        self.assertFalse(AutoSaver.instance().is_closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
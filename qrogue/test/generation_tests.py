@@ -5,13 +5,14 @@ import test_util
 from qrogue.game.logic.actors.controllables.robot import RoboProperties
 from qrogue.game.logic.collectibles import instruction as gates
 from qrogue.game.world import tiles
-from qrogue.game.world.dungeon_generator import DungeonGenerator
+from qrogue.game.world.dungeon_generator import DungeonGenerator, ExpeditionRecipe, QrogueLevelGenerator, \
+    LevelParseCache
 from qrogue.game.world.dungeon_generator.random_generator import RandomLayoutGenerator, ExpeditionGenerator
 from qrogue.game.world.dungeon_generator.wave_function_collapse import WFCManager
 from qrogue.game.world.map import Room, Hallway, CallbackPack, ExpeditionMap
 from qrogue.game.world.navigation import Direction, Coordinate
-from qrogue.management import MapManager
-from qrogue.util import CheatConfig, StvDifficulty, MapConfig
+from qrogue.management import MapManager, ExpeditionPool, ExpeditionWorkItem
+from qrogue.util import CheatConfig, StvDifficulty, MapConfig, PathConfig
 
 
 class LayoutGenTestCase(test_util.SingletonSetupTestCase):
@@ -49,6 +50,20 @@ class LayoutGenTestCase(test_util.SingletonSetupTestCase):
             self._print(wrong_specials_seeds)
             self._print()
 
+    def test_path_connection(self):
+        for legacy in [False, True]:
+            for seed in range(50000, 50020):
+                map_gen = RandomLayoutGenerator(DungeonGenerator.WIDTH, DungeonGenerator.HEIGHT, legacy=legacy)
+                self.assertTrue(map_gen.generate(seed, validate=True), f"Failed to generate: {map_gen}")
+                layout = str(map_gen)
+
+                # reusing a generator or creating a new one must not change the layout of a seed
+                self.assertTrue(map_gen.generate(seed, validate=True))
+                self.assertEqual(layout, str(map_gen))
+                other_gen = RandomLayoutGenerator(DungeonGenerator.WIDTH, DungeonGenerator.HEIGHT, legacy=legacy)
+                other_gen.generate(seed, validate=True)
+                self.assertEqual(layout, str(other_gen))
+
 
 class LevelGenTestCase(test_util.SingletonSetupTestCase):
     @staticmethod
@@ -58,6 +73,41 @@ class LevelGenTestCase(test_util.SingletonSetupTestCase):
         return ExpeditionGenerator(wfc_manager, lambda s: True, lambda s: None, lambda: None, lambda: [gates.HGate()],
                                    CallbackPack.dummy())
 
+    @staticmethod
+    def __generate_level(level_name: str, seed: int) -> str:
+        generator = QrogueLevelGenerator(check_achievement_callback=lambda achievement: False,
+                                         trigger_event_callback=lambda event: None,
+                                         load_map_callback=lambda name, spawn_pos: None,
+                                         show_message_callback=lambda title, text, reopen, position: None,
+                                         callback_pack=CallbackPack.dummy())
+        level, success = generator.generate(seed, level_name)
+        assert success, f"Failed to generate {level_name}"
+        return str(level)
+
+    def test_level_parse_cache(self):
+        level_names = ["l0k0v0", "l0k1v3", "l0exam"]
+        seed = 7
+        try:
+            MapConfig.set_level_parse_cache(False)
+            expected = [self.__generate_level(name, seed) for name in level_names]
+
+            MapConfig.set_level_parse_cache(True)
+            LevelParseCache.clear_memory()
+            parsed = [self.__generate_level(name, seed) for name in level_names]    # parses and stores the trees
+            LevelParseCache.clear_memory()
+            loaded = [self.__generate_level(name, seed) for name in level_names]    # loads the trees from disk
+            cached = [self.__generate_level(name, seed) for name in level_names]    # reuses the trees in memory
+        finally:
+            MapConfig.set_level_parse_cache(True)
+        self.assertEqual(expected, parsed)
+        self.assertEqual(expected, loaded)
+        self.assertEqual(expected, cached)
+
+        # a changed level has a different content hash and therefore must not reuse the cached tree
+        level_data = PathConfig.read_level(level_names[0])
+        self.assertIsNot(LevelParseCache.parse(level_data), LevelParseCache.parse(level_data + "\n"))
+        self.assertRaises(SyntaxError, LevelParseCache.parse, "}" + level_data)
+
     def test_single_seed(self):
         CheatConfig.use_cheat("Illuminati")
         robo_props = test_util.DummyRoboProps()
@@ -102,6 +152,93 @@ class LevelGenTestCase(test_util.SingletonSetupTestCase):
             self._print(force=True)
             self.assertTrue(False, "Some seeds failed!")
 
+    def test_render_cache(self):
+        robo_props = test_util.DummyRoboProps()
+        difficulty = StvDifficulty.from_difficulty_code("1" * StvDifficulty.degrees_of_freedom())
+        generator = self.__create_expedition_generator()
+
+        def generate() -> ExpeditionMap:
+            map_, success = generator.generate(297, (robo_props, difficulty, 7))
+            self.assertTrue(success, "Failed to generate.")
+            return map_
+
+        def reveal_all(map_: ExpeditionMap):
+            for y in range(map_.height):
+                for x in range(map_.width):
+                    if map_.room_at(x, y) is not None:
+                        map_.room_at(x, y).make_visible()
+
+        def toggle_reveal(_: ExpeditionMap):
+            CheatConfig.use_cheat("Illuminati")
+
+        operations = [lambda map_: map_.move(Direction.North), lambda map_: map_.move(Direction.East),
+                      lambda map_: map_.room_at(0, 0) and map_.room_at(0, 0).in_sight(), reveal_all, toggle_reveal,
+                      lambda map_: map_.move(Direction.West), toggle_reveal]
+        rendered_map = generate()
+        for i, operation in enumerate(operations):
+            rendered_map.render_string()
+            operation(rendered_map)
+            # the incrementally updated rendering has to look like rendering a fresh map for the first time
+            fresh_map = generate()
+            for prior_operation in operations[:i + 1]:
+                if prior_operation is not toggle_reveal:    # the cheat is global and therefore already toggled
+                    prior_operation(fresh_map)
+            self.assertEqual(fresh_map.render_string(), rendered_map.render_string(), f"Wrong after operation #{i}")
+            self.assertEqual(fresh_map.row_strings(), rendered_map.row_strings())
+
+    def test_expedition_pool(self):
+        robo_props = RoboProperties(3, 5)
+        difficulty = StvDifficulty.from_difficulty_code("1" * StvDifficulty.degrees_of_freedom())
+        items = [ExpeditionWorkItem(map_seed, 7, robo_props, difficulty, [gates.HGate()]) for map_seed in range(4)]
+
+        pool = ExpeditionPool(queue_size=3, num_of_workers=2)
+        for item in items:
+            pool.submit(item)
+        self.assertTrue(pool.is_full)
+        self.assertEqual(3, pool.queue_depth)
+
+        generator = self.__create_expedition_generator()
+        for item in items[:3]:
+            popped_item, recipe = pool.pop()
+            # results have to be in submission order and match sequential generation
+            self.assertEqual(item.map_seed, popped_item.map_seed)
+            expected_recipe = item.create_recipe(generator)
+            self.assertEqual(expected_recipe is None, recipe is None)
+            if recipe is not None:
+                self.assertEqual(str(generator.build(expected_recipe)[0]), str(generator.build(recipe)[0]))
+        self.assertIsNone(pool.pop())
+        self.assertGreater(pool.average_generation_time, 0)
+
+        pool.submit(items[3])
+        pool.shutdown()
+        self.assertEqual(0, pool.queue_depth)
+
+    def test_expedition_recipe(self):
+        robo_props = RoboProperties(3, 5)
+        difficulty = StvDifficulty.from_difficulty_code("1" * StvDifficulty.degrees_of_freedom())
+        generator = self.__create_expedition_generator()
+        for map_seed in range(3):
+            expedition, success = generator.generate(map_seed, (robo_props, difficulty, 7))
+            recipe = generator.create_recipe(map_seed, (robo_props, difficulty, 7))
+            self.assertEqual(success, recipe is not None)
+            if recipe is None: continue
+
+            # data of other versions or corrupted data is rejected without unpickling it
+            data = recipe.to_bytes()
+            self.assertIsNone(ExpeditionRecipe.from_bytes(data.replace(b"QrogueRecipe", b"QrogueRecipe9", 1)))
+            self.assertIsNone(ExpeditionRecipe.from_bytes(data[:len(data) // 2]))
+            self.assertIsNone(ExpeditionRecipe.from_bytes(b""))
+
+            # building a recipe that went through (de)serialization has to result in the same expedition
+            recipe = ExpeditionRecipe.from_bytes(data)
+            for _ in range(2):
+                built_expedition, built_success = generator.build(recipe)
+                self.assertTrue(built_success)
+                self.assertEqual(str(expedition), str(built_expedition))
+                self.assertEqual(expedition.main_gate, built_expedition.main_gate)
+                self.assertEqual([gate.name() for gate in expedition.robot.get_available_instructions()],
+                                 [gate.name() for gate in built_expedition.robot.get_available_instructions()])
+
     def test_room_correction(self):
         tile_list = Room.dic_to_tile_list({
             Coordinate(3, 0): tiles.Obstacle(),
@@ -153,26 +290,24 @@ class LevelGenTestCase(test_util.SingletonSetupTestCase):
         }
         tile_list = Room.dic_to_tile_list(tile_dic)
 
-        def get_weight(pos: Coordinate) -> int:
-            if pos in tile_dic:
-                return 2
-            if pos.x == 2 and pos.y in [0, 4]:
-                # one of the entrances
-                return 0
-            return 1
-
-        visited = set()
         success, tiles_to_remove = ExpeditionGenerator.path_search(tile_list,
                                                                    lambda t: t.code == tiles.TileCode.Obstacle,
-                                                                   get_weight, visited, target_pos=Coordinate(2, 4),
-                                                                   cur_pos=Coordinate(2, 0))
+                                                                   start_pos=Coordinate(2, 0),
+                                                                   target_pos=Coordinate(2, 4))
         self.assertTrue(success, "Didn't find a removable tile.")
-        """
-        print([str(elem) for elem in tiles_to_remove])
-        visited = list(visited)
-        visited.sort(key=lambda c: c.x + c.y * 10)
-        print(f"Visited: {[str(elem) for elem in visited]}")
-        """
+        # the Obstacles block the whole row, so exactly one of them has to be removed
+        self.assertEqual(1, len(tiles_to_remove))
+        self.assertEqual(2, tiles_to_remove[0].y)
+
+        # blocked entrances have to be removed too
+        tile_list[Room.coordinate_to_index(Coordinate(2, 0))] = tiles.Obstacle()
+        success, tiles_to_remove = ExpeditionGenerator.path_search(tile_list,
+                                                                   lambda t: t.code == tiles.TileCode.Obstacle,
+                                                                   start_pos=Coordinate(2, 0),
+                                                                   target_pos=Coordinate(2, 4))
+        self.assertTrue(success)
+        self.assertEqual(2, len(tiles_to_remove))
+        self.assertEqual(Coordinate(2, 0), tiles_to_remove[0])
 
     def test_expedition_parameters(self):
         prefix = MapConfig.expedition_map_prefix()
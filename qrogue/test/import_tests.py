@@ -0,0 +1,42 @@
+import unittest
+
+from qrogue.util import ImportProfiler
+
+
+class ImportProfilerTestCase(unittest.TestCase):
+    def test_parse(self):
+        output = "import time: self [us] | cumulative | imported package\n" \
+                 "import time:       120 |        120 |   _io\n" \
+                 "import time:        30 |         30 |     qiskit.circuit\n" \
+                 "import time:       200 |        230 |   qiskit\n" \
+                 "some other output\n" \
+                 "import time:       50 |        400 | qrogue.qrogue\n"
+        records = ImportProfiler.parse(output)
+        self.assertEqual(["_io", "qiskit.circuit", "qiskit", "qrogue.qrogue"], [record.name for record in records])
+        self.assertEqual([1, 2, 1, 0], [record.depth for record in records])
+        self.assertEqual([120, 30, 200, 50], [record.self_time for record in records])
+        self.assertEqual(400, records[-1].cumulative_time)
+
+        self.assertIs(records[2], ImportProfiler.find(records, "qiskit"))
+        self.assertIs(records[1], ImportProfiler.find(records, "qiskit.circuit"))
+        self.assertIsNone(ImportProfiler.find(records, "qiskit.providers"))
+
+        report = ImportProfiler.to_report(records)
+        self.assertTrue(report.startswith("Imported 4 modules in 0.4ms"))
+        self.assertIn("Qiskit: imported at startup (0.2ms)", report)
+        self.assertIn("level parser: not imported at startup", report)
+
+    def test_deferred_imports(self):
+        # Qiskit and the generated parsers are slow to import and must therefore not be needed to start the game
+        records = ImportProfiler.measure("qrogue.qrogue")
+        self.assertIsNotNone(ImportProfiler.find(records, "qrogue.qrogue"))
+        for module in ["qiskit", "qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonParser",
+                       "qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonLexer",
+                       "qrogue.management.save_grammar.SaveDataParser",
+                       "qrogue.management.save_grammar.SaveDataLexer"]:
+            self.assertIsNone(ImportProfiler.find(records, module), f"{module} is imported at startup")
+        self.assertRaises(RuntimeError, ImportProfiler.measure, "qrogue.non_existent_module")
+
+
+if __name__ == '__main__':
+    unittest.main()
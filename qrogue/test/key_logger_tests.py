@@ -1,4 +1,5 @@
 import os.path
+import tempfile
 import unittest
 from typing import List
 
@@ -7,7 +8,8 @@ from py_cui import PyCUI
 from qrogue.management import NewSaveData
 from qrogue.util import Controls, Keys
 from qrogue.util.game_simulator import GameSimulator
-from qrogue.util.key_logger import KeyLogger
+from qrogue.util.key_log_reader import KeyLogReader
+from qrogue.util.key_logger import KeyLogger, OverWorldKeyLogger
 
 
 class KeyLoggingTestCase(unittest.TestCase):
@@ -88,5 +90,103 @@ class KeyLoggingTestCase(unittest.TestCase):
         os.remove(save_path)  # delete the created keylog file
 
 
+class KeyLogReaderTestCase(unittest.TestCase):
+    class _TestKeyLogger(OverWorldKeyLogger):
+        def __init__(self, path: str):
+            super().__init__()
+            self.__path = path
+
+        def _append(self, text: str):
+            # write immediately since flushing is skipped while TestConfig is active
+            with open(self.__path, "a") as file:
+                file.write(text)
+
+    def test_checkpoints(self):
+        controls = Controls(lambda key: None)
+        level_keys = [[Keys.MoveUp, Keys.Action], [Keys.PopupClose, Keys.MoveLeft, Keys.Cancel], [Keys.Pause]]
+        save_states = [NewSaveData.empty_save_state() for _ in level_keys]
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "test.qrkl")
+            key_logger = KeyLogReaderTestCase._TestKeyLogger(path)
+            key_logger.reinit(7, "meta", NewSaveData.empty_save_state(), path)
+            key_logger.log(controls, controls.get_key(Keys.MoveDown))
+            for i, keys in enumerate(level_keys):
+                key_logger.level_start(f"level{i}", 10 + i, save_states[i])
+                for key in keys:
+                    key_logger.log(controls, controls.get_key(key))
+
+            reader = KeyLogReader(path)
+            self.assertEqual("meta", reader.map_name)
+            self.assertTrue(reader.has_header)
+            self.assertEqual(7, reader.seed)
+
+            def to_code(key_: Keys) -> int:
+                # logical keys that share their raw key with another logical key are logged as the first one
+                return controls.encode(controls.get_key(key_)).code
+
+            # checkpoints are skipped when reading the keys
+            all_keys = [Keys.MoveDown] + [key for keys in level_keys for key in keys]
+            codes = []
+            code = reader.next_code()
+            while code is not None:
+                codes.append(code)
+                code = reader.next_code()
+            self.assertEqual([to_code(key) for key in all_keys], codes)
+
+            checkpoints = reader.checkpoints
+            self.assertEqual(len(level_keys), len(checkpoints))
+            for i, checkpoint in enumerate(checkpoints):
+                self.assertEqual(i, checkpoint.index)
+                self.assertEqual(f"level{i}", checkpoint.level_name)
+                self.assertEqual(10 + i, checkpoint.seed)
+                self.assertEqual(save_states[i], checkpoint.save_state)
+
+            # seeking a checkpoint continues with the keys of its level and stops at the next checkpoint
+            for i in reversed(range(len(level_keys))):
+                self.assertEqual(checkpoints[i].end, reader.seek_checkpoint(i).end)
+                for key in level_keys[i]:
+                    self.assertEqual(to_code(key), reader.next_code())
+                self.assertIsNone(reader.next_code())
+
+                # or continues with the keys of the following levels
+                reader.seek_checkpoint(i, only_level=False)
+                remaining_keys = [key for keys in level_keys[i:] for key in keys]
+                for key in remaining_keys:
+                    self.assertEqual(to_code(key), reader.next_code())
+                self.assertIsNone(reader.next_code())
+            self.assertRaises(IndexError, reader.seek_checkpoint, len(level_keys))
+
+            reader.seek()
+            self.assertEqual(Keys.MoveDown.code, reader.next_code())
+            reader.close()
+
+    def test_release(self):
+        released: List[str] = []
+        key_logger = KeyLogger(lambda path, text: None, released.append)
+        paths = [f"level{i}.qrkl" for i in range(3)]
+        for path in paths:
+            key_logger.reinit(7, "TEST", NewSaveData.empty_save_state(), path)
+        # every new session releases the file of the previous one
+        self.assertEqual(paths[:-1], released)
+
+    def test_line_endings(self):
+        # key logs written in text mode on Windows use "\r\n" for "\n", which is also a key code
+        keys = [Keys.PopupUp, Keys.MoveUp, Keys.PopupUp, Keys.PopupUp]
+        self.assertEqual(ord("\n"), Keys.PopupUp.code)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "test.qrkl")
+            with open(path, "wb") as file:
+                file.write(b"level\r\n" + b"\r\n" + bytes([Keys.MoveUp.code]) + b"\r\n\r")
+            reader = KeyLogReader(path)
+            self.assertEqual("level", reader.map_name)
+            self.assertFalse(reader.has_header)
+            self.assertEqual(-1, reader.seed)
+            self.assertEqual([key.code for key in keys], [reader.next_code() for _ in keys])
+            self.assertIsNone(reader.next_code())
+            reader.close()
+
+            self.assertRaises(FileNotFoundError, KeyLogReader, os.path.join(folder, "non_existent.qrkl"))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from typing import List
+
+from qrogue.util import AsyncFileWriter, Logger
+
+
+class AsyncFileWriterTestCase(unittest.TestCase):
+    @staticmethod
+    def read(path: str) -> str:
+        with open(path) as file:
+            return file.read()
+
+    def test_append(self):
+        num_of_threads, num_of_lines = 4, 200
+        with tempfile.TemporaryDirectory() as folder:
+            paths = [os.path.join(folder, "a.txt"), os.path.join(folder, "b.txt")]
+            writer = AsyncFileWriter(flush_size=64, flush_interval=0.05, max_pending=256)
+
+            def append(thread_id: int):
+                for i in range(num_of_lines):
+                    writer.append(paths[thread_id % len(paths)], f"{thread_id} {i}\n")
+
+            threads = [threading.Thread(target=append, args=(thread_id,)) for thread_id in range(num_of_threads)]
+            for thread in threads: thread.start()
+            for thread in threads: thread.join()
+            writer.flush()
+            self.assertEqual(0, writer.pending_chars)
+            self.assertEqual(0, writer.pending_appends)
+            self.assertGreater(writer.num_of_batches, 1)
+            # append() only adds to the pending text if less than max_pending characters are pending
+            self.assertLess(writer.max_pending_chars, 256 + len(f"{num_of_threads} {num_of_lines}\n"))
+
+            for thread_id in range(num_of_threads):
+                lines = self.read(paths[thread_id % len(paths)]).splitlines()
+                self.assertEqual([f"{thread_id} {i}" for i in range(num_of_lines)],
+                                 [line for line in lines if line.startswith(f"{thread_id} ")])
+            writer.close()
+            self.assertTrue(writer.is_closed)
+            self.assertRaises(AssertionError, writer.append, paths[0], "closed")
+
+    def test_flush_interval(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "log.txt")
+            writer = AsyncFileWriter(flush_size=1024, flush_interval=0.01)
+            writer.append(path, "text")
+            # less than flush_size characters are written after flush_interval at the latest
+            for _ in range(200):
+                if os.path.exists(path) and self.read(path) == "text":
+                    break
+                time.sleep(0.01)
+            self.assertEqual("text", self.read(path))
+            writer.append(path, " and more")
+            writer.close()
+            self.assertEqual("text and more", self.read(path))
+
+    def test_release(self):
+        with tempfile.TemporaryDirectory() as folder:
+            paths = [os.path.join(folder, f"{i}.qrkl") for i in range(50)]
+            writer = AsyncFileWriter(flush_size=1024, flush_interval=10)
+            for path in paths:
+                writer.append(path, "before")
+                writer.release(path)
+                writer.flush()
+                # the pending text is written before the handle is closed
+                self.assertEqual("before", self.read(path))
+                self.assertEqual(0, writer.num_of_open_files)
+
+            # a released file is reopened when appending to it again
+            writer.append(paths[0], " after")
+            writer.flush()
+            self.assertEqual(1, writer.num_of_open_files)
+            writer.close()
+            self.assertEqual(0, writer.num_of_open_files)
+            self.assertEqual("before after", self.read(paths[0]))
+
+
+class LoggerTestCase(unittest.TestCase):
+    def test_flush(self):
+        commits: List[str] = []
+        try:
+            previous_logger = Logger.instance()
+        except Exception:
+            previous_logger = None
+        Logger._set_instance(None)
+        logger = Logger(commits.append)
+        logger._write("first", False)
+        logger._write("second", False)
+        self.assertEqual([], commits)
+        logger.flush()
+        self.assertEqual(["first\nsecond\n"], commits)
+        logger.flush()  # nothing to flush
+        self.assertEqual(1, len(commits))
+
+        # the buffer is committed automatically once it is full
+        line = "x" * 1000
+        for _ in range(5):
+            logger._write(line, False)
+        self.assertEqual(2, len(commits))
+        self.assertEqual((line + "\n") * 5, commits[1])
+        Logger._set_instance(previous_logger)
+
+    def test_init_for_worker(self):
+        commits: List[str] = []
+        try:
+            previous_logger = Logger.instance()
+        except Exception:
+            previous_logger = None
+        Logger._set_instance(None)
+        parent_logger = Logger(commits.append)
+        parent_logger._write("parent", False)
+
+        # the inherited Logger and its buffer are replaced instead of committed
+        Logger.init_for_worker()
+        self.assertIsNot(parent_logger, Logger.instance())
+        Logger.instance()._write("worker", False)
+        Logger.instance().flush()
+        self.assertEqual([], commits)
+        Logger._set_instance(previous_logger)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,32 @@
+import multiprocessing
+import os
+import tempfile
 import unittest
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set, Tuple
+
+import numpy as np
 
 import qrogue.game.logic.collectibles.instruction as gates
 from qrogue.game.logic import PuzzleGenerator
 from qrogue.game.logic.base import StateVector
 from qrogue.game.logic.collectibles import Score
+from qrogue.game.puzzle_bank import PuzzleBank
+from qrogue.game.target_factory import NewEnemyFactory
 from qrogue.test import test_util
-from qrogue.util import RandomManager, Logger
+from qrogue.util import RandomManager, Logger, StvDifficulty
 from qrogue.util.stv_difficulty import DifficultyType
 
 
+def _use_bank_in_worker(settings: Optional[Tuple[str, int, int]]) -> Tuple[bool, bool]:
+    inherited = PuzzleBank.instance() is not None
+    PuzzleBank.init_for_worker(settings)
+    bank = PuzzleBank.instance()
+    if bank is not None:
+        stv = StateVector([1, 0], num_of_used_gates=0)
+        bank.store("worker", 0, stv, stv)
+    return inherited, bank is not None
+
+
 class ManuelPuzzleGenTestCase(test_util.SingletonSetupTestCase):
     @staticmethod
     def _print_stv_circuit(num_of_qubits: int, circuits: List[List[gates.Instruction]]):
@@ -97,6 +114,107 @@ class ManuelPuzzleGenTestCase(test_util.SingletonSetupTestCase):
         print(gates.Instruction.compute_stv(circuits[-1], num_of_qubits))
         print()
 
+    def test_batch_generation(self):
+        num_of_qubits, circuit_space = 3, 5
+        available_gates = [gates.HGate(), gates.XGate(), gates.SGate(), gates.CXGate(), gates.RYGate(0.4)]
+        difficulty = StvDifficulty.from_difficulty_level(3)
+        reward_pool = [Score(50), Score(100)]
+        seeds = list(range(12))
+
+        expected = [PuzzleGenerator.generate_puzzle(RandomManager.create_new(seed), num_of_qubits, circuit_space,
+                                                    difficulty, available_gates, [gates.CXGate()], reward_pool)
+                    for seed in seeds]
+        for num_of_workers in [1, 3]:
+            puzzles = PuzzleGenerator.generate_puzzles(seeds, num_of_qubits, circuit_space, difficulty, available_gates,
+                                                       [gates.CXGate()], reward_pool, num_of_workers, chunk_size=5)
+            self.assertEqual(len(seeds), len(puzzles))
+            for (input_stv, target_stv, reward), (exp_input, exp_target, exp_reward) in zip(puzzles, expected):
+                # results have to be bit-identical, not only close
+                self.assertTrue(np.array_equal(exp_input.amplitudes, input_stv.amplitudes))
+                self.assertTrue(np.array_equal(exp_target.amplitudes, target_stv.amplitudes))
+                self.assertEqual(exp_reward.amount, reward.amount)
+
+    def test_puzzle_bank(self):
+        available_gates = [gates.HGate(), gates.XGate(), gates.CXGate(), gates.SGate()]
+        reward_pool = [Score(10), Score(20), Score(30)]
+        factory = NewEnemyFactory(StvDifficulty.from_difficulty_level(2), 3, 5, lambda: available_gates, True,
+                                  reward_pool)
+
+        def produce(seed: int):
+            rm = RandomManager.create_new(seed)
+            enemy = factory.produce(rm, None, None)
+            return enemy.input_stv, enemy.state_vector, enemy.reward, rm.get()  # rm has to continue the same way
+
+        def assert_equal(expected_puzzles, puzzles):
+            for (exp_input, exp_target, exp_reward, exp_value), (input_stv, target_stv, reward, value) in \
+                    zip(expected_puzzles, puzzles):
+                self.assertTrue(np.array_equal(exp_input.amplitudes, input_stv.amplitudes))
+                self.assertTrue(np.array_equal(exp_target.amplitudes, target_stv.amplitudes))
+                self.assertEqual(exp_target.num_of_used_gates, target_stv.num_of_used_gates)
+                self.assertIs(exp_reward, reward)
+                self.assertEqual(exp_value, value)
+
+        seeds = list(range(40))
+        live = [produce(seed) for seed in seeds]   # without a bank
+        with tempfile.TemporaryDirectory() as folder:
+            self.assertTrue(PuzzleBank.open(os.path.join(folder, "bank.sqlite"), slots_per_key=8))
+            try:
+                bank = PuzzleBank.instance()
+                expected = [produce(seed) for seed in seeds]    # live generation and write-back
+                assert_equal(expected, [produce(seed) for seed in seeds])   # only lookups
+                # seeds drawing the same slot share their puzzle
+                self.assertLessEqual(bank.size, 8)
+                self.assertEqual((2 * len(seeds) - bank.size, bank.size), (bank.hits, bank.misses))
+
+                # the order of the available gates doesn't matter
+                available_gates.reverse()
+                assert_equal(expected, [produce(seed) for seed in seeds])
+                self.assertEqual(bank.size, bank.misses)
+
+                # but a different gate set must not reuse the stored puzzles
+                size = bank.size
+                available_gates.append(gates.YGate())
+                produce(seeds[0])
+                self.assertEqual((size + 1, size + 1), (bank.size, bank.misses))
+            finally:
+                PuzzleBank.close()
+            available_gates.pop()
+            available_gates.reverse()
+
+            # without a bank, puzzles are generated like before
+            assert_equal(live, [produce(seed) for seed in seeds])
+
+            # by default, the bank doesn't reduce the variety of puzzles compared to live generation
+            self.assertTrue(PuzzleBank.open(os.path.join(folder, "default_bank.sqlite")))
+            try:
+                banked = [produce(seed) for seed in seeds]
+                self.assertEqual(len(seeds), PuzzleBank.instance().size)
+                self.assertGreaterEqual(len({puzzle[1] for puzzle in banked}), len({puzzle[1] for puzzle in live}))
+            finally:
+                PuzzleBank.close()
+
+            # the bank stops growing at its maximum size but puzzles stay the same
+            self.assertTrue(PuzzleBank.open(os.path.join(folder, "small_bank.sqlite"), max_size=3))
+            try:
+                assert_equal(banked, [produce(seed) for seed in seeds])
+                self.assertEqual(3, PuzzleBank.instance().size)
+            finally:
+                PuzzleBank.close()
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs forked worker processes")
+    def test_puzzle_bank_worker(self):
+        with tempfile.TemporaryDirectory() as folder:
+            self.assertTrue(PuzzleBank.open(os.path.join(folder, "bank.sqlite")))
+            try:
+                with multiprocessing.get_context("fork").Pool(1, maxtasksperchild=1) as pool:
+                    # the inherited connection must not be used, but workers can open their own one
+                    self.assertEqual((False, True), pool.apply(_use_bank_in_worker, (PuzzleBank.worker_settings(),)))
+                    self.assertEqual((False, False), pool.apply(_use_bank_in_worker, (None,)))
+                # the worker's puzzle was committed to the shared database
+                self.assertIsNotNone(PuzzleBank.instance().lookup("worker", 0, 1))
+            finally:
+                PuzzleBank.close()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+from typing import List, Tuple
+
+from py_cui.colors import ColorRule
+
+from qrogue.graphics.rendering import MultiColorRenderer
+from qrogue.test.test_util import SingletonSetupTestCase
+from qrogue.util import ColorConfig, PyCuiColors, Logger
+
+
+class _DummyUIElement:
+    def __init__(self, width: int):
+        self.__width = width
+
+    def get_padding(self) -> Tuple[int, int]:
+        return 1, 0
+
+    def get_absolute_dimensions(self) -> Tuple[int, int]:
+        return 1, self.__width
+
+    def get_color(self) -> int:
+        return PyCuiColors.WHITE_ON_BLACK
+
+    def get_selected_color(self) -> int:
+        return PyCuiColors.BLACK_ON_WHITE
+
+
+class MultiColorRendererTestCase(SingletonSetupTestCase):
+    @staticmethod
+    def __rules() -> List[ColorRule]:
+        def rule(regex: str, color: int) -> ColorRule:
+            return ColorRule(regex, color, 0, 'contains', 'regex', [0, 1], False, Logger.instance())
+        # similar to the map rules
+        return [rule("\\d", PyCuiColors.RED_ON_BLACK), rule("#", PyCuiColors.BLACK_ON_WHITE),
+                rule("B", PyCuiColors.BLACK_ON_RED), rule(f"{ColorConfig.REGEX_TEXT_HIGHLIGHT}.*?"
+                                                           f"{ColorConfig.REGEX_TEXT_HIGHLIGHT}", 0)]
+
+    @staticmethod
+    def __render(renderer: MultiColorRenderer, ui_element: _DummyUIElement, line: str, selected: bool = False,
+                 centered: bool = False):
+        return renderer._get_render_text(ui_element, line, centered, True, selected, 0)
+
+    def test_cache(self):
+        lines = ["#####  #####", "#  1  B   2#", "           ", "# 23 #", "free text without rules",
+                 f"a {ColorConfig.highlight_object('highlighted')} word", "#" * 40]
+        ui_element = _DummyUIElement(width=30)
+        cached = MultiColorRenderer(None, None, Logger.instance())
+        uncached = MultiColorRenderer(None, None, Logger.instance(), cache_size=0)
+        for renderer in [cached, uncached]:
+            renderer.set_color_rules(self.__rules())
+
+        for _ in range(3):
+            for line in lines:
+                for selected in [False, True]:
+                    expected = self.__render(uncached, ui_element, line, selected)
+                    self.assertEqual(expected, self.__render(cached, ui_element, line, selected), line)
+        self.assertEqual(2 * len(lines), cached.cache_misses)
+        self.assertEqual(2 * 2 * len(lines), cached.cache_hits)
+        self.assertEqual(0, uncached.cache_size)
+
+        # lines without a matching rule keep the element's color
+        self.assertEqual([["free text without rules" + " " * 1, PyCuiColors.WHITE_ON_BLACK]],
+                         self.__render(cached, ui_element, "free text without rules"))
+        self.assertIn(["1", PyCuiColors.RED_ON_BLACK], self.__render(cached, ui_element, "#  1  B   2#"))
+
+        # modifying the returned fragments (like drawing does) must not modify the cache
+        fragments = self.__render(cached, ui_element, lines[1])
+        fragments[0][0] = "modified"
+        self.assertEqual(self.__render(uncached, ui_element, lines[1]), self.__render(cached, ui_element, lines[1]))
+
+        # equal rules share their cache entries while different rules or sizes don't
+        misses = cached.cache_misses
+        cached.set_color_rules(self.__rules())
+        self.__render(cached, ui_element, lines[1])
+        self.assertEqual(misses, cached.cache_misses)
+        cached.set_color_rules(self.__rules()[:1])
+        uncached.set_color_rules(self.__rules()[:1])
+        self.assertEqual(self.__render(uncached, ui_element, lines[1]), self.__render(cached, ui_element, lines[1]))
+        self.__render(cached, _DummyUIElement(width=20), lines[1])
+        self.assertEqual(misses + 2, cached.cache_misses)
+
+    def test_eviction(self):
+        renderer = MultiColorRenderer(None, None, Logger.instance(), cache_size=2)
+        renderer.set_color_rules(self.__rules())
+        ui_element = _DummyUIElement(width=10)
+        for line in ["1", "2", "3", "1"]:
+            self.__render(renderer, ui_element, line)
+        self.assertEqual(2, renderer.cache_size)
+        self.assertEqual((0, 4), (renderer.cache_hits, renderer.cache_misses))
+        self.__render(renderer, ui_element, "3")
+        self.assertEqual(1, renderer.cache_hits)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,11 @@
+import os
 import unittest
 
+from qrogue.game.logic.collectibles.instruction import CombinedGate
 from qrogue.management import NewSaveData
 from qrogue.test import test_util
 from qrogue.util.achievements import Unlocks
+from qrogue.util.util_functions import simple_byte_decode, simple_byte_encode, simple_encode
 
 
 class SaveDataOverhaulTests(test_util.SingletonSetupTestCase):
@@ -101,6 +104,72 @@ class SaveEncodingTestCases(test_util.SingletonSetupTestCase):
         new_sd2 = NewSaveData(enc_sd.test_encode())
         self.assertEqual(new_sd.to_string(), new_sd2.to_string())
 
+    def test_codec(self):
+        key = "6l5f5BqbldikHYpqE240"
+        for text in ["", "Qrogue<\n>Qrogue\n", "combined{\"Bell\" 2: H(0),CX(0,1)}", "ä€𝄞 non-latin characters"]:
+            self.assertEqual(text, simple_byte_decode(key, simple_byte_encode(key, text)))
+
+        save_data = NewSaveData(NewSaveData.empty_save_state()).to_string()
+        encoded = NewSaveData._encode(save_data, force=True)
+        self.assertTrue(encoded.startswith("QRS2:"))
+        self.assertEqual(save_data, NewSaveData._decode(encoded))
+        # saves encoded before the codec was versioned can still be loaded
+        self.assertEqual(save_data, NewSaveData._decode(simple_encode(key, save_data)))
+        self.assertEqual(save_data, NewSaveData(simple_encode(key, save_data)).to_string())
+
+
+class SaveParsingTestCase(test_util.SingletonSetupTestCase):
+    __SAVE = [
+        "Qrogue<",
+        "19d01m2024y 04:16:55",
+        "[INVENTORY]",
+        "QuantumFuser 3",
+        "[GATES]",
+        "X;H;CX;combined{\"Bell\" 2: H(0),CX(0,1)}",
+        "[LEVELS]",
+        "l0k0v0 @ 19d01m2024y 02:23:23 1234 seconds Score = 988",
+        "l0k1v2 @ 20d01m2024y 12:00:01 34 seconds Score = 0",
+        "[UNLOCKS]",
+        "Continue @ 12d02m2034y 04:12:00",
+        "[ACHIEVEMENTS]",
+        "Racer @ 12d02m2034y 04:12:22 Score = 20 out of 100",
+        ">Qrogue",
+        "",
+    ]
+
+    def setUp(self) -> None:
+        super().setUp()
+        # parsing the saves creates CombinedGates, which must not change the ids of gates created by other tests
+        self.__next_id = CombinedGate._set_next_id(0)
+
+    def tearDown(self) -> None:
+        CombinedGate._set_next_id(self.__next_id)
+        super().tearDown()
+
+    def test_fallback(self):
+        self.set_printing(False)
+
+        expected = NewSaveData("\n".join(self.__SAVE)).to_string()
+        self.assertEqual("\n".join(self.__SAVE), expected)
+        # comments and other layouts are not read by the fast path but still by the generated parser
+        commented = self.__SAVE[:5] + ["// some comment", "X ; H", "CX", "/* another comment */"] + \
+            ["combined{\"Bell\" 2: H(0), CX(0, 1)}"] + self.__SAVE[6:]
+        self.assertEqual(expected, NewSaveData("\n".join(commented)).to_string())
+        self.assertEqual(expected, NewSaveData(" ".join(self.__SAVE)).to_string())
+
+    def test_test_data(self):
+        self.set_printing(False)
+
+        folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_data", "saves")
+        for file_name in os.listdir(folder):
+            with open(os.path.join(folder, file_name), encoding="utf-8") as file:
+                text = file.read()
+            save_data = NewSaveData(NewSaveData._decode(text))
+            # reading the written save again is done by the fast path and must not change anything
+            self.assertEqual(save_data.to_string(), NewSaveData(save_data.to_string()).to_string(), file_name)
+            # squeezing everything into one line forces the generated parser
+            self.assertEqual(save_data.to_string(), NewSaveData(" ".join(text.split())).to_string(), file_name)
+
 
 if __name__ == '__main__':
     # warnings regarding *Failed to set knowledge mode to "None"* can be ignored
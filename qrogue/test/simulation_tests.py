@@ -1,12 +1,14 @@
 import os.path
 import shutil
+import tempfile
 import unittest
 from typing import List, Optional
 
-from qrogue.management import QrogueCUI, NewSaveData
+from qrogue.management import QrogueCUI, NewSaveData, ReplayRunner
 from qrogue.test import test_util
 from qrogue.util import Logger, FileTypes, PathConfig, TestConfig
 from qrogue.util.game_simulator import GameSimulator
+from qrogue.util.key_log_reader import KeyLogCheckpoint, KeyLogReader
 
 user_data_path = os.path.join(os.path.dirname(__file__), "user_data")
 
@@ -131,5 +133,104 @@ class SimulationTestCase(test_util.SingletonSetupTestCase):
                 Logger.instance().flush()
 
 
+class HeadlessSimulationTestCase(test_util.SingletonSetupTestCase):
+    __KEY_LOG_FOLDER = os.path.join(os.path.dirname(__file__), "test_data", "keylogs")
+
+    def test_level(self):
+        for i in range(5):
+            path = os.path.join(HeadlessSimulationTestCase.__KEY_LOG_FOLDER, f"simple_l0k0v{i}")
+            report = QrogueCUI.start_headless_simulation(path, in_keylog_folder=False)
+            self.assertIsNotNone(report, f"Failed to simulate {path}")
+            self._print(report)
+            self.assertTrue(report.finished, f"Simulation of {path} stopped early")
+            self.assertEqual(0, report.error_count, f"Errors occurred while simulating {path}")
+            self.assertGreater(report.num_of_keys, 0)
+            if i == 0:
+                self.assertEqual(345, report.score)
+                self.assertIn("l0k0v0 Score = 345", report.save_state)
+
+            # simulating the same key log again has to lead to the same outcome
+            other_report = QrogueCUI.start_headless_simulation(path, in_keylog_folder=False)
+            self.assertEqual(report.save_state, other_report.save_state)
+            self.assertEqual(report.digest, other_report.digest)
+
+    def test_invalid_path(self):
+        path = os.path.join(HeadlessSimulationTestCase.__KEY_LOG_FOLDER, "non_existent")
+        self.assertIsNone(QrogueCUI.start_headless_simulation(path, in_keylog_folder=False))
+
+    def test_checkpoint(self):
+        levels = ["l0k0v0", "l0k0v1"]
+        reports = []
+        meta_data = b"meta\n"
+        for i, level in enumerate(levels):
+            path = os.path.join(HeadlessSimulationTestCase.__KEY_LOG_FOLDER, f"simple_{level}{FileTypes.KeyLog.value}")
+            reports.append(QrogueCUI.start_headless_simulation(path, in_keylog_folder=False))
+
+            # embed the level's key log as checkpoint into an over world key log
+            reader = KeyLogReader(path)
+            with open(path, "rb") as file:
+                data = file.read()
+            reader.close()
+            header_end = data.index(b"\n") + 1
+            keys_start = reader.position
+            checkpoint = KeyLogCheckpoint.to_log_string(level, reader.seed, f"{reader.save_state}\n")
+            if i == 0:
+                meta_data += data[header_end:keys_start]
+            meta_data += bytes(checkpoint, KeyLogReader.ENCODING) + data[keys_start:]
+
+        with tempfile.TemporaryDirectory() as folder:
+            meta_path = os.path.join(folder, f"meta{FileTypes.KeyLog.value}")
+            with open(meta_path, "wb") as file:
+                file.write(meta_data)
+
+            self.assertIsNone(QrogueCUI.start_headless_simulation(meta_path, in_keylog_folder=False,
+                                                                  checkpoint=len(levels)))
+            # a checkpoint's simulation stops at the next checkpoint, so each one reproduces only its own level
+            for i, level in enumerate(levels):
+                checkpoint_report = QrogueCUI.start_headless_simulation(meta_path, in_keylog_folder=False,
+                                                                        checkpoint=i)
+                self.assertIsNotNone(checkpoint_report)
+                self.assertEqual(level, checkpoint_report.map_name)
+                self.assertEqual(reports[i].num_of_keys, checkpoint_report.num_of_keys)
+                self.assertEqual(reports[i].digest, checkpoint_report.digest)
+
+
+class ReplayRunnerTestCase(test_util.SingletonSetupTestCase):
+    __KEY_LOG_FOLDER = os.path.join(os.path.dirname(__file__), "test_data", "keylogs")
+    __KEY_LOGS = ["all_lessons", "simple_l0k0v0", "simple_l0k0v1", "simple_l0k0v2"]
+
+    def test_folder(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for name in ReplayRunnerTestCase.__KEY_LOGS:
+                shutil.copy(os.path.join(ReplayRunnerTestCase.__KEY_LOG_FOLDER, f"{name}{FileTypes.KeyLog.value}"),
+                            folder)
+            runner = ReplayRunner(folder, num_of_workers=2)
+            results = runner.run()
+            self._print(ReplayRunner.to_report(results, {}))
+            self.assertEqual([f"{name}{FileTypes.KeyLog.value}" for name in ReplayRunnerTestCase.__KEY_LOGS],
+                             [result.name for result in results])
+            # all_lessons.qrkl was recorded with an older version of the game and cannot be replayed anymore
+            self.assertTrue(results[0].failed)
+            for result in results[1:]:
+                self.assertFalse(result.failed, f"Failed to replay {result.name}: {result.error}")
+                self.assertTrue(result.report.finished)
+
+            # only the failed replay diverges as long as no golden results are stored
+            self.assertEqual([results[0].name], [name for name, _ in ReplayRunner.find_divergences(results, {})])
+
+            # replaying again has to reproduce the stored golden results
+            runner.store_golden(results)
+            golden = runner.load_golden()
+            self.assertEqual(len(results) - 1, len(golden))
+            other_results = runner.run()
+            self.assertEqual([results[0].name],
+                             [name for name, _ in ReplayRunner.find_divergences(other_results, golden)])
+
+            golden[results[1].name]["digest"] = "outdated"
+            golden[results[2].name]["error_count"] = 1
+            divergences = ReplayRunner.find_divergences(other_results, golden)
+            self.assertEqual([result.name for result in results[:3]], [name for name, _ in divergences])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,281 @@
+import itertools
+import math
+import unittest
+from typing import Optional
+
+import numpy as np
+import qiskit.circuit.library.standard_gates as qiskit_gates
+
+import qrogue.game.logic.collectibles.instruction as gates
+from qrogue.game.logic.base import QuantumCircuit, QuantumSimulator, UnitarySimulator, CircuitMatrix, StateVector, \
+    UnitaryCache, GateMatrices
+from qrogue.game.logic.actors.controllables import BaseBot
+from qrogue.test.test_util import SingletonSetupTestCase
+from qrogue.util import QuantumSimulationConfig, GateType
+
+
+class NativeBackendTestCase(SingletonSetupTestCase):
+    __NUM_OF_QUBITS = 3
+
+    @staticmethod
+    def __all_gates():
+        for gate_type in GateType:
+            if gate_type in [GateType.Combined, GateType.Debug]: continue
+            gate = gates.InstructionManager.from_type(gate_type)
+            for qargs in itertools.permutations(range(NativeBackendTestCase.__NUM_OF_QUBITS), gate.num_of_qubits):
+                yield gate.copy().setup(list(qargs))
+
+    @staticmethod
+    def circuit_of(instructions, num_of_qubits: int, basis_state: Optional[StateVector] = None) -> QuantumCircuit:
+        circuit = QuantumCircuit.from_bit_num(num_of_qubits, num_of_qubits)
+        if basis_state is not None:
+            # prepare the basis state by flipping the qubits that are 1 in its index
+            index = basis_state.to_value().index(1)
+            for q in range(num_of_qubits):
+                if (index >> q) & 1:
+                    gates.XGate().setup([q]).append_to(circuit)
+        for inst in instructions:
+            inst.append_to(circuit)
+        return circuit
+
+    @staticmethod
+    def __run(instructions, native: bool, inverse: bool = False):
+        QuantumSimulationConfig.set_native_backend(native)
+        try:
+            circuit = QuantumCircuit.from_bit_num(NativeBackendTestCase.__NUM_OF_QUBITS,
+                                                  NativeBackendTestCase.__NUM_OF_QUBITS)
+            for inst in instructions:
+                inst.append_to(circuit, inverse)
+            stv = QuantumSimulator().run(circuit, do_transpile=True)
+            unitary = UnitarySimulator().execute(circuit, decimals=QuantumSimulationConfig.DECIMALS)
+        finally:
+            QuantumSimulationConfig.set_native_backend(True)
+        return np.asarray(stv), np.asarray(unitary)
+
+    def test_single_gates(self):
+        for gate in NativeBackendTestCase.__all_gates():
+            for inverse in [False, True]:
+                native_stv, native_unitary = self.__run([gate], native=True, inverse=inverse)
+                qiskit_stv, qiskit_unitary = self.__run([gate], native=False, inverse=inverse)
+                self.assertTrue(np.allclose(native_stv, qiskit_stv), f"StateVectors differ for {gate}")
+                self.assertTrue(np.allclose(native_unitary, qiskit_unitary), f"Unitaries differ for {gate}")
+
+    def test_circuits(self):
+        all_gates = list(NativeBackendTestCase.__all_gates())
+        rng = np.random.default_rng(7)
+        for _ in range(50):
+            circuit = [all_gates[i] for i in rng.integers(len(all_gates), size=5)]
+            native_stv, native_unitary = self.__run(circuit, native=True)
+            qiskit_stv, qiskit_unitary = self.__run(circuit, native=False)
+            self.assertTrue(np.allclose(native_stv, qiskit_stv), f"StateVectors differ for {circuit}")
+            self.assertTrue(np.allclose(native_unitary, qiskit_unitary), f"Unitaries differ for {circuit}")
+
+    def test_combined_gate(self):
+        comb_gate = gates.CombinedGate([gates.HGate().setup([0]), gates.CXGate().setup([0, 1])], 2, name="Bell")
+        comb_gate.setup([2, 1])
+        native_stv, native_unitary = self.__run([gates.XGate().setup([2]), comb_gate], native=True)
+        qiskit_stv, qiskit_unitary = self.__run([gates.XGate().setup([2]), comb_gate], native=False)
+        self.assertTrue(np.allclose(native_stv, qiskit_stv))
+        self.assertTrue(np.allclose(native_unitary, qiskit_unitary))
+
+
+class CircuitMatrixTestCase(SingletonSetupTestCase):
+    def test_multiply(self):
+        circuit = [gates.HGate().setup([0]), gates.CXGate().setup([0, 1]), gates.SGate().setup([1])]
+        matrix = CircuitMatrix(UnitarySimulator().execute(NativeBackendTestCase.circuit_of(circuit, 2), decimals=None),
+                               len(circuit))
+        for stv in StateVector.create_basis_states(2):
+            expected = QuantumSimulator().run(NativeBackendTestCase.circuit_of(circuit, 2, stv))
+            self.assertTrue(np.allclose(matrix.multiply(stv).amplitudes, expected))
+
+        basis_states = StateVector.create_basis_states(2)
+        for single, batched in zip([matrix.multiply(stv) for stv in basis_states], matrix.multiply_all(basis_states)):
+            self.assertTrue(np.allclose(single.amplitudes, batched.amplitudes))
+        self.assertIsNone(matrix.multiply_all([StateVector.create_zero_state_vector(3)]))
+
+    def test_properties(self):
+        identity = CircuitMatrix.create_identity(2)
+        self.assertTrue(identity.is_classical)
+        self.assertTrue(identity.is_real)
+        self.assertEqual(identity, CircuitMatrix(np.eye(4), 0))
+
+        phase = CircuitMatrix(np.diag([1j, 1j]), 1)
+        self.assertTrue(phase.is_imag)
+        self.assertFalse(phase.is_classical)
+
+        self.assertTrue(CircuitMatrix.check_validity(np.array([[1, 1], [1, -1]]) / np.sqrt(2)))
+        self.assertFalse(CircuitMatrix.check_validity([[1, 1], [0, 1]]))
+
+
+class GateMatrixTestCase(SingletonSetupTestCase):
+    __QISKIT_GATES = {
+        GateType.IGate: qiskit_gates.IGate, GateType.XGate: qiskit_gates.XGate, GateType.SXGate: qiskit_gates.SXGate,
+        GateType.YGate: qiskit_gates.YGate, GateType.ZGate: qiskit_gates.ZGate, GateType.HGate: qiskit_gates.HGate,
+        GateType.SGate: qiskit_gates.SGate, GateType.SwapGate: qiskit_gates.SwapGate,
+        GateType.CXGate: qiskit_gates.CXGate, GateType.CYGate: qiskit_gates.CYGate,
+        GateType.CZGate: qiskit_gates.CZGate, GateType.CHGate: qiskit_gates.CHGate,
+    }
+    __ANGLES = [0, 0.3, math.pi / 2, math.pi, 2.5 * math.pi, -1.2]
+
+    def test_matrices(self):
+        for gate_type, qiskit_gate in GateMatrixTestCase.__QISKIT_GATES.items():
+            expected = np.asarray(qiskit_gate().to_matrix())
+            self.assertTrue(np.allclose(expected, GateMatrices.get(gate_type)), f"Wrong matrix for {gate_type}")
+            self.assertTrue(np.allclose(expected.conj().T, GateMatrices.get(gate_type, inverse=True)),
+                            f"Wrong inverse for {gate_type}")
+        for angle in GateMatrixTestCase.__ANGLES:
+            for gate_type, expected in [(GateType.RYGate, qiskit_gates.RYGate(theta=angle).to_matrix()),
+                                        (GateType.RZGate, qiskit_gates.RZGate(phi=angle).to_matrix())]:
+                self.assertTrue(np.allclose(expected, GateMatrices.get(gate_type, angle)))
+                self.assertTrue(np.allclose(np.asarray(expected).conj().T, GateMatrices.get(gate_type, angle, True)))
+                self.assertIs(GateMatrices.get(gate_type, angle), GateMatrices.get(gate_type, angle))
+
+        self.assertFalse(GateMatrices.get(GateType.HGate).flags.writeable)
+        self.assertRaises(ValueError, GateMatrices.get, GateType.Combined)
+        self.assertRaises(ValueError, GateMatrices.get, GateType.RYGate)
+
+        # the Instructions use the same matrices
+        self.assertIs(GateMatrices.get(GateType.CXGate), gates.CXGate().get_matrix())
+        self.assertIs(GateMatrices.get(GateType.RZGate, 0.3, True), gates.RZGate(0.3).get_matrix(inverse=True))
+
+        # DebugGates have no matrix of their own but act like an RZGate
+        self.assertRaises(ValueError, GateMatrices.get, GateType.Debug)
+        self.assertIs(GateMatrices.get(GateType.RZGate, 2.5), gates.DebugGate().get_matrix())
+        self.assertIs(GateMatrices.get(GateType.RZGate, 2.5, True), gates.DebugGate().get_matrix(inverse=True))
+        circuit = [gates.HGate().setup([0]), gates.DebugGate().setup([0])]
+        expected = gates.Instruction.compute_stv([circuit[0], gates.RZGate(2.5).setup([0])], 1)
+        self.assertTrue(expected.is_equal_to(gates.Instruction.compute_stv(circuit, 1)))
+
+    def test_embed(self):
+        num_of_qubits = 3
+        for gate in [gates.IGate(), gates.XGate(), gates.SXGate(), gates.YGate(), gates.ZGate(), gates.HGate(),
+                     gates.SGate(), gates.SwapGate(), gates.CXGate(), gates.CYGate(), gates.CZGate(), gates.CHGate()]:
+            gate_type = gate.gate_type
+            for qargs in itertools.permutations(range(num_of_qubits), gate.num_of_qubits):
+                circuit = NativeBackendTestCase.circuit_of([gate.copy().setup(list(qargs))], num_of_qubits)
+                expected = UnitarySimulator().execute(circuit, decimals=None)
+                self.assertTrue(np.allclose(expected, GateMatrices.embed(gate_type, qargs, num_of_qubits)),
+                                f"Wrong embedding of {gate_type} on {qargs}")
+
+        # single qubit gates are a Kronecker product in Qiskit's qubit order (qubit 0 is the rightmost factor)
+        ry = GateMatrices.get(GateType.RYGate, 0.4)
+        expected = np.kron(np.eye(2), np.kron(ry, np.eye(2)))
+        self.assertTrue(np.allclose(expected, GateMatrices.embed(GateType.RYGate, [1], num_of_qubits, 0.4)))
+        self.assertRaises(ValueError, GateMatrices.embed, GateType.CXGate, [0], num_of_qubits)
+        self.assertRaises(ValueError, GateMatrices.embed, GateType.CXGate, [1, 1], num_of_qubits)
+        self.assertRaises(ValueError, GateMatrices.embed, GateType.XGate, [3], num_of_qubits)
+
+        GateMatrices.clear()
+        GateMatrices.precompute(2)
+        num_of_embeddings = GateMatrices.num_of_embeddings()
+        self.assertGreater(num_of_embeddings, 0)
+        GateMatrices.embed(GateType.SwapGate, (1, 0), 2, inverse=True)
+        self.assertEqual(num_of_embeddings, GateMatrices.num_of_embeddings())
+
+
+class UnitaryCacheTestCase(SingletonSetupTestCase):
+    @staticmethod
+    def __compute(cache: UnitaryCache, circuit, inverse: bool = False):
+        return cache.compute(3, [inst.signature() for inst in circuit],
+                             lambda i: (circuit[i].get_matrix(inverse), list(circuit[i].qargs_iter())), inverse)
+
+    def test_prefix_reuse(self):
+        cache = UnitaryCache(max_size=100)
+        circuit = [gates.HGate().setup([0]), gates.CXGate().setup([0, 1]), gates.RYGate(0.3).setup([2])]
+
+        unitary, amplitudes = self.__compute(cache, circuit)
+        expected = QuantumSimulator().run(NativeBackendTestCase.circuit_of(circuit, 3))
+        self.assertTrue(np.allclose(amplitudes, expected))
+        self.assertEqual((0, 1, 3), (cache.hits, cache.misses, cache.size))
+
+        # the same sequence built from different Instruction objects is a hit
+        self.__compute(cache, [inst.copy().setup(list(inst.qargs_iter())) for inst in circuit])
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        # appending a gate only needs one additional entry
+        longer_circuit = circuit + [gates.XGate().setup([1])]
+        _, amplitudes = self.__compute(cache, longer_circuit)
+        self.assertEqual(4, cache.size)
+        expected = QuantumSimulator().run(NativeBackendTestCase.circuit_of(longer_circuit, 3))
+        self.assertTrue(np.allclose(amplitudes, expected))
+
+        # different angles, qubits or the inverse flag must not be mixed up
+        _, other_angle = self.__compute(cache, circuit[:2] + [gates.RYGate(0.6).setup([2])])
+        _, inverse = self.__compute(cache, circuit, inverse=True)
+        self.assertFalse(np.allclose(other_angle, self.__compute(cache, circuit)[1]))
+        self.assertFalse(np.allclose(inverse, self.__compute(cache, circuit)[1]))
+
+    def test_combined_gates(self):
+        cache = UnitaryCache(max_size=100)
+
+        def combined(angle: float) -> gates.CombinedGate:
+            # a fixed id doesn't change the ids of CombinedGates created by other tests
+            return gates.CombinedGate([gates.HGate().setup([0]), gates.RYGate(angle).setup([1])], 2, "Rot", _id=0)
+
+        # the save string doesn't contain the angles, but the signature has to
+        first, second = combined(0.3).setup([0, 1]), combined(1.2).setup([0, 1])
+        self.assertEqual(first.to_save_string(), second.to_save_string())
+        self.assertNotEqual(first.signature(), second.signature())
+        self.assertEqual(first.signature(), combined(0.3).setup([0, 1]).signature())
+
+        unitary, _ = self.__compute(cache, [first])
+        other_unitary, _ = self.__compute(cache, [second])
+        self.assertFalse(np.allclose(unitary, other_unitary))
+        self.assertEqual(2, cache.misses)
+
+    def test_eviction(self):
+        cache = UnitaryCache(max_size=2)
+        for qubit in range(3):
+            self.__compute(cache, [gates.XGate().setup([qubit])])
+        self.assertEqual(2, cache.size)
+        self.__compute(cache, [gates.XGate().setup([0])])   # was evicted
+        self.assertEqual((0, 4), (cache.hits, cache.misses))
+
+        cache.resize(0)
+        self.__compute(cache, [gates.XGate().setup([0])])
+        self.assertEqual(0, cache.size)
+
+
+class RobotCircuitTestCase(SingletonSetupTestCase):
+    def __assert_circuit(self, robot: BaseBot, input_stv: StateVector):
+        robot.update_statevector(input_stv, use_energy=False, check_for_game_over=False)
+        placed = [robot.gate_used_at(pos) for pos in range(robot.circuit_space)]
+        placed = [inst for inst in placed if inst is not None]
+        expected = UnitarySimulator().execute(NativeBackendTestCase.circuit_of(placed, robot.num_of_qubits),
+                                              decimals=QuantumSimulationConfig.DECIMALS)
+        self.assertTrue(np.allclose(robot.circuit_matrix.matrix, expected), f"Wrong unitary for {placed}")
+        self.assertTrue(np.allclose(robot.state_vector.amplitudes, expected @ input_stv.amplitudes))
+
+    def test_incremental_updates(self):
+        circuit_space = 5
+        available_gates = [gates.HGate(), gates.XGate(), gates.CXGate(), gates.RYGate(0.7), gates.SwapGate()]
+        robot = BaseBot(lambda: None, num_of_qubits=3, gates=available_gates, circuit_space=circuit_space)
+        input_stv = StateVector.create_basis_states(3)[5]
+        rng = np.random.default_rng(11)
+        for _ in range(100):
+            gate = available_gates[rng.integers(len(available_gates))]
+            position = int(rng.integers(-1, circuit_space))  # -1 removes the gate
+            if not gate.is_used():
+                if not robot.is_space_left: continue
+                gate.reset()
+                for qubit in rng.permutation(robot.num_of_qubits)[:gate.num_of_qubits]:
+                    gate.use_qubit(int(qubit))
+            robot.use_instruction(gate, position)
+            self.__assert_circuit(robot, input_stv)
+
+        robot.reset_circuit()
+        self.__assert_circuit(robot, input_stv)
+
+        # previewing must neither change the circuit nor differ from actually placing the gate
+        robot.use_instruction(gates.HGate().setup([0]), 0)
+        robot.use_instruction(gates.CXGate().setup([0, 2]), 3)
+        self.__assert_circuit(robot, input_stv)
+        gate = gates.ZGate().setup([1])
+        preview = robot.preview_circuit_matrix(gate, 2)
+        self.__assert_circuit(robot, input_stv)
+        robot.use_instruction(gate, 2)
+        self.__assert_circuit(robot, input_stv)
+        self.assertTrue(np.allclose(preview.matrix, robot.circuit_matrix.matrix))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,7 @@ import numpy as np
 
 import qrogue.game.logic.collectibles.instruction as gates
 from qrogue.game.logic.actors.puzzles import is_puzzle_solvable
-from qrogue.game.logic.base import StateVector
+from qrogue.game.logic.base import StateVector, UnitarySimulator
 from qrogue.game.logic.collectibles import Instruction
 from qrogue.test import test_util
 
@@ -27,7 +27,7 @@ class StateVectorTests(test_util.SingletonSetupTestCase):
         self.assertTrue(ret2, "Failed to solve solvable puzzle!")
 
     def test2(self):
-        # todo: this one claims to not be reachable, but it is { H @q1, X @g1 }
+        # reachable via { H @q1, X @q1 }
         input_stv = StateVector([0, 0, 1, 0,
                                  0, 0, 0, 0])
         target_stv = StateVector([-StateVectorTests._SUP_VAL, 0, StateVectorTests._SUP_VAL, 0,
@@ -43,5 +43,79 @@ class StateVectorTests(test_util.SingletonSetupTestCase):
         print(target_stv.to_string())
 
 
+class StateVectorTestCase(test_util.SingletonSetupTestCase):
+    _SUP_VAL = 1 / np.sqrt(2)
+
+    def test_solver_budget(self):
+        input_stv = StateVector([0, 0, 1, 0,
+                                 0, 0, 0, 0])
+        target_stv = StateVector([-StateVectorTestCase._SUP_VAL, 0, StateVectorTestCase._SUP_VAL, 0,
+                                  0, 0, 0, 0])
+        gate_list = [gates.CXGate(), gates.XGate(), gates.HGate()]
+
+        ret, circuit = is_puzzle_solvable(input_stv, target_stv, gate_list)
+        self.assertTrue(ret)
+        self.assertEqual(2, circuit.size)  # breadth-first search finds the shortest solution
+        output = UnitarySimulator().execute(circuit, decimals=None) @ input_stv.amplitudes
+        self.assertTrue(StateVector(output).is_equal_to(target_stv))
+
+        ret, circuit = is_puzzle_solvable(input_stv, target_stv, gate_list, max_depth=1)
+        self.assertFalse(ret)
+        self.assertIsNone(circuit)
+        ret, _ = is_puzzle_solvable(input_stv, target_stv, [gates.HGate(), gates.HGate()])
+        self.assertFalse(ret)
+
+        ret, circuit = is_puzzle_solvable(input_stv, input_stv, gate_list)
+        self.assertTrue(ret)
+        self.assertEqual(0, circuit.size)
+
+        # running out of time doesn't mean the puzzle is unsolvable
+        ret, circuit = is_puzzle_solvable(input_stv, target_stv, gate_list, time_limit=0)
+        self.assertIsNone(ret)
+        self.assertIsNone(circuit)
+        ret, _ = is_puzzle_solvable(input_stv, target_stv, gate_list, time_limit=60)
+        self.assertTrue(ret)
+
+    def test_predicates(self):
+        classical = StateVector([0, 0, 1, 0])
+        self.assertTrue(classical.is_classical)
+        self.assertTrue(classical.is_real)
+        self.assertFalse(classical.is_imag)
+        self.assertFalse(classical.is_zero)
+        self.assertEqual(2, classical.num_of_qubits)
+        self.assertEqual([0, 0, 1, 0], classical.to_value())
+
+        imag = StateVector([0, complex(0, 1)])
+        self.assertTrue(imag.is_imag)
+        self.assertFalse(imag.is_classical)
+        self.assertFalse(imag.is_complex)
+
+        mixed = StateVector([complex(0.5, 0.5), complex(0.5, -0.5)])
+        self.assertTrue(mixed.is_complex)
+        self.assertTrue(StateVector([0.01, 0, 0, 0.05]).is_zero)
+
+    def test_comparisons(self):
+        stv = StateVector([StateVectorTestCase._SUP_VAL, 0, StateVectorTestCase._SUP_VAL, 0])
+        close_stv = StateVector([StateVectorTestCase._SUP_VAL + 0.05, 0, StateVectorTestCase._SUP_VAL, 0])
+        bigger_stv = StateVector([StateVectorTestCase._SUP_VAL, 0, StateVectorTestCase._SUP_VAL, 0, 0, 0, 0, 0])
+        other_stv = StateVector([0, 1, 0, 0])
+
+        self.assertTrue(stv.is_equal_to(close_stv, ignore_god_mode=True))
+        self.assertTrue(stv.is_equal_to(bigger_stv, ignore_god_mode=True))
+        self.assertFalse(bigger_stv.is_equal_to(stv, ignore_god_mode=True))
+        self.assertFalse(stv.is_equal_to(other_stv, ignore_god_mode=True))
+        self.assertTrue(stv.is_equal_to_any([other_stv, close_stv], ignore_god_mode=True))
+        self.assertFalse(stv.is_equal_to_any([other_stv], ignore_god_mode=True))
+
+        diff = stv.get_diff(bigger_stv)
+        self.assertEqual(bigger_stv.size, diff.size)
+        self.assertTrue(diff.is_zero)
+
+        # equal StateVectors need to have equal hashes, even if they differ in the sign of 0
+        self.assertEqual(StateVector([-0.0, 1]), StateVector([0.0, 1]))
+        self.assertEqual(hash(StateVector([-0.0, 1])), hash(StateVector([0.0, 1])))
+        self.assertEqual(2, len({stv, StateVector(stv.amplitudes), other_stv}))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
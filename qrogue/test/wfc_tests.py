@@ -1,10 +1,15 @@
+import os
+import tempfile
 import unittest
 from typing import Dict
 
-from qrogue.game.world.dungeon_generator.wave_function_collapse import WaveFunction
+from qrogue.game.logic.collectibles import Key
+from qrogue.game.world import tiles
+from qrogue.game.world.dungeon_generator.wave_function_collapse import WaveFunction, LearnableRoom, WFCManager, \
+    WFCGenerator
 from qrogue.game.world.dungeon_generator.wave_function_collapse.wfc_generator import WFCRoomGenerator, \
     WFCLayoutGenerator
-from qrogue.game.world.map import AreaType, Area
+from qrogue.game.world.map import AreaType, Area, Room
 from qrogue.test import test_util
 from qrogue.util import MapConfig, RandomManager, TestConfig
 from qrogue.util.util_functions import enum_string
@@ -39,6 +44,87 @@ class WFCGeneratorTestCases(test_util.SingletonSetupTestCase):
             self._print(text)
             self._print()
 
+    def test_array_engine(self):
+        generator = WFCRoomGenerator.from_level_files([(level, True) for level in MapConfig.level_list()],
+                                                      room_type=AreaType.WildRoom)
+        static_entries = {Room.mid(): tiles.Collectible(Key())}
+        try:
+            MapConfig.set_array_wfc(False)
+            legacy_room = generator.generate(7, static_entries=static_entries)
+            MapConfig.set_array_wfc(True)
+            for seed in range(20):
+                room = generator.generate(seed, static_entries=static_entries)
+                self.assertEqual(len(legacy_room), len(room))
+                for legacy_row, row in zip(legacy_room, room):
+                    self.assertEqual(len(legacy_row), len(row))
+                    for val in row:
+                        self.assertIsInstance(val, LearnableRoom.TileData)
+                self.assertEqual(tiles.TileCode.Collectible, room[Room.mid().y][Room.mid().x].code)
+
+                # the same seed always leads to the same room
+                self.assertEqual(room, generator.generate(seed, static_entries=static_entries))
+        finally:
+            MapConfig.set_array_wfc(True)
+
+    def test_binary_knowledge(self):
+        templates = WFCRoomGenerator.get_level_list()
+        manager = WFCManager()
+        manager.learn(templates)
+        static_entries = {Room.mid(): tiles.Collectible(Key())}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "wfc.npz")
+            manager.store_binary(file_name, templates)
+
+            loaded_manager = WFCManager()
+            self.assertTrue(loaded_manager.load_binary(file_name, templates))
+            generator = manager.get_generator(AreaType.WildRoom, 0)
+            loaded_generator = loaded_manager.get_generator(AreaType.WildRoom, 0)
+            self.assertEqual(WFCGenerator.get_pos_weight_json_string(generator),
+                             WFCGenerator.get_pos_weight_json_string(loaded_generator))
+            self.assertEqual(WFCGenerator.get_type_weight_json_string(generator),
+                             WFCGenerator.get_type_weight_json_string(loaded_generator))
+            try:
+                for array_wfc in [True, False]:
+                    MapConfig.set_array_wfc(array_wfc)
+                    for seed in range(10):
+                        self.assertEqual(generator.generate(seed, static_entries=dict(static_entries)),
+                                         loaded_generator.generate(seed, static_entries=dict(static_entries)))
+            finally:
+                MapConfig.set_array_wfc(True)
+
+            # learning from different levels makes the file outdated
+            self.assertFalse(WFCManager().load_binary(file_name, templates[1:]))
+            self.assertFalse(WFCManager().load_binary(os.path.join(tmp_dir, "missing.npz"), templates))
+
+    def test_text_knowledge(self):
+        templates = WFCRoomGenerator.get_level_list()
+        manager = WFCManager()
+        manager.learn(templates)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "wfc.txt")
+            manager.store(file_name, templates)
+            # the hash of the levels is stored to detect outdated text files
+            self.assertEqual(WFCManager.levels_hash(templates), WFCManager.stored_levels_hash(file_name))
+            self.assertNotEqual(WFCManager.levels_hash(templates[1:]), WFCManager.stored_levels_hash(file_name))
+            self.assertIsNone(WFCManager.stored_levels_hash(os.path.join(tmp_dir, "missing.txt")))
+
+            generator = manager.get_generator(AreaType.WildRoom, 0)
+            with open(file_name) as file:
+                lines = file.read().splitlines(keepends=True)
+            legacy_file_name = os.path.join(tmp_dir, "legacy.txt")
+            with open(legacy_file_name, "w") as file:
+                file.writelines(lines[1:])
+            # files stored without the hash can still be loaded, but their levels are unknown
+            self.assertIsNone(WFCManager.stored_levels_hash(legacy_file_name))
+            for name in [file_name, legacy_file_name]:
+                loaded_manager = WFCManager()
+                loaded_manager.load(name, learn_if_non_existent=False)
+                loaded_generator = loaded_manager.get_generator(AreaType.WildRoom, 0)
+                self.assertEqual(WFCGenerator.get_pos_weight_json_string(generator),
+                                 WFCGenerator.get_pos_weight_json_string(loaded_generator))
+                self.assertEqual(WFCGenerator.get_type_weight_json_string(generator),
+                                 WFCGenerator.get_type_weight_json_string(loaded_generator))
+
 
 class WaveFunctionTestCase(test_util.SingletonSetupTestCase):
     def test_collapse_validity(self):
@@ -1,8 +1,11 @@
 # exporting
+from .async_writer import AsyncFileWriter
+from .auto_saver import AutoSaver
 from .common_messages import CommonInfos, CommonPopups, CommonQuestions
 from .config import *
 from .controls import Controls, Keys
 from .help_texts import HelpText, load_help_text, get_filtered_help_texts
+from .import_profiler import ImportProfiler, ImportRecord
 from .level_info import LevelInfo, LevelData
 from .logger import Logger
 from .my_random import MyRandom, RandomManager
@@ -10,6 +13,7 @@ from .parser_util import ParserErrorListener
 from .stv_difficulty import StvDifficulty, DifficultyType
 
 # not exported:
+# - BackgroundWorker
 # - KeyLogger etc.
 # - GameSimulator
 # - achievements
@@ -0,0 +1,177 @@
+import io
+from typing import Dict, Set, TextIO
+
+from .background_worker import BackgroundWorker
+
+
+class AsyncFileWriter(BackgroundWorker):
+    """
+    Appends text to files in a background thread, so writing logs doesn't add latency to the game loop. Appended texts
+    are batched per file and written to file handles that stay open until release() or close(). A batch is written as
+    soon as enough text is pending or after a short time, whichever comes first. To bound memory usage, append() blocks
+    if too much text is pending until the background thread caught up.
+
+    There is one shared instance (see instance()) that is flushed and closed when the interpreter exits.
+    """
+    __FLUSH_SIZE = 4096             # number of pending characters that triggers a write
+    __FLUSH_INTERVAL = 1.0          # seconds after which pending text is written at the latest
+    __MAX_PENDING = 1024 * 1024     # number of pending characters at which append() blocks
+
+    @staticmethod
+    def instance() -> "AsyncFileWriter":
+        return BackgroundWorker._shared_instance(AsyncFileWriter)
+
+    def __init__(self, flush_size: int = __FLUSH_SIZE, flush_interval: float = __FLUSH_INTERVAL,
+                 max_pending: int = __MAX_PENDING):
+        """
+        :param flush_size: number of pending characters that triggers a write
+        :param flush_interval: seconds after which pending text is written at the latest
+        :param max_pending: number of pending characters at which append() blocks until they are written
+        """
+        super().__init__("Qrogue-Writer")
+        self.__flush_size = flush_size
+        self.__flush_interval = flush_interval
+        self.__max_pending = max(max_pending, flush_size)
+
+        # the condition guards the pending buffers and metrics, the io lock keeps the batches in order
+        self.__buffers: Dict[str, io.StringIO] = {}
+        self.__files: Dict[str, TextIO] = {}
+        self.__released: Set[str] = set()  # paths whose file handle is closed after writing their pending text
+
+        self.__pending_chars = 0
+        self.__pending_appends = 0
+        self.__max_pending_chars = 0
+        self.__num_of_batches = 0
+        self.__num_of_blocked_appends = 0
+
+    @property
+    def pending_chars(self) -> int:
+        """
+        :return: number of appended characters that are not written yet
+        """
+        return self.__pending_chars
+
+    @property
+    def pending_appends(self) -> int:
+        """
+        :return: number of append() calls whose text is not written yet
+        """
+        return self.__pending_appends
+
+    @property
+    def num_of_open_files(self) -> int:
+        """
+        :return: number of file handles that are currently open
+        """
+        return len(self.__files)
+
+    @property
+    def max_pending_chars(self) -> int:
+        """
+        :return: the highest number of pending characters so far
+        """
+        return self.__max_pending_chars
+
+    @property
+    def num_of_batches(self) -> int:
+        """
+        :return: how often pending text was written
+        """
+        return self.__num_of_batches
+
+    @property
+    def num_of_blocked_appends(self) -> int:
+        """
+        :return: how often append() had to wait because too much text was pending
+        """
+        return self.__num_of_blocked_appends
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self.is_closed and self.__pending_chars < self.__flush_size:
+                    self._condition.wait(self.__flush_interval)
+                is_closed = self.is_closed
+            if is_closed:
+                return  # close() writes the remaining text itself
+            self.__write_pending()
+
+    def _finish(self):
+        self.__write_pending()
+        with self._io_lock:
+            for file in self.__files.values():
+                file.close()
+            self.__files.clear()
+
+    def __write_pending(self):
+        with self._io_lock:
+            with self._condition:
+                buffers = self.__buffers
+                self.__buffers = {}
+                released = self.__released
+                self.__released = set()
+                self.__pending_chars = 0
+                self.__pending_appends = 0
+                self._condition.notify_all()   # wake up blocked appends
+
+            for path, buffer in buffers.items():
+                try:
+                    if path not in self.__files:
+                        self.__files[path] = open(path, "a")
+                    file = self.__files[path]
+                    file.write(buffer.getvalue())
+                    file.flush()
+                except OSError as ex:
+                    # we cannot use the Logger here since it writes through us
+                    print(f"[Qrogue] Failed to write to \"{path}\": {ex}")
+
+            for path in released:
+                if path in self.__files:
+                    self.__files.pop(path).close()
+
+            if len(buffers) > 0:
+                with self._condition:
+                    self.__num_of_batches += 1
+
+    def append(self, path: str, text: str):
+        """
+        Appends text to the file at the given path, which is created if it doesn't exist yet.
+
+        :param path: absolute path of the file
+        :param text: the text to append
+        """
+        assert not self.is_closed, "Cannot append to a closed AsyncFileWriter!"
+        if len(text) <= 0:
+            return
+        with self._condition:
+            if self.__pending_chars >= self.__max_pending and not self._is_background_thread():
+                self.__num_of_blocked_appends += 1
+                self._condition.notify_all()
+                while self.__pending_chars >= self.__max_pending and not self.is_closed:
+                    self._condition.wait()
+
+            if path not in self.__buffers:
+                self.__buffers[path] = io.StringIO()
+            self.__buffers[path].write(text)
+            self.__pending_chars += len(text)
+            self.__pending_appends += 1
+            self.__max_pending_chars = max(self.__max_pending_chars, self.__pending_chars)
+            if self.__pending_chars >= self.__flush_size:
+                self._condition.notify_all()
+        self._start()
+
+    def release(self, path: str):
+        """
+        Closes the file handle of the given path once its pending text is written. Appending to the file again later on
+        reopens it, so callers should release files they are done with to not run out of file descriptors.
+
+        :param path: absolute path of the file
+        """
+        with self._condition:
+            self.__released.add(path)
+
+    def flush(self):
+        """
+        Writes all pending text before returning.
+        """
+        self.__write_pending()
@@ -0,0 +1,195 @@
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .background_worker import BackgroundWorker
+from .config import PathConfig
+
+
+class AutoSaver(BackgroundWorker):
+    """
+    Encodes and writes auto saves in a background thread, so the game loop only has to take a snapshot of the state it
+    wants to save. Every file is replaced atomically (see PathConfig.write_atomic()), so an interrupted write cannot
+    corrupt it.
+
+    Requests for the same file are debounced: the file is only written once no new request arrived for a short time,
+    and only the latest snapshot is written. To not postpone saving forever during longer bursts, a request is written
+    after a maximum delay at the latest.
+
+    There is one shared instance (see instance()) that writes all pending saves when the interpreter exits.
+    """
+    __DEBOUNCE = 0.5    # seconds without new requests after which a pending save is written
+    __MAX_DELAY = 3.0   # seconds after which a pending save is written at the latest
+
+    @staticmethod
+    def instance() -> "AutoSaver":
+        return BackgroundWorker._shared_instance(AutoSaver)
+
+    def __init__(self, debounce: float = __DEBOUNCE, max_delay: float = __MAX_DELAY):
+        """
+        :param debounce: seconds without new requests for a file after which its latest snapshot is written
+        :param max_delay: seconds after the first pending request for a file after which it is written at the latest
+        """
+        super().__init__("Qrogue-AutoSaver")
+        self.__debounce = debounce
+        self.__max_delay = max(max_delay, debounce)
+
+        # the condition guards the pending saves, errors and metrics
+        # path -> (snapshot, encode, time of the first pending request, time of the latest request)
+        self.__pending: Dict[str, Tuple[str, Optional[Callable[[str], str]], float, float]] = {}
+        self.__errors: List[str] = []
+
+        self.__num_of_requests = 0
+        self.__num_of_writes = 0
+        self.__num_of_failures = 0
+        self.__max_request_time = 0.0
+        self.__last_write_time = 0.0
+        self.__max_write_time = 0.0
+        self.__max_latency = 0.0
+
+    @property
+    def num_of_pending_saves(self) -> int:
+        return len(self.__pending)
+
+    @property
+    def num_of_requests(self) -> int:
+        """
+        :return: how often schedule() was called
+        """
+        return self.__num_of_requests
+
+    @property
+    def num_of_writes(self) -> int:
+        """
+        :return: how many snapshots were written successfully
+        """
+        return self.__num_of_writes
+
+    @property
+    def num_of_failures(self) -> int:
+        """
+        :return: how many snapshots could not be encoded or written
+        """
+        return self.__num_of_failures
+
+    @property
+    def num_of_coalesced_requests(self) -> int:
+        """
+        :return: how many requests were dropped because a newer snapshot of the same file replaced them
+        """
+        return self.__num_of_requests - self.__num_of_writes - self.__num_of_failures - len(self.__pending)
+
+    @property
+    def max_request_time(self) -> float:
+        """
+        :return: the longest time in seconds schedule() blocked its caller (including taking the snapshot)
+        """
+        return self.__max_request_time
+
+    @property
+    def last_write_time(self) -> float:
+        """
+        :return: seconds the background thread needed to encode and write the latest save
+        """
+        return self.__last_write_time
+
+    @property
+    def max_write_time(self) -> float:
+        """
+        :return: the longest time in seconds the background thread needed to encode and write a save
+        """
+        return self.__max_write_time
+
+    @property
+    def max_latency(self) -> float:
+        """
+        :return: the longest time in seconds between a request and writing its (or a newer) snapshot
+        """
+        return self.__max_latency
+
+    def take_errors(self) -> List[str]:
+        """
+        :return: the messages of all failed saves since the last call, so the caller can report them in its own thread
+        """
+        with self._condition:
+            errors = self.__errors
+            self.__errors = []
+        return errors
+
+    def __next_due(self) -> Optional[float]:
+        # point in time at which the next pending save has to be written
+        if len(self.__pending) <= 0:
+            return None
+        return min([min(latest + self.__debounce, first + self.__max_delay)
+                    for _, _, first, latest in self.__pending.values()])
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self.is_closed:
+                    due = self.__next_due()
+                    now = time.perf_counter()
+                    if due is not None and due <= now:
+                        break
+                    self._condition.wait(None if due is None else due - now)
+                if self.is_closed:
+                    return  # close() writes the remaining saves itself
+            self.__write_pending(only_due=True)
+
+    def _finish(self):
+        self.__write_pending(only_due=False)
+
+    def __write_pending(self, only_due: bool):
+        with self._io_lock:
+            with self._condition:
+                now = time.perf_counter()
+                due = {path: request for path, request in self.__pending.items()
+                       if not only_due or min(request[3] + self.__debounce, request[2] + self.__max_delay) <= now}
+                for path in due:
+                    del self.__pending[path]
+
+            for path, (snapshot, encode, first_request, _) in due.items():
+                start = time.perf_counter()
+                try:
+                    PathConfig.write_atomic(path, snapshot if encode is None else encode(snapshot), in_user_path=False)
+                    error = None
+                except Exception as ex:
+                    error = f"Failed to save \"{path}\": {ex}"
+                end = time.perf_counter()
+
+                with self._condition:
+                    if error is None:
+                        self.__num_of_writes += 1
+                        self.__last_write_time = end - start
+                        self.__max_write_time = max(self.__max_write_time, end - start)
+                        self.__max_latency = max(self.__max_latency, end - first_request)
+                    else:
+                        self.__num_of_failures += 1
+                        self.__errors.append(error)
+                    self._condition.notify_all()
+
+    def schedule(self, path: str, snapshot: Callable[[], str], encode: Optional[Callable[[str], str]] = None):
+        """
+        Takes a snapshot in the calling thread and writes it in the background unless a newer snapshot for the same
+        file is scheduled before.
+
+        :param path: absolute path of the file to (over)write
+        :param snapshot: returns the text to save, called immediately in the calling thread
+        :param encode: optionally transforms the snapshot before writing it, called in the background
+        """
+        assert not self.is_closed, "Cannot schedule saves of a closed AutoSaver!"
+        start = time.perf_counter()
+        text = snapshot()
+        with self._condition:
+            now = time.perf_counter()
+            first_request = self.__pending[path][2] if path in self.__pending else now
+            self.__pending[path] = text, encode, first_request, now
+            self.__num_of_requests += 1
+            self.__max_request_time = max(self.__max_request_time, time.perf_counter() - start)
+            self._condition.notify_all()
+        self._start()
+
+    def flush(self):
+        """
+        Writes all pending saves before returning.
+        """
+        self.__write_pending(only_due=False)
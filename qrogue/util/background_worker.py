@@ -0,0 +1,95 @@
+import atexit
+import os
+import threading
+from typing import Dict, Optional, Type
+
+
+class BackgroundWorker:
+    """
+    Base class for objects that do their work (e.g., writing files) in a daemon thread, so the game loop doesn't have to
+    wait for it. Subclasses implement _run() as the thread's main loop and _finish() to do the remaining work in the
+    closing thread after the background thread stopped.
+
+    Every subclass can have one shared instance (see _shared_instance()). Shared instances are closed when the
+    interpreter exits and forgotten in forked processes, since a fork neither inherits the background thread nor may it
+    do its parent's pending work a second time.
+    """
+    __instances: Dict[type, "BackgroundWorker"] = {}
+
+    @staticmethod
+    def _shared_instance(worker_type: Type["BackgroundWorker"]) -> "BackgroundWorker":
+        """
+        :param worker_type: the subclass to get the shared instance of, it must be constructable without arguments
+        :return: the shared instance of the given subclass, a new one is created if there is none or it was closed
+        """
+        instance = BackgroundWorker.__instances.get(worker_type, None)
+        if instance is None or instance.is_closed:
+            instance = worker_type()
+            BackgroundWorker.__instances[worker_type] = instance
+        return instance
+
+    @staticmethod
+    def _close_instances():
+        # close the newest instances first since they might depend on older ones
+        for instance in reversed(list(BackgroundWorker.__instances.values())):
+            instance.close()
+        BackgroundWorker.__instances.clear()
+
+    @staticmethod
+    def _forget_instances():
+        BackgroundWorker.__instances.clear()
+
+    def __init__(self, thread_name: str):
+        """
+        :param thread_name: name of the background thread
+        """
+        self._condition = threading.Condition()    # guards the pending work, subclasses have to notify it on changes
+        self._io_lock = threading.Lock()            # makes sure the pending work is not done by two threads at once
+        self.__thread_name = thread_name
+        self.__thread: Optional[threading.Thread] = None
+        self.__is_closed = False
+
+    @property
+    def is_closed(self) -> bool:
+        return self.__is_closed
+
+    def _is_background_thread(self) -> bool:
+        return self.__thread is not None and self.__thread is threading.current_thread()
+
+    def _start(self):
+        """
+        Starts the background thread if it is not running yet.
+        """
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self._run, name=self.__thread_name, daemon=True)
+            self.__thread.start()
+
+    def _run(self):
+        """
+        Main loop of the background thread. It has to return once is_closed is True.
+        """
+        raise NotImplementedError()
+
+    def _finish(self):
+        """
+        Does the remaining work when closing, after the background thread stopped.
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """
+        Stops the background thread and does the remaining work. Afterwards, no new work can be added anymore.
+        """
+        with self._condition:
+            if self.__is_closed:
+                return
+            self.__is_closed = True
+            self._condition.notify_all()
+        if self.__thread is not None and not self._is_background_thread():
+            self.__thread.join()
+        self._finish()
+
+
+atexit.register(BackgroundWorker._close_instances)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=BackgroundWorker._forget_instances)
@@ -1,6 +1,5 @@
 import os
-
-import qiskit  # imported to check its version
+from typing import Optional
 
 from qrogue.util.util_functions import cur_datetime
 from .gameplay_config import CheatConfig
@@ -17,6 +16,8 @@ class Config:
     __GAMEPLAY_HEAD = "[Gameplay]\n"
     __DEBUG = False
     __TEST_LEVEL = False
+    __KEY_LOG_CHECKPOINTS = True    # whether key logs of the over world store a checkpoint at the start of each level
+    __NEW_QISKIT: Optional[bool] = None     # determined on first use since importing Qiskit is slow
 
     __HEADER = "QRogue "
     __SEED_HEAD = "Seed="
@@ -181,6 +182,14 @@ class Config:
         PathConfig.write(Config.game_config_file(), text, in_user_path=True, may_exist=True, append=False)
         return True
 
+    @staticmethod
+    def key_log_checkpoints() -> bool:
+        return Config.__KEY_LOG_CHECKPOINTS
+
+    @staticmethod
+    def set_key_log_checkpoints(value: bool):
+        Config.__KEY_LOG_CHECKPOINTS = value
+
     @staticmethod
     def skip_persisting() -> bool:
         return TestConfig.is_active()
@@ -199,10 +208,13 @@ class Config:
 
     @staticmethod
     def using_new_qiskit() -> bool:
-        parts = qiskit.__qiskit_version__['qiskit'].split(".")
-        major = int(parts[0])
-        minor = int(parts[1])
-        return major >= 0 and minor >= 44  # >= 0.44.0
+        if Config.__NEW_QISKIT is None:
+            import qiskit  # only imported when needed since it is slow to import
+            parts = qiskit.__qiskit_version__['qiskit'].split(".")
+            major = int(parts[0])
+            minor = int(parts[1])
+            Config.__NEW_QISKIT = major >= 0 and minor >= 44  # >= 0.44.0
+        return Config.__NEW_QISKIT
 
     @staticmethod
     def check_reachability(source: str, raise_exception: bool = False):
@@ -113,6 +113,39 @@ class MapConfig:
     def test_level() -> str:
         return "l0training"
 
+    # whether WFCGenerators use the array based WFCArrayEngine or the original WaveFunction objects
+    __ARRAY_WFC = True
+
+    @staticmethod
+    def use_array_wfc() -> bool:
+        return MapConfig.__ARRAY_WFC
+
+    @staticmethod
+    def set_array_wfc(active: bool = True):
+        MapConfig.__ARRAY_WFC = active
+
+    # whether RandomLayoutGenerators connect SpecialRooms like older versions, so seeds lead to the same layouts as before
+    __LEGACY_LAYOUT = False
+
+    @staticmethod
+    def use_legacy_layout() -> bool:
+        return MapConfig.__LEGACY_LAYOUT
+
+    @staticmethod
+    def set_legacy_layout(active: bool = True):
+        MapConfig.__LEGACY_LAYOUT = active
+
+    # whether QrogueLevelGenerators load parse trees of levels from the LevelParseCache instead of parsing them again
+    __LEVEL_PARSE_CACHE = True
+
+    @staticmethod
+    def use_level_parse_cache() -> bool:
+        return MapConfig.__LEVEL_PARSE_CACHE
+
+    @staticmethod
+    def set_level_parse_cache(active: bool = True):
+        MapConfig.__LEVEL_PARSE_CACHE = active
+
     @staticmethod
     def level_list() -> List[str]:
         levels = []
@@ -290,6 +323,10 @@ class GameplayConfig:
 class PuzzleConfig:
     BOSS_FLEE_ENERGY = 10
     BOSS_FAIL_DAMAGE = 5
+    BANK_FILE = "puzzle_bank.sqlite"    # file in the user data folder storing generated puzzles for later reuse
+    BANK_COMMIT_INTERVAL = 32           # after how many newly stored puzzles the puzzle bank is written to disk
+    BANK_SLOTS_PER_KEY = 1 << 16        # how many different puzzles the puzzle bank provides for the same parameters
+    BANK_MAX_SIZE = 50000               # how many puzzles the puzzle bank stores at most
 
     @staticmethod
     def calculate_appearance_chance(eid: int) -> float:
@@ -416,6 +453,19 @@ class QuantumSimulationConfig:
     MAX_SPACE_PER_NUMBER = 1 + 1 + 1 + DECIMALS  # sign + "0" + "." + DECIMALS
     MAX_SPACE_PER_COMPLEX_NUMBER = 1 + 1 + COMPLEX_DECIMALS + 1 + 1 + COMPLEX_DECIMALS + 1  # sign, . & j and decimals
     MAX_PERCENTAGE_SPACE = 3  # the maximum (100%) has three digits
+    UNITARY_CACHE_SIZE = 4096  # how many unitaries of gate sequences are cached at most by the native backend
+    MAX_NUM_OF_QUBITS = 3  # the most qubits a puzzle's circuit can have
+
+    # whether circuits are simulated by applying the gate matrices directly via numpy or by running Qiskit's backends
+    __NATIVE_BACKEND = True
+
+    @staticmethod
+    def use_native_backend() -> bool:
+        return QuantumSimulationConfig.__NATIVE_BACKEND
+
+    @staticmethod
+    def set_native_backend(active: bool = True):
+        QuantumSimulationConfig.__NATIVE_BACKEND = active
 
 
 class InstructionConfig:
@@ -513,6 +563,7 @@ class GateType(enum.Enum):
 
 class ExpeditionConfig:
     DEFAULT_QUEUE_SIZE = 0
+    NUM_OF_WORKERS = 2          # how many processes generate queued Expeditions
     MIN_DIFFICULTY = 1          # minimum difficulty level used for Expeditions
     MIN_NUM_OF_GATES_GOAL = 3   # minimum number of gates we try to pick for non-custom expeditions
 
@@ -14,6 +14,7 @@ class FileTypes(enum.Enum):
     Dungeon = ".qrdg"
     World = ".qrw"
     Templates = ".txt"
+    ParseCache = ".qrpc"
 
 
 class PathConfig:
@@ -25,6 +26,7 @@ class PathConfig:
     __SCREEN_PRINTS_FOLDER = "screenprints"
     __SAVE_DATA_FOLDER = "saves"
     __DUNGEON_FOLDER = "dungeons"
+    __LEVEL_CACHE_FOLDER = "level_cache"
     __TEMPLATE_ROOMS = "rooms"
     __TEMPLATE_HALLWAYS = "hallways"
     __TEMPLATE_STV_POOLS = "stv_pools"
@@ -82,6 +84,17 @@ class PathConfig:
     def keylog_folder() -> str:
         return PathConfig.__KEY_LOG_FOLDER
 
+    @staticmethod
+    def dungeon_folder() -> str:
+        return PathConfig.__DUNGEON_FOLDER
+
+    @staticmethod
+    def level_cache_path(file_name: str = "") -> str:
+        """
+        :return: path of the given file in the folder storing parsed levels (see LevelParseCache)
+        """
+        return PathConfig.user_data_path(os.path.join(PathConfig.__LEVEL_CACHE_FOLDER, file_name))
+
     @staticmethod
     def create_folder_structure(user_data_path: str) -> None:
         pathlib.Path(user_data_path).mkdir(parents=True, exist_ok=True)
@@ -212,19 +225,18 @@ class PathConfig:
             oldest_num = num - PathConfig.__NUMBER_OF_SAVE_FILES
             PathConfig.delete(PathConfig.__save_file_str(oldest_num))
 
-        file_path = PathConfig.__save_file_str(num)
-        try:
-            PathConfig.write(file_path, text, may_exist=False)
-        except Exception as ex:
-            PathConfig.delete(file_path)    # delete the newly created file because it is corrupt
-            raise ex
+        # the new file either appears completely or not at all, so there is nothing to clean up if writing fails
+        PathConfig.write_atomic(PathConfig.__save_file_str(num), text)
 
     @staticmethod
-    def write_auto_save(text: str):
+    def auto_save_path() -> str:
         # don't use the same ending because it would mess with __get_save_files_stats()
-        file_path = os.path.join(PathConfig.__SAVE_DATA_FOLDER,
-                                 f"{PathConfig.__SAVE_FILE_PREFIX}{FileTypes.Save.value}_auto")
-        PathConfig.write(file_path, text, may_exist=True)
+        return PathConfig.user_data_path(os.path.join(PathConfig.__SAVE_DATA_FOLDER,
+                                                      f"{PathConfig.__SAVE_FILE_PREFIX}{FileTypes.Save.value}_auto"))
+
+    @staticmethod
+    def write_auto_save(text: str):
+        PathConfig.write_atomic(PathConfig.auto_save_path(), text, in_user_path=False)
 
     @staticmethod
     def find_latest_save_file() -> str:
@@ -235,13 +247,17 @@ class PathConfig:
             return PathConfig.base_path(f"{PathConfig.__FRESH_SAVE_FILE}{FileTypes.Save.value}")
 
     @staticmethod
-    def read_keylog_buffered(file_name: str, in_keylog_folder: bool = True, buffer_size: int = 1024) -> str:
+    def key_log_path(file_name: str, in_keylog_folder: bool = True) -> str:
         if not file_name.endswith(FileTypes.KeyLog.value):
             file_name += FileTypes.KeyLog.value
         if in_keylog_folder:
-            path = PathConfig.user_data_path(os.path.join(PathConfig.__KEY_LOG_FOLDER, file_name))
+            return PathConfig.user_data_path(os.path.join(PathConfig.__KEY_LOG_FOLDER, file_name))
         else:
-            path = file_name
+            return file_name
+
+    @staticmethod
+    def read_keylog_buffered(file_name: str, in_keylog_folder: bool = True, buffer_size: int = 1024) -> str:
+        path = PathConfig.key_log_path(file_name, in_keylog_folder)
         if os.path.exists(path):
             with open(path, "r") as file:
                 data = file.read(buffer_size)
@@ -299,6 +315,26 @@ class PathConfig:
         with open(path, mode) as file:
             file.write(text)
 
+    @staticmethod
+    def write_atomic(path: str, text: str, in_user_path: bool = True):
+        """
+        Writes text to a temporary file next to path and then replaces path with it. Hence, path either keeps its
+        previous content or has the new content but never only parts of it (e.g., if the game is closed while writing).
+        """
+        if in_user_path:
+            path = PathConfig.user_data_path(path)  # data in base_path is static so we can only write user data
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w") as file:
+                file.write(text)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
     @staticmethod
     def delete(path: str):
         path = PathConfig.user_data_path(path)  # data in base_path is static so we can only delete user data
@@ -25,6 +25,17 @@ class PyCuiConfig:
         # everything below 31 rows throws an internal error complaining about the height being too small.
         return 31, 133
 
+    @staticmethod
+    def get_headless_terminal_dimensions() -> Tuple[int, int]:
+        """
+
+        Returns: number of rows and columns of the terminal simulated for headless simulations, i.e., the minimum
+            dimensions plus the rows PyCUI needs for its title bar, status bar and their borders
+
+        """
+        rows, cols = PyCuiConfig.get_min_dimensions()
+        return rows + 4, cols
+
     @staticmethod
     def set_get_dimensions_callback(get_dimensions: Callable[[], Tuple[int, int]]):
         PyCuiConfig.__get_dimensions = get_dimensions
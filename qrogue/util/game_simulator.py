@@ -1,8 +1,10 @@
-from typing import Tuple, Optional
+import hashlib
+from typing import List, Optional, Tuple
 
 from qrogue.util import Logger
-from qrogue.util.config import PathConfig, OptionsManager, Config, ColorConfig, FileTypes
+from qrogue.util.config import PathConfig, OptionsManager, Config, ColorConfig
 from qrogue.util.controls import Controls, Keys
+from qrogue.util.key_log_reader import KeyLogCheckpoint, KeyLogReader
 
 
 class GameSimulator:
@@ -16,68 +18,40 @@ class GameSimulator:
     #         the same as its original logical counterpart. However, when given the same Controls-object, it will always
     #         be equivalent to its original logical key.
 
-    __ENCODING = "utf-8"
-    __BUFFER_SIZE = 1024
-    __VERSION_END = "\n"
-    __SEED_END = "\n"
-    __SAVE_DATA_START = "Qrogue<"
-    __SAVE_DATA_END = ">Qrogue"
-    __CONFIG_END = __SAVE_DATA_START
-
-    def __init__(self, path: str, in_keylog_folder: bool = True):
-        if not path.endswith(FileTypes.KeyLog.value):
-            path += FileTypes.KeyLog.value
-
+    def __init__(self, path: str, in_keylog_folder: bool = True, checkpoint: Optional[int] = None):
+        """
+        :param path: path of the .qrkl-file to simulate
+        :param in_keylog_folder: whether path is relative to the user data's key log folder
+        :param checkpoint: index of the checkpoint (see KeyLogCheckpoint) to start at or None to simulate the whole key
+            log, starting at a checkpoint is like simulating the key log of the corresponding level, i.e., the
+            simulation stops at the next checkpoint
+        :raises IndexError: if the key log has no checkpoint at the given index
+        """
         self.__controls: Optional[Controls] = None
-        self.__reader = PathConfig.read_keylog_buffered(path, in_keylog_folder, buffer_size=GameSimulator.__BUFFER_SIZE)
-        self.__cur_chunk: Optional[bytes] = None
-        self._next_chunk()  # initializes __cur_chunk
+        self.__reader: Optional[KeyLogReader] = KeyLogReader(PathConfig.key_log_path(path, in_keylog_folder))
 
         self.__notification_popup = True
         self.__marker_counter = 0
         self.__finished = False
 
-        # retrieve the name of the map that was played
-        second_line = self.__cur_chunk.index((bytes("\n", GameSimulator.__ENCODING)))
-        self.__map_name = str(self.__cur_chunk[0:second_line], GameSimulator.__ENCODING)
-        self.__cur_index = second_line
-
-        # change the config so we can reproduce the run (e.g. different auto reset would destroy the simulation)
-        if self.__cur_chunk[second_line + 1:].startswith(bytes(Config.HEADER(), GameSimulator.__ENCODING)):
-            version_start = second_line + len(Config.HEADER())
-            version_end = self.__cur_chunk.index(bytes(self.__VERSION_END, GameSimulator.__ENCODING), version_start)
-            self.__version = str(self.__cur_chunk[version_start:version_end], GameSimulator.__ENCODING)
-
-            seed_start = self.__cur_chunk.index(bytes(Config.SEED_HEAD(), GameSimulator.__ENCODING), version_end) \
-                         + len(Config.SEED_HEAD())
-            seed_end = self.__cur_chunk.index(bytes(self.__SEED_END, GameSimulator.__ENCODING), seed_start)
-            self.__seed = int(self.__cur_chunk[seed_start:seed_end])
-
-            time_start = self.__cur_chunk.index(bytes(Config.TIME_HEAD(), GameSimulator.__ENCODING), seed_end) \
-                         + len(Config.TIME_HEAD())
-            time_end = self.__cur_chunk.index(bytes("\n", GameSimulator.__ENCODING), time_start)
-            self.__time = str(self.__cur_chunk[time_start:time_end], GameSimulator.__ENCODING)
-
-            start = self.__cur_chunk.index(bytes(Config.CONFIG_HEAD(), GameSimulator.__ENCODING), seed_end) \
-                    + len(Config.CONFIG_HEAD()) + 1  # start at the first line after CONFIG_HEAD
-            end = self.__cur_chunk.index(bytes(self.__CONFIG_END, GameSimulator.__ENCODING), start)
-            config = str(self.__cur_chunk[start:end], GameSimulator.__ENCODING)
-            OptionsManager.from_text(config)
-
-            start = self.__cur_chunk.index(bytes(self.__SAVE_DATA_START, GameSimulator.__ENCODING), end)
-            if start < 0:
-                self.__save_state = None
-            else:
-                end = self.__cur_chunk.index(bytes(self.__SAVE_DATA_END, GameSimulator.__ENCODING), start) \
-                      + len(self.__SAVE_DATA_END)
-                self.__save_state = str(self.__cur_chunk[start:end], GameSimulator.__ENCODING)
+        self.__map_name = self.__reader.map_name
+        self.__version = self.__reader.version
+        self.__seed = self.__reader.seed
+        self.__time = self.__reader.time
+        self.__save_state = self.__reader.save_state
+        if self.__reader.config is not None:
+            # change the config so we can reproduce the run (e.g. different auto reset would destroy the simulation)
+            OptionsManager.from_text(self.__reader.config)
 
-            # continue at the \n at the end of the save state because in next_key() we start with going to the next position
-            self.__cur_index = end
-        else:
-            self.__version = "???"
-            self.__seed = -1
-            self.__time = "???"
+        if checkpoint is not None:
+            try:
+                start = self.__reader.seek_checkpoint(checkpoint)
+            except IndexError:
+                self.__reader.close()
+                raise
+            self.__map_name = start.level_name
+            self.__seed = start.seed
+            self.__save_state = start.save_state
 
     @property
     def map_name(self) -> str:
@@ -103,37 +77,40 @@ class GameSimulator:
     def save_state(self) -> Optional[str]:
         return self.__save_state
 
+    @property
+    def is_finished(self) -> bool:
+        return self.__finished
+
+    @property
+    def checkpoints(self) -> List[KeyLogCheckpoint]:
+        if self.__reader is None:
+            return []
+        return self.__reader.checkpoints
+
     def set_controls(self, controls: Controls):
         self.__controls = controls
 
-    def _next_chunk(self):
-        chunk = next(self.__reader)
-        self.__cur_index = -1
-        self.__cur_chunk = bytes(chunk, GameSimulator.__ENCODING)
-
     def __next_key(self) -> int:
         """
 
-        :return: the next (raw) key or -1 if we should retry (self.__cur_chunk is None if we reached the end)
+        :return: the next (raw) key or -1 if we should retry (self.__reader is None if we reached the end)
         """
-        self.__cur_index += 1
-        if 0 <= self.__cur_index < len(self.__cur_chunk):
-            code = self.__cur_chunk[self.__cur_index]
-            key_pressed, key = self.__controls.decode(code)
-            if key is Keys.ErrorMarker:
-                self.__marker_counter += 1
-                if self.__marker_counter >= 3:  # todo fix magic number
-                    Config.check_reachability("GameSimulator.__next_key()@marker_counter>>")
-                return -1
-            else:
-                self.__marker_counter = 0
-            if key_pressed:
-                return key_pressed
+        code = self.__reader.next_code()
+        if code is None:
+            self.__reader.close()
+            self.__reader = None
+            return -1
+
+        key_pressed, key = self.__controls.decode(code)
+        if key is Keys.ErrorMarker:
+            self.__marker_counter += 1
+            if self.__marker_counter >= 3:  # todo fix magic number
+                Config.check_reachability("GameSimulator.__next_key()@marker_counter>>")
+            return -1
         else:
-            try:
-                self._next_chunk()
-            except StopIteration:
-                self.__cur_chunk = None
+            self.__marker_counter = 0
+        if key_pressed:
+            return key_pressed
         return -1
 
     def next(self) -> Optional[int]:
@@ -145,7 +122,7 @@ class GameSimulator:
             # close the notification popup if it is still open before using any real simulation keys
             self.__notification_popup = False
             return self.__controls.get_key(Keys.PopupClose)
-        while self.__cur_chunk is not None:
+        while self.__reader is not None:
             key = self.__next_key()
             if key > -1:
                 return key
@@ -203,3 +180,89 @@ class GameSimulator:
             text = "stopped Simulator"
         text += f"\n{Logger.instance().error_count} errors occurred while simulating"
         return text
+
+
+class SimulationReport:
+    """
+    Outcome of a headless simulation of a key log (see QrogueCUI.start_headless_simulation()).
+    """
+
+    def __init__(self, map_name: str, seed: int, num_of_keys: int, duration: float, error_count: int, finished: bool,
+                 save_state: str, score: Optional[int], robot_state: Optional[str]):
+        """
+        :param map_name: name of the map the key log started in
+        :param seed: seed of the simulated run
+        :param num_of_keys: number of (raw) keys that were simulated
+        :param duration: wall time of the simulation in seconds
+        :param error_count: number of errors logged while simulating
+        :param finished: whether the simulation reached the end of the key log
+        :param save_state: the final save data without dates and durations (see NewSaveData.to_comparable_string())
+        :param score: score of the robot in the last map or None if no map was loaded
+        :param robot_state: description of the robot in the last map or None if no map was loaded
+        """
+        self.__map_name = map_name
+        self.__seed = seed
+        self.__num_of_keys = num_of_keys
+        self.__duration = duration
+        self.__error_count = error_count
+        self.__finished = finished
+        self.__save_state = save_state
+        self.__score = score
+        self.__robot_state = robot_state
+
+    @property
+    def map_name(self) -> str:
+        return self.__map_name
+
+    @property
+    def seed(self) -> int:
+        return self.__seed
+
+    @property
+    def num_of_keys(self) -> int:
+        return self.__num_of_keys
+
+    @property
+    def duration(self) -> float:
+        return self.__duration
+
+    @property
+    def keys_per_second(self) -> float:
+        if self.__duration <= 0:
+            return float(self.__num_of_keys)
+        return self.__num_of_keys / self.__duration
+
+    @property
+    def error_count(self) -> int:
+        return self.__error_count
+
+    @property
+    def finished(self) -> bool:
+        return self.__finished
+
+    @property
+    def save_state(self) -> str:
+        return self.__save_state
+
+    @property
+    def score(self) -> Optional[int]:
+        return self.__score
+
+    @property
+    def robot_state(self) -> Optional[str]:
+        return self.__robot_state
+
+    @property
+    def digest(self) -> str:
+        """
+        :return: hash over the final save state, score and robot state, i.e., over everything a replay should reproduce
+        """
+        text = f"{self.__save_state}\n{self.__score}\n{self.__robot_state}"
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def __str__(self) -> str:
+        return f"Simulated {self.__num_of_keys} keys of \"{self.__map_name}\" (seed={self.__seed}) in " \
+               f"{self.__duration:.3f}s ({self.keys_per_second:.0f} keys/s): " \
+               f"{'finished' if self.__finished else 'stopped'}, {self.__error_count} errors, score={self.__score}, " \
+               f"digest={self.digest}"
+
@@ -0,0 +1,152 @@
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+
+class ImportRecord:
+    def __init__(self, name: str, self_time: int, cumulative_time: int, depth: int):
+        """
+        :param name: full name of the imported module
+        :param self_time: microseconds spent importing only this module
+        :param cumulative_time: microseconds spent importing this module including the modules it imported
+        :param depth: 0 for modules imported directly, 1 for modules imported by them and so on
+        """
+        self.__name = name
+        self.__self_time = self_time
+        self.__cumulative_time = cumulative_time
+        self.__depth = depth
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def self_time(self) -> int:
+        return self.__self_time
+
+    @property
+    def cumulative_time(self) -> int:
+        return self.__cumulative_time
+
+    @property
+    def depth(self) -> int:
+        return self.__depth
+
+    def __str__(self) -> str:
+        return f"{self.__name} ({self.__self_time}us, {self.__cumulative_time}us cumulative)"
+
+
+class ImportProfiler:
+    """
+    Measures which modules are imported while starting the game and how long that takes. The measurement runs in a
+    fresh interpreter with Python's "-X importtime" option, so modules that were already imported by the calling
+    process don't distort it.
+    """
+    __HEADER = "import time:"
+    # modules that are slow to import and should therefore only be imported on demand
+    __DEFERRED_MODULES = [
+        ("Qiskit", "qiskit"),
+        ("level parser", "qrogue.game.world.dungeon_generator.dungeon_parser.QrogueDungeonParser"),
+        ("save data parser", "qrogue.management.save_grammar.SaveDataParser"),
+    ]
+
+    @staticmethod
+    def parse(output: str) -> List[ImportRecord]:
+        """
+        :param output: what Python wrote to stderr with "-X importtime" enabled
+        :return: the records of all imported modules in the order their import finished
+        """
+        records = []
+        for line in output.splitlines():
+            if not line.startswith(ImportProfiler.__HEADER):
+                continue
+            parts = line[len(ImportProfiler.__HEADER):].split("|")
+            if len(parts) != 3:
+                continue
+            try:
+                self_time, cumulative_time = int(parts[0]), int(parts[1])
+            except ValueError:
+                continue    # the line describing the columns
+            name = parts[2].rstrip()
+            # nested imports are indented by two additional spaces per level
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            records.append(ImportRecord(name.strip(), self_time, cumulative_time, depth))
+        return records
+
+    @staticmethod
+    def measure(module: str = "qrogue.qrogue") -> List[ImportRecord]:
+        """
+        :param module: the module to import
+        :return: the records of all modules imported by a fresh interpreter (including its own startup) until module
+            was imported
+        :raises RuntimeError: if module could not be imported
+        """
+        # make sure the fresh interpreter finds the same qrogue package as we do
+        package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.pathsep.join([package_root] + [path for path in [env.get("PYTHONPATH")] if path])
+
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env,
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        if process.returncode != 0:
+            error = process.stderr.strip().splitlines()
+            raise RuntimeError(f"Failed to import {module}: {error[-1] if len(error) > 0 else process.returncode}")
+        return ImportProfiler.parse(process.stderr)
+
+    @staticmethod
+    def __group_of(name: str) -> str:
+        parts = name.split(".")
+        # our own modules are grouped by sub-package, all others by top-level package
+        if parts[0] == "qrogue" and len(parts) > 1:
+            return ".".join(parts[:2])
+        return parts[0]
+
+    @staticmethod
+    def to_report(records: List[ImportRecord], num_of_modules: int = 15, num_of_groups: int = 15) -> str:
+        """
+        :param records: the records to summarize
+        :param num_of_modules: how many of the slowest modules to list
+        :param num_of_groups: how many of the slowest packages to list
+        :return: the total import time, a breakdown by package, the slowest modules and whether the modules that
+            should be imported on demand were imported
+        """
+        total_time = sum([record.self_time for record in records])
+
+        def line(name: str, time: int) -> str:
+            share = 100 * time / total_time if total_time > 0 else 0
+            return f"  {time / 1000:9.1f}ms {share:5.1f}%  {name}"
+
+        groups: Dict[str, int] = {}
+        for record in records:
+            group = ImportProfiler.__group_of(record.name)
+            groups[group] = groups.get(group, 0) + record.self_time
+        sorted_groups: List[Tuple[str, int]] = sorted(groups.items(), key=lambda item: item[1], reverse=True)
+        sorted_records = sorted(records, key=lambda record: record.self_time, reverse=True)
+
+        lines = [f"Imported {len(records)} modules in {total_time / 1000:.1f}ms", "By package:"]
+        lines += [line(group, time) for group, time in sorted_groups[:num_of_groups]]
+        lines.append("Slowest modules:")
+        lines += [line(record.name, record.self_time) for record in sorted_records[:num_of_modules]]
+        lines.append("Imported on demand:")
+        for title, module in ImportProfiler.__DEFERRED_MODULES:
+            record = ImportProfiler.find(records, module)
+            if record is None:
+                lines.append(f"  {title}: not imported at startup")
+            else:
+                lines.append(f"  {title}: imported at startup ({record.cumulative_time / 1000:.1f}ms)")
+        return "\n".join(lines)
+
+    @staticmethod
+    def find(records: List[ImportRecord], module: str) -> Optional[ImportRecord]:
+        """
+        :return: the record of the given module or of the first of its sub-modules if the module itself was not
+            imported, None if neither was imported
+        """
+        sub_module: Optional[ImportRecord] = None
+        for record in records:
+            if record.name == module:
+                return record
+            if sub_module is None and record.name.startswith(module + "."):
+                sub_module = record
+        return sub_module
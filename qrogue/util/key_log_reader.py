@@ -0,0 +1,310 @@
+import mmap
+import os
+from typing import Dict, List, Optional
+
+from qrogue.util.config import Config
+from qrogue.util.controls import Keys
+
+
+def _to_text(data: bytes) -> str:
+    # key logs are written in text mode, so we have to undo the platform specific line endings like open() does
+    return str(data, KeyLogReader.ENCODING).replace("\r\n", "\n").replace("\r", "\n")
+
+
+class KeyLogCheckpoint:
+    """
+    Snapshot written into the key stream of a key log whenever a level starts (see KeyLogger.checkpoint()). Replaying
+    the keys between a checkpoint and the next one with its save state and seed is like replaying the key log of the
+    level it belongs to, so a simulation can start at any level of a long key log. The keys after the next checkpoint
+    depend on the random state of the over world, which is not part of a checkpoint.
+
+    Format: LevelBegin marker, level name, "\\n", seed head, seed, "\\n", save state, LevelBegin marker
+    """
+    __MARKER = Keys.LevelBegin.to_char()
+
+    @staticmethod
+    def marker() -> str:
+        return KeyLogCheckpoint.__MARKER
+
+    @staticmethod
+    def to_log_string(level_name: str, seed: int, save_state: str) -> str:
+        return f"{KeyLogCheckpoint.__MARKER}{level_name}\n{Config.SEED_HEAD()}{seed}\n{save_state}" \
+               f"{KeyLogCheckpoint.__MARKER}"
+
+    def __init__(self, index: int, level_name: str, seed: int, save_state: str, start: int, end: int):
+        """
+        :param index: how many checkpoints precede this one in its key log
+        :param level_name: internal name of the level that started
+        :param seed: seed of the level that started
+        :param save_state: save state at the start of the level
+        :param start: byte position of the checkpoint's first marker
+        :param end: byte position of the first key after the checkpoint
+        """
+        self.__index = index
+        self.__level_name = level_name
+        self.__seed = seed
+        self.__save_state = save_state
+        self.__start = start
+        self.__end = end
+
+    @property
+    def index(self) -> int:
+        return self.__index
+
+    @property
+    def level_name(self) -> str:
+        return self.__level_name
+
+    @property
+    def seed(self) -> int:
+        return self.__seed
+
+    @property
+    def save_state(self) -> str:
+        return self.__save_state
+
+    @property
+    def start(self) -> int:
+        return self.__start
+
+    @property
+    def end(self) -> int:
+        return self.__end
+
+
+class KeyLogReader:
+    """
+    Random-access reader for .qrkl-files. The file is memory-mapped and its header is parsed once, afterwards the key
+    codes are read byte by byte without copying the file. Since key logs are written in text mode, "\\r\\n" and "\\r"
+    are read as "\\n" just like reading the file in text mode would.
+    """
+    ENCODING = "utf-8"
+    __SAVE_DATA_START = b"Qrogue<"
+    __SAVE_DATA_END = b">Qrogue"
+    __CONFIG_END = __SAVE_DATA_START
+    __LF = ord("\n")
+    __CR = ord("\r")
+    __MARKER = ord(KeyLogCheckpoint.marker())
+
+    def __init__(self, path: str):
+        """
+        :param path: path of the key log
+        :raises FileNotFoundError: if there is no file at the given path
+        :raises ValueError: if the file is no valid key log
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"There is no such key log file: {path}")
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size <= 0:
+                raise ValueError(f"Key log \"{path}\" is empty!")
+            self.__data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__size = len(self.__data)
+        self.__checkpoints: Optional[List[KeyLogCheckpoint]] = None
+        self.__checkpoints_by_start: Dict[int, KeyLogCheckpoint] = {}
+
+        name_end = self.__data.find(b"\n")
+        if name_end < 0:
+            raise ValueError(f"Key log \"{path}\" has no header!")
+        self.__map_name = _to_text(self.__data[0:name_end]).rstrip("\n")
+
+        # same layout as written by KeyLogger.reinit(): map name, log head (see Config.get_log_head()), save state
+        if self.__data[name_end + 1:name_end + 1 + len(Config.HEADER())] == bytes(Config.HEADER(), self.ENCODING):
+            config_head = self.__find(bytes(Config.CONFIG_HEAD(), self.ENCODING), name_end, path)
+            save_start = self.__find(self.__CONFIG_END, config_head, path)
+            save_end = self.__find(self.__SAVE_DATA_END, save_start, path) + len(self.__SAVE_DATA_END)
+            header = _to_text(self.__data[0:save_end])
+
+            second_line = header.index("\n")
+            version_start = second_line + len(Config.HEADER())
+            version_end = header.index("\n", version_start)
+            self.__version: str = header[version_start:version_end]
+
+            seed_start = header.index(Config.SEED_HEAD(), version_end) + len(Config.SEED_HEAD())
+            seed_end = header.index("\n", seed_start)
+            self.__seed: int = int(header[seed_start:seed_end])
+
+            time_start = header.index(Config.TIME_HEAD(), seed_end) + len(Config.TIME_HEAD())
+            time_end = header.index("\n", time_start)
+            self.__time: str = header[time_start:time_end]
+
+            config_start = header.index(Config.CONFIG_HEAD(), seed_end) + len(Config.CONFIG_HEAD()) + 1
+            config_end = header.index(str(self.__CONFIG_END, self.ENCODING), config_start)
+            self.__config: Optional[str] = header[config_start:config_end]
+            self.__save_state: Optional[str] = header[config_end:]
+            keys_start = save_end
+        else:
+            self.__version = "???"
+            self.__seed = -1
+            self.__time = "???"
+            self.__config = None
+            self.__save_state = None
+            keys_start = name_end
+
+        # skip the line break that ends the header
+        self.__keys_start = self.__skip_code(keys_start)
+        self.__position = self.__keys_start
+        self.__end = self.__size
+
+    def __find(self, sub: bytes, start: int, path: str) -> int:
+        index = self.__data.find(sub, start)
+        if index < 0:
+            raise ValueError(f"Key log \"{path}\" has an incomplete header: missing {sub}!")
+        return index
+
+    def __skip_code(self, position: int) -> int:
+        """
+        :return: the position after the code at the given position with "\\r\\n" counting as one code
+        """
+        if position < self.__size and self.__data[position] == self.__CR and position + 1 < self.__size and \
+                self.__data[position + 1] == self.__LF:
+            return position + 2
+        return position + 1
+
+    def __parse_checkpoint(self, start: int, index: int) -> Optional[KeyLogCheckpoint]:
+        """
+        :return: the checkpoint starting at the given position or None if the marker at this position doesn't start a
+            valid checkpoint
+        """
+        name_end = self.__data.find(b"\n", start)
+        seed_head = bytes(Config.SEED_HEAD(), self.ENCODING)
+        if name_end < 0 or self.__data[name_end + 1:name_end + 1 + len(seed_head)] != seed_head:
+            return None
+        seed_end = self.__data.find(b"\n", name_end + 1)
+        save_end = self.__data.find(self.__SAVE_DATA_END, seed_end)
+        if seed_end < 0 or save_end < 0:
+            return None
+        save_end += len(self.__SAVE_DATA_END)
+        if save_end < self.__size and self.__data[save_end] in (self.__LF, self.__CR):
+            save_end = self.__skip_code(save_end)     # save states end with a line break
+        if save_end >= self.__size or self.__data[save_end] != self.__MARKER:
+            return None
+        try:
+            seed = int(self.__data[name_end + 1 + len(seed_head):seed_end])
+        except ValueError:
+            return None
+        level_name = _to_text(self.__data[start + 1:name_end]).rstrip("\n")
+        return KeyLogCheckpoint(index, level_name, seed, _to_text(self.__data[seed_end + 1:save_end]), start,
+                                save_end + 1)
+
+    def __get_checkpoints(self) -> List[KeyLogCheckpoint]:
+        if self.__checkpoints is None:
+            # markers inside of a checkpoint's save state are skipped since we continue searching after its end
+            checkpoints = []
+            position = self.__data.find(bytes([self.__MARKER]), self.__keys_start)
+            while position >= 0:
+                checkpoint = self.__parse_checkpoint(position, len(checkpoints))
+                if checkpoint is None:
+                    position = self.__data.find(bytes([self.__MARKER]), position + 1)
+                else:
+                    checkpoints.append(checkpoint)
+                    self.__checkpoints_by_start[position] = checkpoint
+                    position = self.__data.find(bytes([self.__MARKER]), checkpoint.end)
+            self.__checkpoints = checkpoints
+        return self.__checkpoints
+
+    def __checkpoint_at(self, position: int) -> Optional[KeyLogCheckpoint]:
+        self.__get_checkpoints()
+        return self.__checkpoints_by_start.get(position, None)
+
+    @property
+    def map_name(self) -> str:
+        return self.__map_name
+
+    @property
+    def has_header(self) -> bool:
+        return self.__config is not None
+
+    @property
+    def version(self) -> str:
+        return self.__version
+
+    @property
+    def seed(self) -> int:
+        return self.__seed
+
+    @property
+    def time(self) -> str:
+        return self.__time
+
+    @property
+    def config(self) -> Optional[str]:
+        """
+        :return: the options the key log was recorded with or None if it has no header
+        """
+        return self.__config
+
+    @property
+    def save_state(self) -> Optional[str]:
+        return self.__save_state
+
+    @property
+    def position(self) -> int:
+        return self.__position
+
+    @property
+    def end(self) -> int:
+        """
+        :return: byte position at which reading stops
+        """
+        return self.__end
+
+    @property
+    def checkpoints(self) -> List[KeyLogCheckpoint]:
+        """
+        :return: all checkpoints of the key log in the order they were written
+        """
+        return list(self.__get_checkpoints())
+
+    def seek(self, position: Optional[int] = None, end: Optional[int] = None):
+        """
+        :param position: byte position of the next key to read or None to start at the first key again
+        :param end: byte position at which reading stops or None to read until the end of the key log
+        """
+        if position is None:
+            position = self.__keys_start
+        if end is None:
+            end = self.__size
+        assert self.__keys_start <= position <= self.__size, f"Position {position} is outside of the key stream!"
+        assert position <= end <= self.__size, f"End {end} is outside of the key stream or before {position}!"
+        self.__position = position
+        self.__end = end
+
+    def seek_checkpoint(self, index: int, only_level: bool = True) -> KeyLogCheckpoint:
+        """
+        Continues reading with the first key after the given checkpoint.
+
+        :param index: index of the checkpoint, negative values count from the end
+        :param only_level: whether reading stops at the next checkpoint, i.e., after the last key of the checkpoint's
+            level, or continues until the end of the key log
+        :return: the checkpoint
+        :raises IndexError: if the key log has no checkpoint at the given index
+        """
+        checkpoints = self.__get_checkpoints()
+        checkpoint = checkpoints[index]
+        end = None
+        if only_level and checkpoint.index + 1 < len(checkpoints):
+            end = checkpoints[checkpoint.index + 1].start
+        self.seek(checkpoint.end, end)
+        return checkpoint
+
+    def next_code(self) -> Optional[int]:
+        """
+        :return: the code of the next logged key (see Keys.code) or None if we reached the end of the key log or the
+            end set by seek()
+        """
+        while self.__position < self.__end:
+            code = self.__data[self.__position]
+            if code == self.__MARKER:
+                checkpoint = self.__checkpoint_at(self.__position)
+                if checkpoint is not None:
+                    self.__position = checkpoint.end
+                    continue
+            elif code == self.__CR:
+                code = self.__LF
+            self.__position = self.__skip_code(self.__position)
+            return code
+        return None
+
+    def close(self):
+        if not self.__data.closed:
+            self.__data.close()
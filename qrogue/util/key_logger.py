@@ -1,8 +1,10 @@
 import os.path
-from typing import Optional, Callable
+from typing import Optional, Callable, List
 
+from qrogue.util.async_writer import AsyncFileWriter
 from qrogue.util.config import PathConfig, Config
 from qrogue.util.controls import Controls, Keys
+from qrogue.util.key_log_reader import KeyLogCheckpoint
 
 
 class KeyLogger:
@@ -13,16 +15,28 @@ class KeyLogger:
     def get_error_marker() -> str:
         return Keys.ErrorMarker.to_char() + Keys.ErrorMarker.to_char() + Keys.ErrorMarker.to_char()
 
-    def __init__(self, write: Optional[Callable[[str, str], None]] = None):
+    def __init__(self, write: Optional[Callable[[str, str], None]] = None,
+                 release: Optional[Callable[[str], None]] = None):
+        """
+        :param write: appends text to the file at the given path, defaults to appending in the background
+        :param release: called with the path of a log that will not be written anymore, defaults to closing its file
+            handle in the background (only used if write is None, too)
+        """
         self.__save_file: Optional[str] = None
-        self.__buffer: Optional[str] = None
+        self.__buffer: Optional[List[str]] = None
+        self.__buffer_size = 0  # number of characters stored in buffer
+        self.__has_flushed = False  # whether the current logging session was already written
         self.__keystrokes = 0  # count how many keys are logged to not persist empty or almost empty runs
         self.__is_active = False  # whether log() should log or do nothing
 
         if write is None:
-            self.__write = lambda path, text: PathConfig.write(path, text, may_exist=True, append=True)
+            # write in the background, so logging doesn't add latency to handling the key presses
+            self.__write = lambda path, text: AsyncFileWriter.instance().append(PathConfig.user_data_path(path), text)
+            if release is None:
+                release = lambda path: AsyncFileWriter.instance().release(PathConfig.user_data_path(path))
         else:
             self.__write = write
+        self.__release = release
 
     def _is_for_levels(self) -> bool:
         return True
@@ -35,13 +49,17 @@ class KeyLogger:
         self.__is_active = active
 
     def _append(self, text: str):
-        self.__buffer += text
+        self.__buffer.append(text)
+        self.__buffer_size += len(text)
 
     def reinit(self, seed: int, level_name: str, save_state: str, save_path: Optional[str] = None,
                activate: bool = True):
         if self.is_initialized:
             # flush the old data if needed
             self.flush_if_useful()
+            if self.__release is not None:
+                # every session gets its own file, so the old one is never written again
+                self.__release(self.__save_file)
         if activate:  # reactivate if requested
             self.set_active(True)
 
@@ -50,7 +68,9 @@ class KeyLogger:
             self.__save_file = PathConfig.new_key_log_file(seed, self._is_for_levels())
         else:
             self.__save_file = save_path
-        self.__buffer = ""
+        self.__buffer = []
+        self.__buffer_size = 0
+        self.__has_flushed = False
         self._append(level_name)
         self._append("\n")
         self._append(Config.get_log_head(seed))
@@ -64,32 +84,41 @@ class KeyLogger:
             self.__keystrokes += 1
             self._flush(force=False)
 
+    def checkpoint(self, level_name: str, seed: int, save_state: str):
+        """
+        Stores a snapshot of the given level start in the log, so simulations can start at this point of the log instead
+        of replaying it from the beginning (see KeyLogReader.seek_checkpoint()).
+        """
+        if self.__is_active and Config.key_log_checkpoints():
+            self._append(KeyLogCheckpoint.to_log_string(level_name, seed, save_state))
+            self._flush(force=False)
+
     def flush_if_useful(self):
         """
         Flushes only if the .qrkl-file was already created (meaning we already flushed before) or if the buffer has a
         minimum length, so we don't produce useless files (e.g. immediately quiting a run doesn't provide useful
         information).
         """
-        if os.path.exists(self.__save_file) or KeyLogger.__MIN_KEYSTROKES_FOR_FLUSH <= self.__keystrokes:
+        if self.__has_flushed or os.path.exists(self.__save_file) or \
+                KeyLogger.__MIN_KEYSTROKES_FOR_FLUSH <= self.__keystrokes:
             self._flush(force=True)
 
     def _flush(self, force: bool):
         if Config.skip_persisting():
             return
-        if force or len(self.__buffer) >= KeyLogger.__BUFFER_SIZE:
-            self.__write(self.__save_file, self.__buffer)
-            self.__buffer = ""
+        if force or self.__buffer_size >= KeyLogger.__BUFFER_SIZE:
+            self.__write(self.__save_file, "".join(self.__buffer))
+            self.__buffer.clear()
+            self.__buffer_size = 0
+            self.__has_flushed = True
 
 
 class OverWorldKeyLogger(KeyLogger):
     def _is_for_levels(self) -> bool:
         return False
 
-    def level_start(self, level_name: str):
-        # self._append(
-        #    f"{OverWorldKeyLogger.get_level_start_marker()}{level_name}{OverWorldKeyLogger.get_level_start_marker()}"
-        # )
-        pass
+    def level_start(self, level_name: str, seed: int, save_state: str):
+        self.checkpoint(level_name, seed, save_state)
 
 
 class DummyKeyLogger(OverWorldKeyLogger):
@@ -114,6 +143,9 @@ class DummyKeyLogger(OverWorldKeyLogger):
     def log(self, controls: Controls, key_pressed: int):
         pass
 
+    def checkpoint(self, level_name: str, seed: int, save_state: str):
+        pass
+
     def flush_if_useful(self):
         pass
 
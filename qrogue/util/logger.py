@@ -2,6 +2,7 @@ from typing import Callable, Optional, List, Union
 
 from py_cui.debug import PyCUILogger
 
+from .async_writer import AsyncFileWriter
 from .config import Config, ErrorConfig, PathConfig, TestConfig
 from .util_functions import cur_datetime
 
@@ -31,6 +32,15 @@ class Logger(PyCUILogger):
         else:
             raise TestConfig.StateException(ErrorConfig.singleton_reset("Logger"))
 
+    @staticmethod
+    def init_for_worker():
+        """
+        Replaces the Logger of a worker process with one that drops all messages. A Logger inherited from the parent
+        process would otherwise write the parent's buffer a second time.
+        """
+        Logger.__instance = None
+        Logger(lambda text: None)
+
     @staticmethod
     def _set_instance(logger: "Logger"):
         # needed to insert a special TestLogger during testing
@@ -42,28 +52,25 @@ class Logger(PyCUILogger):
             Logger.__instance.throw(Exception(ErrorConfig.singleton("Logger")))
         else:
             if commit is None:
-                save_file = PathConfig.new_log_file()
+                # write in the background, so logging doesn't slow down the game
+                save_file = PathConfig.user_data_path(PathConfig.new_log_file())
 
                 def commit_(text: str):
-                    PathConfig.write(save_file, text, may_exist=True, append=True)
+                    AsyncFileWriter.instance().append(save_file, text)
 
                 self.__commit = commit_
+                self.__writes_async = True
             else:
                 self.__commit = commit
+                self.__writes_async = False
 
             self.__text = ""
             self.__error_popup: Optional[Callable[[str], None]] = None
             self.__buffer: List[str] = []  # stores logged lines
+            self.__buffer_size = 0  # number of characters stored in buffer
             self.__error_counter = 0
             Logger.__instance = self
 
-    @property
-    def __buffer_size(self) -> int:
-        """
-        Returns: number of characters stored in buffer
-        """
-        return sum([len(line) for line in self.__buffer])
-
     @property
     def error_count(self) -> int:
         return self.__error_counter
@@ -79,8 +86,9 @@ class Logger(PyCUILogger):
                         some Exceptions)
         """
         self.__buffer.append(text)
+        self.__buffer_size += len(text)
         if self.__buffer_size >= Logger.__BUFFER_SIZE:
-            self.flush()
+            self.__commit_buffer()
 
     def info(self, message, from_pycui: bool = True, **kwargs) -> None:
         time_str = cur_datetime().strftime("%H-%M-%S")
@@ -128,10 +136,17 @@ class Logger(PyCUILogger):
     def clear(self) -> None:
         self.__text = ""
 
-    def flush(self) -> None:
+    def __commit_buffer(self) -> None:
         if self.__buffer_size > 0:
-            text = ""
-            for log in self.__buffer:
-                text += log + "\n"
-            self.__commit(text)
+            self.__buffer.append("")    # for the line break at the end
+            self.__commit("\n".join(self.__buffer))
             self.__buffer.clear()
+            self.__buffer_size = 0
+
+    def flush(self) -> None:
+        """
+        Commits the buffered lines and, if they are written in the background, waits until they are written.
+        """
+        self.__commit_buffer()
+        if self.__writes_async:
+            AsyncFileWriter.instance().flush()
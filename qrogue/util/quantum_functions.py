@@ -1,4 +1,6 @@
-from typing import List
+from typing import List, Iterable, Tuple, Sequence, Optional, Union
+
+import numpy as np
 
 from qrogue.util.util_functions import to_binary_string, is_power_of_2
 
@@ -26,17 +28,69 @@ def verify_stv_amplitudes(amplitudes: List[complex], tolerance: float):
     return False
 
 
-def verify_circuit_matrix(matrix: List[List[complex]], tolerance: float) -> bool:
-    col_sum: List[float] = [0] * len(matrix)
-    for row in matrix:
-        row_sum = 0
-        for i, val in enumerate(row):
-            res_val = abs(val) ** 2
-            row_sum += res_val
-            col_sum[i] += res_val
-        if row_sum < 1 - tolerance or 1 + tolerance < row_sum:
-            return False
-    for val in col_sum:
-        if val < 1 - tolerance or 1 + tolerance < val:
-            return False
-    return True
+def verify_circuit_matrix(matrix: Union[List[List[complex]], np.ndarray], tolerance: float) -> bool:
+    """
+    Checks whether the given matrix is unitary, i.e., whether U @ U^dagger is the identity (within tolerance).
+    """
+    matrix = np.asarray(matrix, dtype=np.complex128)
+    if len(matrix.shape) != 2 or matrix.shape[0] != matrix.shape[1]:
+        return False
+    return bool(np.allclose(matrix @ matrix.conj().T, np.eye(matrix.shape[0]), rtol=0, atol=tolerance))
+
+
+def apply_gate_matrix(tensor: np.ndarray, matrix: np.ndarray, qargs: Sequence[int], num_of_qubits: int) \
+        -> np.ndarray:
+    """
+    Applies a gate matrix onto the given qubits of a tensor with shape (2,)*num_of_qubits + (batch dimensions).
+    The ordering is the same as Qiskit's (little-endian): qubit 0 is the least significant bit of a basis state's index
+    and qargs[0] is the least significant bit of matrix's index.
+
+    :param tensor: the state (e.g., a reshaped StateVector or the rows of a reshaped unitary) to apply the gate to
+    :param matrix: the (2**len(qargs) x 2**len(qargs)) matrix of the gate
+    :param qargs: the qubits the gate is applied to
+    :param num_of_qubits: how many qubits tensor describes
+    :return: a new tensor with the same shape as tensor
+    """
+    k = len(qargs)
+    gate = matrix.reshape((2,) * (2 * k))
+    # the first axis of the reshaped gate belongs to its most significant qubit, i.e., qargs[k-1]
+    axes = [num_of_qubits - 1 - qargs[k - 1 - i] for i in range(k)]
+    result = np.tensordot(gate, tensor, axes=(list(range(k, 2 * k)), axes))
+    return np.moveaxis(result, list(range(k)), axes)
+
+
+def simulate_statevector(operations: Iterable[Tuple[np.ndarray, Sequence[int]]], num_of_qubits: int,
+                         amplitudes: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Computes the amplitudes resulting from applying the given operations in order onto the given input amplitudes.
+
+    :param operations: pairs of gate matrix and the qubits it is applied to
+    :param num_of_qubits: how many qubits the circuit has
+    :param amplitudes: optional input amplitudes, defaults to the zero state |0...0>
+    :return: complex128 array of 2**num_of_qubits amplitudes
+    """
+    if amplitudes is None:
+        tensor = np.zeros(2 ** num_of_qubits, dtype=np.complex128)
+        tensor[0] = 1
+    else:
+        tensor = np.asarray(amplitudes, dtype=np.complex128)
+    tensor = tensor.reshape((2,) * num_of_qubits)
+    for matrix, qargs in operations:
+        tensor = apply_gate_matrix(tensor, matrix, qargs, num_of_qubits)
+    return tensor.reshape(2 ** num_of_qubits)
+
+
+def simulate_unitary(operations: Iterable[Tuple[np.ndarray, Sequence[int]]], num_of_qubits: int) -> np.ndarray:
+    """
+    Computes the unitary of a circuit consisting of the given operations.
+
+    :param operations: pairs of gate matrix and the qubits it is applied to
+    :param num_of_qubits: how many qubits the circuit has
+    :return: complex128 array of shape (2**num_of_qubits, 2**num_of_qubits)
+    """
+    dim = 2 ** num_of_qubits
+    # the rows of the unitary are transformed by each gate while the columns act as batch dimension
+    tensor = np.eye(dim, dtype=np.complex128).reshape((2,) * num_of_qubits + (dim,))
+    for matrix, qargs in operations:
+        tensor = apply_gate_matrix(tensor, matrix, qargs, num_of_qubits)
+    return tensor.reshape(dim, dim)
@@ -262,25 +262,45 @@ def num_to_letter(num: int, start_uppercase: bool = True) -> str:
     return chr(ord(start_char) + num)
 
 
+def __key_stream(key: str, length: int) -> np.ndarray:
+    # the key repeated (and cut off) to the given length
+    return np.resize(np.array([ord(c) for c in key], dtype=np.int64), length)
+
+
+def __code_points(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+
+
 def simple_encode(key: str, clear: str) -> str:
-    enc = []
-    for i in range(len(clear)):
-        key_c = key[i % len(key)]
-        enc_c = chr((ord(clear[i]) + ord(key_c)) % 256)
-        enc.append(enc_c)
-    enc = base64.urlsafe_b64encode(bytearray("".join(enc), "utf-8"))
+    # shifts every character by the corresponding key character (modulo 256)
+    codes = __code_points(clear)
+    enc = ((codes + __key_stream(key, len(codes))) % 256).astype(np.uint8).tobytes().decode("latin-1")
+    enc = base64.urlsafe_b64encode(bytearray(enc, "utf-8"))
     return enc.decode("utf-8")  # convert bytes back to str
 
 
 def simple_decode(key: str, enc: str) -> str:
-    dec = []
     enc = base64.urlsafe_b64decode(enc)
     enc = enc.decode("utf-8")   # convert bytes back to str
-    for i in range(len(enc)):
-        key_c = key[i % len(key)]
-        dec_c = chr((256 + ord(enc[i]) - ord(key_c)) % 256)
-        dec.append(dec_c)
-    return "".join(dec)
+    codes = __code_points(enc)
+    dec = (256 + codes - __key_stream(key, len(codes))) % 256
+    return dec.astype(np.uint8).tobytes().decode("latin-1")
+
+
+def simple_byte_encode(key: str, clear: str) -> str:
+    """
+    Like simple_encode() but shifts the UTF-8 bytes of clear instead of its characters, so characters beyond the
+    first 256 survive and the result is shorter since no byte needs two bytes in UTF-8 afterwards.
+    """
+    data = np.frombuffer(clear.encode("utf-8"), dtype=np.uint8)
+    key_stream = np.resize(np.frombuffer(key.encode("utf-8"), dtype=np.uint8), len(data))
+    return base64.urlsafe_b64encode((data + key_stream).tobytes()).decode("ascii")  # uint8 wraps around at 256
+
+
+def simple_byte_decode(key: str, enc: str) -> str:
+    data = np.frombuffer(base64.urlsafe_b64decode(enc), dtype=np.uint8)
+    key_stream = np.resize(np.frombuffer(key.encode("utf-8"), dtype=np.uint8), len(data))
+    return (data - key_stream).tobytes().decode("utf-8")
 
 
 def open_folder(path: str):